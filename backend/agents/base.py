@@ -1,8 +1,18 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from utils.trace import DecisionTrace
 
+
+class BaseAgent:
+    """
+    Lightweight base for agents that return their own trace lines
+    (e.g. {"...": ..., "trace": [...]}) instead of writing to a shared DecisionTrace.
+    """
+
+    name: str = "agent"
+
+
 class Agent(ABC):
     """
     Minimal base class for all agents.
@@ -11,8 +21,8 @@ class Agent(ABC):
 
     name: str = "Agent"
 
-    def __init__(self, trace: DecisionTrace) -> None:
-        self.trace = trace
+    def __init__(self, trace: Optional[DecisionTrace] = None) -> None:
+        self.trace = trace if trace is not None else DecisionTrace()
 
     def log(self, message: str) -> None:
         self.trace.log(f"[{self.name}] {message}")
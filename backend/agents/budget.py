@@ -1,31 +1,106 @@
 from __future__ import annotations
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Sequence
+
 from .base import Agent
-from utils.types import TripRequest
+from .budget_engine import BudgetEngine, spot_price, spot_values, table_prices, table_values
+from utils.config import get_settings
+from utils.similarity import normalize_title
+from utils.spots import SpotTable
+from utils.types import DayPlan, TripRequest
+
+DEFAULT_DAILY_COST_PER_PERSON = 120.0  # USD, conservative baseline (no itinerary to price)
 
-DEFAULT_DAILY_COST_PER_PERSON = 120.0  # USD, conservative baseline
 
 class BudgetAgent(Agent):
+    """
+    Prices an itinerary: per-person daily base (BUDGET_DAILY_BASE) plus each visited
+    spot's est_price, times travelers, with a per-day breakdown. When the plan is over
+    profile.budget_total, the engine reports what the best-fitting itinerary would cost.
+    """
     name = "Budget"
 
-    def act(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        req: TripRequest = state["request"]
-        people = max(req.profile.people, 1)
-        baseline = DEFAULT_DAILY_COST_PER_PERSON * req.days * people
-
-        # If user provided a target total budget, keep both numbers
-        target_budget = req.profile.budget_total
-        result = {
-            "total_cost_estimate": round(baseline, 2),
-            "budget_target": target_budget,
-        }
+    def estimate(
+        self,
+        days: Optional[Sequence[Any]],
+        request: TripRequest,
+        spots: Optional[Sequence[Dict[str, Any]]] = None,
+        table: Optional[SpotTable] = None,
+        rows: Optional[Sequence[Sequence[Optional[int]]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        With the Planner's `table` and `rows` (the row behind each activity) visits are
+        priced straight from the table; otherwise activities are matched to `spots` by title.
+        """
+        people = max(request.profile.people, 1)
+        target = request.profile.budget_total
+        if not days:
+            total = DEFAULT_DAILY_COST_PER_PERSON * people * request.days
+            return {
+                "total_estimated_cost": round(total, 2),
+                "currency": "USD",
+                "trace": [f"[{self.name}] estimated total ${total:.2f} for {people} traveler(s)"],
+            }
 
-        if target_budget is not None and baseline > float(target_budget):
-            self.log(
-                f"estimate ${baseline:.2f} exceeds target ${float(target_budget):.2f} "
-                f"by ${baseline - float(target_budget):.2f}"
-            )
+        # activities that came from a curated spot carry its price; the rest ride on the base
+        assignment: List[int] = []
+        acts_per_day = [d.activities if isinstance(d, DayPlan) else d.get("activities", []) for d in days]
+        if table is not None and rows is not None and list(map(len, rows)) == list(map(len, acts_per_day)):
+            placed = [(d, r) for d, day in enumerate(rows) for r in day if r is not None]
+            all_prices, all_values = table_prices(table), table_values(table)
+            prices = [all_prices[r] for _, r in placed]
+            values = [all_values[r] for _, r in placed]
+            assignment = [d for d, _ in placed]
         else:
-            self.log(f"estimated total ${baseline:.2f} for {people} traveler(s)")
+            by_title = {normalize_title(str(s.get("title") or "")): s for s in spots or []}
+            priced: List[Dict[str, Any]] = []
+            for d, acts in enumerate(acts_per_day):
+                for act in acts:
+                    spot = by_title.get(normalize_title(act))
+                    if spot is not None:
+                        priced.append(spot)
+                        assignment.append(d)
+            prices = [spot_price(s) for s in priced]
+            values = spot_values(priced, spots or [])
 
-        return result
+        s = get_settings()
+        engine = BudgetEngine(
+            prices=prices,
+            days=len(days),
+            people=people,
+            base_per_day=s.BUDGET_DAILY_BASE,
+            values=values,
+        )
+        fit = engine.breakdown(assignment, target=target)
+        trace = [
+            f"[{self.name}] estimated total ${fit.total:.2f} for {people} traveler(s) "
+            f"({len(prices)} priced visit(s), {len(days)} day(s))"
+        ]
+        if target is not None and not fit.within_target:
+            best = engine.fit(assignment, target=target, mode=s.BUDGET_MODE)  # as the Planner fits
+            if best.within_target:
+                trace.append(
+                    f"[{self.name}] exceeds target ${float(target):.2f} by ${fit.total - float(target):.2f}; "
+                    f"dropping {len(best.dropped)} visit(s) would bring it to ${best.total:.2f}"
+                )
+            else:
+                trace.append(
+                    f"[{self.name}] exceeds target ${float(target):.2f} even without paid visits "
+                    f"(floor ${best.total:.2f})"
+                )
+        return {
+            "total_estimated_cost": fit.total,
+            "currency": "USD",
+            "breakdown": fit.to_dict(),
+            "trace": trace,
+        }
+
+    def act(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        req: TripRequest = state["request"]
+        out = self.estimate(state.get("draft_plan"), req, state.get("llm_spots"))
+        for line in out["trace"]:
+            self.trace.log(line)
+        return {
+            "total_cost_estimate": out["total_estimated_cost"],
+            "budget_target": req.profile.budget_total,
+            "budget_breakdown": out.get("breakdown"),
+        }
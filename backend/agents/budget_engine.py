@@ -0,0 +1,252 @@
+"""
+Vectorized budget engine used by the Planner and the Budget agent.
+
+Spot prices (per person), per-day base costs (per person: lodging, meals, transit)
+and the traveler count are held as arrays. A candidate itinerary is one row of an
+(m, n) matrix giving each spot's day index, or -1 when the spot is dropped, so a
+whole batch of candidates is costed with one bincount:
+
+    per_day[c, d] = people * (base[d] + sum(price[s] for spots s on day d in c))
+
+Candidates come from greedy knapsack orderings (drop the spots with the lowest
+value^alpha / price first, for several alphas); each prefix of an ordering is one
+candidate. NumPy is used when installed; the pure-Python path gives the same results.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from utils.spots import SpotTable
+
+try:
+    import numpy as np
+except Exception:
+    np = None  # type: ignore[assignment, unused-ignore]
+
+DEFAULT_SPOT_PRICE = 15.0
+# typical per-person entry price when the LLM/catalogue gives none
+CATEGORY_PRICE: Dict[str, float] = {
+    "museum": 18.0, "gallery": 12.0, "landmark": 12.0, "church": 0.0, "park": 0.0,
+    "garden": 6.0, "viewpoint": 8.0, "market": 15.0, "food": 25.0, "cafe": 8.0,
+    "nightlife": 30.0, "shopping": 20.0, "tour": 30.0, "walk": 0.0, "neighborhood": 0.0,
+}
+ALPHAS = (0.0, 0.5, 1.0, 2.0, 4.0)  # 0 = cheapest first, large = value first
+
+
+def spot_price(spot: Dict[str, Any]) -> float:
+    """Per-person price of a spot: est_price if usable, else a category default."""
+    try:
+        price = spot.get("est_price")
+        if price is not None and float(price) >= 0:
+            return float(price)
+    except (TypeError, ValueError):
+        pass
+    return CATEGORY_PRICE.get(str(spot.get("category") or "").strip().lower(), DEFAULT_SPOT_PRICE)
+
+
+def spot_values(selected: Sequence[Dict[str, Any]], ranked: Sequence[Dict[str, Any]]) -> List[float]:
+    """Value of each selected spot from its rank in the curated list: 1.0 (best) down to 1/n."""
+    n = max(len(ranked), 1)
+    rank = {id(s): i for i, s in enumerate(ranked)}
+    return [1.0 - rank.get(id(s), n - 1) / n for s in selected]
+
+
+def table_prices(table: SpotTable) -> List[float]:
+    """spot_price for every row of `table`; category defaults are looked up once per category code."""
+    defaults = [CATEGORY_PRICE.get(c, DEFAULT_SPOT_PRICE) for c in table.categories]
+    return [p if p >= 0 else defaults[c] for p, c in zip(table.price, table.category)]  # NaN >= 0 is False
+
+
+def table_values(table: SpotTable) -> List[float]:
+    """spot_values of every row: rows are in rank order, so 1.0 (best) down to 1/n."""
+    n = max(len(table), 1)
+    return [1.0 - i / n for i in range(len(table))]
+
+
+@dataclass
+class Scores:
+    totals: Any                     # (m,) per candidate; list, or ndarray on the NumPy path
+    values: Any                     # (m,)
+    per_day: Any                    # (m, days)
+
+
+@dataclass
+class BudgetFit:
+    index: int                      # chosen candidate row
+    assignment: List[int]           # day index per spot, -1 = dropped
+    total: float
+    value: float
+    per_day: List[Dict[str, float]]
+    target: Optional[float]
+    within_target: Optional[bool]
+    candidates: int
+    backend: str
+
+    @property
+    def dropped(self) -> List[int]:
+        return [i for i, d in enumerate(self.assignment) if d < 0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "target": self.target,
+            "within_target": self.within_target,
+            "per_day": self.per_day,
+            "dropped": len(self.dropped),
+            "candidates": self.candidates,
+            "backend": self.backend,
+        }
+
+
+class BudgetEngine:
+    """
+    Costs and ranks candidate itineraries over a fixed set of `n` priced spots.
+    `values` (default: 1.0 each) is what a candidate keeps by including a spot.
+    """
+
+    def __init__(
+        self,
+        prices: Sequence[float],
+        days: int,
+        people: int,
+        base_per_day: Sequence[float] | float,
+        values: Optional[Sequence[float]] = None,
+        use_numpy: Optional[bool] = None,
+    ) -> None:
+        self.n = len(prices)
+        self.days = max(int(days), 1)
+        self.people = max(int(people), 1)
+        if isinstance(base_per_day, (int, float)):
+            base_per_day = [float(base_per_day)] * self.days
+        self.prices = [float(p) for p in prices]
+        self.base = [float(b) for b in base_per_day][:self.days]
+        self.values = [float(v) for v in values] if values is not None else [1.0] * self.n
+        self.np = np is not None if use_numpy is None else (use_numpy and np is not None)
+        self.backend = "numpy" if self.np else "python"
+
+    # ---------- candidates ----------
+
+    def candidates(self, assignment: Sequence[int], alphas: Sequence[float] = ALPHAS) -> Any:
+        """
+        (m, n) candidate matrix derived from one day assignment: for each alpha, drop
+        0, 1, 2, ... priced spots in increasing value^alpha / price order. Free and
+        already-unassigned spots are never dropped (they cost nothing).
+        """
+        droppable = [i for i in range(self.n) if assignment[i] >= 0 and self.prices[i] > 0]
+        k = len(droppable)
+        if self.np:
+            a = np.asarray(assignment, dtype=np.int64)
+            p = np.asarray(self.prices)[droppable]
+            v = np.asarray(self.values)[droppable]
+            steps = np.arange(k + 1)[:, None]
+            blocks = []
+            for alpha in alphas:
+                order = np.argsort(v ** alpha / p, kind="stable")   # first = dropped first
+                pos = np.full(self.n, k + 1, dtype=np.int64)        # never dropped
+                pos[np.asarray(droppable, dtype=np.int64)[order]] = np.arange(k)
+                blocks.append(np.where(pos[None, :] >= steps, a[None, :], -1))  # (k+1, n)
+            return np.concatenate(blocks)
+        rows: List[List[int]] = []
+        for alpha in alphas:
+            ranked = sorted(
+                range(k), key=lambda j: self.values[droppable[j]] ** alpha / self.prices[droppable[j]]
+            )
+            row = list(assignment)
+            rows.append(list(row))
+            for j in ranked:
+                row[droppable[j]] = -1
+                rows.append(list(row))
+        return rows
+
+    # ---------- scoring ----------
+
+    def score(self, candidates: Any) -> Scores:
+        """Cost every candidate row in one pass."""
+        D, ppl = self.days, self.people
+        if self.np:
+            A = np.asarray(candidates, dtype=np.int64)
+            m = len(candidates)
+            A = A.reshape(m, self.n)
+            inc = (A >= 0) & (A < D)
+            # dropped spots land in one overflow bin past the last (candidate, day) cell
+            cell = np.where(inc, np.arange(m)[:, None] * D + A, m * D)
+            cost = np.broadcast_to(np.asarray(self.prices) * ppl, A.shape)
+            per_day = np.bincount(cell.ravel(), weights=cost.ravel(), minlength=m * D + 1)[:m * D]
+            per_day = per_day.reshape(m, D) + np.asarray(self.base) * ppl
+            return Scores(per_day.sum(axis=1), inc @ np.asarray(self.values), per_day)
+        base = [b * ppl for b in self.base]
+        costs = [p * ppl for p in self.prices]
+        totals: List[float] = []
+        values_out: List[float] = []
+        per_day_out: List[List[float]] = []
+        for row in candidates:
+            days = list(base)
+            value = 0.0
+            for i, d in enumerate(row):
+                if 0 <= d < D:
+                    days[d] += costs[i]
+                    value += self.values[i]
+            per_day_out.append(days)
+            totals.append(sum(days))
+            values_out.append(value)
+        return Scores(totals, values_out, per_day_out)
+
+    @staticmethod
+    def choose(scores: Scores, target: Optional[float] = None, mode: str = "best") -> int:
+        """
+        Row to keep. "best": most value within the target (cheaper wins ties);
+        "cheapest": lowest total. Over target everywhere -> cheapest.
+        """
+        if np is not None and isinstance(scores.totals, np.ndarray):
+            # same rule as below; lexsort keys are listed least significant first
+            total, value = np.round(scores.totals, 6), np.round(scores.values, 6)
+            idx = np.arange(len(total))
+            feasible = np.ones(len(total), bool) if target is None else total <= target + 1e-9
+            if mode == "cheapest" or not feasible.any():
+                return int(np.lexsort((idx, -value, total))[0])
+            cand = idx[feasible]
+            return int(cand[np.lexsort((cand, total[cand], -value[cand]))[0]])
+        rows = range(len(scores.totals))
+        # rounded so NumPy and pure-Python summation order cannot flip a tie
+        totals = [round(t, 6) for t in scores.totals]
+        values = [round(v, 6) for v in scores.values]
+        within = [i for i in rows if target is None or totals[i] <= target + 1e-9]
+        if mode == "cheapest" or not within:
+            return min(rows, key=lambda i: (totals[i], -values[i]))
+        return max(within, key=lambda i: (values[i], -totals[i]))
+
+    def fit(self, assignment: Sequence[int], target: Optional[float] = None, mode: str = "best") -> BudgetFit:
+        cands = self.candidates(assignment)
+        scores = self.score(cands)
+        best = self.choose(scores, target, mode)
+        row = [int(d) for d in cands[best]]
+        return self._fit(row, best, scores, target, len(scores.totals))
+
+    def breakdown(self, assignment: Sequence[int], target: Optional[float] = None) -> BudgetFit:
+        """Cost a single itinerary (no search)."""
+        scores = self.score([list(assignment)])
+        return self._fit([int(d) for d in assignment], 0, scores, target, 1)
+
+    def _fit(self, row: List[int], i: int, scores: Scores, target: Optional[float], m: int) -> BudgetFit:
+        base = [b * self.people for b in self.base]
+        per_day = [
+            {
+                "day": d + 1,
+                "base": round(base[d], 2),
+                "activities": round(float(scores.per_day[i][d]) - base[d], 2),
+                "total": round(float(scores.per_day[i][d]), 2),
+            }
+            for d in range(self.days)
+        ]
+        total = round(float(scores.totals[i]), 2)
+        return BudgetFit(
+            index=i,
+            assignment=row,
+            total=total,
+            value=float(scores.values[i]),
+            per_day=per_day,
+            target=target,
+            within_target=None if target is None else total <= target + 1e-9,
+            candidates=m,
+            backend=self.backend,
+        )
@@ -1,34 +1,234 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+import math
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from utils.similarity import MinHashLSH, near_duplicate_groups, normalize_title
+from utils.spots import SpotTable
+from utils.trace import DecisionTrace
+from utils.types import DayPlan, TripRequest
 from .base import Agent
 
+# keyword -> category for activities without a curated spot behind them (generic fillers, seeds)
+_CATEGORY_KEYWORDS = {
+    "museum": "museum", "gallery": "museum", "art": "museum", "exhibit": "museum",
+    "park": "park", "garden": "park", "botanical": "park", "waterfront": "park", "beach": "park",
+    "market": "market", "food": "food", "restaurant": "food", "tasting": "food", "street": "food",
+    "cafe": "cafe", "coffee": "cafe", "bar": "nightlife", "club": "nightlife",
+    "cathedral": "landmark", "church": "landmark", "basilica": "landmark", "tower": "landmark",
+    "palace": "landmark", "castle": "landmark", "landmark": "landmark", "heritage": "landmark",
+    "viewpoint": "viewpoint", "view": "viewpoint", "walk": "walk", "tour": "walk",
+    "shopping": "shopping", "shop": "shopping",
+}
+
+# shared across requests: its per-shingle hash cache warms up on common title n-grams
+_LSH = MinHashLSH()
+
+
+@dataclass
+class CriticIssue:
+    """
+    One actionable finding. `targets` are the (day, index) activity slots the Planner
+    should change (`action`), `keep` is the occurrence the finding is measured against.
+    Days are 1-based like DayPlan.day; indexes point into DayPlan.activities.
+    """
+    kind: str                                   # "duplicate" | "near_duplicate" | "low_variety"
+    action: str                                 # "replace" | "diversify"
+    message: str
+    day: int
+    targets: List[Dict[str, Any]] = field(default_factory=list)
+    keep: Optional[Dict[str, Any]] = None
+    category: Optional[str] = None
+
+
+@dataclass
+class CriticReport:
+    issues: List[CriticIssue]
+    diversity: List[Dict[str, Any]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"issues": [asdict(i) for i in self.issues], "diversity": self.diversity}
+
+
 class CriticAgent(Agent):
+    """
+    Checks an itinerary for repeated places and monotonous days.
+
+    Near-duplicates ("Louvre Museum" vs "Musée du Louvre (1st arr.)") are found across
+    the whole trip with MinHash/LSH over normalized title shingles (utils.similarity),
+    so cost stays near-linear in the number of activities. Each day also gets
+    category-diversity metrics; a day dominated by one category is flagged.
+    """
     name = "Critic"
+    SIMILARITY = 0.6        # Jaccard over title shingles to call two activities the same place
+    MAX_SHARE = 0.67        # dominant category share that makes a day "low variety"
+    MIN_FOR_VARIETY = 3     # days with fewer categorized activities are not judged
+    MAX_TRACE_LINES = 8
+
+    def __init__(self, trace: Optional[DecisionTrace] = None, lsh: Optional[MinHashLSH] = None) -> None:
+        super().__init__(trace)
+        self.lsh = lsh or _LSH
+
+    # ---------- engine ----------
+
+    def evaluate(
+        self,
+        days: Sequence[Sequence[str]],
+        spots: Optional[Sequence[Dict[str, Any]]] = None,
+        day_numbers: Optional[Sequence[int]] = None,
+        table: Optional[SpotTable] = None,
+        rows: Optional[Sequence[Sequence[Optional[int]]]] = None,
+    ) -> CriticReport:
+        """
+        `days` holds each day's activity strings; `spots` (optional, ranked_spots_via_llm
+        schema) supply categories for activities built from them. With the Planner's
+        `table` and `rows` (the row behind each activity, None for fillers) titles and
+        categories are read from the table instead of parsed back out of the strings.
+        """
+        numbers = list(day_numbers or range(1, len(days) + 1))
+        flat = [(numbers[d], i, a) for d, acts in enumerate(days) for i, a in enumerate(acts)]
+        flat_rows: List[Optional[int]] = [None] * len(flat)
+        if table is not None and rows is not None and sum(map(len, rows)) == len(flat):
+            flat_rows = [r for day in rows for r in day]
+        else:
+            table = None  # rows do not describe these days
+        canonical: List[Optional[str]] = [None] * len(flat)
+        titles: List[str] = []
+        for k, (r, (_, _, a)) in enumerate(zip(flat_rows, flat)):
+            if table is not None and r is not None:
+                canonical[k] = table.strings[table.key[r]]
+                titles.append(table.strings[table.title[r]])
+            else:
+                titles.append(_title(a))
+        issues: List[CriticIssue] = []
+
+        # 1) repeated places anywhere in the itinerary
+        for group in near_duplicate_groups([a for _, _, a in flat], self.SIMILARITY, self.lsh, canonical):
+            occ: List[Dict[str, Any]] = [
+                {"day": flat[g][0], "index": flat[g][1], "activity": flat[g][2]} for g in group
+            ]
+            keep, rest = occ[0], occ[1:]
+            exact = len({titles[g].casefold() for g in group}) == 1
+            kind = "duplicate" if exact else "near_duplicate"
+            where = ", ".join(f"day {d}" for d in sorted({o["day"] for o in rest}))
+            issues.append(CriticIssue(
+                kind=kind,
+                action="replace",
+                message=(
+                    f"Day {keep['day']}: '{titles[group[0]]}' "
+                    f"{'repeats' if exact else 'looks repeated'} on {where}"
+                ),
+                day=rest[0]["day"],
+                targets=rest,
+                keep=keep,
+            ))
+
+        # 2) per-day category diversity
+        categories = (
+            {} if table is not None else
+            {normalize_title(str(s.get("title") or "")): s.get("category") for s in spots or []}
+        )
+        diversity: List[Dict[str, Any]] = []
+        pos = 0
+        for d, acts in enumerate(days):
+            cats = [
+                table.category_of(r) if table is not None and r is not None else _category(a, categories)
+                for a, r in zip(acts, flat_rows[pos:pos + len(acts)])
+            ]
+            pos += len(acts)
+            counts = Counter(c for c in cats if c != "other")
+            known = sum(counts.values())
+            dominant, top = counts.most_common(1)[0] if counts else (None, 0)
+            share = top / known if known else 0.0
+            entropy = -sum((n / known) * math.log(n / known) for n in counts.values()) if known else 0.0
+            metrics = {
+                "day": numbers[d],
+                "activities": len(acts),
+                "categories": dict(Counter(cats)),
+                "distinct": len(counts),
+                "evenness": round(entropy / math.log(len(counts)), 3) if len(counts) > 1 else 0.0,
+                "dominant": dominant,
+                "dominant_share": round(share, 3),
+            }
+            diversity.append(metrics)
+            if known >= self.MIN_FOR_VARIETY and share >= self.MAX_SHARE:
+                issues.append(CriticIssue(
+                    kind="low_variety",
+                    action="diversify",
+                    message=f"Day {numbers[d]}: {top} of {known} activities are {dominant}",
+                    day=numbers[d],
+                    targets=[
+                        {"day": numbers[d], "index": i, "activity": a}
+                        for i, (a, c) in enumerate(zip(acts, cats)) if c == dominant
+                    ][1:],
+                    category=dominant,
+                ))
+
+        issues.sort(key=lambda i: (i.day, i.kind))
+        return CriticReport(issues=issues, diversity=diversity)
+
+    # ---------- entry points ----------
+
+    def run(
+        self,
+        days: Sequence[DayPlan],
+        request: Optional[TripRequest] = None,
+        spots: Optional[Sequence[Dict[str, Any]]] = None,
+        table: Optional[SpotTable] = None,
+        rows: Optional[Sequence[Sequence[Optional[int]]]] = None,
+    ) -> Dict[str, Any]:
+        """Review drafted days -> {"issues": [...], "diversity": [...], "trace": [...]}."""
+        report = self.evaluate([d.activities for d in days], spots, [d.day for d in days], table, rows)
+        return {**report.to_dict(), "trace": self._summarize(report)}
 
     def act(self, state: Dict[str, Any]) -> Dict[str, Any]:
         draft: List[Dict[str, Any]] = state.get("draft_plan", [])
-        issues: List[str] = []
-        suggestions: List[str] = []
-
-        # 1) Per-day duplicate check
-        for day in draft:
-            acts = day.get("activities", [])
-            if len(set(acts)) < len(acts):
-                issues.append(f"Day {day['day']}: duplicated activities")
-                suggestions.append(f"Day {day['day']}: replace duplicates with alternatives from pool")
-
-        # 2) Repetition across consecutive days (fatigue heuristic)
-        prev = set()
-        for day in draft:
-            acts = set(day.get("activities", []))
-            if prev and len(prev.intersection(acts)) >= 2:
-                issues.append(f"Day {day['day']}: heavy overlap with previous day")
-                suggestions.append(f"Day {day['day']}: swap 1–2 items for variety")
-            prev = acts
-
-        if issues:
-            self.log(f"found {len(issues)} issue(s)")
-        else:
-            self.log("no obvious issues found")
+        report = self.evaluate(
+            [day.get("activities", []) for day in draft],
+            state.get("llm_spots"),
+            [day["day"] for day in draft],
+        )
+        for line in self._summarize(report):
+            self.trace.log(line)
+        return {
+            "critic_issues": [i.message for i in report.issues],
+            "critic_suggestions": [_suggestion(i) for i in report.issues],
+            "critic_report": report.to_dict(),
+        }
+
+    def _summarize(self, report: CriticReport) -> List[str]:
+        if not report.issues:
+            return [f"[{self.name}] no obvious issues found"]
+        kinds = Counter(i.kind.replace("_", "-") for i in report.issues)
+        lines = [
+            f"[{self.name}] found {len(report.issues)} issue(s): "
+            + ", ".join(f"{n} {k}" for k, n in kinds.items())
+        ]
+        shown = report.issues[:self.MAX_TRACE_LINES]
+        lines += [f"[{self.name}] {i.message}" for i in shown]
+        if len(report.issues) > len(shown):
+            lines.append(f"[{self.name}] ... and {len(report.issues) - len(shown)} more")
+        return lines
+
+
+def _title(activity: str) -> str:
+    """'Musée d'Orsay (Left Bank) — morning • 2h' -> 'Musée d'Orsay'."""
+    return activity.split(" — ")[0].split(" (")[0].strip()
+
+
+def _category(activity: str, known: Dict[str, Any]) -> str:
+    cat = known.get(normalize_title(activity))
+    if cat:
+        return str(cat).strip().lower()
+    for token in normalize_title(activity).split():
+        if token in _CATEGORY_KEYWORDS:
+            return _CATEGORY_KEYWORDS[token]
+    return "other"
+
 
-        return {"critic_issues": issues, "critic_suggestions": suggestions}
+def _suggestion(issue: CriticIssue) -> str:
+    if issue.action == "replace":
+        days = sorted({t["day"] for t in issue.targets})
+        return f"Day {', '.join(map(str, days))}: replace repeated visit with an alternative from the pool"
+    return f"Day {issue.day}: swap {len(issue.targets)} {issue.category} item(s) for variety"
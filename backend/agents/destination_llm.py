@@ -1,8 +1,22 @@
 from __future__ import annotations
-from typing import List, Dict, Any, Sequence
+import asyncio
+import time
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 
 from agents.base import BaseAgent  # already in your repo
-from utils.llm import ranked_spots_via_llm, flatten_spots_to_activity_strings
+from utils.llm import flatten_spots_to_activity_strings
+from utils.cache import normalize_destination
+from utils.curation import (
+    canonical_interests, curated_shards, curated_superset, merge_ranked, shard_focuses, spots_for_days,
+)
+from utils.config import get_settings, llm_backends
+from utils.deadline import DeadlineExceeded, deadline_scope, planning_reserve, remaining
+from utils.metrics import CACHE_REQUESTS, PLAN_DEGRADED
+from utils.trace import span
+from tools.catalogue import get_catalogue
+
+# key -> in-flight or finished curation task, shared by the requests of one batch
+CurationMemo = Dict[Tuple[Any, ...], "asyncio.Task[Tuple[List[Dict[str, Any]], Dict[str, Any]]]"]
 
 
 class DestinationLLMAgent(BaseAgent):
@@ -13,12 +27,79 @@ class DestinationLLMAgent(BaseAgent):
 
     name = "destination_llm"
 
-    def propose(self, destination: str, interests: Sequence[str] | None, days: int) -> Dict[str, Any]:
-        # Ask the LLM for top spots (rich objects)
-        spots = ranked_spots_via_llm(destination=destination, interests=interests, days=days)
+    def __init__(self, memo: Optional[CurationMemo] = None) -> None:
+        self.memo = memo
+
+    async def _curate(
+        self, destination: str, interests: Sequence[str] | None, days: int
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Day-independent superset (spot cache / batch memo), sliced to the trip length.
+        Long trips fetch focused shards concurrently with the superset and merge them in.
+        """
+        n = spots_for_days(days)
+        focuses = shard_focuses(interests, n)
+        if not focuses:
+            spots, cache_info = await self._superset(destination, interests)
+            return list(spots[:n]), cache_info
+        with span("curation.shards", shards=len(focuses)) as sp:
+            (spots, cache_info), extra = await asyncio.gather(
+                self._superset(destination, interests), curated_shards(destination, interests, focuses)
+            )
+            merged = merge_ranked(spots, extra)
+            sp.set(superset=len(spots), merged=len(merged))
+        if not spots and not any(extra):
+            return [], cache_info
+        merged = merged[:n]
+        return merged, {**cache_info, "shards": len(focuses), "shard_spots": len(merged) - min(len(spots), n)}
+
+    async def _superset(
+        self, destination: str, interests: Sequence[str] | None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        if self.memo is None:
+            return await curated_superset(destination, interests)
+        key = (normalize_destination(destination), canonical_interests(interests))
+        task = self.memo.get(key)
+        if task is None:
+            task = self.memo[key] = asyncio.ensure_future(curated_superset(destination, interests))
+            return await asyncio.shield(task)
+        spots, cache_info = await asyncio.shield(task)
+        CACHE_REQUESTS.inc(cache="batch", status="hit")
+        return spots, {**cache_info, "status": "batch"}
 
-        # Flatten to short activity strings (for the current Plan schema)
-        activities: List[str] = flatten_spots_to_activity_strings(spots)
+    def _from_catalogue(
+        self, destination: str, interests: Sequence[str] | None, max_items: int = 12
+    ) -> List[Dict[str, Any]]:
+        """Offline catalogue spots, or [] on a miss (unknown destination / too few matches)."""
+        catalogue = get_catalogue()
+        if catalogue is None:
+            return []
+        with span("catalogue.query") as sp:
+            spots = catalogue.query(destination, interests, limit=max_items)
+            hit = len(spots) >= get_settings().CATALOGUE_MIN_SPOTS
+            sp.set(status="hit" if hit else "miss", spots=len(spots))
+        CACHE_REQUESTS.inc(cache="catalogue", status="hit" if hit else "miss")
+        return spots if hit else []
+
+    async def propose(self, destination: str, interests: Sequence[str] | None, days: int) -> Dict[str, Any]:
+        # Well-known destinations are served from the offline catalogue without an LLM call, unless
+        # the catalogue is too short for the trip and a provider can top it up (with 12-13 spots a
+        # destination and CURATION_SPOTS_PER_DAY=4, anything over 3 days goes to the provider)
+        n = spots_for_days(days)
+        listed = self._from_catalogue(destination, interests, n)
+        if listed and (len(listed) >= n or not llm_backends(get_settings())):
+            return self._catalogue(destination, interests, listed)
+
+        # Ask the LLM for top spots (rich objects), served from the spot cache (or batch memo) when possible.
+        # The request's deadline bounds the provider fetch (cache lookups always run), keeping a reserve
+        # for the Planner/Critic/Budget after it.
+        budget = remaining()
+        t0 = time.perf_counter()
+        try:
+            with deadline_scope(budget - planning_reserve(budget) if budget is not None else None):
+                spots, cache_info = await self._curate(destination, interests, days)
+        except DeadlineExceeded:
+            return self._degraded(destination, budget, t0, listed)
 
         # Build trace lines
         trace_lines: List[str] = []
@@ -30,11 +111,72 @@ class DestinationLLMAgent(BaseAgent):
             # show a couple of examples for transparency
             preview = ", ".join([s.get("title", "") for s in spots[:3] if s.get("title")]) or "n/a"
             trace_lines.append(f"[LLM] examples: {preview}")
+            if cache_info["status"] in ("hit", "coalesced", "batch"):
+                trace_lines.append(f"[LLM] served from spot cache ({cache_info['status']})")
+            elif cache_info["status"] == "derived":
+                trace_lines.append(
+                    f"[LLM] derived from the cached superset for interests: {cache_info['from_interests']}"
+                )
+            if cache_info.get("shards"):
+                trace_lines.append(
+                    f"[LLM] long trip: merged {cache_info['shard_spots']} extra spots "
+                    f"from {cache_info['shards']} parallel shard(s)"
+                )
         else:
             trace_lines.append("[LLM] no LLM spots available (provider off or parsing failed)")
 
+        source = "llm"
+        if listed:
+            # catalogue spots first, LLM spots fill the rest of the trip
+            merged = merge_ranked(listed, [spots])[:n]
+            trace_lines.insert(0, f"[Catalogue] {len(listed)} curated spots for {destination}, "
+                                  f"{n} wanted for {days} days: topped up with "
+                                  f"{len(merged) - len(listed)} LLM spots")
+            spots, source = merged, "catalogue+llm" if len(merged) > len(listed) else "catalogue"
+
         return {
             "spots": spots,            # rich objects (for metadata / UI)
-            "activities": activities,  # short strings (for Planner seeding)
+            "activities": flatten_spots_to_activity_strings(spots),  # short strings (for Planner seeding)
             "trace": trace_lines,
+            "cache": cache_info,       # hit/miss/eviction counters
+            "source": source,
+        }
+
+    @staticmethod
+    def _catalogue(destination: str, interests: Sequence[str] | None, spots: List[Dict[str, Any]]) -> Dict[str, Any]:
+        preview = ", ".join(s["title"] for s in spots[:3])
+        return {
+            "spots": spots,
+            "activities": flatten_spots_to_activity_strings(spots),
+            "trace": [
+                f"[Catalogue] served {len(spots)} curated spots for {destination} offline"
+                + (f" (interests: {', '.join(interests)})" if interests else ""),
+                f"[Catalogue] examples: {preview}",
+            ],
+            "source": "catalogue",
+        }
+
+    @staticmethod
+    def _degraded(
+        destination: str, budget: float | None, t0: float, listed: Sequence[Dict[str, Any]] = ()
+    ) -> Dict[str, Any]:
+        """
+        The deadline ran out: plan from the catalogue spots in hand, if any, else the
+        Planner falls back to generic activities.
+        """
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        PLAN_DEGRADED.inc(stage="curate")
+        spots = list(listed)
+        rest = f"planned from {len(spots)} catalogue spots" if spots else "planned from generic activities"
+        return {
+            "spots": spots,
+            "activities": flatten_spots_to_activity_strings(spots),
+            "trace": [f"[Deadline] LLM curation for {destination} abandoned after {elapsed_ms:.0f} ms; {rest}"],
+            "source": "catalogue" if spots else "llm",
+            "degraded": {
+                "reason": "deadline",
+                "stage": "curate",
+                "budget_ms": round(max(budget, 0.0) * 1000.0, 1) if budget is not None else None,
+                "elapsed_ms": round(elapsed_ms, 1),
+            },
         }
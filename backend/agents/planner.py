@@ -1,21 +1,38 @@
 from __future__ import annotations
 from datetime import datetime, timedelta
-from typing import List, Sequence, Optional, Dict, Any
+from typing import List, Sequence, Optional, Dict, Any, Union
 
 from agents.base import BaseAgent
+from agents.scheduler import Schedule, schedule_spots, table_hours, DEFAULT_DURATION_H
+from agents.budget_engine import BudgetEngine, table_prices, table_values
+from agents.routing import RouteSummary, route_schedule
+from utils.config import get_settings
+from utils.spots import SpotTable
 from utils.types import TripRequest, DayPlan
 
 
 class Planner(BaseAgent):
     """
     Drafts a day-by-day itinerary.
-    If LLM seeds are provided, they are slotted first; otherwise fall back to generic activities
-    aligned to interests.
+    If rich spots are provided, the scheduler assigns them to days/slots by duration,
+    best_time and neighborhood; plain LLM seeds are slotted first in order; otherwise fall
+    back to generic activities aligned to interests.
+
+    Scheduled plans also return "table" (the SpotTable) and "rows": per day, the table
+    row behind each activity (None for generic fillers), so later stages work on rows
+    rather than re-parsing the activity strings.
     """
     name = "planner"
     _PER_DAY = 3  # activities per day (simple, editable)
 
-    def run(self, request: TripRequest, seed_activities: Optional[List[str]] = None) -> Dict[str, Any]:
+    def run(
+        self,
+        request: TripRequest,
+        seed_activities: Optional[List[str]] = None,
+        spots: Optional[Union[SpotTable, Sequence[Dict[str, Any]]]] = None,
+    ) -> Dict[str, Any]:
+        if spots:
+            return self._run_scheduled(request, spots)
         destination = request.destination
         days = int(request.days)
         interests: Sequence[str] = request.profile.interests or []
@@ -59,6 +76,128 @@ class Planner(BaseAgent):
 
         return {"days": out_days, "trace": trace_lines}
 
+    def _run_scheduled(
+        self, request: TripRequest, spots: Union[SpotTable, Sequence[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        days = int(request.days)
+        daily_hours = get_settings().PLANNER_DAILY_HOURS
+        table = spots if isinstance(spots, SpotTable) else SpotTable.from_dicts(spots)
+        sched = schedule_spots(table, days, daily_hours=daily_hours)
+        fit_lines = self._fit_budget(request, sched)
+        route = self._route(request, sched)
+        generic_pool = self._build_generic_pool(request.profile.interests or [], request.destination)
+        start_dt = datetime.fromisoformat(request.start_date)
+
+        out_days: List[DayPlan] = []
+        day_rows: List[List[Optional[int]]] = []
+        fillers = 0
+        for d, day in enumerate(sched.days):
+            # label each visit with the slot it was actually given (rendered here, once)
+            acts: List[str] = []
+            rows: List[Optional[int]] = []
+            for slot, row in day.timeline():
+                text = table.activity(row, slot)
+                if text and text not in acts:
+                    acts.append(text)
+                    rows.append(row)
+            hours = day.hours
+            # light days get generic fillers, but never past the daily capacity
+            while len(acts) < self._PER_DAY and hours + DEFAULT_DURATION_H <= daily_hours and generic_pool:
+                pick = generic_pool[(d * self._PER_DAY + len(acts)) % len(generic_pool)]
+                if pick in acts:
+                    break
+                acts.append(pick)
+                rows.append(None)
+                hours += DEFAULT_DURATION_H
+                fillers += 1
+            notes = f"~{day.hours:g}h planned"
+            if day.neighborhoods:
+                notes += " · " + ", ".join(day.neighborhoods)
+            if route is not None and route.days[d].km >= 0.1:
+                leg = route.days[d]
+                notes += f" · ~{leg.km:.1f} km, ~{leg.minutes:.0f} min between stops"
+            out_days.append(
+                DayPlan(
+                    day=d + 1,
+                    date=(start_dt + timedelta(days=d)).date().isoformat(),
+                    activities=acts,
+                    notes=notes if day.items else None,
+                )
+            )
+            day_rows.append(rows)
+
+        avg = sum(day.hours for day in sched.days) / max(days, 1)
+        trace_lines = [
+            f"[Planner] scheduled {sched.scheduled} spot(s) across {days} day(s) "
+            f"(avg {avg:.1f}h/day, cap {daily_hours:g}h)"
+        ]
+        if sched.unscheduled:
+            trace_lines.append(f"[Planner] {len(sched.unscheduled)} spot(s) did not fit the daily capacity")
+        trace_lines += fit_lines
+        if route is not None:
+            trace_lines.append(
+                f"[Planner] routed {route.located}/{route.stops} stop(s) in {route.destination}: "
+                f"{route.km_before:.1f} km -> {route.km:.1f} km between stops ({route.backend})"
+            )
+        if fillers:
+            trace_lines.append(f"[Planner] added {fillers} generic activities to light days")
+        return {"days": out_days, "rows": day_rows, "table": table, "trace": trace_lines}
+
+    def _fit_budget(self, request: TripRequest, sched: Schedule) -> List[str]:
+        """Drop paid visits (lowest value per dollar first) until the plan fits profile.budget_total."""
+        target = request.profile.budget_total
+        if target is None:
+            return []
+        s = get_settings()
+        table = sched.table
+        placed = [(day.day, row) for day in sched.days for _, row in day.items]
+        prices, values = table_prices(table), table_values(table)
+        engine = BudgetEngine(
+            prices=[prices[row] for _, row in placed],
+            days=len(sched.days),
+            people=request.profile.people,
+            base_per_day=s.BUDGET_DAILY_BASE,
+            values=[values[row] for _, row in placed],
+        )
+        fit = engine.fit([d for d, _ in placed], target=float(target), mode=s.BUDGET_MODE)
+        if not fit.within_target:
+            return [
+                f"[Planner] budget ${float(target):.2f} is below the trip's floor "
+                f"(${fit.total:.2f} without paid visits); kept all visits"
+            ]
+        if not fit.dropped:
+            return []
+        dropped = {placed[i][1] for i in fit.dropped}
+        hours = table_hours(table)
+        for day in sched.days:
+            day.items = [item for item in day.items if item[1] not in dropped]
+            day.slot_hours = [0.0] * len(day.slot_hours)
+            day.neighborhoods = []
+            for slot, row in day.items:
+                day.slot_hours[slot] += hours[row]
+                nbh = table.text(table.neighborhood[row])
+                if nbh and nbh not in day.neighborhoods:
+                    day.neighborhoods.append(nbh)
+            day.hours = sum(day.slot_hours)
+        return [
+            f"[Planner] dropped {len(fit.dropped)} paid visit(s) to fit budget ${float(target):.2f} "
+            f"(est ${fit.total:.2f} fits; {fit.candidates} candidates, {fit.backend})"
+        ]
+
+    def _route(self, request: TripRequest, sched: Schedule) -> Optional[RouteSummary]:
+        """Order each day's stops by travel time (in place); None when routing is off or not possible."""
+        s = get_settings()
+        if not s.ROUTING_ENABLED:
+            return None
+        return route_schedule(
+            sched,
+            request.destination,
+            walk_kmh=s.ROUTING_WALK_KMH,
+            walk_max_km=s.ROUTING_WALK_MAX_KM,
+            transit_kmh=s.ROUTING_TRANSIT_KMH,
+            overhead_min=s.ROUTING_TRANSIT_OVERHEAD_MIN,
+        )
+
     # ---------- helpers ----------
 
     def _build_generic_pool(self, interests: Sequence[str], destination: str) -> List[str]:
@@ -0,0 +1,273 @@
+"""
+Intra-day routing used by the Planner: orders each day's stops to cut travel time.
+
+Stops are placed with the offline gazetteer (tools/gazetteer.py) from their
+neighborhood. One distance matrix is built per trip, vectorized haversine over the
+coordinate arrays, and turned into a travel-time matrix (walk short legs, take transit
+with a fixed overhead on longer ones; both on street distance = DETOUR x great-circle).
+Each day is then routed slot by slot so time-of-day assignments are kept: the stops of
+a slot are ordered by nearest neighbour from the previous slot's last stop and
+improved with 2-opt on the open path. NumPy is used when installed; the pure-Python
+path gives the same orders.
+
+Stops whose neighborhood is unknown keep their scheduler order at the end of their
+slot, and a destination the gazetteer does not know is left unrouted.
+"""
+from __future__ import annotations
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from agents.scheduler import Schedule
+from tools.gazetteer import EARTH_RADIUS_KM, Gazetteer, get_gazetteer
+
+try:
+    import numpy as np
+except Exception:
+    np = None  # type: ignore[assignment, unused-ignore]
+
+DETOUR = 1.3                # street distance / great-circle distance in a city grid
+_NP_MIN_NODES = 16          # below this the pure-Python 2-opt is faster than array calls
+
+
+# -------------------- Matrices --------------------
+
+def distance_matrix(points: Sequence[Tuple[float, float]], use_numpy: Optional[bool] = None) -> Any:
+    """(n, n) great-circle km between (lat, lon) points; ndarray on the NumPy path, else lists."""
+    if np is not None and use_numpy is not False:
+        if not len(points):
+            return np.zeros((0, 0))
+        rad = np.radians(np.asarray(points, dtype=float))
+        lat, lon = rad[:, 0], rad[:, 1]
+        a = (np.sin((lat[:, None] - lat[None, :]) / 2) ** 2
+             + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin((lon[:, None] - lon[None, :]) / 2) ** 2)
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    rad = [(math.radians(la), math.radians(lo)) for la, lo in points]
+    cos = [math.cos(la) for la, _ in rad]
+    n = len(rad)
+    out = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            a = (math.sin((rad[j][0] - rad[i][0]) / 2) ** 2
+                 + cos[i] * cos[j] * math.sin((rad[j][1] - rad[i][1]) / 2) ** 2)
+            out[i][j] = out[j][i] = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+    return out
+
+
+def travel_minutes(
+    km: Any, walk_kmh: float, walk_max_km: float, transit_kmh: float, overhead_min: float
+) -> Any:
+    """Door-to-door minutes for a distance matrix from distance_matrix (same type back)."""
+    def leg(d: float) -> float:
+        street = d * DETOUR
+        if street <= walk_max_km:
+            return street / walk_kmh * 60.0
+        return min(street / walk_kmh, street / transit_kmh) * 60.0 + overhead_min
+
+    if np is not None and isinstance(km, np.ndarray):
+        street = km * DETOUR
+        walk = street / walk_kmh * 60.0
+        transit = np.minimum(walk, street / transit_kmh * 60.0) + overhead_min
+        out = np.where(street <= walk_max_km, walk, transit)
+        np.fill_diagonal(out, 0.0)
+        return out
+    return [[0.0 if i == j else leg(d) for j, d in enumerate(row)] for i, row in enumerate(km)]
+
+
+# -------------------- Routing --------------------
+
+class Router:
+    """
+    Orders subsets of `points` along short open paths. `cost` is the travel-time
+    matrix; `km` the distances it came from (reported, not optimized).
+    """
+
+    def __init__(
+        self,
+        points: Sequence[Tuple[float, float]],
+        walk_kmh: float = 4.5,
+        walk_max_km: float = 1.5,
+        transit_kmh: float = 20.0,
+        overhead_min: float = 8.0,
+        use_numpy: Optional[bool] = None,
+    ) -> None:
+        self.n = len(points)
+        self.np = np is not None if use_numpy is None else (use_numpy and np is not None)
+        self.backend = "numpy" if self.np else "python"
+        self.km = distance_matrix(points, use_numpy=self.np)
+        self.cost = travel_minutes(self.km, walk_kmh, walk_max_km, transit_kmh, overhead_min)
+        # plain lists for the scalar lookups of small routes (ndarray indexing is slow per element)
+        self._cost_rows = self.cost.tolist() if self.np else self.cost
+
+    def length(self, order: Sequence[int], start: Optional[int] = None, matrix: str = "cost") -> float:
+        """Sum of consecutive legs of `order`, from `start` when given."""
+        m = self.km if matrix == "km" else self.cost
+        path = ([start] if start is not None else []) + list(order)
+        return float(sum(m[a][b] for a, b in zip(path, path[1:])))
+
+    def route(self, nodes: Sequence[int], start: Optional[int] = None) -> List[int]:
+        """
+        `nodes` (point indices) in a short visiting order. With `start` (a point not in
+        `nodes`) the path begins there; otherwise it may begin anywhere. The end is open.
+        """
+        nodes = list(dict.fromkeys(nodes))
+        if len(nodes) < 2:
+            return nodes
+        if self.np and len(nodes) >= _NP_MIN_NODES:
+            return self._route_np(nodes, start)
+        c: List[List[float]] = self._cost_rows
+        left = list(nodes)
+        order: List[int] = []
+        if start is None:
+            # open start: begin at the most outlying stop (largest total cost to the others)
+            first = max(left, key=lambda a: round(sum(c[a][b] for b in left), 6))
+            left.remove(first)
+            order.append(first)
+        cur = start if start is not None else order[0]
+        while left:
+            nxt = min(left, key=lambda j: c[cur][j])
+            left.remove(nxt)
+            order.append(nxt)
+            cur = nxt
+
+        # 2-opt on [start?] + order + [free end]; None is a free end (zero-cost edge)
+        def w(a: Optional[int], b: Optional[int]) -> float:
+            return 0.0 if a is None or b is None else c[a][b]
+
+        path: List[Optional[int]] = [start, *order, None]
+        improved = True
+        while improved:
+            improved = False
+            for i in range(1, len(path) - 2):
+                best, best_j = -1e-9, None
+                for j in range(i + 1, len(path) - 1):
+                    delta = (w(path[i - 1], path[j]) + w(path[i], path[j + 1])
+                             - w(path[i - 1], path[i]) - w(path[j], path[j + 1]))
+                    if delta < best:
+                        best, best_j = delta, j
+                if best_j is not None:
+                    path[i:best_j + 1] = path[i:best_j + 1][::-1]
+                    improved = True
+        return [p for p in path[1:-1] if p is not None]
+
+    def _route_np(self, nodes: List[int], start: Optional[int]) -> List[int]:
+        # submatrix over [nodes..., start?, free end]; the free end is a zero row/column
+        k = len(nodes)
+        idx = nodes + ([start] if start is not None else [])
+        sub = np.zeros((len(idx) + 1, len(idx) + 1))
+        sub[:len(idx), :len(idx)] = self.cost[np.ix_(idx, idx)]
+        end = len(idx)
+        head = k if start is not None else end  # a free start is the zero node too
+
+        # nearest neighbour: masked argmin per step
+        visited = np.zeros(k, dtype=bool)
+        order: List[int] = []
+        cur = head if start is not None else int(np.argmax(np.round(sub[:k, :k].sum(axis=1), 6)))
+        if start is None:
+            visited[cur] = True
+            order.append(cur)
+        while len(order) < k:
+            row = np.where(visited, np.inf, sub[cur, :k])
+            cur = int(np.argmin(row))
+            visited[cur] = True
+            order.append(cur)
+
+        # 2-opt: for each i, every j at once; take the best reversal, repeat until none helps
+        path = np.asarray([head, *order, end])
+        improved = True
+        while improved:
+            improved = False
+            for i in range(1, len(path) - 2):
+                a, b = path[i - 1], path[i]
+                cs, ds = path[i + 1:-1], path[i + 2:]
+                delta = sub[a, cs] + sub[b, ds] - sub[a, b] - sub[cs, ds]
+                j = int(np.argmin(delta))
+                if delta[j] < -1e-9:
+                    j += i + 1
+                    path[i:j + 1] = path[i:j + 1][::-1].copy()
+                    improved = True
+        return [nodes[p] for p in path[1:-1]]
+
+
+# -------------------- Schedules --------------------
+
+@dataclass
+class DayRoute:
+    km_before: float = 0.0          # scheduler order
+    km: float = 0.0                 # routed order
+    minutes: float = 0.0            # estimated travel time of the routed order
+    located: int = 0                # stops placed on the map
+
+
+@dataclass
+class RouteSummary:
+    destination: str
+    days: List[DayRoute] = field(default_factory=list)
+    located: int = 0
+    stops: int = 0
+    backend: str = "python"
+
+    @property
+    def km_before(self) -> float:
+        return sum(d.km_before for d in self.days)
+
+    @property
+    def km(self) -> float:
+        return sum(d.km for d in self.days)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "destination": self.destination,
+            "km_before": round(self.km_before, 2),
+            "km": round(self.km, 2),
+            "located": self.located,
+            "stops": self.stops,
+            "backend": self.backend,
+        }
+
+
+def route_schedule(
+    sched: Schedule,
+    destination: str,
+    gazetteer: Optional[Gazetteer] = None,
+    use_numpy: Optional[bool] = None,
+    **speeds: float,
+) -> Optional[RouteSummary]:
+    """
+    Reorder every day's items in place (slot assignments unchanged). Returns None when the
+    destination is unknown or fewer than two stops can be located.
+    """
+    gaz = gazetteer or get_gazetteer()
+    city = gaz.resolve_destination(destination)
+    if city is None:
+        return None
+    table = sched.table
+    rows = [row for day in sched.days for _, row in day.items]
+    coords = gaz.locate(city, [table.text(table.neighborhood[row]) for row in rows])
+    located = [i for i, c in enumerate(coords) if c is not None]
+    if len(located) < 2:
+        return None
+
+    router = Router([c for c in coords if c is not None], use_numpy=use_numpy, **speeds)
+    point = {rows[i]: p for p, i in enumerate(located)}  # table row -> point in the router
+    summary = RouteSummary(destination=city.name, located=len(located), stops=len(rows), backend=router.backend)
+
+    for day in sched.days:
+        before = [point[row] for _, row in sorted(day.items, key=lambda it: it[0]) if row in point]
+        new_items: List[Tuple[int, int]] = []
+        routed: List[int] = []
+        for slot in sorted({s for s, _ in day.items}):
+            members = [row for s, row in day.items if s == slot]
+            order = router.route([point[row] for row in members if row in point],
+                                 start=routed[-1] if routed else None)
+            by_point = {point[row]: row for row in members if row in point}
+            new_items += [(slot, by_point[p]) for p in order] + [(slot, row) for row in members if row not in point]
+            routed += order
+        day.items = new_items
+        summary.days.append(DayRoute(
+            km_before=router.length(before, matrix="km"),
+            km=router.length(routed, matrix="km"),
+            minutes=router.length(routed),
+            located=len(routed),
+        ))
+    return summary
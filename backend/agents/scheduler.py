@@ -0,0 +1,165 @@
+"""
+Constraint-aware day scheduler used by the Planner.
+
+Assigns ranked spots (rows of a utils.spots.SpotTable, or ranked_spots_via_llm dicts)
+to days and time-of-day slots under a daily hours capacity. Greedy and O(n log d): spots are taken in rank
+order, so a better spot is never dropped for a worse one, and each goes to the day that
+already holds its neighborhood if that day has room (keeps a day walkable), otherwise to
+the least loaded day (keeps days balanced). best_time picks the slot; flexible spots take
+the slot with the most room left.
+"""
+from __future__ import annotations
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from utils.spots import NONE, SpotTable
+
+SLOTS: Tuple[str, ...] = ("morning", "afternoon", "evening")
+DEFAULT_SLOT_HOURS: Dict[str, float] = {"morning": 3.5, "afternoon": 4.5, "evening": 3.0}
+DEFAULT_DAILY_HOURS = 8.0
+DEFAULT_DURATION_H = 1.5
+
+
+@dataclass
+class DaySchedule:
+    day: int                                    # 0-based
+    hours: float = 0.0
+    slot_hours: List[float] = field(default_factory=lambda: [0.0, 0.0, 0.0])
+    items: List[Tuple[int, int]] = field(default_factory=list)  # (slot index, row in Schedule.table)
+    neighborhoods: List[str] = field(default_factory=list)
+
+    def ordered(self) -> List[int]:
+        """Rows in time-of-day order (stable within a slot)."""
+        return [row for _, row in self.timeline()]
+
+    def timeline(self) -> List[Tuple[str, int]]:
+        """(slot name, row) pairs in time-of-day order."""
+        return [(SLOTS[slot], row) for slot, row in sorted(self.items, key=lambda it: it[0])]
+
+    def slots(self) -> Dict[str, List[int]]:
+        out: Dict[str, List[int]] = {name: [] for name in SLOTS}
+        for slot, row in self.items:
+            out[SLOTS[slot]].append(row)
+        return out
+
+
+@dataclass
+class Schedule:
+    days: List[DaySchedule]
+    unscheduled: List[int]                      # rows that fit nowhere
+    table: SpotTable = field(default_factory=SpotTable)
+
+    @property
+    def scheduled(self) -> int:
+        return sum(len(d.items) for d in self.days)
+
+
+def spot_duration(spot: Dict[str, Any]) -> float:
+    try:
+        d = float(spot.get("duration_hours") or DEFAULT_DURATION_H)
+    except (TypeError, ValueError):
+        d = DEFAULT_DURATION_H
+    return max(d, 0.25)
+
+
+def table_hours(table: SpotTable) -> List[float]:
+    """spot_duration for every row of `table`."""
+    return [max(d, 0.25) if d and not math.isnan(d) else DEFAULT_DURATION_H for d in table.duration]
+
+
+def _pick_slot(
+    day: DaySchedule, pref: Optional[int], hours: float, slot_cap: Sequence[float]
+) -> Optional[int]:
+    """Preferred slot if it fits, else the slot with the most room that fits (None if none)."""
+    if pref is not None and day.slot_hours[pref] + hours <= slot_cap[pref] + 1e-9:
+        return pref
+    best, room = None, -1.0
+    for i in range(len(SLOTS)):
+        r = slot_cap[i] - day.slot_hours[i]
+        if r + 1e-9 >= hours and r > room:
+            best, room = i, r
+    if best is None and not day.items:
+        # a single long visit (e.g. a 5h museum day) may span slots on an otherwise empty day
+        best = int(max(range(len(SLOTS)), key=lambda i: slot_cap[i] - day.slot_hours[i]))
+    return best
+
+
+def schedule_spots(
+    spots: Union[SpotTable, Sequence[Dict[str, Any]]],
+    days: int,
+    daily_hours: float = DEFAULT_DAILY_HOURS,
+    slot_hours: Optional[Dict[str, float]] = None,
+) -> Schedule:
+    """
+    Assign `spots` (best first) to `days` days. Days hold (slot, row) pairs into
+    Schedule.table; rows that fit nowhere are returned in `unscheduled`.
+    """
+    table = spots if isinstance(spots, SpotTable) else SpotTable.from_dicts(spots)
+    caps = slot_hours or DEFAULT_SLOT_HOURS
+    slot_cap = [float(caps.get(name, 0.0)) for name in SLOTS]
+    out = [DaySchedule(day=i) for i in range(max(int(days), 0))]
+    if not out:
+        return Schedule(days=[], unscheduled=list(range(len(table))), table=table)
+
+    durations = table_hours(table)
+    total = sum(durations)
+    target = min(daily_hours, total / len(out))    # balanced load per day
+    load_heap: List[Tuple[float, int]] = [(0.0, i) for i in range(len(out))]
+    home: Dict[int, List[int]] = {}                 # neighborhood -> days that already visit it
+    unscheduled: List[int] = []
+
+    def place(day: DaySchedule, row: int, slot: int, hours: float, nbh: Optional[int]) -> None:
+        day.items.append((slot, row))
+        day.hours += hours
+        day.slot_hours[slot] += hours
+        if nbh is not None and day.day not in home.setdefault(nbh, []):
+            home[nbh].append(day.day)
+            day.neighborhoods.append(table.strings[table.neighborhood[row]])
+        heapq.heappush(load_heap, (day.hours, day.day))
+
+    # rank order; the neighborhood (interned folded name) only steers the choice of day
+    for row, area in enumerate(table.area):
+        nbh = area if area != NONE else None
+        hours = durations[row]
+        pref = table.slot[row] if table.slot[row] >= 0 else None
+
+        # 1) stay in a neighborhood we already visit, while that day is under target
+        placed = False
+        for d in home.get(nbh, []) if nbh is not None else []:
+            day = out[d]
+            if day.hours + hours <= min(daily_hours, target + hours / 2):
+                slot = _pick_slot(day, pref, hours, slot_cap)
+                if slot is not None:
+                    place(day, row, slot, hours, nbh)
+                    placed = True
+                    break
+        if placed:
+            continue
+
+        # 2) least-loaded day that can take it (lazy heap: skip stale entries)
+        while load_heap and load_heap[0][0] != out[load_heap[0][1]].hours:
+            heapq.heappop(load_heap)
+        if not load_heap or load_heap[0][0] + hours > daily_hours + 1e-9:
+            unscheduled.append(row)  # not even the emptiest day has room
+            continue
+        skipped: List[Tuple[float, int]] = []
+        while load_heap:
+            load, d = heapq.heappop(load_heap)
+            day = out[d]
+            if load != day.hours:
+                continue  # stale entry
+            if day.hours + hours <= daily_hours + 1e-9:
+                slot = _pick_slot(day, pref, hours, slot_cap)
+                if slot is not None:
+                    place(day, row, slot, hours, nbh)
+                    placed = True
+                    break
+            skipped.append((load, d))
+        for entry in skipped:
+            heapq.heappush(load_heap, entry)
+        if not placed:
+            unscheduled.append(row)
+
+    return Schedule(days=out, unscheduled=unscheduled, table=table)
@@ -1,8 +1,31 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from utils.admission import Overloaded
+from utils.llm import close_http_client
+from utils.metrics import REGISTRY
+from utils.plan_store import close_plan_store, get_plan_store
 from .routes.plan import router as plan_router
+from .routes.store import router as store_router
+from .warmup import prewarm
 
-app = FastAPI(title="VoyageCraft Backend", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Build the pooled provider client (only with an LLM configured), caches and validators
+    # now, so the first request does not pay for them (see app/warmup.py)
+    app.state.prewarm = await prewarm()
+    get_plan_store()  # opened here: record_plan never opens it on the request path
+    try:
+        yield
+    finally:
+        await close_http_client()
+        close_plan_store()  # flushes plans still queued for the store
+
+
+app = FastAPI(title="VoyageCraft Backend", version="0.1.0", lifespan=lifespan)
 
 # CORS: allow the frontend (tighten in production)
 app.add_middleware(
@@ -15,7 +38,23 @@ app.add_middleware(
 
 # Routes
 app.include_router(plan_router)
+app.include_router(store_router)
+
+
+@app.exception_handler(Overloaded)
+async def overloaded(request: Request, exc: Overloaded) -> JSONResponse:
+    # admission control shed the request: tell the client when to come back
+    return JSONResponse(
+        status_code=exc.status,
+        content={"detail": str(exc), "reason": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 @app.get("/health")
-def health():
+def health() -> Dict[str, str]:
     return {"status": "ok"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    # Prometheus text exposition format
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,11 +1,208 @@
-from fastapi import APIRouter
-from utils.types import TripRequest
-from orchestrators.react_loop import ReactLoop
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, TypeVar
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from utils.admission import check_priority, plan_admission, set_priority
+from utils.config import get_settings
+from utils.deadline import deadline_scope
+from utils.metrics import PLAN_CANCELLED
+from utils.plan_cache import cached_plan, etag_for, etag_matches, etag_variant
+from utils.plan_store import record_plan
+from utils.serialize import Fields, compress, dump_plan, dumps, negotiate_encoding, parse_fields, project_json
+from utils.types import Plan, TripRequest, PlanEvent
+from orchestrators import Orchestrator, get_orchestrator
+from orchestrators.batch import plan_batch
 
 router = APIRouter()
 
+T = TypeVar("T")
+
+_ORCHESTRATOR_QUERY = Query(default=None, description="'react' (sequential) or 'graph' (parallel DAG)")
+_PRIORITY_HEADER = Header(default=None, description="'interactive' (default) or 'batch' admission class")
+_DEADLINE_HEADER = Header(
+    default=None, ge=1, description="milliseconds the client will wait (can only shorten PLAN_DEADLINE_S)"
+)
+_FIELDS_QUERY = Query(
+    default=None,
+    description="comma-separated Plan fields to return, e.g. 'days,total_estimated_cost' "
+    "(dotted paths such as 'metadata.spot_source' reach into objects)",
+)
+
+
+def _pick(name: Optional[str]) -> Orchestrator:
+    try:
+        return get_orchestrator(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _priority(value: Optional[str]) -> str:
+    try:
+        return check_priority(value)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _fields(value: Optional[str]) -> Fields:
+    try:
+        return parse_fields(value, Plan.model_fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _budget(x_deadline_ms: Optional[int]) -> Optional[float]:
+    """Seconds this request may take: PLAN_DEADLINE_S, shortened by X-Deadline-Ms (None = unbounded)."""
+    limits = [x for x in (_server_budget(), x_deadline_ms / 1000.0 if x_deadline_ms else None) if x is not None]
+    return min(limits) if limits else None
+
+
+def _server_budget() -> Optional[float]:
+    return get_settings().PLAN_DEADLINE_S or None
+
+
+async def _disconnected(raw: Request) -> None:
+    # the body is already read, so the next ASGI message is the disconnect
+    while (await raw.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _unless_disconnected(raw: Request, work: Awaitable[T]) -> Optional[T]:
+    """Await `work`, cancelling it (and the provider calls under it) if the client goes away; None then."""
+    task = asyncio.ensure_future(work)
+    watch = asyncio.ensure_future(_disconnected(raw))
+    try:
+        await asyncio.wait((task, watch), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watch.cancel()
+        if not task.done():
+            task.cancel()
+    if not task.done():
+        PLAN_CANCELLED.inc(route="plan")
+        return None
+    return task.result()
+
+
 @router.post("/plan")
-def generate_plan(request: TripRequest):
-    orch = ReactLoop()
-    plan = orch.run(request)
-    return plan.model_dump()
+async def generate_plan(
+    request: TripRequest,
+    raw: Request,
+    orchestrator: Optional[str] = _ORCHESTRATOR_QUERY,
+    fields: Optional[str] = _FIELDS_QUERY,
+    if_none_match: Optional[str] = Header(default=None),
+    accept_encoding: Optional[str] = Header(default=None),
+    x_priority: Optional[str] = _PRIORITY_HEADER,
+    x_deadline_ms: Optional[int] = _DEADLINE_HEADER,
+) -> Response:
+    """
+    Plan a trip. Identical requests are served from the plan cache without running the
+    orchestrator; the ETag lets clients/CDNs revalidate with If-None-Match (304).
+    `?fields=` projects the plan, and large bodies are gzip/br encoded when accepted.
+    Saturated workers answer 429/503 with Retry-After (see utils/admission.py).
+    The plan runs under a deadline (utils/deadline.py): past it, LLM curation is abandoned
+    and the plan comes back from generic activities with metadata["degraded"]. A client
+    that disconnects cancels the plan, in-flight provider calls included.
+    """
+    orch = _pick(orchestrator)
+    projection = _fields(fields)
+    priority = _priority(x_priority)
+    # a plan run may be shared by identical requests, so it runs under the server's deadline;
+    # a caller with X-Deadline-Ms plans under its own instead (see cached_plan)
+    with deadline_scope(_server_budget()):
+        built = await _unless_disconnected(raw, cached_plan(request, orch, priority, _budget(x_deadline_ms)))
+    if built is None:
+        return Response(status_code=499)  # nobody is listening; nginx's "client closed request"
+    entry, status = built
+    body, etag = entry.body, entry.etag
+    if projection:
+        body = project_json(body, projection)
+        etag = etag_for(body)
+    coding = negotiate_encoding(accept_encoding, len(body))
+    if coding:
+        etag = etag_variant(etag, coding)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Plan-Cache": status, "Vary": "Accept-Encoding"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if coding:
+        body = compress(body, coding)
+        headers["Content-Encoding"] = coding
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _sse(ev: PlanEvent, data: Optional[bytes] = None) -> bytes:
+    """One SSE frame; `data` is the event's data already serialized (the plan body)."""
+    payload = b'{"data":' + (dumps(ev.data) if data is None else data) + b',"trace":' + dumps(ev.trace) + b"}"
+    return b"event: " + ev.event.encode() + b"\ndata: " + payload + b"\n\n"
+
+
+@router.post("/plan/stream")
+async def stream_plan(
+    request: TripRequest,
+    orchestrator: Optional[str] = _ORCHESTRATOR_QUERY,
+    x_priority: Optional[str] = _PRIORITY_HEADER,
+    x_deadline_ms: Optional[int] = _DEADLINE_HEADER,
+) -> StreamingResponse:
+    """
+    Server-Sent Events: one typed event per completed stage
+    (spots -> day* -> critic -> budget -> plan), each carrying its trace lines.
+    Admission happens before the stream opens, so saturation is a plain 429/503.
+    The deadline counts from arrival, as for /plan; a client that disconnects cancels the plan.
+    """
+    arrived = time.monotonic()
+    budget = _budget(x_deadline_ms)
+    orch = _pick(orchestrator)
+    priority = _priority(x_priority)
+    admission = plan_admission()
+    with deadline_scope(budget):  # queue no longer than the client will wait
+        release = await admission.hold(priority) if admission is not None else None
+
+    async def events() -> AsyncIterator[bytes]:
+        set_priority(priority)
+        try:
+            with deadline_scope(budget - (time.monotonic() - arrived) if budget is not None else None):
+                async for ev in orch.stream(request):
+                    if ev.plan is not None:
+                        body = dump_plan(ev.plan)  # without llm_spots: they went out as "spots"
+                        record_plan(request, body, orch.name, source="stream")
+                        yield _sse(ev, body)
+                    else:
+                        yield _sse(ev)
+        except asyncio.CancelledError:
+            PLAN_CANCELLED.inc(route="stream")  # client disconnected: the stage in flight is cancelled
+            raise
+        except Exception as e:
+            yield _sse(PlanEvent(event="error", data={"detail": str(e) or type(e).__name__}))
+        finally:
+            if release is not None:
+                release()
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    # release is idempotent; the background task covers a client that leaves before the first event
+    background = BackgroundTask(release) if release is not None else None
+    return StreamingResponse(events(), media_type="text/event-stream", headers=headers, background=background)
+
+
+@router.post("/plan/batch")
+async def generate_plan_batch(
+    items: List[Dict[str, Any]],
+    concurrency: Optional[int] = Query(default=None, ge=1),
+    orchestrator: Optional[str] = _ORCHESTRATOR_QUERY,
+) -> StreamingResponse:
+    """
+    Plan a JSON array of TripRequests with bounded concurrency.
+    Streams NDJSON, one {"index", "plan"} or {"index", "error", "detail"} line per item
+    in completion order; an invalid item never fails the whole batch.
+    """
+    s = get_settings()
+    if len(items) > s.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"batch limited to {s.BATCH_MAX_ITEMS} items")
+    conc = min(concurrency or s.BATCH_CONCURRENCY, s.BATCH_CONCURRENCY)
+    _pick(orchestrator)  # validate the name before streaming starts
+
+    async def lines() -> AsyncIterator[bytes]:
+        # items queue behind interactive plans; a shed item becomes an error line
+        async for rec in plan_batch(items, concurrency=conc, orchestrator=orchestrator, priority="batch"):
+            yield dumps(rec) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
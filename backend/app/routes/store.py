@@ -0,0 +1,62 @@
+import hmac
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response
+from utils.config import get_settings
+from utils.plan_store import PlanStore, get_plan_store
+from utils.serialize import dumps
+
+
+def _read_api(authorization: Optional[str] = Header(default=None)) -> None:
+    """Stored plans hold users' trip requests: the read API is off unless PLAN_STORE_API (+ optional token)."""
+    s = get_settings()
+    if not s.PLAN_STORE_API:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if s.PLAN_STORE_API_TOKEN:
+        expected = f"Bearer {s.PLAN_STORE_API_TOKEN}"
+        if not authorization or not hmac.compare_digest(authorization.encode(), expected.encode()):
+            raise HTTPException(status_code=401, detail="plan store API token required",
+                                headers={"WWW-Authenticate": "Bearer"})
+
+
+router = APIRouter(dependencies=[Depends(_read_api)])
+
+
+def _store() -> PlanStore:
+    store = get_plan_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="plan store is disabled (PLAN_STORE_ENABLED)")
+    return store
+
+
+@router.get("/plans")
+def list_plans(
+    destination: Optional[str] = Query(default=None),
+    start_date: Optional[str] = Query(default=None, description="trip start date, YYYY-MM-DD"),
+    request_hash: Optional[str] = Query(default=None),
+    since: Optional[float] = Query(default=None, description="recorded at or after (unix seconds)"),
+    until: Optional[float] = Query(default=None, description="recorded before (unix seconds)"),
+    limit: int = Query(default=20, ge=1, le=500),
+    with_plan: bool = Query(default=False, description="include request and plan bodies"),
+) -> Response:
+    """
+    Past plans from the append-only store, newest first, by any combination of keys.
+    Plans reach the store a batch interval after they are served.
+    """
+    recs = _store().query(destination, start_date, request_hash, since, until, limit, with_plan)
+    return Response(dumps([r.to_dict() for r in recs]), media_type="application/json")
+
+
+@router.get("/plans/destinations")
+def top_destinations(limit: int = Query(default=20, ge=1, le=500)) -> List[Dict[str, Any]]:
+    """Most planned destinations with their plan counts."""
+    return [{"destination": d, "plans": n} for d, n in _store().destinations(limit)]
+
+
+@router.get("/plans/{record_id}")
+def get_plan(record_id: str) -> Response:
+    """One stored plan with its request and trace, by the id /plans returned."""
+    rec = _store().get(record_id)
+    if rec is None:
+        raise HTTPException(status_code=404, detail=f"no stored plan '{record_id}'")
+    return Response(dumps(rec.to_dict()), media_type="application/json")
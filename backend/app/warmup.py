@@ -0,0 +1,70 @@
+"""
+Lifespan prewarm: pay the one-off costs of the first plan before the first request.
+
+The provider HTTP client (and the httpx import behind it) is only built when an LLM is
+configured; caches, the offline catalogue and gazetteer, the default orchestrator and the Pydantic
+validators/serializers of the request/response models are touched once. A step that
+fails is recorded and skipped; prewarm never keeps the app from starting.
+"""
+from __future__ import annotations
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from utils.config import get_settings, llm_backends
+from utils.serialize import dump_plan, dumps
+from utils.types import DayPlan, Plan, PlanEvent, TripRequest
+
+_SAMPLE_REQUEST = {"origin": "Chicago", "destination": "Paris", "start_date": "2025-09-10", "days": 1,
+                   "profile": {"people": 1, "interests": ["art"]}}
+
+
+async def _provider() -> None:
+    if llm_backends(get_settings()):
+        from utils.llm import open_http_client
+
+        await open_http_client()
+
+
+async def _caches() -> None:
+    from tools.catalogue import get_catalogue
+    from tools.gazetteer import get_gazetteer
+    from utils.cache import get_spot_cache
+    from utils.plan_cache import get_plan_cache
+    from utils.plan_store import get_plan_store
+
+    get_spot_cache()
+    get_plan_cache()
+    get_plan_store()
+    get_catalogue()
+    get_gazetteer()
+
+
+async def _models() -> None:
+    from orchestrators import get_orchestrator
+
+    get_orchestrator()
+    TripRequest.model_validate_json(TripRequest.model_validate(_SAMPLE_REQUEST).model_dump_json())
+    day = DayPlan(day=1, date="2025-09-10", activities=["warmup"])
+    dump_plan(Plan(destination="Paris", total_estimated_cost=0.0, days=[day]))
+    dumps(PlanEvent(event="plan", data={"days": 1}).model_dump())
+
+
+_STEPS: Dict[str, Callable[[], Awaitable[None]]] = {"provider": _provider, "caches": _caches, "models": _models}
+
+
+async def prewarm() -> Dict[str, Any]:
+    """Run every prewarm step; returns {step: ms} plus {"errors": {step: message}} for failed steps."""
+    if not get_settings().PREWARM:
+        return {}
+    out: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    for name, step in _STEPS.items():
+        t0 = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:  # a cold first request is better than no app
+            errors[name] = f"{type(e).__name__}: {e}"
+        out[name] = round((time.perf_counter() - t0) * 1e3, 2)
+    if errors:
+        out["errors"] = errors
+    return out
@@ -0,0 +1,75 @@
+"""
+Benchmark the budget engine: cost + rank every candidate itinerary in one pass,
+NumPy (when installed) vs the pure-Python fallback.
+
+    cd backend && python -m benchmarks.bench_budget [--repeat 20] [--json]
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from agents.budget_engine import BudgetEngine, np
+
+CASES = [(3, 12), (7, 40), (14, 120), (30, 300), (30, 900)]  # (days, scheduled spots)
+_PRICES = [0.0, 0.0, 5.0, 8.0, 12.0, 18.0, 25.0, 40.0, 60.0]
+
+
+def synthetic_trip(days: int, n: int, seed: int = 7) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {
+        "prices": [rng.choice(_PRICES) for _ in range(n)],
+        "values": [1.0 - i / n for i in range(n)],
+        "assignment": [rng.randrange(days) for _ in range(n)],
+    }
+
+
+def run(repeat: int, people: int = 2, base: float = 100.0) -> List[Dict[str, Any]]:
+    results = []
+    backends = [True, False] if np is not None else [False]
+    for days, n in CASES:
+        trip = synthetic_trip(days, n)
+        full = people * (base * days + sum(trip["prices"]))
+        target = people * base * days + 0.6 * (full - people * base * days)  # room for ~60% of visit spend
+        row: Dict[str, Any] = {"days": days, "spots": n, "target": round(target, 2)}
+        picks = []
+        for use_numpy in backends:
+            engine = BudgetEngine(trip["prices"], days, people, base, trip["values"], use_numpy=use_numpy)
+            timings = []
+            for _ in range(repeat):
+                t = time.perf_counter()
+                fit = engine.fit(trip["assignment"], target=target)
+                timings.append((time.perf_counter() - t) * 1000.0)
+            picks.append(fit.assignment)
+            row[f"{engine.backend}_ms"] = round(statistics.median(timings), 3)
+            row["candidates"] = fit.candidates
+            row["total"] = fit.total
+            row["dropped"] = len(fit.dropped)
+            row["within_target"] = fit.within_target
+        row["same_pick"] = all(p == picks[0] for p in picks)
+        results.append(row)
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--json", action="store_true", help="print raw JSON")
+    args = ap.parse_args()
+    results = run(args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'days':>4} {'spots':>6} {'cands':>6} {'numpy ms':>9} {'python ms':>10} {'total':>9} "
+          f"{'target':>9} {'dropped':>8} {'same':>5}")
+    for r in results:
+        numpy_ms = f"{r['numpy_ms']:>9.3f}" if "numpy_ms" in r else f"{'n/a':>9}"
+        print(f"{r['days']:>4} {r['spots']:>6} {r['candidates']:>6} {numpy_ms} {r['python_ms']:>10.3f} "
+              f"{r['total']:>9.2f} {r['target']:>9.2f} {r['dropped']:>8} {str(r['same_pick']):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark the Critic's near-duplicate search (MinHash/LSH) against all-pairs Jaccard.
+
+    cd backend && python -m benchmarks.bench_critic [--repeat 20] [--json]
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Any, Dict, List, Set, Tuple
+
+from agents.critic import CriticAgent
+from utils.similarity import MinHashLSH, near_duplicate_groups, normalize_title, same_place, shingles
+
+CASES = [(7, 70), (14, 140), (30, 300), (30, 900), (30, 3000)]  # (days, activities)
+_WORDS = (
+    "royal old grand little north south river hill market palace garden tower bridge museum gallery "
+    "cathedral church square harbour abbey fort castle opera theatre library quarter hall"
+).split()
+_PLACES = "marais orsay louvre trastevere shibuya soho gracia ueno camden montmartre chelsea".split()
+_VARIANTS = [
+    lambda t: f"{t} (Old Town) — morning • 2.0h",
+    lambda t: f"The {t}",
+    lambda t: t.upper(),
+    lambda t: t.replace("Museum", "Musée").replace("Garden", "Jardin"),
+    lambda t: f"{t}s",
+]
+
+
+def synthetic_days(days: int, n: int, dup_rate: float = 0.15, seed: int = 7) -> List[List[str]]:
+    """`n` activities over `days` days; about `dup_rate` of them re-visit an earlier place, reworded."""
+    rng = random.Random(seed)
+    acts: List[str] = []
+    for i in range(n):
+        if acts and rng.random() < dup_rate:
+            acts.append(rng.choice(_VARIANTS)(rng.choice(acts).split(" (")[0]))
+        else:
+            words = rng.sample(_WORDS, 2)
+            acts.append(f"{rng.choice(_PLACES).title()} {words[0].title()} {words[1].title()} {i}")
+    per_day = max(n // days, 1)
+    return [acts[d * per_day:(d + 1) * per_day] for d in range(days)]
+
+
+def all_pairs(titles: List[str], threshold: float) -> Set[Tuple[int, int]]:
+    canon = [normalize_title(t) for t in titles]
+    sets = [shingles(c) for c in canon]
+    return {
+        (i, j)
+        for i in range(len(sets))
+        for j in range(i + 1, len(sets))
+        if same_place(canon[i], canon[j], sets[i], sets[j], threshold)
+    }
+
+
+def _pairs(groups: List[List[int]]) -> Set[Tuple[int, int]]:
+    return {(g[x], g[y]) for g in groups for x in range(len(g)) for y in range(x + 1, len(g))}
+
+
+def _median_ms(fn, repeat: int) -> Tuple[float, Any]:
+    timings, out = [], None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        timings.append((time.perf_counter() - t) * 1000.0)
+    return statistics.median(timings), out
+
+
+def run(repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    threshold = CriticAgent.SIMILARITY
+    for days, n in CASES:
+        plan = synthetic_days(days, n)
+        titles = [a for day in plan for a in day]
+        # a fresh index per run so the per-shingle cache does not flatter repeats
+        lsh_ms, groups = _median_ms(lambda: near_duplicate_groups(titles, threshold, MinHashLSH()), repeat)
+        warm = MinHashLSH()
+        near_duplicate_groups(titles, threshold, warm)
+        warm_ms, _ = _median_ms(lambda: near_duplicate_groups(titles, threshold, warm), repeat)
+        naive_ms, truth = _median_ms(lambda: all_pairs(titles, threshold), max(repeat // 5, 1))
+        critic_ms, report = _median_ms(lambda: CriticAgent().evaluate(plan), repeat)
+        found = _pairs(groups)
+        results.append({
+            "days": days,
+            "activities": len(titles),
+            "lsh_ms": round(lsh_ms, 3),
+            "lsh_warm_ms": round(warm_ms, 3),
+            "all_pairs_ms": round(naive_ms, 3),
+            "speedup": round(naive_ms / lsh_ms, 1) if lsh_ms else None,
+            "critic_ms": round(critic_ms, 3),
+            "issues": len(report.issues),
+            # transitive grouping can add pairs all-pairs would not; recall is what matters
+            "recall": round(len(found & truth) / len(truth), 3) if truth else 1.0,
+        })
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--json", action="store_true", help="print raw JSON")
+    args = ap.parse_args()
+    results = run(args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'days':>4} {'acts':>5} {'lsh ms':>8} {'warm ms':>8} {'pairs ms':>9} {'speedup':>8} {'critic ms':>10} "
+          f"{'issues':>7} {'recall':>7}")
+    for r in results:
+        print(f"{r['days']:>4} {r['activities']:>5} {r['lsh_ms']:>8.3f} {r['lsh_warm_ms']:>8.3f} {r['all_pairs_ms']:>9.3f} "
+              f"{r['speedup']:>7}x {r['critic_ms']:>10.3f} {r['issues']:>7} {r['recall']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Load-test POST /plan at rising concurrency against a local fake OpenAI/Ollama server.
+
+    cd backend && python -m benchmarks.bench_load [--levels 1,4,16,64] [--requests 64]
+        [--provider openai|ollama] [--latency lognormal:0.3,0.5] [--error-rate 0.0]
+        [--items 12] [--out benchmarks/results/load.json] [--compare OLD.json]
+
+The app runs in-process (httpx ASGI transport, real lifespan, real pooled provider
+client); the stand-in LLM from benchmarks.fake_llm runs in a child process. Every
+request uses a fresh destination so the spot cache / catalogue never short-circuit
+the provider call. Per level it reports requests/sec, p50/p95/p99 latency, errors,
+per-stage time (from metadata["trace_detail"] spans) and traced memory per in-flight
+request (a separate tracemalloc pass, so the timing pass is not slowed down).
+Results are written as JSON so two commits can be diffed with --compare.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import dataclasses
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.fake_llm import FakeLLMConfig, FakeLLMServer
+from utils import config
+
+DEFAULT_OUT = os.path.join("benchmarks", "results", "load.json")
+STAGES = ("agent.destination_llm", "agent.planner", "agent.critic", "agent.budget", "llm.openai", "llm.ollama")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100); 0.0 for an empty sample."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(q / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def _body(i: int, days: int) -> Dict[str, Any]:
+    return {
+        "origin": "Benchport",
+        "destination": f"Loadtown {i}",
+        "start_date": "2026-05-04",
+        "days": days,
+        "profile": {"people": 2, "budget_total": 900.0, "interests": ["museums", "food"]},
+    }
+
+
+def _use_fake_provider(provider: str, url: str, stream: bool) -> None:
+    changes: Dict[str, Any] = {
+        "PROVIDER": provider,
+        "LLM_STREAM": stream,
+        "SPOT_CACHE_ENABLED": False,
+        "CATALOGUE_ENABLED": False,
+    }
+    if provider == "openai":
+        changes.update(OPENAI_API_KEY="sk-fake", OPENAI_BASE_URL=f"{url}/v1")
+    else:
+        changes.update(OLLAMA_HOST=url)
+    config.override_settings(**changes)
+
+
+async def _one(client: httpx.AsyncClient, body: Dict[str, Any], orchestrator: str) -> Dict[str, Any]:
+    t = time.perf_counter()
+    try:
+        r = await client.post("/plan", params={"orchestrator": orchestrator}, json=body)
+        status = r.status_code
+        data = r.json() if status == 200 else {}
+    except Exception as e:  # transport-level failure still counts as an error sample
+        status, data = 0, {"error": type(e).__name__}
+    out: Dict[str, Any] = {"ms": (time.perf_counter() - t) * 1000.0, "status": status, "stages": {}}
+    spans = (data.get("metadata") or {}).get("trace_detail", {}).get("spans", [])
+    for sp in spans:
+        if sp.get("name") in STAGES and sp.get("duration_ms") is not None:
+            out["stages"][sp["name"]] = out["stages"].get(sp["name"], 0.0) + sp["duration_ms"]
+    out["spot_source"] = (data.get("metadata") or {}).get("spot_source")
+    return out
+
+
+async def _drive(client: httpx.AsyncClient, level: int, n: int, start: int, days: int, orch: str) -> tuple:
+    """`level` workers pull request numbers until n requests have completed."""
+    samples: List[Dict[str, Any]] = []
+    counter = iter(range(start, start + n))
+
+    async def worker() -> None:
+        for i in counter:
+            samples.append(await _one(client, _body(i, days), orch))
+
+    t = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(level)))
+    return samples, time.perf_counter() - t
+
+
+async def _memory(client: httpx.AsyncClient, level: int, start: int, days: int, orch: str) -> Dict[str, float]:
+    """Peak traced allocation while `level` requests are in flight, per request."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await asyncio.gather(*(_one(client, _body(start + i, days), orch) for i in range(level)))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"peak_kib": round((peak - base) / 1024.0, 1), "per_request_kib": round((peak - base) / 1024.0 / level, 1)}
+
+
+def _summarize(level: int, samples: List[Dict[str, Any]], wall: float) -> Dict[str, Any]:
+    ok = [s for s in samples if s["status"] == 200]
+    lat = [s["ms"] for s in ok]
+    stages: Dict[str, List[float]] = defaultdict(list)
+    for s in ok:
+        for name, ms in s["stages"].items():
+            stages[name].append(ms)
+    return {
+        "concurrency": level,
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "fallbacks": sum(1 for s in ok if s["spot_source"] is None),  # planned without provider spots
+        "rps": round(len(ok) / wall, 2) if wall > 0 else 0.0,
+        "p50_ms": round(percentile(lat, 50), 2),
+        "p95_ms": round(percentile(lat, 95), 2),
+        "p99_ms": round(percentile(lat, 99), 2),
+        "max_ms": round(max(lat), 2) if lat else 0.0,
+        "stages_ms": {
+            name: {"mean": round(sum(v) / len(v), 2), "p95": round(percentile(v, 95), 2)}
+            for name, v in sorted(stages.items())
+        },
+    }
+
+
+async def run(args: argparse.Namespace, url: str) -> List[Dict[str, Any]]:
+    from app.main import app  # imported after the settings override is in place
+
+    results = []
+    next_id = 0
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120.0) as client:
+            await _drive(client, 2, 4, 10_000_000, args.days, args.orchestrator)  # warm imports + pool
+            for level in args.levels:
+                n = max(args.requests, level)
+                samples, wall = await _drive(client, level, n, next_id, args.days, args.orchestrator)
+                next_id += n
+                row = _summarize(level, samples, wall)
+                if not args.no_memory:
+                    row["memory"] = await _memory(client, level, next_id, args.days, args.orchestrator)
+                    next_id += level
+                results.append(row)
+                if not args.json:
+                    print(_line(row), flush=True)
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _header() -> str:
+    return (f"{'conc':>5} {'reqs':>5} {'err':>4} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+            f"{'KiB/req':>8}  stages (mean ms)")
+
+
+def _line(r: Dict[str, Any]) -> str:
+    mem = r.get("memory", {}).get("per_request_kib")
+    stages = " ".join(f"{k.split('.', 1)[1]}={v['mean']:.1f}" for k, v in r["stages_ms"].items())
+    return (f"{r['concurrency']:>5} {r['requests']:>5} {r['errors']:>4} {r['rps']:>8.2f} {r['p50_ms']:>9.2f} "
+            f"{r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {mem if mem is not None else 'n/a':>8}  {stages}")
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> None:
+    """Print per-level deltas (new vs old) for throughput and tail latency."""
+    before = {r["concurrency"]: r for r in old.get("results", [])}
+    print(f"\ncompare {old.get('meta', {}).get('commit')} -> {new.get('meta', {}).get('commit')}")
+    print(f"{'conc':>5} {'rps':>18} {'p50 ms':>20} {'p95 ms':>20} {'p99 ms':>20}")
+    for r in new["results"]:
+        o = before.get(r["concurrency"])
+        if o is None:
+            continue
+        cells = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            delta = (r[key] - o[key]) / o[key] * 100.0 if o[key] else 0.0
+            cells.append(f"{o[key]:.1f}->{r[key]:.1f} ({delta:+.0f}%)")
+        print(f"{r['concurrency']:>5} {cells[0]:>18} {cells[1]:>20} {cells[2]:>20} {cells[3]:>20}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--levels", default="1,4,16,64", help="comma-separated concurrency levels")
+    ap.add_argument("--requests", type=int, default=64, help="requests per level (at least one per worker)")
+    ap.add_argument("--provider", choices=["openai", "ollama"], default="openai")
+    ap.add_argument("--orchestrator", default="react")
+    ap.add_argument("--days", type=int, default=3)
+    ap.add_argument("--no-stream", action="store_true", help="non-streaming provider calls")
+    ap.add_argument("--latency", default="lognormal:0.3,0.5", help="fake provider latency spec")
+    ap.add_argument("--token-delay", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--items", type=int, default=12, help="spots per fake answer (response size)")
+    ap.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    ap.add_argument("--out", default=DEFAULT_OUT)
+    ap.add_argument("--compare", metavar="OLD_JSON", help="print deltas against an earlier result file")
+    ap.add_argument("--json", action="store_true", help="print raw JSON")
+    args = ap.parse_args()
+    args.levels = [int(x) for x in args.levels.split(",") if x.strip()]
+
+    fake = FakeLLMConfig(
+        latency=args.latency, token_delay=args.token_delay, error_rate=args.error_rate, items=args.items,
+    )
+    with FakeLLMServer(fake) as server:
+        _use_fake_provider(args.provider, server.url, stream=not args.no_stream)
+        if not args.json:
+            print(_header())
+        results = asyncio.run(run(args, server.url))
+
+    doc = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "provider": args.provider,
+            "orchestrator": args.orchestrator,
+            "stream": not args.no_stream,
+            "days": args.days,
+            "fake_llm": {k: v for k, v in dataclasses.asdict(fake).items() if k != "stats"},
+        },
+        "results": results,
+    }
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+    if args.json:
+        print(json.dumps(doc, indent=2))
+    elif args.out:
+        print(f"\nwrote {args.out}", file=sys.stderr)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), doc)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Routing benchmark: travel-time matrix build and route time at trip scale.
+
+    cd backend && python -m benchmarks.bench_routing [--sizes 50,200,500,1000] [--repeat 5]
+        [--per-day 4] [--python-route-max 200] [--json]
+
+Points are seeded-random stops within ~8 km of central Paris. Per size n and backend
+(numpy when installed, pure Python) it reports the median wall time of:
+
+  matrix_ms   distance_matrix + travel_minutes, (n, n)
+  trip_ms     routing a whole trip: n stops in days of --per-day, three slots per day,
+              each slot chained from the previous one (what the Planner does per plan)
+  path_ms     one open path through all n stops (nearest neighbour + 2-opt); the
+              pure-Python run is skipped above --python-route-max
+
+with the km of each before routing (input order, by slot for the trip) and after.
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from agents import routing
+from agents.routing import Router, distance_matrix, travel_minutes
+
+CENTRE = (48.8566, 2.3522)
+
+
+def points(n: int, seed: int = 7) -> List[Tuple[float, float]]:
+    rng = random.Random(seed)
+    return [(CENTRE[0] + rng.uniform(-0.07, 0.07), CENTRE[1] + rng.uniform(-0.11, 0.11)) for _ in range(n)]
+
+
+def wall_ms(fn: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    out = fn()
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t) * 1e3)
+    return statistics.median(samples), out
+
+
+def trip_slots(n: int, per_day: int) -> List[List[List[int]]]:
+    """Stops 0..n-1 in days of `per_day`, dealt round-robin into three slots as a stand-in schedule."""
+    days = [list(range(d, min(d + per_day, n))) for d in range(0, n, per_day)]
+    return [[day[i::3] for i in range(3)] for day in days]
+
+
+def route_trip(router: Router, per_day: int) -> List[List[int]]:
+    routed: List[List[int]] = []
+    for slots in trip_slots(router.n, per_day):
+        path: List[int] = []
+        for members in slots:
+            path += router.route(members, start=path[-1] if path else None)
+        routed.append(path)
+    return routed
+
+
+def run(sizes: List[int], repeat: int, per_day: int, python_route_max: int) -> List[Dict[str, Any]]:
+    backends = (["numpy"] if routing.np is not None else []) + ["python"]
+    rows: List[Dict[str, Any]] = []
+    for n in sizes:
+        pts = points(n)
+        for backend in backends:
+            use_np = backend == "numpy"
+            matrix_ms, _ = wall_ms(lambda: travel_minutes(distance_matrix(pts, use_numpy=use_np), 4.5, 1.5, 20.0, 8.0),
+                                   repeat)
+            router = Router(pts, use_numpy=use_np)
+            trip_ms, days = wall_ms(lambda: route_trip(router, per_day), repeat)
+            row: Dict[str, Any] = {
+                "n": n, "backend": backend, "matrix_ms": round(matrix_ms, 2), "trip_ms": round(trip_ms, 2),
+                "trip_km_before": round(sum(router.length(sum(slots, []), matrix="km")
+                                            for slots in trip_slots(n, per_day)), 1),
+                "trip_km": round(sum(router.length(p, matrix="km") for p in days), 1),
+                "path_ms": None, "path_km_before": round(router.length(list(range(n)), matrix="km"), 1), "path_km": None,
+            }
+            if use_np or n <= python_route_max:
+                path_ms, path = wall_ms(lambda: router.route(list(range(n))), max(1, repeat // 2))
+                row.update(path_ms=round(path_ms, 2), path_km=round(router.length(path, matrix="km"), 1))
+            rows.append(row)
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="50,200,500,1000")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--per-day", type=int, default=4, help="stops per trip day")
+    ap.add_argument("--python-route-max", type=int, default=200, help="largest single pure-Python path")
+    ap.add_argument("--json", action="store_true", help="print raw JSON")
+    args = ap.parse_args()
+    rows = run([int(x) for x in args.sizes.split(",") if x.strip()], args.repeat, args.per_day, args.python_route_max)
+    if args.json:
+        print(json.dumps({"per_day": args.per_day, "results": rows}, indent=2))
+        return
+    print(f"{'n':>5} {'backend':>7} {'matrix ms':>10} {'trip ms':>9} {'trip km':>17} {'path ms':>9} {'path km':>17}")
+    for r in rows:
+        path_ms = f"{r['path_ms']:>9.2f}" if r["path_ms"] is not None else f"{'-':>9}"
+        path_km = f"{r['path_km_before']:>8.1f} -> {r['path_km']:<5.1f}" if r["path_km"] is not None else f"{'-':>17}"
+        print(f"{r['n']:>5} {r['backend']:>7} {r['matrix_ms']:>10.2f} {r['trip_ms']:>9.2f} "
+              f"{r['trip_km_before']:>8.1f} -> {r['trip_km']:<5.1f} {path_ms} {path_km}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark the Planner's day scheduler over synthetic spot sets.
+
+    cd backend && python -m benchmarks.bench_scheduler [--repeat 50] [--json]
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from agents.scheduler import schedule_spots
+
+CASES = [(3, 12), (7, 60), (14, 150), (30, 300), (30, 900)]  # (days, candidate spots)
+_TIMES = ["morning", "afternoon", "evening", "night", "flexible"]
+
+
+def synthetic_spots(n: int, neighborhoods: int = 25, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "title": f"Spot {i}",
+            "neighborhood": f"Quarter {rng.randrange(neighborhoods)}",
+            "category": rng.choice(["museum", "landmark", "park", "market", "cafe"]),
+            "best_time": rng.choice(_TIMES),
+            "duration_hours": rng.choice([0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 4.0]),
+            "est_price": float(rng.randrange(0, 40)),
+        }
+        for i in range(n)
+    ]
+
+
+def run(repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for days, n in CASES:
+        spots = synthetic_spots(n)
+        timings = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            sched = schedule_spots(spots, days)
+            timings.append((time.perf_counter() - t) * 1000.0)
+        loads = [d.hours for d in sched.days]
+        results.append({
+            "days": days,
+            "spots": n,
+            "median_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(sorted(timings)[int(0.95 * (len(timings) - 1))], 3),
+            "scheduled": sched.scheduled,
+            "unscheduled": len(sched.unscheduled),
+            "min_day_h": min(loads),
+            "max_day_h": max(loads),
+            "avg_neighborhoods_per_day": round(statistics.mean(len(d.neighborhoods) for d in sched.days), 2),
+        })
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=50)
+    ap.add_argument("--json", action="store_true", help="print raw JSON")
+    args = ap.parse_args()
+    results = run(args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'days':>4} {'spots':>6} {'median ms':>10} {'p95 ms':>8} {'placed':>7} {'left':>5} "
+          f"{'min h':>6} {'max h':>6} {'nbh/day':>8}")
+    for r in results:
+        print(f"{r['days']:>4} {r['spots']:>6} {r['median_ms']:>10.3f} {r['p95_ms']:>8.3f} {r['scheduled']:>7} "
+              f"{r['unscheduled']:>5} {r['min_day_h']:>6.1f} {r['max_day_h']:>6.1f} "
+              f"{r['avg_neighborhoods_per_day']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Micro-benchmark of the Plan response path on 30-day plans: CPU time and bytes per response.
+
+    cd backend && python -m benchmarks.bench_serialize [--days 30] [--repeat 300] [--json]
+
+The plan is built once, offline (catalogue destination, no LLM). Then every step a
+response can take is timed in process CPU time per call: building the model
+(validated vs model_construct), encoding it (FastAPI's generic jsonable_encoder +
+json, stdlib json, pydantic-core, orjson), `?fields=` projections of the cached body,
+and gzip/br content-coding.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+
+from orchestrators import get_orchestrator
+from utils import config
+from utils.serialize import available_encodings, compress, dump_model, dump_plan, dumps, orjson, project_json
+from utils.types import DayPlan, Plan, TripRequest
+
+PROJECTIONS = ["days,total_estimated_cost", "days.activities,total_estimated_cost,metadata.spot_source"]
+
+
+def build_plan(days: int) -> Plan:
+    config.override_settings(PROVIDER="none", OPENAI_API_KEY=None, OLLAMA_HOST=None, CATALOGUE_ENABLED=True)
+    req = TripRequest(origin="Chicago", destination="Paris", start_date="2025-09-10", days=days,
+                      profile={"people": 2, "budget_total": 250.0 * days, "interests": ["art", "cafes", "history"]})
+    return asyncio.run(get_orchestrator("react").run(req))
+
+
+def cpu_us(fn: Callable[[], Any], repeat: int) -> float:
+    fn()
+    t = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - t) / repeat * 1e6
+
+
+def run(days: int, repeat: int) -> List[Dict[str, Any]]:
+    plan = build_plan(days)
+    data = plan.model_dump()
+    body = dump_plan(plan)
+    rows: List[Dict[str, Any]] = []
+
+    def add(group: str, name: str, fn: Callable[[], Any]) -> None:
+        out = fn()
+        rows.append({"group": group, "step": name, "cpu_us": round(cpu_us(fn, repeat), 1),
+                     "bytes": len(out) if isinstance(out, (bytes, str)) else None})
+
+    add("build", "Plan.model_validate(dict)", lambda: Plan.model_validate(data))
+    add("build", "Plan.model_construct", lambda: Plan.model_construct(
+        **{**data, "days": [DayPlan.model_construct(**d) for d in data["days"]]}))
+
+    add("encode", "jsonable_encoder + json.dumps", lambda: json.dumps(jsonable_encoder(plan)).encode())
+    add("encode", "json.dumps(model_dump())", lambda: json.dumps(plan.model_dump(), ensure_ascii=False).encode())
+    add("encode", "model_dump_json().encode()", lambda: plan.model_dump_json().encode("utf-8"))
+    add("encode", "dump_model (pydantic-core bytes)", lambda: dump_model(plan))
+    add("encode", "dump_plan (HTTP body, no metadata.llm_spots)", lambda: dump_plan(plan))
+    if orjson is not None:
+        add("encode", "orjson(model_dump())", lambda: orjson.dumps(plan.model_dump()))
+    add("encode", "serialize.dumps(dict)", lambda: dumps(data))
+
+    add("project", "full body (no fields)", lambda: project_json(body, ()))
+    for spec in PROJECTIONS:
+        fields = tuple(spec.split(","))
+        add("project", f"fields={spec}", lambda fields=fields: project_json(body, fields))
+
+    small = project_json(body, tuple(PROJECTIONS[0].split(",")))
+    for coding in available_encodings():
+        add("compress", f"{coding} full body", lambda coding=coding: compress(body, coding))
+        add("compress", f"{coding} fields={PROJECTIONS[0]}", lambda coding=coding: compress(small, coding))
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--days", type=int, default=30)
+    ap.add_argument("--repeat", type=int, default=300)
+    ap.add_argument("--json", action="store_true", help="print raw JSON")
+    args = ap.parse_args()
+    rows = run(args.days, args.repeat)
+    if args.json:
+        print(json.dumps({"days": args.days, "orjson": orjson is not None, "results": rows}, indent=2))
+        return
+    print(f"{args.days}-day plan, CPU time per call (orjson {'on' if orjson is not None else 'off'})")
+    print(f"{'group':>8}  {'step':<62} {'cpu us':>9} {'bytes':>8}")
+    for r in rows:
+        size = f"{r['bytes']:>8}" if r["bytes"] is not None else f"{'-':>8}"
+        print(f"{r['group']:>8}  {r['step']:<62} {r['cpu_us']:>9.1f} {size}")
+
+
+if __name__ == "__main__":
+    main()
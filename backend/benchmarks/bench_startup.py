@@ -0,0 +1,178 @@
+"""
+Cold-start budget for both entry points: import time and time-to-first-plan.
+
+    cd backend && python -m benchmarks.bench_startup [--runs 5] [--provider none|openai]
+        [--cli-budget 300:1000] [--app-budget 700:1500] [--json]
+
+Every run is a fresh interpreter (`python -m benchmarks.bench_startup --probe cli|app`),
+so nothing is warm but the OS page cache. Per entry point it reports the median of:
+
+  import_ms      `import cli` / `import app.main`
+  startup_ms     app only: FastAPI lifespan (prewarm) until ready to serve
+  first_plan_ms  the first plan itself (cli: the typer command; app: POST /plan over ASGI)
+  total_ms       interpreter-side import + startup + first plan (time-to-first-plan)
+  process_ms     wall time of the whole child process, interpreter start included
+
+The app is driven with raw ASGI messages (no test client) so the probe does not load
+httpx itself. With --provider none the plan is built offline (catalogue destination,
+no LLM); --provider openai points the app at benchmarks.fake_llm and uses a destination
+outside the catalogue, so the provider client is on the measured path. Budgets are
+IMPORT_MS:TOTAL_MS per entry point (app.main pays for FastAPI itself); the run exits 1
+when a median import_ms or total_ms is over its budget.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+ENTRY_POINTS = ("cli", "app")
+BUDGETS = {"cli": "300:1000", "app": "700:1500"}  # default IMPORT_MS:TOTAL_MS
+_PLAN = {"origin": "Chicago", "destination": "Paris", "start_date": "2025-09-10", "days": 3,
+         "profile": {"people": 2, "budget_total": 1000.0, "interests": ["art", "cafes"]}}
+
+# -------------------- Child probes --------------------
+
+def _probe_cli(destination: str) -> Dict[str, float]:
+    import contextlib
+    import io
+
+    t0 = time.perf_counter()
+    import cli
+    t1 = time.perf_counter()
+    sys.argv = ["cli.py", "--destination", destination, "--days", "3"]
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            cli.typer.run(cli.main)
+        except SystemExit as e:
+            if e.code:
+                raise
+    t2 = time.perf_counter()
+    return {"import_ms": (t1 - t0) * 1e3, "startup_ms": 0.0, "first_plan_ms": (t2 - t1) * 1e3,
+            "total_ms": (t2 - t0) * 1e3}
+
+
+async def _asgi_post(app: Any, path: str, body: bytes) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("bench", 1), "server": ("bench", 80),
+    }
+    sent = {"body": False}
+    status = {"code": 0}
+
+    async def receive() -> Dict[str, Any]:
+        if sent["body"]:
+            return {"type": "http.disconnect"}
+        sent["body"] = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await app(scope, receive, send)
+    return status["code"]
+
+
+def _probe_app(destination: str) -> Dict[str, float]:
+    import asyncio
+
+    t0 = time.perf_counter()
+    import app.main as main
+    t1 = time.perf_counter()
+
+    async def run() -> Dict[str, float]:
+        async with main.app.router.lifespan_context(main.app):
+            t2 = time.perf_counter()
+            code = await _asgi_post(main.app, "/plan", json.dumps({**_PLAN, "destination": destination}).encode())
+            t3 = time.perf_counter()
+        if code != 200:
+            raise RuntimeError(f"POST /plan answered {code}")
+        return {"import_ms": (t1 - t0) * 1e3, "startup_ms": (t2 - t1) * 1e3,
+                "first_plan_ms": (t3 - t2) * 1e3, "total_ms": (t3 - t0) * 1e3}
+
+    return asyncio.run(run())
+
+# -------------------- Driver --------------------
+
+def _child_env(tmp: str, provider_url: str | None) -> Dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if k not in ("OPENAI_API_KEY", "OLLAMA_HOST")}
+    env.update(PYTHONDONTWRITEBYTECODE="1", SPOT_CACHE_PATH=os.path.join(tmp, "spots.sqlite3"))
+    if provider_url:
+        env.update(PROVIDER="openai", OPENAI_API_KEY="bench", OPENAI_BASE_URL=provider_url + "/v1")
+    else:
+        env.update(PROVIDER="none")
+    return env
+
+
+def measure(entry: str, runs: int, provider_url: str | None) -> Dict[str, Any]:
+    destination = "Benchmarkville" if provider_url else _PLAN["destination"]
+    samples: List[Dict[str, float]] = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            t0 = time.perf_counter()
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_startup", "--probe", entry, "--destination", destination],
+                env=_child_env(tmp, provider_url), capture_output=True, text=True, check=False,
+            )
+            wall = (time.perf_counter() - t0) * 1e3
+        if out.returncode != 0:
+            raise RuntimeError(f"{entry} probe failed:\n{out.stderr.strip()}")
+        samples.append({**json.loads(out.stdout.strip().splitlines()[-1]), "process_ms": wall})
+    keys = ("import_ms", "startup_ms", "first_plan_ms", "total_ms", "process_ms")
+    return {"entry": entry, "runs": runs, **{k: round(statistics.median(s[k] for s in samples), 1) for k in keys}}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters per entry point")
+    ap.add_argument("--provider", choices=["none", "openai"], default="none")
+    for entry in ENTRY_POINTS:
+        ap.add_argument(f"--{entry}-budget", default=BUDGETS[entry], metavar="IMPORT_MS:TOTAL_MS")
+    ap.add_argument("--json", action="store_true", help="print raw JSON")
+    ap.add_argument("--probe", choices=ENTRY_POINTS, help=argparse.SUPPRESS)
+    ap.add_argument("--destination", default=_PLAN["destination"], help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.probe:
+        probe = _probe_cli if args.probe == "cli" else _probe_app
+        print(json.dumps(probe(args.destination)))
+        return
+
+    from benchmarks.fake_llm import FakeLLMConfig, FakeLLMServer
+
+    if args.provider == "openai":
+        with FakeLLMServer(FakeLLMConfig(latency="fixed:0.05")) as server:
+            results = [measure(e, args.runs, server.url) for e in ENTRY_POINTS]
+    else:
+        results = [measure(e, args.runs, None) for e in ENTRY_POINTS]
+
+    over = []
+    for r in results:
+        budget_import, budget_total = (float(x) for x in getattr(args, f"{r['entry']}_budget").split(":"))
+        for name, key, budget in (("import", "import_ms", budget_import), ("time-to-first-plan", "total_ms", budget_total)):
+            if r[key] > budget:
+                over.append(f"{r['entry']} {name} {r[key]:.0f}ms > {budget:.0f}ms")
+    if args.json:
+        print(json.dumps({"provider": args.provider, "results": results, "over_budget": over}, indent=2))
+    else:
+        print(f"{'entry':>5} {'import':>8} {'startup':>8} {'1st plan':>9} {'total':>8} {'process':>8}   (median ms, "
+              f"{args.runs} runs, provider={args.provider})")
+        for r in results:
+            print(f"{r['entry']:>5} {r['import_ms']:>8.1f} {r['startup_ms']:>8.1f} {r['first_plan_ms']:>9.1f} "
+                  f"{r['total_ms']:>8.1f} {r['process_ms']:>8.1f}")
+        for line in over:
+            print(f"OVER BUDGET: {line}")
+    if over:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Local stand-in for the OpenAI and Ollama chat APIs (the shapes utils/llm.py calls),
+so load tests measure our hot path without spending provider quota.
+
+    cd backend && python -m benchmarks.fake_llm --port 8790 --latency lognormal:0.4,0.5 --error-rate 0.02
+
+POST /v1/chat/completions   OpenAI; `stream: true` answers SSE deltas plus a usage chunk
+POST /api/chat              Ollama; NDJSON lines when `stream` is true
+GET  /stats                 requests / errors served so far
+
+Latency specs (seconds, time to the first byte): "fixed:0.2", "uniform:0.1,0.5",
+"normal:0.3,0.1", "lognormal:MEDIAN,SIGMA", "exp:MEAN". Streams also wait
+--token-delay between chunks. The answer is a JSON array of --items spots for the
+destination named in the prompt.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_CATEGORIES = ["museum", "landmark", "neighborhood", "market", "cafe", "park", "gallery", "viewpoint"]
+_TIMES = ["morning", "afternoon", "evening", "flexible"]
+_DESTINATION = re.compile(r"Destination:\s*(.+)")
+_FOCUS = re.compile(r"Focus:\s*([^(\n]+)")  # shard of a long trip: distinct spots per focus
+_BATCH_LABEL = re.compile(r'^- "(.+?)"', re.MULTILINE)  # one line per destination in a micro-batched prompt
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Sampler for a latency spec (see module docstring); a bare number means fixed."""
+    kind, _, args = spec.partition(":")
+    if not args:
+        kind, args = "fixed", kind
+    nums = [float(x) for x in args.split(",") if x.strip()]
+    samplers: Dict[str, Callable[[random.Random], float]] = {
+        "fixed": lambda r: nums[0],
+        "uniform": lambda r: r.uniform(nums[0], nums[1]),
+        "normal": lambda r: r.gauss(nums[0], nums[1]),
+        "lognormal": lambda r: r.lognormvariate(math.log(nums[0]), nums[1]),
+        "exp": lambda r: r.expovariate(1.0 / nums[0]),
+    }
+    if kind not in samplers:
+        raise ValueError(f"unknown latency distribution '{kind}' (use {', '.join(samplers)})")
+    sampler = samplers[kind]
+    return lambda r: max(sampler(r), 0.0)
+
+
+@dataclass
+class FakeLLMConfig:
+    latency: str = "fixed:0.05"
+    token_delay: float = 0.0       # seconds between streamed chunks
+    error_rate: float = 0.0        # fraction of requests answered with error_status
+    error_status: int = 500
+    items: int = 12                # spots per answer (response size)
+    chunk_chars: int = 16          # characters per streamed delta (~4 tokens)
+    seed: int = 7
+    stats: Dict[str, int] = field(default_factory=lambda: {"requests": 0, "errors": 0, "streams": 0})
+
+
+def fake_spots(destination: str, n: int, focus: Optional[str] = None) -> List[Dict[str, Any]]:
+    rng = random.Random(f"{destination}|{focus or ''}")
+    kind = focus.strip().title() if focus else "Highlight"
+    return [
+        {
+            "title": f"{destination} {kind} {i + 1}",
+            "neighborhood": f"District {rng.randrange(1, 8)}",
+            "category": rng.choice(_CATEGORIES),
+            "best_time": rng.choice(_TIMES),
+            "duration_hours": rng.choice([1.0, 1.5, 2.0, 2.5, 3.0]),
+            "est_price": float(rng.choice([0, 0, 8, 12, 18, 25])),
+            "reason_short": f"A standout stop number {i + 1} with a short reason to keep the payload realistic.",
+        }
+        for i in range(n)
+    ]
+
+
+def create_app(config: FakeLLMConfig) -> FastAPI:
+    app = FastAPI(title="fake-llm")
+    rng = random.Random(config.seed)
+    latency = parse_latency(config.latency)
+
+    def answer(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        focus_match = _FOCUS.search(prompt)
+        focus = focus_match.group(1) if focus_match else None
+        if "Destinations (" in prompt:
+            labels = _BATCH_LABEL.findall(prompt)
+            content = json.dumps({label: fake_spots(label, config.items, focus) for label in labels})
+            return {"content": content, "prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+        match = _DESTINATION.search(prompt)
+        destination = match.group(1).strip() if match else "Somewhere"
+        content = json.dumps(fake_spots(destination, config.items, focus))
+        return {"content": content, "prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+
+    def chunks(text: str) -> List[str]:
+        n = max(config.chunk_chars, 1)
+        return [text[i:i + n] for i in range(0, len(text), n)]
+
+    async def admit() -> Optional[JSONResponse]:
+        config.stats["requests"] += 1
+        await asyncio.sleep(latency(rng))
+        if config.error_rate and rng.random() < config.error_rate:
+            config.stats["errors"] += 1
+            return JSONResponse({"error": {"message": "injected failure"}}, status_code=config.error_status)
+        return None
+
+    @app.post("/v1/chat/completions")
+    async def openai_chat(request: Request) -> Any:
+        body = await request.json()
+        failed = await admit()
+        if failed is not None:
+            return failed
+        out = answer(body.get("messages", []))
+        usage = {"prompt_tokens": out["prompt_tokens"], "completion_tokens": out["completion_tokens"]}
+        if not body.get("stream"):
+            return {"choices": [{"message": {"role": "assistant", "content": out["content"]}}], "usage": usage}
+        config.stats["streams"] += 1
+
+        async def sse() -> AsyncIterator[str]:
+            for piece in chunks(out["content"]):
+                if config.token_delay:
+                    await asyncio.sleep(config.token_delay)
+                yield "data: " + json.dumps({"choices": [{"delta": {"content": piece}}]}) + "\n\n"
+            yield "data: " + json.dumps({"choices": [], "usage": usage}) + "\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(sse(), media_type="text/event-stream")
+
+    @app.post("/api/chat")
+    async def ollama_chat(request: Request) -> Any:
+        body = await request.json()
+        failed = await admit()
+        if failed is not None:
+            return failed
+        out = answer(body.get("messages", []))
+        done = {"done": True, "prompt_eval_count": out["prompt_tokens"], "eval_count": out["completion_tokens"]}
+        if body.get("stream") is False:
+            return {"message": {"role": "assistant", "content": out["content"]}, **done}
+        config.stats["streams"] += 1
+
+        async def ndjson() -> AsyncIterator[str]:
+            for piece in chunks(out["content"]):
+                if config.token_delay:
+                    await asyncio.sleep(config.token_delay)
+                yield json.dumps({"message": {"role": "assistant", "content": piece}, "done": False}) + "\n"
+            yield json.dumps({"message": {"role": "assistant", "content": ""}, **done}) + "\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    @app.get("/stats")
+    async def stats() -> Dict[str, int]:
+        return dict(config.stats)
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return int(s.getsockname()[1])
+
+
+class FakeLLMServer:
+    """Runs the stand-in in a child process (own GIL, so it does not compete with the app under test)."""
+
+    def __init__(self, config: FakeLLMConfig, port: Optional[int] = None) -> None:
+        self.config = config
+        self.port = port or free_port()
+        self.proc: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout: float = 15.0) -> "FakeLLMServer":
+        c = self.config
+        self.proc = subprocess.Popen(
+            [
+                sys.executable, "-m", "benchmarks.fake_llm", "--port", str(self.port),
+                "--latency", c.latency, "--token-delay", str(c.token_delay),
+                "--error-rate", str(c.error_rate), "--error-status", str(c.error_status),
+                "--items", str(c.items), "--chunk-chars", str(c.chunk_chars), "--seed", str(c.seed),
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError("fake LLM server exited during startup")
+            try:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=0.2):
+                    return self
+            except OSError:
+                time.sleep(0.05)
+        self.stop()
+        raise RuntimeError(f"fake LLM server did not listen on :{self.port} within {timeout}s")
+
+    def stop(self) -> None:
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.proc = None
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8790)
+    ap.add_argument("--latency", default=FakeLLMConfig.latency, help="e.g. fixed:0.2, lognormal:0.4,0.5")
+    ap.add_argument("--token-delay", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--error-status", type=int, default=500)
+    ap.add_argument("--items", type=int, default=12)
+    ap.add_argument("--chunk-chars", type=int, default=16)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    parse_latency(args.latency)  # fail fast on a bad spec
+
+    import uvicorn
+
+    config = FakeLLMConfig(
+        latency=args.latency, token_delay=args.token_delay, error_rate=args.error_rate,
+        error_status=args.error_status, items=args.items, chunk_chars=args.chunk_chars, seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,74 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import sys
+from typing import Optional, TextIO
+
 import typer
 from rich.console import Console
 
-from orchestrators.react_loop import ReactLoop
-from utils.types import TripRequest, UserProfile
+from utils.config import get_settings
+from utils.types import Plan, TripRequest, UserProfile
+
+# The orchestrator graph (agents, caches, provider client) is imported inside the commands,
+# so --help and argument errors return without loading it; httpx is only loaded by a provider call.
 
 console = Console()
 
+async def _plan_once(req: TripRequest, orchestrator: Optional[str]) -> Plan:
+    from orchestrators import get_orchestrator
+    from utils.llm import close_http_client
+    from utils.plan_store import close_plan_store, get_plan_store, record_plan
+
+    get_plan_store()  # record_plan only queues to an open store
+    try:
+        orch = get_orchestrator(orchestrator)
+        plan = await orch.run(req)
+        record_plan(req, plan, orch.name, source="cli")
+        return plan
+    finally:
+        await close_http_client()
+        close_plan_store()
+
+async def _plan_many(
+    src: TextIO, dst: TextIO, concurrency: int, orchestrator: Optional[str]
+) -> tuple[int, int]:
+    from orchestrators.batch import plan_batch
+    from utils.llm import close_http_client
+    from utils.plan_store import close_plan_store, get_plan_store
+
+    get_plan_store()
+    ok = failed = 0
+    try:
+        async for rec in plan_batch(src, concurrency=concurrency, orchestrator=orchestrator):
+            dst.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            dst.flush()
+            if "error" in rec:
+                failed += 1
+            else:
+                ok += 1
+    finally:
+        await close_http_client()
+        close_plan_store()
+    return ok, failed
+
+def run_batch(batch: str, out: str, concurrency: Optional[int], orchestrator: Optional[str]) -> None:
+    """Read TripRequest JSONL from `batch` ('-' = stdin) and write one result JSON line per item."""
+    conc = concurrency or get_settings().BATCH_CONCURRENCY
+    src = sys.stdin if batch == "-" else open(batch, "r", encoding="utf-8")
+    dst = sys.stdout if out == "-" else open(out, "w", encoding="utf-8")
+    try:
+        ok, failed = asyncio.run(_plan_many(src, dst, conc, orchestrator))
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    Console(stderr=True).print(f"[bold]batch done[/bold]: {ok} ok, {failed} failed")
+    if failed and not ok:
+        raise typer.Exit(code=1)
+
 def main(
     origin: str = typer.Option("Chicago", help="Starting city or airport"),
     destination: str = typer.Option("Paris", help="Destination city"),
@@ -17,10 +77,19 @@ def main(
     people: int = typer.Option(2, min=1, help="Number of travelers"),
     budget_total: float = typer.Option(1000.0, min=0.0, help="Total budget in USD"),
     interests: str = typer.Option("art,cafes", help="Comma-separated interests"),
-):
+    batch: Optional[str] = typer.Option(None, help="TripRequest JSONL file to plan in bulk ('-' = stdin)"),
+    out: str = typer.Option("-", help="Batch output JSONL file ('-' = stdout)"),
+    concurrency: Optional[int] = typer.Option(None, min=1, help="Plans in flight in batch mode"),
+    orchestrator: Optional[str] = typer.Option(None, help="'react' (sequential) or 'graph' (parallel DAG)"),
+) -> None:
     """
     Run the ReAct-style loop (Planner -> Critic -> Budget) and print a JSON plan + decision trace.
+    With --batch, plan every TripRequest in a JSONL input and stream Plan JSONL out instead.
     """
+    if batch:
+        run_batch(batch, out, concurrency, orchestrator)
+        return
+
     interests_list = [s.strip() for s in interests.split(",") if s.strip()]
     profile = UserProfile(people=people, budget_total=budget_total, interests=interests_list)
     req = TripRequest(
@@ -31,8 +100,7 @@ def main(
         profile=profile,
     )
 
-    orch = ReactLoop()
-    plan = orch.run(req)
+    plan = asyncio.run(_plan_once(req, orchestrator))
 
     console.rule("[bold]VoyageCraft Simulation[/bold]")
     console.print_json(json.dumps(plan.model_dump(), indent=2))
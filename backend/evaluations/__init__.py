@@ -0,0 +1,5 @@
+"""
+Scenario evaluations: TripRequest suites replayed offline against recorded provider
+answers (cassette.py), scored by rubrics (rubrics.py) and run in a process pool
+(harness.py).
+"""
@@ -0,0 +1,194 @@
+"""
+Cassettes: provider request/response pairs recorded once, replayed offline.
+
+A cassette is a JSONL file. The first line is a header naming the provider, model
+and temperature it was recorded with (replay configures the same ones); every other
+line is one answer:
+
+    {"key": ..., "provider": "openai", "model": "gpt-4o-mini", "temperature": 0.35,
+     "system": ..., "user": ..., "text": ..., "ms": 812.4, "stream": true, "complete": true}
+
+The key hashes (provider, model, temperature, system prompt, user prompt), so the
+same prompt always replays the same text whether the call streams or not. Installed
+with utils.llm.set_cassette, a cassette sees every provider call:
+
+  replay   answer from the file; an unknown prompt raises CassetteMiss (the provider
+           call fails as it would offline, and the miss is counted)
+  record   answer from the file when known, otherwise make the real call and keep
+           the answer; new answers are appended by save()
+
+A stream that the caller closes early (enough spots parsed) is kept as far as it
+got ("complete": false); replay stops at the same point, so the parsed spots match.
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import aclosing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+VERSION = 1
+REPLAY_CHUNK_CHARS = 64     # replayed streams are cut into deltas of this size
+
+
+class CassetteMiss(LookupError):
+    """A replayed prompt that was never recorded."""
+
+
+def cassette_key(provider: str, model: str, temperature: float, system: str, user: str) -> str:
+    raw = json.dumps([provider, model, round(float(temperature), 4), system, user], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+class Cassette:
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        mode: str = "replay",
+        latency_scale: float = 0.0,
+        header: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if mode not in ("replay", "record"):
+            raise ValueError(f"unknown cassette mode '{mode}' (use replay or record)")
+        self.path = Path(path) if path is not None else None
+        self.mode = mode
+        self.latency_scale = latency_scale  # replay sleeps recorded ms x this (0 = instant)
+        self.header: Dict[str, Any] = dict(header or {})
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.new: List[Dict[str, Any]] = []
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+        if self.path is not None and self.path.exists():
+            self._load(self.path)
+
+    def _load(self, path: Path) -> None:
+        with path.open(encoding="utf-8") as f:
+            for n, line in enumerate(f):
+                if not line.strip():
+                    continue
+                rec = json.loads(line)
+                if n == 0 and "cassette" in rec:
+                    if rec["cassette"] != VERSION:
+                        raise ValueError(f"{path}: unsupported cassette version {rec['cassette']}")
+                    self.header = {**rec, **self.header}
+                    continue
+                self.entries[rec["key"]] = rec
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    # ---------- persistence ----------
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        """Append the answers recorded since loading (writes the header for a new file)."""
+        target = Path(path or self.path or "")
+        if not str(target):
+            raise ValueError("cassette has no path")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fresh = not target.exists() or target.stat().st_size == 0
+        with target.open("a", encoding="utf-8") as f:
+            if fresh:
+                head = {"cassette": VERSION, "created": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+                f.write(json.dumps({**head, **self.header}, ensure_ascii=False) + "\n")
+            for rec in self.new:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        self.new = []
+        return target
+
+    def add(self, records: List[Dict[str, Any]]) -> None:
+        """Take answers recorded elsewhere (a worker process); kept for the next save()."""
+        for rec in records:
+            if rec["key"] not in self.entries:
+                self.entries[rec["key"]] = rec
+                self.new.append(rec)
+
+    # ---------- provider hooks (utils.llm) ----------
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        rec = self.entries.get(key)
+        if rec is not None:
+            self.stats["hits"] += 1
+        elif self.mode == "replay":
+            self.stats["misses"] += 1
+            raise CassetteMiss(f"no recorded answer for prompt {key}")
+        return rec
+
+    def _keep(self, rec: Dict[str, Any]) -> None:
+        self.entries[rec["key"]] = rec
+        self.new.append(rec)
+        self.stats["recorded"] += 1
+
+    async def _wait(self, rec: Dict[str, Any]) -> None:
+        if self.latency_scale > 0 and rec.get("ms"):
+            await asyncio.sleep(rec["ms"] / 1000.0 * self.latency_scale)
+
+    async def call(
+        self,
+        provider: str,
+        model: str,
+        temperature: float,
+        system: str,
+        user: str,
+        call: Callable[[], Awaitable[str]],
+    ) -> str:
+        key = cassette_key(provider, model, temperature, system, user)
+        rec = self._lookup(key)
+        if rec is not None:
+            await self._wait(rec)
+            return rec["text"]
+        t0 = time.perf_counter()
+        text = await call()
+        self._keep(self._record(key, provider, model, temperature, system, user, text, t0, stream=False))
+        return text
+
+    async def stream(
+        self,
+        provider: str,
+        model: str,
+        temperature: float,
+        system: str,
+        user: str,
+        gen: AsyncIterator[str],
+    ) -> AsyncIterator[str]:
+        key = cassette_key(provider, model, temperature, system, user)
+        async with aclosing(gen):  # type: ignore[type-var]
+            rec = self._lookup(key)
+            if rec is not None:
+                await self._wait(rec)
+                text = rec["text"]
+                for i in range(0, len(text), REPLAY_CHUNK_CHARS):
+                    yield text[i:i + REPLAY_CHUNK_CHARS]
+                return
+            t0 = time.perf_counter()
+            deltas: List[str] = []
+            try:
+                async for delta in gen:
+                    deltas.append(delta)
+                    yield delta
+            except GeneratorExit:
+                # the caller stopped reading (enough spots): keep what it saw; a failed call is not kept
+                self._keep(self._record(key, provider, model, temperature, system, user, "".join(deltas), t0,
+                                        stream=True, complete=False))
+                raise
+            self._keep(self._record(key, provider, model, temperature, system, user, "".join(deltas), t0,
+                                    stream=True))
+
+    @staticmethod
+    def _record(
+        key: str, provider: str, model: str, temperature: float, system: str, user: str, text: str, t0: float,
+        stream: bool, complete: bool = True,
+    ) -> Dict[str, Any]:
+        return {
+            "key": key,
+            "provider": provider,
+            "model": model,
+            "temperature": temperature,
+            "system": system,
+            "user": user,
+            "text": text,
+            "ms": round((time.perf_counter() - t0) * 1000.0, 1),
+            "stream": stream,
+            "complete": complete,
+        }
@@ -0,0 +1,424 @@
+"""
+Scenario replay harness: runs a suite through the orchestrator against recorded
+provider answers and reports latency, per-stage time and quality rubrics.
+
+    cd backend
+    # once, with a provider configured (.env / env): record the suite's answers
+    python -m evaluations.harness record smoke [--workers 4]
+    # afterwards, offline and deterministic
+    python -m evaluations.harness replay smoke [--workers 8] [--baseline OLD.json]
+    python -m evaluations.harness compare OLD.json NEW.json
+
+A suite is a name under evaluations/scenarios/ or a JSONL path (evaluations/scenarios.py);
+its cassette defaults to evaluations/cassettes/<suite>.jsonl (evaluations/cassette.py).
+Scenarios are split into chunks and run in a process pool; each worker installs the
+cassette with utils.llm.set_cassette and plans its scenarios one at a time on one
+event loop, so per-scenario latency is not skewed by sibling scenarios.
+
+Every run uses the same settings so record and replay make the same provider calls:
+no spot cache, no micro-batching, no hedging, a circuit breaker that never opens (a
+replay miss must not change what later scenarios do) and the catalogue off unless
+--catalogue. Replay takes provider, model and temperature from the cassette header.
+
+Per scenario: wall ms of orchestrator.run, the agent spans of metadata["trace_detail"]
+(curate / draft / review / estimate, plus time inside provider calls), cassette hits
+and misses, and the rubrics of evaluations/rubrics.py. The report (JSON, --out) holds
+the summary and every scenario; --baseline / compare diff two reports and exit 1 on a
+regression: tail latency up more than --max-slowdown, a rubric pass rate down more
+than --max-quality-drop, or more errors or cassette misses.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from evaluations.cassette import Cassette
+from evaluations.rubrics import RUBRICS, score_plan
+from evaluations.scenarios import Scenario, load_suite, suite_name
+
+HERE = Path(__file__).resolve().parent
+CASSETTES_DIR = HERE / "cassettes"
+RESULTS_DIR = HERE / "results"
+# settings every record and replay run shares (see module docstring)
+FIXED_SETTINGS: Dict[str, Any] = {
+    "SPOT_CACHE_ENABLED": False,
+    "LLM_MICROBATCH": False,
+    "LLM_HEDGE": False,
+    "LLM_BREAKER_FAILURES": 1 << 30,
+    "PLAN_STORE_ENABLED": False,
+}
+REPLAY_KEY = "replay"              # stands in for credentials; a replayed call never leaves the process
+REPLAY_HOST = "http://replay.invalid"
+
+_WORKER: Dict[str, Any] = {}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100); 0.0 for an empty sample."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(q / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+# -------------------- Settings --------------------
+
+def recording_header(catalogue: bool) -> Dict[str, Any]:
+    """Provider, model and temperature of the current settings (what a record run calls)."""
+    from utils.config import choose_llm, get_settings
+
+    s = get_settings()
+    picked = choose_llm(s)
+    if picked is None:
+        raise SystemExit("record needs a configured provider (OPENAI_API_KEY or OLLAMA_HOST)")
+    provider, cfg = picked
+    return {"provider": provider, "model": cfg["model"], "temperature": s.LLM_TEMPERATURE, "catalogue": catalogue}
+
+
+def settings_changes(mode: str, header: Dict[str, Any]) -> Dict[str, Any]:
+    changes = {**FIXED_SETTINGS, "CATALOGUE_ENABLED": bool(header.get("catalogue"))}
+    if mode == "replay":
+        changes.update(PROVIDER=header["provider"], LLM_TEMPERATURE=float(header["temperature"]))
+        if header["provider"] == "openai":
+            changes.update(OPENAI_API_KEY=REPLAY_KEY, OPENAI_MODEL=header["model"], OLLAMA_HOST=None)
+        else:
+            changes.update(OLLAMA_HOST=REPLAY_HOST, OLLAMA_MODEL=header["model"], OPENAI_API_KEY=None)
+    return changes
+
+
+# -------------------- Workers --------------------
+
+def _init_worker(changes: Dict[str, Any], cassette_path: str, mode: str, latency_scale: float) -> None:
+    from app.warmup import prewarm
+    from utils import config
+    from utils.llm import set_cassette
+
+    config.override_settings(**changes)
+    cassette = Cassette(Path(cassette_path), mode=mode, latency_scale=latency_scale)
+    set_cassette(cassette)
+    # one loop per worker (the pooled client and admission limits stay bound to it), prewarmed
+    # like the app lifespan so a worker's first scenario does not pay for imports
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(prewarm())
+    _WORKER.update(cassette=cassette, loop=loop)
+
+
+def _stage_ms(plan: Dict[str, Any]) -> Dict[str, float]:
+    from orchestrators.stages import AGENT_SPANS
+
+    names = {span: stage for stage, span in AGENT_SPANS.items()}
+    out: Dict[str, float] = defaultdict(float)
+    for sp in (plan.get("metadata") or {}).get("trace_detail", {}).get("spans", []):
+        ms = sp.get("duration_ms")
+        if ms is None:
+            continue
+        if sp.get("name") in names:
+            out[names[sp["name"]]] += ms
+        elif str(sp.get("name", "")).startswith("llm."):
+            out["llm"] += ms
+    return {k: round(v, 3) for k, v in out.items()}
+
+
+async def _run_one(scenario: Scenario, orchestrator: str) -> Dict[str, Any]:
+    from orchestrators import get_orchestrator
+
+    cassette: Cassette = _WORKER["cassette"]
+    before = dict(cassette.stats)
+    plan: Optional[Dict[str, Any]] = None
+    error = None
+    t = time.perf_counter()
+    try:
+        plan = (await get_orchestrator(orchestrator).run(scenario.request)).model_dump()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    ms = (time.perf_counter() - t) * 1000.0
+    return {
+        "id": scenario.id,
+        "tags": scenario.tags,
+        "destination": scenario.request.destination,
+        "days": scenario.request.days,
+        "ms": round(ms, 3),
+        "error": error,
+        "cassette": {k: cassette.stats[k] - before[k] for k in cassette.stats},
+        "spot_source": (plan or {}).get("metadata", {}).get("spot_source"),
+        "stages_ms": _stage_ms(plan) if plan else {},
+        "rubrics": score_plan(plan, scenario.request) if plan else {},
+    }
+
+
+async def _run_many(scenarios: Sequence[Scenario], orchestrator: str) -> List[Dict[str, Any]]:
+    return [await _run_one(s, orchestrator) for s in scenarios]
+
+
+def _run_chunk(scenarios: Sequence[Scenario], orchestrator: str) -> Dict[str, Any]:
+    """Worker entry point: plan `scenarios` in order; returns results and newly recorded answers."""
+    cassette: Cassette = _WORKER["cassette"]
+    results = _WORKER["loop"].run_until_complete(_run_many(scenarios, orchestrator))
+    recorded, cassette.new = cassette.new, []
+    return {"results": results, "recorded": recorded}
+
+
+def run_suite(
+    scenarios: Sequence[Scenario],
+    cassette: Cassette,
+    mode: str,
+    orchestrator: str = "react",
+    workers: int = 1,
+    chunk: Optional[int] = None,
+    latency_scale: float = 0.0,
+    progress: bool = True,
+) -> List[Dict[str, Any]]:
+    """Plan every scenario (in a process pool when workers > 1); results in suite order."""
+    assert cassette.path is not None
+    initargs = (settings_changes(mode, cassette.header), str(cassette.path), mode, latency_scale)
+    size = chunk or max(1, min(50, math.ceil(len(scenarios) / max(workers, 1) / 4)))
+    chunks = [list(scenarios[i:i + size]) for i in range(0, len(scenarios), size)]
+    results: List[Dict[str, Any]] = []
+
+    def collect(out: Dict[str, Any]) -> None:
+        results.extend(out["results"])
+        if out["recorded"]:
+            cassette.add(out["recorded"])
+            cassette.save()  # after every chunk, so an interrupted recording keeps what it paid for
+        if progress:
+            print(f"\r{len(results)}/{len(scenarios)} scenarios", end="", file=sys.stderr, flush=True)
+
+    if workers <= 1:
+        from utils.llm import close_http_client, set_cassette
+
+        _init_worker(*initargs)
+        try:
+            for c in chunks:
+                collect(_run_chunk(c, orchestrator))
+        finally:
+            loop = _WORKER.pop("loop")
+            loop.run_until_complete(close_http_client())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+            set_cassette(None)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+            for fut in as_completed([pool.submit(_run_chunk, c, orchestrator) for c in chunks]):
+                collect(fut.result())
+    if progress:
+        print(file=sys.stderr)
+    order = {s.id: i for i, s in enumerate(scenarios)}
+    return sorted(results, key=lambda r: order[r["id"]])
+
+
+# -------------------- Reports --------------------
+
+def summarize(results: List[Dict[str, Any]], wall_s: float) -> Dict[str, Any]:
+    ok = [r for r in results if r["error"] is None]
+    lat = [r["ms"] for r in ok]
+    stages: Dict[str, List[float]] = defaultdict(list)
+    for r in ok:
+        for name, ms in r["stages_ms"].items():
+            stages[name].append(ms)
+    rubrics: Dict[str, Dict[str, Any]] = {}
+    for name in RUBRICS:
+        graded = [r for r in ok if (r["rubrics"].get(name) or {}).get("pass") is not None]
+        passed = [r for r in graded if r["rubrics"][name]["pass"]]
+        rubrics[name] = {
+            "graded": len(graded),
+            "pass_rate": round(len(passed) / len(graded), 4) if graded else None,
+            "mean_score": round(sum(r["rubrics"][name]["score"] for r in graded) / len(graded), 4) if graded else None,
+            "failing": [r["id"] for r in graded if not r["rubrics"][name]["pass"]][:20],
+        }
+    return {
+        "scenarios": len(results),
+        "errors": len(results) - len(ok),
+        "fallbacks": sum(1 for r in ok if r["spot_source"] is None),  # planned without curated spots
+        "cassette": {k: sum(r["cassette"].get(k, 0) for r in results) for k in ("hits", "misses", "recorded")},
+        "wall_s": round(wall_s, 3),
+        "scenarios_per_s": round(len(results) / wall_s, 2) if wall_s > 0 else 0.0,
+        "p50_ms": round(percentile(lat, 50), 3),
+        "p95_ms": round(percentile(lat, 95), 3),
+        "p99_ms": round(percentile(lat, 99), 3),
+        "max_ms": round(max(lat), 3) if lat else 0.0,
+        "slowest": [r["id"] for r in sorted(ok, key=lambda r: -r["ms"])[:5]],
+        "stages_ms": {
+            name: {"mean": round(sum(v) / len(v), 3), "p95": round(percentile(v, 95), 3)}
+            for name, v in sorted(stages.items())
+        },
+        "rubrics": rubrics,
+    }
+
+
+def print_summary(s: Dict[str, Any]) -> None:
+    c = s["cassette"]
+    print(f"{s['scenarios']} scenarios in {s['wall_s']:.2f}s ({s['scenarios_per_s']:.1f}/s), "
+          f"{s['errors']} error(s), {s['fallbacks']} fallback(s); cassette {c['hits']} hit(s), "
+          f"{c['misses']} miss(es), {c['recorded']} recorded")
+    print(f"latency ms  p50 {s['p50_ms']:.2f}  p95 {s['p95_ms']:.2f}  p99 {s['p99_ms']:.2f}  max {s['max_ms']:.2f}"
+          f"  (slowest: {', '.join(s['slowest'])})")
+    print(f"{'stage':<10} {'mean ms':>9} {'p95 ms':>9}")
+    for name, v in s["stages_ms"].items():
+        print(f"{name:<10} {v['mean']:>9.3f} {v['p95']:>9.3f}")
+    print(f"{'rubric':<14} {'graded':>6} {'pass':>7} {'score':>7}  failing")
+    for name, v in s["rubrics"].items():
+        rate = f"{v['pass_rate'] * 100:.1f}%" if v["pass_rate"] is not None else "-"
+        score = f"{v['mean_score']:.3f}" if v["mean_score"] is not None else "-"
+        print(f"{name:<14} {v['graded']:>6} {rate:>7} {score:>7}  {', '.join(v['failing'][:5])}")
+
+
+def compare(
+    old: Dict[str, Any], new: Dict[str, Any], max_slowdown: float = 0.25, min_ms: float = 1.0,
+    max_quality_drop: float = 0.0,
+) -> List[str]:
+    """
+    Print new-vs-old deltas and return the regressions. A latency counts when it grew by
+    more than `max_slowdown` (fraction) and more than `min_ms`; a rubric when its pass
+    rate fell by more than `max_quality_drop`. Scenarios that went from pass to fail are named.
+    """
+    a, b = old["summary"], new["summary"]
+    regressions: List[str] = []
+    print(f"\ncompare {old.get('meta', {}).get('commit')} -> {new.get('meta', {}).get('commit')}")
+    workers = (old.get("meta", {}).get("workers"), new.get("meta", {}).get("workers"))
+    if workers[0] != workers[1]:
+        print(f"  note: {workers[0]} vs {workers[1]} workers; latencies are only comparable at equal counts")
+
+    def slower(label: str, x: float, y: float) -> None:
+        delta = (y - x) / x * 100.0 if x else 0.0
+        print(f"  {label:<22} {x:>10.3f} -> {y:<10.3f} ({delta:+.0f}%)")
+        if y - x > min_ms and y > x * (1.0 + max_slowdown):
+            regressions.append(f"{label} {x:.2f} -> {y:.2f} ms")
+
+    for key in ("p50_ms", "p95_ms", "p99_ms"):
+        slower(key, a[key], b[key])
+    for name, v in b["stages_ms"].items():
+        if name in a["stages_ms"]:
+            slower(f"{name} p95_ms", a["stages_ms"][name]["p95"], v["p95"])
+    for key in ("errors", "fallbacks"):
+        print(f"  {key:<22} {a[key]:>10} -> {b[key]}")
+    if b["errors"] > a["errors"]:
+        regressions.append(f"errors {a['errors']} -> {b['errors']}")
+    if b["cassette"]["misses"] > a["cassette"]["misses"]:
+        regressions.append(f"cassette misses {a['cassette']['misses']} -> {b['cassette']['misses']}")
+
+    before = {r["id"]: r for r in old.get("scenarios", [])}
+    for name, v in b["rubrics"].items():
+        x, y = (a["rubrics"].get(name) or {}).get("pass_rate"), v["pass_rate"]
+        if x is None or y is None:
+            continue
+        print(f"  {name + ' pass':<22} {x * 100:>9.1f}% -> {y * 100:.1f}%")
+        if x - y > max_quality_drop + 1e-9:
+            flipped = [r["id"] for r in new.get("scenarios", [])
+                       if (r["rubrics"].get(name) or {}).get("pass") is False
+                       and ((before.get(r["id"]) or {}).get("rubrics", {}).get(name) or {}).get("pass") is True]
+            regressions.append(f"{name} pass rate {x * 100:.1f}% -> {y * 100:.1f}%"
+                               + (f" (now failing: {', '.join(flipped[:10])})" if flipped else ""))
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _finish(regressions: List[str]) -> None:
+    if regressions:
+        print("\nREGRESSIONS:\n  " + "\n  ".join(regressions))
+        raise SystemExit(1)
+    print("\nno regressions")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = ap.add_subparsers(dest="command", required=True)
+    for name in ("record", "replay"):
+        p = sub.add_parser(name, help=f"{name} a scenario suite")
+        p.add_argument("suite", help="suite name (evaluations/scenarios/<name>.jsonl) or JSONL path")
+        p.add_argument("--cassette", help="cassette path (default: evaluations/cassettes/<suite>.jsonl)")
+        p.add_argument("--orchestrator", default="react")
+        p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes (1 = in-process)")
+        p.add_argument("--chunk", type=int, help="scenarios per pool task")
+        p.add_argument("--limit", type=int, help="first N scenarios only")
+        p.add_argument("--latency-scale", type=float, default=0.0,
+                       help="replay: sleep recorded provider latency x this (0 = instant)")
+        p.add_argument("--out", help="report JSON (default: evaluations/results/<suite>-<mode>.json)")
+        p.add_argument("--baseline", metavar="OLD_JSON", help="compare against an earlier report; exit 1 on regression")
+        p.add_argument("--max-slowdown", type=float, default=0.25)
+        p.add_argument("--max-quality-drop", type=float, default=0.0)
+        p.add_argument("--json", action="store_true", help="print the summary as JSON")
+        if name == "record":
+            p.add_argument("--catalogue", action="store_true", help="serve catalogue destinations offline")
+    p = sub.add_parser("compare", help="diff two reports; exit 1 on regression")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--max-slowdown", type=float, default=0.25)
+    p.add_argument("--max-quality-drop", type=float, default=0.0)
+    args = ap.parse_args()
+
+    if args.command == "compare":
+        with open(args.old, encoding="utf-8") as f, open(args.new, encoding="utf-8") as g:
+            old, new = json.load(f), json.load(g)
+        _finish(compare(old, new, args.max_slowdown, max_quality_drop=args.max_quality_drop))
+        return
+
+    baseline = None
+    if args.baseline:  # read first: the default --out of a rerun overwrites it
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    name = suite_name(args.suite)
+    scenarios = load_suite(args.suite)[:args.limit] if args.limit else load_suite(args.suite)
+    path = Path(args.cassette) if args.cassette else CASSETTES_DIR / f"{name}.jsonl"
+    if args.command == "replay":
+        if not path.exists():
+            raise SystemExit(f"no cassette at {path}; record the suite first")
+        cassette = Cassette(path, mode="replay")
+    else:
+        header = recording_header(args.catalogue)
+        cassette = Cassette(path, mode="record", header=header)
+        known = {k: cassette.header.get(k) for k in ("provider", "model", "temperature")}
+        if len(cassette) and known != {k: header[k] for k in known}:
+            raise SystemExit(f"{path} was recorded with {known}; record into a new cassette")
+
+    t = time.perf_counter()
+    results = run_suite(scenarios, cassette, args.command, args.orchestrator, args.workers, args.chunk,
+                        args.latency_scale, progress=not args.json)
+    summary = summarize(results, time.perf_counter() - t)
+    doc = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "suite": name,
+            "mode": args.command,
+            "orchestrator": args.orchestrator,
+            "workers": args.workers,
+            "latency_scale": args.latency_scale,
+            "cassette": str(path),
+            **{k: cassette.header.get(k) for k in ("provider", "model", "temperature", "catalogue")},
+        },
+        "summary": summary,
+        "scenarios": results,
+    }
+    out = Path(args.out) if args.out else RESULTS_DIR / f"{name}-{args.command}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(doc, indent=1), encoding="utf-8")
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary)
+        print(f"\nwrote {out}", file=sys.stderr)
+    if baseline is not None:
+        _finish(compare(baseline, doc, args.max_slowdown, max_quality_drop=args.max_quality_drop))
+
+
+if __name__ == "__main__":
+    main()
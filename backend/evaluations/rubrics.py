@@ -0,0 +1,74 @@
+"""
+Quality rubrics over a finished plan (Plan.model_dump()) and the request it answers.
+
+Each rubric returns {"score": 0..1 or None, "pass": bool or None, ...details};
+None means the rubric does not apply (e.g. budget_fit without a budget).
+
+  seed_coverage   share of activities that are curated spots (metadata["llm_spots"])
+                  rather than seeds or generic fillers; passes at MIN_SEED_COVERAGE
+  duplicates      activities that repeat an earlier one of the trip (same normalized
+                  title); passes at zero. The Critic's near-duplicate count is reported
+                  alongside but not graded, so the rubric does not depend on the Critic
+  budget_fit      estimated cost against profile.budget_total; passes when within it
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List
+
+from utils.similarity import normalize_title
+from utils.spots import SpotTable
+from utils.types import TripRequest
+
+MIN_SEED_COVERAGE = 0.5
+
+Rubric = Callable[[Dict[str, Any], TripRequest], Dict[str, Any]]
+
+
+def _activities(plan: Dict[str, Any]) -> List[str]:
+    return [a for day in plan.get("days") or [] for a in day.get("activities") or []]
+
+
+def seed_coverage(plan: Dict[str, Any], request: TripRequest) -> Dict[str, Any]:
+    acts = _activities(plan)
+    table = SpotTable.from_dicts((plan.get("metadata") or {}).get("llm_spots") or [])
+    curated = sum(1 for a in acts if table.find(a) is not None) if len(table) else 0
+    score = curated / len(acts) if acts else 0.0
+    return {"score": round(score, 4), "pass": score >= MIN_SEED_COVERAGE, "curated": curated,
+            "activities": len(acts), "spots": len(table)}
+
+
+def duplicates(plan: Dict[str, Any], request: TripRequest) -> Dict[str, Any]:
+    acts = _activities(plan)
+    seen: set = set()
+    repeats = 0
+    for a in acts:
+        key = normalize_title(a) or a.casefold()
+        repeats += key in seen
+        seen.add(key)
+    issues = ((plan.get("metadata") or {}).get("critic") or {}).get("issues") or []
+    near = sum(1 for i in issues if i.get("kind") == "near_duplicate")
+    score = 1.0 - repeats / len(acts) if acts else 1.0
+    return {"score": round(score, 4), "pass": repeats == 0, "repeats": repeats, "critic_near": near}
+
+
+def budget_fit(plan: Dict[str, Any], request: TripRequest) -> Dict[str, Any]:
+    target = request.profile.budget_total
+    cost = float(plan.get("total_estimated_cost") or 0.0)
+    if target is None:
+        return {"score": None, "pass": None, "cost": cost}
+    if target <= 0:
+        return {"score": 1.0 if cost <= 0 else 0.0, "pass": cost <= 0, "cost": cost, "ratio": None}
+    ratio = cost / target
+    # 1.0 within budget, falling linearly to 0 at twice the budget
+    return {"score": round(max(0.0, min(1.0, 2.0 - ratio)), 4), "pass": cost <= target + 1e-6,
+            "cost": cost, "ratio": round(ratio, 4)}
+
+
+RUBRICS: Dict[str, Rubric] = {
+    "seed_coverage": seed_coverage,
+    "duplicates": duplicates,
+    "budget_fit": budget_fit,
+}
+
+
+def score_plan(plan: Dict[str, Any], request: TripRequest) -> Dict[str, Dict[str, Any]]:
+    return {name: rubric(plan, request) for name, rubric in RUBRICS.items()}
@@ -0,0 +1,119 @@
+"""
+Scenario suites: TripRequests with an id and tags, one JSON object per line.
+
+    {"id": "s0001", "tags": ["short", "budget"], "request": {"origin": ..., "destination": ..., ...}}
+
+A bare TripRequest line (the `cli.py --batch` input format) is read as a scenario
+whose id is its line number. `generate()` builds large seeded suites over the
+gazetteer's cities plus a few places no catalogue or gazetteer knows:
+
+    python -m evaluations.scenarios 2000 --seed 7 > evaluations/scenarios/large.jsonl
+"""
+from __future__ import annotations
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Sequence
+
+from utils.types import TripRequest
+
+SUITES_DIR = Path(__file__).resolve().parent / "scenarios"
+
+INTERESTS = (
+    "art", "museums", "history", "food", "cafes", "markets", "architecture", "parks", "nightlife",
+    "shopping", "photography", "music", "nature", "kids",
+)
+ORIGINS = ("Chicago", "London", "Berlin", "Singapore", "Sao Paulo", "Toronto")
+UNKNOWN = ("Lakeport", "Vell Harbor", "Santa Irene", "Nordby")  # no catalogue, no gazetteer entry
+# trip lengths weighted toward the common case, with a tail up to the 30-day maximum
+DAY_WEIGHTS = {1: 4, 2: 8, 3: 14, 4: 12, 5: 12, 6: 6, 7: 10, 10: 6, 14: 5, 21: 2, 30: 2}
+
+
+@dataclass
+class Scenario:
+    id: str
+    request: TripRequest
+    tags: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"id": self.id, "tags": self.tags, "request": self.request.model_dump()}
+
+
+def parse_scenarios(lines: Iterable[str]) -> List[Scenario]:
+    out: List[Scenario] = []
+    for n, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        rec = json.loads(line)
+        if "request" in rec:
+            out.append(Scenario(str(rec.get("id") or n), TripRequest.model_validate(rec["request"]),
+                                list(rec.get("tags") or [])))
+        else:
+            out.append(Scenario(str(n), TripRequest.model_validate(rec)))
+    ids = [s.id for s in out]
+    if len(set(ids)) != len(ids):
+        raise ValueError("scenario ids must be unique")
+    return out
+
+
+def load_suite(name_or_path: str) -> List[Scenario]:
+    """A path to a JSONL file, or the name of a suite in evaluations/scenarios/."""
+    path = Path(name_or_path)
+    if not path.exists():
+        path = SUITES_DIR / f"{name_or_path}.jsonl"
+    with path.open(encoding="utf-8") as f:
+        return parse_scenarios(f)
+
+
+def suite_name(name_or_path: str) -> str:
+    return Path(name_or_path).stem
+
+
+def _cities() -> List[str]:
+    from tools.gazetteer import get_gazetteer
+
+    return [p.name for p in get_gazetteer().places if p.kind == "city"]
+
+
+def generate(n: int, seed: int = 7, destinations: Sequence[str] = ()) -> List[Scenario]:
+    """`n` seeded scenarios; the same (n, seed) always gives the same suite."""
+    rng = random.Random(seed)
+    known = list(destinations) or _cities()
+    lengths, weights = zip(*DAY_WEIGHTS.items())
+    out: List[Scenario] = []
+    for i in range(n):
+        unknown = rng.random() < 0.08
+        destination = rng.choice(UNKNOWN if unknown else known)
+        days = rng.choices(lengths, weights)[0]
+        people = rng.choice((1, 2, 2, 2, 3, 4))
+        interests = rng.sample(INTERESTS, rng.choice((0, 1, 2, 2, 3, 3, 4)))
+        # a third without a budget; the rest from tight to generous per person per day
+        budget = None if rng.random() < 0.33 else round(rng.uniform(60.0, 450.0) * people * days, -1)
+        start = date(2026, 1, 1) + timedelta(days=rng.randrange(365))
+        tags = ["short" if days <= 3 else "long" if days >= 10 else "week"]
+        tags += ["unknown"] if unknown else []
+        tags += ["budget"] if budget is not None else []
+        request = TripRequest(
+            origin=rng.choice(ORIGINS),
+            destination=destination,
+            start_date=start.isoformat(),
+            days=days,
+            profile={"people": people, "budget_total": budget, "interests": interests},
+        )
+        out.append(Scenario(f"s{i + 1:05d}", request, tags))
+    return out
+
+
+if __name__ == "__main__":
+    import sys
+
+    import typer
+
+    def main(n: int = typer.Argument(100), seed: int = typer.Option(7)) -> None:
+        """Write a generated suite as JSONL to stdout."""
+        for scenario in generate(n, seed):
+            sys.stdout.write(json.dumps(scenario.to_dict(), ensure_ascii=False) + "\n")
+
+    typer.run(main)
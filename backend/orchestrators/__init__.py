@@ -0,0 +1,24 @@
+from __future__ import annotations
+from typing import Any, Dict, Type, Union
+
+from .react_loop import ReactLoop
+from .graph import GraphOrchestrator
+
+Orchestrator = Union[ReactLoop, GraphOrchestrator]
+
+ORCHESTRATORS: Dict[str, Type[Orchestrator]] = {
+    ReactLoop.name: ReactLoop,
+    GraphOrchestrator.name: GraphOrchestrator,
+}
+
+
+def get_orchestrator(name: str | None = None, **kwargs: Any) -> Orchestrator:
+    """Build an orchestrator by name ('react' | 'graph'); defaults to Settings.ORCHESTRATOR."""
+    if not name:
+        from utils.config import get_settings
+        name = get_settings().ORCHESTRATOR
+    try:
+        cls = ORCHESTRATORS[name.lower()]
+    except KeyError:
+        raise ValueError(f"unknown orchestrator '{name}' (choose from: {', '.join(ORCHESTRATORS)})")
+    return cls(**kwargs)
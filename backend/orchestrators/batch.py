@@ -0,0 +1,80 @@
+from __future__ import annotations
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Set, Union
+
+from pydantic import ValidationError
+
+from agents.destination_llm import CurationMemo
+from orchestrators import get_orchestrator
+from utils.admission import admitted, plan_admission
+from utils.plan_store import record_plan
+from utils.serialize import PLAN_BODY_EXCLUDE
+from utils.types import TripRequest
+
+BatchItem = Union[TripRequest, Dict[str, Any], str]
+
+
+def _parse_item(item: BatchItem) -> TripRequest:
+    if isinstance(item, TripRequest):
+        return item
+    if isinstance(item, str):
+        return TripRequest.model_validate_json(item)
+    return TripRequest.model_validate(item)
+
+
+async def _plan_item(
+    index: int, item: BatchItem, memo: CurationMemo, orchestrator: Optional[str], priority: Optional[str] = None
+) -> Dict[str, Any]:
+    """Plan one item; any failure becomes an error record instead of aborting the batch."""
+    try:
+        req = _parse_item(item)
+        orch = get_orchestrator(orchestrator, curation_memo=memo)
+        async with admitted(plan_admission() if priority else None, priority):
+            plan = await orch.run(req)
+        record_plan(req, plan, orch.name, source="batch")
+        return {"index": index, "plan": plan.model_dump(exclude=PLAN_BODY_EXCLUDE)}
+    except ValidationError as e:
+        return {"index": index, "error": "invalid TripRequest", "detail": json.loads(e.json())}
+    except Exception as e:
+        return {"index": index, "error": type(e).__name__, "detail": str(e)}
+
+
+async def plan_batch(
+    items: Iterable[BatchItem],
+    concurrency: int = 8,
+    orchestrator: Optional[str] = None,
+    priority: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Plan many TripRequests with at most `concurrency` in flight, yielding one record per item
+    ({"index", "plan"} or {"index", "error", "detail"}) as soon as it finishes (completion order).
+
+    Items may be TripRequests, dicts or raw JSON strings (e.g. JSONL lines); blank lines are skipped.
+    `items` is consumed lazily, so arbitrarily large inputs run in bounded memory.
+    Destination curation is shared across the batch: identical destination/interests
+    pairs hit the LLM (or spot cache) once. With a `priority` (server side), every item
+    also takes a plan admission slot in that class.
+    """
+    memo: CurationMemo = {}
+    pending: Set["asyncio.Task[Dict[str, Any]]"] = set()
+    limit = max(int(concurrency), 1)
+    index = 0
+    try:
+        for item in items:
+            if isinstance(item, str) and not item.strip():
+                continue
+            if len(pending) >= limit:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for t in done:
+                    yield t.result()
+            pending.add(asyncio.ensure_future(_plan_item(index, item, memo, orchestrator, priority)))
+            index += 1
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for t in done:
+                yield t.result()
+    finally:
+        for t in pending:
+            t.cancel()
+
@@ -0,0 +1,228 @@
+from __future__ import annotations
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from utils.types import TripRequest, Plan, PlanEvent
+from utils.trace import DecisionTrace
+from agents.destination_llm import CurationMemo
+from orchestrators import stages
+
+# keys present in the state before any node runs
+INITIAL_KEYS = ("request", "curation_memo")
+
+
+@dataclass(frozen=True)
+class Node:
+    """
+    One step of the graph. `fn` is called with the `inputs` state keys as keyword
+    arguments (sync or async) and must return a dict holding every key in `outputs`,
+    plus optional "trace" lines.
+    """
+    name: str
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    fn: Callable[..., Any]
+    events: Optional[Callable[[Dict[str, Any], List[str]], List[PlanEvent]]] = None
+
+
+def _spots_events(out: Dict[str, Any], trace: List[str]) -> List[PlanEvent]:
+    spots = out["llm_spots"]
+    return [PlanEvent(event="spots", data={"count": len(spots), "spots": spots}, trace=trace)]
+
+
+def _day_events(out: Dict[str, Any], trace: List[str]) -> List[PlanEvent]:
+    days = out["days"]
+    return [
+        PlanEvent(event="day", data=d.model_dump(), trace=trace if i == len(days) - 1 else [])
+        for i, d in enumerate(days)
+    ]
+
+
+def _critic_events(out: Dict[str, Any], trace: List[str]) -> List[PlanEvent]:
+    data = {"findings": out["critic_findings"], **out["critic_report"]}
+    return [PlanEvent(event="critic", data=data, trace=trace)]
+
+
+def _budget_events(out: Dict[str, Any], trace: List[str]) -> List[PlanEvent]:
+    data = {
+        "total_estimated_cost": out["total_estimated_cost"],
+        "currency": out["currency"],
+        "breakdown": out["budget_breakdown"],
+    }
+    return [PlanEvent(event="budget", data=data, trace=trace)]
+
+
+def default_nodes() -> List[Node]:
+    return [
+        Node(
+            "curate",
+            inputs=("request", "curation_memo"),
+            outputs=("seed_activities", "llm_spots", "spot_table", "llm_metadata"),
+            fn=lambda request, curation_memo: stages.curate(request, memo=curation_memo),
+            events=_spots_events,
+        ),
+        Node(
+            "draft",
+            inputs=("request", "seed_activities", "llm_spots", "spot_table"),
+            outputs=("days", "rows"),
+            fn=stages.draft,
+            events=_day_events,
+        ),
+        Node(
+            "review",
+            inputs=("request", "days", "llm_spots", "spot_table", "rows"),
+            outputs=("critic_findings", "critic_report"),
+            fn=stages.review,
+            events=_critic_events,
+        ),
+        # prices the drafted days, so it runs alongside the critic
+        Node(
+            "estimate",
+            inputs=("request", "days", "llm_spots", "spot_table", "rows"),
+            outputs=("total_estimated_cost", "currency", "budget_breakdown"),
+            fn=stages.estimate,
+            events=_budget_events,
+        ),
+    ]
+
+
+def topo_order(nodes: Sequence[Node], initial: Sequence[str] = INITIAL_KEYS) -> List[Node]:
+    """
+    Derive the DAG from declared inputs/outputs and return nodes in a stable topological order.
+    Raises ValueError on duplicate producers, unknown inputs or cycles.
+    """
+    producer: Dict[str, str] = {}
+    for n in nodes:
+        for key in n.outputs:
+            if key in producer or key in initial:
+                first = producer.get(key, "initial state")
+                raise ValueError(f"state key '{key}' produced by both '{first}' and '{n.name}'")
+            producer[key] = n.name
+    deps: Dict[str, Set[str]] = {}
+    for n in nodes:
+        missing = [k for k in n.inputs if k not in producer and k not in initial]
+        if missing:
+            raise ValueError(f"node '{n.name}' needs unknown state key(s): {', '.join(missing)}")
+        deps[n.name] = {producer[k] for k in n.inputs if k in producer}
+
+    order: List[Node] = []
+    placed: Set[str] = set()
+    pending = list(nodes)
+    while pending:
+        ready = [n for n in pending if deps[n.name] <= placed]
+        if not ready:
+            raise ValueError(f"cycle between nodes: {', '.join(n.name for n in pending)}")
+        for n in ready:
+            order.append(n)
+            placed.add(n.name)
+        pending = [n for n in pending if n.name not in placed]
+    return order
+
+
+class GraphOrchestrator:
+    """
+    Dependency-graph orchestrator: each node declares the state keys it reads and writes,
+    the engine derives the DAG and starts every node as soon as its inputs exist, so
+    independent agents (e.g. Critic vs. Budget) run concurrently on the event loop.
+
+    Same contract as ReactLoop: `run(request) -> Plan`, and `stream(request)` yields
+    PlanEvents in completion order. Per-node start/end offsets are added to the trace
+    and to metadata["graph_timings"]; each node runs in a DecisionTrace span
+    (metadata["trace_detail"]).
+    """
+
+    name = "graph"
+
+    def __init__(
+        self, curation_memo: Optional[CurationMemo] = None, nodes: Optional[Sequence[Node]] = None
+    ) -> None:
+        self.curation_memo = curation_memo
+        self.nodes = topo_order(list(nodes) if nodes is not None else default_nodes())
+
+    async def run(self, request: TripRequest) -> Plan:
+        plan: Optional[Plan] = None
+        async for ev in self.stream(request):
+            if ev.event == "plan":
+                plan = ev.plan
+        assert plan is not None
+        return plan
+
+    @staticmethod
+    async def _call(node: Node, state: Dict[str, Any], trace: DecisionTrace) -> Dict[str, Any]:
+        # runs in its own task, so the span is the parent of whatever the node calls
+        with trace.span(stages.AGENT_SPANS.get(node.name, f"node.{node.name}"), node=node.name):
+            out: Any = node.fn(**{k: state[k] for k in node.inputs})
+            if inspect.isawaitable(out):
+                out = await out
+            trace.extend(list(out.get("trace", [])))
+        missing = [k for k in node.outputs if k not in out]
+        if missing:
+            raise RuntimeError(f"node '{node.name}' did not produce: {', '.join(missing)}")
+        produced: Dict[str, Any] = out
+        return produced
+
+    async def stream(self, request: TripRequest) -> AsyncIterator[PlanEvent]:
+        state: Dict[str, Any] = {"request": request, "curation_memo": self.curation_memo}
+        node_trace: Dict[str, List[str]] = {}
+        timings: Dict[str, Dict[str, float]] = {}
+        running: Dict["asyncio.Task[Dict[str, Any]]", Node] = {}
+        waiting = list(self.nodes)
+        decisions = DecisionTrace("plan")
+        decisions.root.set(orchestrator=self.name, destination=request.destination, days=request.days)
+        outcome = "error"
+        t0 = time.perf_counter()
+
+        def ms() -> float:
+            return round((time.perf_counter() - t0) * 1000.0, 2)
+
+        try:
+            while waiting or running:
+                for node in [n for n in waiting if all(k in state for k in n.inputs)]:
+                    waiting.remove(node)
+                    timings[node.name] = {"start_ms": ms()}
+                    running[asyncio.ensure_future(self._call(node, state, decisions))] = node
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    node = running.pop(task)
+                    out = task.result()
+                    timings[node.name]["end_ms"] = ms()
+                    for key in node.outputs:
+                        state[key] = out[key]
+                    t = timings[node.name]
+                    timing = f"[Graph] {node.name}: {t['start_ms']:.1f}–{t['end_ms']:.1f} ms"
+                    decisions.log(timing)
+                    lines = list(out.get("trace", [])) + [timing]
+                    node_trace[node.name] = lines
+                    for ev in node.events(out, lines) if node.events else []:
+                        yield ev
+            outcome = "degraded" if (state.get("llm_metadata") or {}).get("degraded") else "ok"
+        except (GeneratorExit, asyncio.CancelledError):
+            outcome = "cancelled"
+            raise
+        finally:
+            for task in running:
+                task.cancel()
+            detail = stages.finish_trace(decisions, self.name, outcome)
+
+        # trace in stable (topological) order, whatever the completion order was
+        trace = [line for n in self.nodes for line in node_trace.get(n.name, [])]
+        metadata: Dict[str, Any] = dict(state.get("llm_metadata") or {})
+        metadata["orchestrator"] = self.name
+        if "critic_report" in state:
+            metadata["critic"] = state["critic_report"]
+        if state.get("budget_breakdown"):
+            metadata["budget"] = state["budget_breakdown"]
+        metadata["graph_timings"] = timings
+        metadata["trace_detail"] = detail
+        plan = Plan(
+            destination=request.destination,
+            total_estimated_cost=state["total_estimated_cost"],
+            currency=state["currency"],
+            days=state["days"],
+            trace=trace,
+            metadata=metadata,
+        )
+        yield PlanEvent(event="plan", plan=plan)
@@ -1,12 +1,11 @@
 from __future__ import annotations
-from typing import List, Dict, Any
+import asyncio
+from typing import AsyncIterator, List, Dict, Any, Optional
 
-from utils.types import TripRequest, Plan, DayPlan
-from agents.planner import Planner
-from agents.critic import Critic
-from agents.budget import Budget
-from agents.destination_llm import DestinationLLMAgent
-from utils.config import get_settings, choose_llm
+from utils.types import TripRequest, Plan, DayPlan, PlanEvent
+from utils.trace import DecisionTrace
+from agents.destination_llm import CurationMemo
+from orchestrators import stages
 
 
 class ReactLoop:
@@ -14,86 +13,101 @@ class ReactLoop:
     Simple orchestrator:
       1) Ask LLM for destination-specific 'best places' (rich spots + seed activities)
       2) Planner drafts days (uses seeds first, then generic fallbacks)
-      3) Critic sanity-checks
-      4) Budget estimates total cost
+      3) Critic flags repeated places and monotonous days (structured issues in metadata)
+      4) Budget prices the days (daily base + visit prices, per-day breakdown)
       5) Return a Plan with decision trace + metadata (incl. llm_spots)
+
+    `stream` yields a PlanEvent as each stage completes; `run` drains it and returns the Plan.
+    Each stage runs in a DecisionTrace span; the structured spans/events go to
+    metadata["trace_detail"], the one-line rendering to Plan.trace.
+
+    A deadline opened by the caller (utils.deadline.deadline_scope) bounds the LLM
+    stage: when it runs out, curation is abandoned, the Planner uses its generic
+    fallbacks and metadata["degraded"] says why.
     """
 
-    def run(self, request: TripRequest) -> Plan:
-        trace: List[str] = []
-        metadata: Dict[str, Any] = {}
+    name = "react"
 
-        # -------- 1) LLM destination curation
-        interests = request.profile.interests or []
-        llm_agent = DestinationLLMAgent()
-        llm_out = llm_agent.propose(
-            destination=request.destination,
-            interests=interests,
-            days=request.days,
-        )
-        seed_activities = llm_out.get("activities", [])
-        llm_spots = llm_out.get("spots", [])
-        trace.extend(llm_out.get("trace", []))
+    def __init__(self, curation_memo: Optional[CurationMemo] = None) -> None:
+        # shared across a batch so identical destination curation runs once
+        self.curation_memo = curation_memo
 
-        if llm_spots:
-            # record provider/model for transparency
-            s = get_settings()
-            picked = choose_llm(s)
-            if picked:
-                provider, cfg = picked
-                metadata["llm_provider"] = provider
-                metadata["llm_model"] = cfg.get("model")
-            metadata["llm_spots"] = llm_spots
+    async def run(self, request: TripRequest) -> Plan:
+        plan: Optional[Plan] = None
+        async for ev in self.stream(request):
+            if ev.event == "plan":
+                plan = ev.plan
+        assert plan is not None
+        return plan
 
-        # -------- 2) Planning
-        planner = Planner()
-        pr = planner.run(request, seed_activities=seed_activities)
-        days: List[DayPlan] = pr["days"]
-        trace.extend(pr.get("trace", []))
+    async def stream(self, request: TripRequest) -> AsyncIterator[PlanEvent]:
+        trace = DecisionTrace("plan")
+        trace.root.set(orchestrator=self.name, destination=request.destination, days=request.days)
+        metadata: Dict[str, Any] = {"orchestrator": self.name}
+        outcome = "error"
+        try:
+            # -------- 1) LLM destination curation
+            with trace.span(stages.AGENT_SPANS["curate"]):
+                cur = await stages.curate(request, memo=self.curation_memo)
+                trace.extend(cur["trace"])
+            metadata.update(cur["llm_metadata"])
+            llm_spots = cur["llm_spots"]
+            yield PlanEvent(
+                event="spots",
+                data={"count": len(llm_spots), "spots": llm_spots},
+                trace=cur["trace"],
+            )
+
+            # -------- 2) Planning
+            with trace.span(stages.AGENT_SPANS["draft"]):
+                pr = stages.draft(request, cur["seed_activities"], llm_spots, cur["spot_table"])
+                trace.extend(pr["trace"])
+            days: List[DayPlan] = pr["days"]
+            for i, day in enumerate(days):
+                # the Planner's summary lines ride on the last drafted day
+                day_trace = pr["trace"] if i == len(days) - 1 else []
+                yield PlanEvent(event="day", data=day.model_dump(), trace=day_trace)
 
-        # -------- 3) Critic (structure-aware but lightweight)
-        critic = Critic()
-        critic_trace: List[str] = []
-        if hasattr(critic, "run"):
-            out = critic.run(days, request)  # type: ignore[arg-type]
-            if isinstance(out, dict) and "trace" in out:
-                critic_trace = out["trace"]
-            elif isinstance(out, str):
-                critic_trace = [out]
-        elif hasattr(critic, "review"):
-            msg = critic.review(days, request)  # type: ignore[attr-defined]
-            critic_trace = [msg] if isinstance(msg, str) else (msg or [])
-        if not critic_trace:
-            critic_trace = ["[Critic] no obvious issues found"]
-        trace.extend(critic_trace)
+            # -------- 3) Critic (near-duplicates across the trip, per-day variety)
+            with trace.span(stages.AGENT_SPANS["review"]):
+                cr = stages.review(request, days, llm_spots, cur["spot_table"], pr["rows"])
+                trace.extend(cr["trace"])
+            metadata["critic"] = cr["critic_report"]
+            yield PlanEvent(
+                event="critic",
+                data={"findings": cr["critic_findings"], **cr["critic_report"]},
+                trace=cr["trace"],
+            )
 
-        # -------- 4) Budget
-        # fall back to a deterministic simple estimate if the Budget agent shape differs
-        total = None
-        currency = "USD"
-        budget = Budget()
-        if hasattr(budget, "estimate"):
-            bo = budget.estimate(days, request)  # type: ignore[attr-defined]
-            if isinstance(bo, dict):
-                total = int(bo.get("total_estimated_cost") or bo.get("total") or 0)
-                currency = bo.get("currency", "USD")
-                if "trace" in bo:
-                    trace.extend(bo["trace"])
-        if total is None:
-            # default rule-of-thumb: $120 per person per day
-            per_ppd = 120
-            total = int(per_ppd * request.profile.people * request.days)
-            trace.append(
-                f"[Budget] estimated total ${total:.2f} for {request.profile.people} traveler(s)"
+            # -------- 4) Budget
+            with trace.span(stages.AGENT_SPANS["estimate"]):
+                br = stages.estimate(request, days, llm_spots, cur["spot_table"], pr["rows"])
+                trace.extend(br["trace"])
+            if br["budget_breakdown"]:
+                metadata["budget"] = br["budget_breakdown"]
+            yield PlanEvent(
+                event="budget",
+                data={
+                    "total_estimated_cost": br["total_estimated_cost"],
+                    "currency": br["currency"],
+                    "breakdown": br["budget_breakdown"],
+                },
+                trace=br["trace"],
             )
+            outcome = "degraded" if "degraded" in metadata else "ok"
+        except (GeneratorExit, asyncio.CancelledError):
+            outcome = "cancelled"
+            raise
+        finally:
+            metadata["trace_detail"] = stages.finish_trace(trace, self.name, outcome)
 
         # -------- 5) Return Plan
         plan = Plan(
             destination=request.destination,
-            total_estimated_cost=total,
-            currency=currency,
+            total_estimated_cost=br["total_estimated_cost"],
+            currency=br["currency"],
             days=days,
-            trace=trace,
+            trace=trace.dump(),
             metadata=metadata,
         )
-        return plan
+        yield PlanEvent(event="plan", plan=plan)
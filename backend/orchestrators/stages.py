@@ -0,0 +1,111 @@
+"""
+Stage functions shared by the orchestrators (ReactLoop runs them in sequence,
+GraphOrchestrator wires them by their state keys). Each returns its outputs plus
+the "trace" lines it contributes to Plan.trace.
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Optional
+
+from utils.types import TripRequest, DayPlan
+from agents.planner import Planner
+from agents.critic import CriticAgent as Critic
+from agents.budget import BudgetAgent as Budget
+from agents.destination_llm import DestinationLLMAgent, CurationMemo
+from utils.config import get_settings, choose_llm
+from utils.metrics import PLAN_SECONDS
+from utils.spots import SpotTable
+from utils.trace import DecisionTrace
+
+# trace span per stage, named after the agent doing the work
+AGENT_SPANS = {
+    "curate": "agent.destination_llm",
+    "draft": "agent.planner",
+    "review": "agent.critic",
+    "estimate": "agent.budget",
+}
+
+
+def finish_trace(trace: DecisionTrace, orchestrator: str, outcome: str = "ok") -> Dict[str, Any]:
+    """Close the plan's root span, record its latency, and return the structured trace for metadata."""
+    root = trace.finish(outcome=outcome)
+    PLAN_SECONDS.observe((root.duration_ms or 0.0) / 1000.0, orchestrator=orchestrator, outcome=outcome)
+    return {"spans": trace.spans(), "events": trace.events()}
+
+
+async def curate(request: TripRequest, memo: Optional[CurationMemo] = None) -> Dict[str, Any]:
+    """LLM destination curation -> seed_activities, llm_spots (+ their spot_table), llm_metadata."""
+    interests = request.profile.interests or []
+    llm_agent = DestinationLLMAgent(memo=memo)
+    llm_out = await llm_agent.propose(
+        destination=request.destination,
+        interests=interests,
+        days=request.days,
+    )
+    llm_spots = llm_out.get("spots", [])
+    metadata: Dict[str, Any] = {}
+    if llm_spots:
+        metadata["spot_source"] = llm_out.get("source", "llm")
+        # record provider/model for transparency
+        s = get_settings()
+        picked = choose_llm(s) if metadata["spot_source"] != "catalogue" else None
+        if picked:
+            provider, cfg = picked
+            metadata["llm_provider"] = provider
+            metadata["llm_model"] = cfg.get("model")
+        metadata["llm_spots"] = llm_spots
+    if llm_out.get("cache"):
+        metadata["spot_cache"] = llm_out["cache"]
+    if llm_out.get("degraded"):
+        metadata["degraded"] = llm_out["degraded"]
+    return {
+        "seed_activities": llm_out.get("activities", []),
+        "llm_spots": llm_spots,
+        "spot_table": SpotTable.from_dicts(llm_spots),
+        "llm_metadata": metadata,
+        "trace": list(llm_out.get("trace", [])),
+    }
+
+
+def draft(
+    request: TripRequest,
+    seed_activities: List[str],
+    llm_spots: Optional[List[Dict[str, Any]]] = None,
+    spot_table: Optional[SpotTable] = None,
+) -> Dict[str, Any]:
+    """
+    Planner schedules spots into days (or slots seeds, then generic fallbacks) -> days,
+    rows (the spot_table row behind each activity, None for seeds and fallbacks).
+    """
+    spots = spot_table if spot_table is not None and len(spot_table) else llm_spots
+    pr = Planner().run(request, seed_activities=seed_activities, spots=spots)
+    return {"days": pr["days"], "rows": pr.get("rows"), "trace": list(pr.get("trace", []))}
+
+
+def review(
+    request: TripRequest,
+    days: List[DayPlan],
+    llm_spots: Optional[List[Dict[str, Any]]] = None,
+    spot_table: Optional[SpotTable] = None,
+    rows: Optional[List[List[Optional[int]]]] = None,
+) -> Dict[str, Any]:
+    """Critic (near-duplicates across the trip, per-day variety) -> critic_findings, critic_report."""
+    out = Critic().run(days, request, spots=llm_spots, table=spot_table, rows=rows)
+    report = {"issues": out["issues"], "diversity": out["diversity"]}
+    return {"critic_findings": list(out["trace"]), "critic_report": report, "trace": list(out["trace"])}
+
+
+def estimate(
+    request: TripRequest,
+    days: Optional[List[DayPlan]] = None,
+    llm_spots: Optional[List[Dict[str, Any]]] = None,
+    spot_table: Optional[SpotTable] = None,
+    rows: Optional[List[List[Optional[int]]]] = None,
+) -> Dict[str, Any]:
+    """Budget (daily base + priced visits, per-day breakdown) -> total_estimated_cost, currency."""
+    bo = Budget().estimate(days, request, spots=llm_spots, table=spot_table, rows=rows)
+    return {
+        "total_estimated_cost": bo["total_estimated_cost"],
+        "currency": bo.get("currency", "USD"),
+        "budget_breakdown": bo.get("breakdown"),
+        "trace": list(bo.get("trace", [])),
+    }
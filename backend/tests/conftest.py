@@ -0,0 +1,26 @@
+"""Shared fixtures: every test starts from the default Settings with no provider, cache or store."""
+from __future__ import annotations
+from typing import Any, Callable, Iterator
+
+import pytest
+
+from utils import config
+
+
+@pytest.fixture(autouse=True)
+def settings(tmp_path: Any) -> Iterator[Callable[..., config.Settings]]:
+    """Offline defaults for each test; call the fixture with changes to override more."""
+    previous = config.override_settings(
+        config.Settings(),
+        PROVIDER="none",
+        SPOT_CACHE_PATH=str(tmp_path / "spots.sqlite3"),
+        PLAN_STORE_ENABLED=False,
+        PLAN_CACHE_ENABLED=False,
+    )
+
+    def change(**changes: Any) -> config.Settings:
+        config.override_settings(**changes)
+        return config.get_settings()
+
+    yield change
+    config.override_settings(previous)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, Callable, Iterator, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from utils.admission import AdmissionController, Overloaded, plan_admission
+
+REQUEST = {"origin": "Chicago", "destination": "Rome", "start_date": "2026-05-01", "days": 1}
+
+
+def _controller(max_queue: int = 4, timeout: float = 1.0) -> AdmissionController:
+    return AdmissionController("test", 1, max_queue, {"interactive": timeout, "batch": timeout})
+
+
+def test_interactive_waiters_go_before_earlier_batch_ones() -> None:
+    order: List[str] = []
+
+    async def main() -> None:
+        ctl = _controller()
+        release = await ctl.hold()
+
+        async def wait(priority: str) -> None:
+            async with ctl.slot(priority):
+                order.append(priority)
+
+        waiters = [asyncio.ensure_future(wait(p)) for p in ("batch", "batch", "interactive")]
+        await asyncio.sleep(0)
+        assert ctl.queued == 3
+        release()
+        await asyncio.gather(*waiters)
+        assert ctl.inflight == 0 and ctl.queued == 0
+
+    asyncio.run(main())
+    assert order == ["interactive", "batch", "batch"]
+
+
+def test_full_queue_and_queue_timeout_are_refused() -> None:
+    async def main() -> None:
+        ctl = _controller(max_queue=1, timeout=0.05)
+        release = await ctl.hold()
+        waiter = asyncio.ensure_future(ctl.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as full:
+            await ctl.acquire()
+        assert full.value.status == 429 and full.value.reason == "queue_full" and full.value.retry_after >= 1
+        with pytest.raises(Overloaded) as late:
+            await waiter
+        assert late.value.status == 503 and late.value.reason == "queue_timeout"
+        release()
+        assert ctl.inflight == 0 and ctl.queued == 0
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_gives_its_place_back() -> None:
+    async def main() -> None:
+        ctl = _controller()
+        release = await ctl.hold()
+        waiter = asyncio.ensure_future(ctl.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert ctl.queued == 0
+        release()
+        assert ctl.inflight == 0
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def busy(settings: Any) -> Iterator[Callable[..., None]]:
+    """Takes the only plan slot of the worker for the duration of the test."""
+    releases: List[Callable[[], None]] = []
+
+    def occupy(**changes: Any) -> None:
+        settings(ADMISSION_ENABLED=True, ADMISSION_MAX_INFLIGHT=1, **changes)
+        admission = plan_admission()
+        assert admission is not None
+        releases.append(asyncio.run(admission.hold()))
+
+    yield occupy
+    for release in releases:
+        release()
+
+
+@pytest.mark.parametrize("path", ["/plan", "/plan/stream"])
+def test_saturated_worker_answers_429_with_retry_after(busy: Callable[..., None], path: str) -> None:
+    busy(ADMISSION_MAX_QUEUE=0)
+    res = TestClient(app).post(path, json=REQUEST)
+    assert res.status_code == 429 and res.json()["reason"] == "queue_full"
+    assert int(res.headers["Retry-After"]) >= 1
+
+
+def test_queue_timeout_answers_503_with_retry_after(busy: Callable[..., None]) -> None:
+    busy(ADMISSION_MAX_QUEUE=4, ADMISSION_QUEUE_TIMEOUT_S=0.05)
+    res = TestClient(app).post("/plan", json=REQUEST)
+    assert res.status_code == 503 and res.json()["reason"] == "queue_timeout"
+    assert int(res.headers["Retry-After"]) >= 1
+    admission = plan_admission()
+    assert admission is not None and admission.queued == 0
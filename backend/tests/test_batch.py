@@ -0,0 +1,65 @@
+from __future__ import annotations
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from orchestrators import batch
+from orchestrators.batch import plan_batch
+from utils.types import Plan, TripRequest
+
+ITEM = {"origin": "Chicago", "destination": "Rome", "start_date": "2026-05-01", "days": 1}
+
+
+def test_batch_over_the_item_limit_is_refused(settings: Any) -> None:
+    settings(BATCH_MAX_ITEMS=2)
+    res = TestClient(app).post("/plan/batch", json=[ITEM] * 3)
+    assert res.status_code == 413 and "2 items" in res.json()["detail"]
+
+
+def test_invalid_items_become_error_lines() -> None:
+    res = TestClient(app).post("/plan/batch", json=[ITEM, {"origin": "Chicago"}, {**ITEM, "destination": "Paris"}])
+    assert res.status_code == 200 and res.headers["content-type"].startswith("application/x-ndjson")
+    lines = sorted((json.loads(line) for line in res.text.splitlines()), key=lambda r: r["index"])
+    assert [r["index"] for r in lines] == [0, 1, 2]
+    assert lines[0]["plan"]["destination"] == "Rome" and lines[2]["plan"]["destination"] == "Paris"
+    assert lines[1]["error"] == "invalid TripRequest"
+    assert {e["loc"][0] for e in lines[1]["detail"]} >= {"destination", "start_date"}
+
+
+class GatedOrchestrator:
+    """Counts the plans in flight at once; each takes a short sleep."""
+
+    name = "gated"
+    running = 0
+    peak = 0
+
+    def __init__(self, **kwargs: Any) -> None:
+        pass
+
+    async def run(self, request: TripRequest) -> Plan:
+        cls = type(self)
+        cls.running += 1
+        cls.peak = max(cls.peak, cls.running)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            cls.running -= 1
+        return Plan(destination=request.destination, total_estimated_cost=0.0, days=[])
+
+
+def test_plan_batch_bounds_concurrency_and_skips_blank_lines(monkeypatch: Any) -> None:
+    monkeypatch.setattr(batch, "get_orchestrator", lambda name=None, **kw: GatedOrchestrator(**kw))
+    lines = [json.dumps({**ITEM, "destination": f"City {i}"}) for i in range(7)]
+    lines.insert(3, "  ")
+    lines.append("{not json")
+
+    async def main() -> List[Dict[str, Any]]:
+        return [rec async for rec in plan_batch(lines, concurrency=3)]
+
+    records = sorted(asyncio.run(main()), key=lambda r: r["index"])
+    assert len(records) == 8 and GatedOrchestrator.peak == 3
+    assert [r["plan"]["destination"] for r in records[:7]] == [f"City {i}" for i in range(7)]
+    assert records[7]["index"] == 7 and records[7]["error"] == "invalid TripRequest"
@@ -0,0 +1,70 @@
+from __future__ import annotations
+import random
+from typing import Any
+
+import pytest
+
+from agents.budget import BudgetAgent
+from agents.budget_engine import BudgetEngine, np
+from utils.types import DayPlan, TripRequest
+
+SPOTS = [
+    {"title": "Grand Museum", "category": "museum", "est_price": 40},
+    {"title": "Harbour Cruise", "category": "tour", "est_price": 30},
+    {"title": "Old Market", "category": "market", "est_price": 10},
+    {"title": "City Park", "category": "park", "est_price": 0},
+]
+
+
+def _engine(**kwargs: Any) -> BudgetEngine:
+    return BudgetEngine(prices=[40, 30, 10, 0], days=2, people=2, base_per_day=50.0,
+                        values=[1.0, 0.75, 0.5, 0.25], **kwargs)
+
+
+def test_breakdown_costs_each_day() -> None:
+    fit = _engine().breakdown([0, 0, 1, 1], target=None)
+    assert fit.total == 2 * (50 + 40 + 30) + 2 * (50 + 10)
+    assert [d["activities"] for d in fit.per_day] == [140.0, 20.0]
+    assert fit.within_target is None
+
+
+def test_fit_drops_the_least_valuable_paid_visits_first() -> None:
+    fit = _engine().fit([0, 0, 1, 1], target=300.0)
+    assert fit.within_target and fit.total == 300.0
+    assert fit.dropped == [1]  # dropping the cruise keeps the most value within the target
+
+
+def test_cheapest_mode_drops_every_paid_visit() -> None:
+    fit = _engine().fit([0, 0, 1, 1], target=300.0, mode="cheapest")
+    assert fit.total == 200.0 and fit.dropped == [0, 1, 2]
+
+
+@pytest.mark.skipif(np is None, reason="numpy not installed")
+def test_numpy_and_python_paths_agree() -> None:
+    rnd = random.Random(3)
+    for _ in range(50):
+        n, days = rnd.randint(1, 12), rnd.randint(1, 4)
+        prices = [rnd.choice([0, 5, 12.5, 30, 45]) for _ in range(n)]
+        values = [rnd.random() for _ in range(n)]
+        assignment = [rnd.randint(-1, days - 1) for _ in range(n)]
+        target = rnd.uniform(50, 600)
+        fits = [
+            BudgetEngine(prices, days, 2, 40.0, values, use_numpy=use).fit(assignment, target, mode)
+            for mode in ("best", "cheapest") for use in (True, False)
+        ]
+        assert (fits[0].assignment, fits[0].total) == (fits[1].assignment, fits[1].total)
+        assert (fits[2].assignment, fits[2].total) == (fits[3].assignment, fits[3].total)
+
+
+def test_budget_agent_follows_budget_mode(settings: Any) -> None:
+    request = TripRequest(origin="Chicago", destination="Lakeport", start_date="2026-05-01", days=1,
+                          profile={"people": 1, "budget_total": 120})
+    days = [DayPlan(day=1, date="2026-05-01", activities=[s["title"] for s in SPOTS])]
+
+    settings(BUDGET_DAILY_BASE=60.0, BUDGET_MODE="best")
+    best = BudgetAgent().estimate(days, request, SPOTS)["trace"][-1]
+    settings(BUDGET_MODE="cheapest")
+    cheapest = BudgetAgent().estimate(days, request, SPOTS)["trace"][-1]
+
+    assert "dropping 1 visit(s) would bring it to $110.00" in best
+    assert "dropping 3 visit(s) would bring it to $60.00" in cheapest
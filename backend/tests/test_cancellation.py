@@ -0,0 +1,92 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+from starlette.requests import Request
+
+from app.routes.plan import _unless_disconnected
+from utils import microbatch
+from utils.cache import SingleFlight
+from utils.microbatch import CurationBatcher
+
+
+class Work:
+    def __init__(self) -> None:
+        self.cancelled = False
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> List[Dict[str, Any]]:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return []
+
+
+async def _cancel_after(task: "asyncio.Future[Any]", delay: float = 0.02) -> None:
+    await asyncio.sleep(delay)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def test_single_flight_cancels_work_with_its_last_waiter() -> None:
+    async def main() -> Work:
+        flight, work = SingleFlight(), Work()
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await _cancel_after(first)
+        assert not work.cancelled  # the second caller still waits for it
+        await _cancel_after(second, 0.0)
+        await asyncio.sleep(0)
+        return work
+
+    assert asyncio.run(main()).cancelled
+
+
+def test_microbatch_cancels_the_provider_call_once_every_caller_left(settings: Any, monkeypatch: Any) -> None:
+    settings(LLM_MICROBATCH=True, LLM_MICROBATCH_MAX=4, LLM_MICROBATCH_WINDOW_MS=1.0)
+    work = Work()
+    monkeypatch.setattr(microbatch, "ranked_spots_batch_via_llm", work)
+
+    async def main() -> None:
+        batcher = CurationBatcher()
+        callers = [asyncio.ensure_future(batcher.submit(d, ["food"], 3)) for d in ("Lakeport", "Nordby")]
+        await _cancel_after(callers[0])
+        assert not work.cancelled
+        await _cancel_after(callers[1], 0.0)
+        await asyncio.sleep(0)
+        assert not batcher._running
+
+    asyncio.run(main())
+    assert work.cancelled
+
+
+def _request(messages: List[Dict[str, Any]], delay: float) -> Request:
+    async def receive() -> Dict[str, Any]:
+        await asyncio.sleep(delay)
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    return Request({"type": "http", "method": "POST", "headers": []}, receive)
+
+
+def test_disconnect_cancels_the_plan() -> None:
+    work = Work()
+    out = asyncio.run(_unless_disconnected(_request([], 0.02), work()))
+    assert out is None and work.cancelled
+
+
+def test_connected_client_gets_the_plan() -> None:
+    async def plan() -> str:
+        await asyncio.sleep(0.02)
+        return "plan"
+
+    assert asyncio.run(_unless_disconnected(_request([], 5.0), plan())) == "plan"
+
+
+def test_plan_errors_propagate() -> None:
+    async def plan() -> None:
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        asyncio.run(_unless_disconnected(_request([], 5.0), plan()))
@@ -0,0 +1,71 @@
+from __future__ import annotations
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, List
+
+import pytest
+
+from tools import catalogue
+from tools.catalogue import Catalogue, build, get_catalogue
+
+
+def test_query_ranks_by_interests_and_filters(tmp_path: Path) -> None:
+    cat = Catalogue(build(out=tmp_path / "catalogue.bin"))
+    try:
+        assert "paris" in cat and "Atlantis" not in cat
+        editorial = cat.query("Paris", limit=3)
+        assert len(editorial) == 3 and editorial == cat.query("  PARIS ", limit=3)
+        museums = cat.query("Paris", category="museum")
+        assert museums and {s["category"] for s in museums} == {"museum"}
+        assert cat.query("Atlantis") == [] and cat.query("Paris", limit=0) == []
+    finally:
+        cat.close()
+
+
+def test_build_writes_through_a_temp_file_of_its_own(tmp_path: Path, monkeypatch: Any) -> None:
+    names: List[str] = []
+    real = tempfile.NamedTemporaryFile
+
+    def spy(*args: Any, **kwargs: Any) -> Any:
+        f = real(*args, **kwargs)
+        names.append(f.name)
+        return f
+
+    monkeypatch.setattr(tempfile, "NamedTemporaryFile", spy)
+    out = tmp_path / "catalogue.bin"
+    build(out=out)
+    build(out=out)
+    assert len(set(names)) == 2 and all(Path(n).parent == tmp_path for n in names)
+    assert os.listdir(tmp_path) == ["catalogue.bin"]  # renamed into place, nothing left behind
+
+
+def test_failed_build_leaves_no_temp_file(tmp_path: Path, monkeypatch: Any) -> None:
+    def refuse(*args: Any) -> None:
+        raise PermissionError("target is read-only")
+
+    monkeypatch.setattr(os, "replace", refuse)
+    with pytest.raises(PermissionError):
+        build(out=tmp_path / "catalogue.bin")
+    assert os.listdir(tmp_path) == []
+
+
+def test_rebuild_closes_the_previous_catalogue(tmp_path: Path, settings: Any) -> None:
+    settings(CATALOGUE_PATH=str(tmp_path / "catalogue.bin"))
+    previous_state = dict(catalogue._STATE)
+    catalogue._STATE.update(catalogue=None, key=None)
+    try:
+        first = get_catalogue()
+        assert first is not None and first.query("Rome", limit=1)
+        later = time.time() + 5
+        os.utime(tmp_path / "catalogue.bin", (later, later))  # as if another process rebuilt it
+        second = get_catalogue()
+        assert second is not None and second is not first
+        assert first._mm.closed and not second._mm.closed
+        assert second.query("Rome", limit=1)
+    finally:
+        current = catalogue._STATE["catalogue"]
+        if current is not None:
+            current.close()
+        catalogue._STATE.update(previous_state)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set
+
+import pytest
+
+from agents.destination_llm import DestinationLLMAgent
+from utils import curation, llm
+from utils.curation import (
+    canonical_interests, curated_shards, curated_superset, merge_ranked, rank_for_interests, shard_focuses,
+    spots_for_days,
+)
+from utils.router import ROUTER
+
+CATEGORIES = ("landmark", "cafe", "museum", "park")
+
+
+class FakeStream:
+    """Records each provider stream and answers `max_items` spots cycling through CATEGORIES."""
+
+    def __init__(self) -> None:
+        self.calls: List[Dict[str, Any]] = []
+        self.failing: Set[str] = set()
+        self.active = self.peak = 0
+
+    async def __call__(self, destination: str, interests: Optional[Sequence[str]], days: Optional[int],
+                       month: Optional[str] = None, max_items: int = 12, backend: Any = None,
+                       focus: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        self.calls.append({"destination": destination, "interests": list(interests or ()), "focus": focus})
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if focus in self.failing:
+                raise ConnectionError("stream reset")
+            label = focus or "spot"
+            for i in range(max_items):
+                yield {"title": f"{destination} {label} {i}", "category": CATEGORIES[i % len(CATEGORIES)]}
+        finally:
+            self.active -= 1
+
+
+@pytest.fixture
+def stream(settings: Any, monkeypatch: Any) -> FakeStream:
+    settings(PROVIDER="openai", OPENAI_API_KEY="sk-test", LLM_MICROBATCH=False, CURATION_SUPERSET_ITEMS=8)
+    ROUTER.reset()
+    monkeypatch.setitem(curation._INDEX, "index", None)
+    fake = FakeStream()
+    monkeypatch.setattr(llm, "stream_ranked_spots", fake)
+    return fake
+
+
+def test_interest_order_and_case_share_one_superset(stream: FakeStream) -> None:
+    first, info = asyncio.run(curated_superset("Paris", ["art", "Cafes"]))
+    again, again_info = asyncio.run(curated_superset(" paris ", ["cafes", "ART", "art"]))
+    assert len(stream.calls) == 1 and stream.calls[0]["interests"] == ["art", "cafes"]
+    assert info["status"] == "miss" and again_info["status"] == "hit" and again == first
+    assert canonical_interests(["Cafes", " art", "ART"]) == ("art", "cafes")
+
+
+def test_interest_subset_is_ranked_from_the_wider_superset(stream: FakeStream) -> None:
+    wide, _ = asyncio.run(curated_superset("Paris", ["art", "cafes"]))
+    cafes, info = asyncio.run(curated_superset("Paris", ["cafes"]))
+    assert len(stream.calls) == 1
+    assert info == {"status": "derived", "from_interests": "art, cafes"}
+    assert sorted(s["title"] for s in cafes) == sorted(s["title"] for s in wide)
+    assert [s["category"] for s in cafes[:2]] == ["cafe", "cafe"]
+
+
+def test_unrelated_interests_still_call_the_provider(stream: FakeStream) -> None:
+    asyncio.run(curated_superset("Paris", ["art", "cafes"]))
+    _, wider = asyncio.run(curated_superset("Paris", ["art", "cafes", "parks"]))
+    _, other = asyncio.run(curated_superset("Rome", ["cafes"]))
+    assert wider["status"] == other["status"] == "miss" and len(stream.calls) == 3
+
+
+def test_rank_for_interests_keeps_the_superset_order_on_ties() -> None:
+    spots = [{"title": "Old bridge", "category": "landmark"}, {"title": "Bean bar", "category": "cafe"},
+             {"title": "Art house cafe", "category": "cafe"}, {"title": "City museum", "category": "museum"}]
+    ranked = rank_for_interests(spots, ["cafes", "art"])
+    assert [s["title"] for s in ranked] == ["Art house cafe", "Bean bar", "City museum", "Old bridge"]
+    assert rank_for_interests(spots, []) == spots
+
+
+def test_shards_are_added_only_past_the_superset(stream: FakeStream) -> None:
+    assert shard_focuses(["art"], 8) == []
+    assert shard_focuses(["Art"], spots_for_days(10)) == ["art", "galleries and art spaces", "museums and collections"]
+    assert len(shard_focuses(None, 10_000)) == 8  # CURATION_MAX_SHARDS
+
+
+def test_shards_run_concurrently_and_a_failed_one_is_empty(stream: FakeStream, settings: Any) -> None:
+    settings(CURATION_SHARD_CONCURRENCY=2)
+    stream.failing = {"parks"}
+    shards = asyncio.run(curated_shards("Paris", ["art"], ["museums", "parks", "cafes", "views"]))
+    assert [len(s) for s in shards] == [15, 0, 15, 15]
+    assert stream.peak == 2
+
+
+def test_merge_keeps_the_head_then_round_robins_the_shards() -> None:
+    head = [{"title": "The Louvre"}, {"title": "Orsay"}]
+    shards = [[{"title": "Louvre"}, {"title": "Rodin"}], [{"title": "Marais"}]]
+    assert [s["title"] for s in merge_ranked(head, shards)] == ["The Louvre", "Orsay", "Marais", "Rodin"]
+
+
+def test_long_trip_merges_shards_fetched_alongside_the_superset(stream: FakeStream) -> None:
+    spots, info = asyncio.run(DestinationLLMAgent()._curate("Paris", ["art"], 10))
+    assert len(spots) == spots_for_days(10) == 40
+    assert [s["title"] for s in spots[:8]] == [f"Paris spot {i}" for i in range(8)]
+    assert info["shards"] == 3 and info["shard_spots"] == 32
+    assert [c["focus"] for c in stream.calls][1:] == ["art", "galleries and art spaces", "museums and collections"]
+    assert stream.peak == 4  # superset and shards in flight together
@@ -0,0 +1,187 @@
+from __future__ import annotations
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List
+
+import pytest
+
+from agents.destination_llm import DestinationLLMAgent
+from orchestrators import get_orchestrator
+from utils import llm
+from utils.admission import Overloaded, plan_admission
+from utils.deadline import DeadlineExceeded, deadline_scope, planning_reserve, remaining, within
+from utils.plan_cache import cached_plan
+from utils.router import ROUTER
+from utils.types import TripRequest
+
+
+class SlowProvider:
+    """Stands in for the provider stream: answers after `delay` seconds, records cancellations."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self, *args: Any, **kwargs: Any) -> AsyncIterator[Dict[str, Any]]:
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        for i in range(8):
+            yield {"title": f"Harbour spot {i}", "category": "sight", "best_time": "morning"}
+
+
+@pytest.fixture
+def provider(settings: Any, monkeypatch: Any) -> SlowProvider:
+    settings(PROVIDER="openai", OPENAI_API_KEY="sk-test", LLM_MICROBATCH=False, PLAN_DEADLINE_RESERVE_S=0.05)
+    ROUTER.reset()
+    slow = SlowProvider(delay=0.3)
+    monkeypatch.setattr(llm, "stream_ranked_spots", slow)
+    return slow
+
+
+def _request(**changes: Any) -> TripRequest:
+    return TripRequest(**{"origin": "Chicago", "destination": "Lakeport", "start_date": "2026-05-01", "days": 3,
+                          "profile": {"interests": ["food"]}, **changes})
+
+
+def test_scopes_only_tighten() -> None:
+    assert remaining() is None
+    with deadline_scope(10.0):
+        with deadline_scope(60.0):
+            assert remaining() < 10.0
+        with deadline_scope(None):
+            assert remaining() is not None
+    assert remaining() is None
+
+
+def test_planning_reserve_is_clamped(settings: Any) -> None:
+    settings(PLAN_DEADLINE_RESERVE_S=0.5)
+    assert planning_reserve(None) == 0.5
+    assert planning_reserve(10.0) == 0.5
+    assert planning_reserve(0.4) == pytest.approx(0.2)
+    assert planning_reserve(-1.0) == 0.0
+
+
+def test_within_cancels_the_work() -> None:
+    cancelled: List[bool] = []
+
+    async def work() -> None:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main() -> None:
+        with deadline_scope(0.05):
+            with pytest.raises(DeadlineExceeded):
+                await within(work())
+        with pytest.raises(DeadlineExceeded):
+            await within(work(), limit=0.05)  # a caller's own bound, no deadline in context
+        with deadline_scope(0.0):
+            with pytest.raises(DeadlineExceeded):
+                await within(work())  # never started
+
+    asyncio.run(main())
+    assert cancelled == [True, True]
+
+
+def test_deadline_degrades_curation_and_cancels_the_provider(provider: SlowProvider) -> None:
+    async def main() -> Dict[str, Any]:
+        with deadline_scope(0.1):
+            return await DestinationLLMAgent().propose("Lakeport", ["food"], 3)
+
+    out = asyncio.run(main())
+    assert out["spots"] == [] and out["degraded"]["reason"] == "deadline"
+    assert provider.started == 1 and provider.cancelled == 1
+
+
+def test_warm_spot_cache_is_read_past_the_deadline(provider: SlowProvider) -> None:
+    warm = asyncio.run(DestinationLLMAgent().propose("Lakeport", ["food"], 3))
+    assert warm["spots"]
+
+    async def main() -> Dict[str, Any]:
+        with deadline_scope(0.0):  # already out of time: no provider call, but the cache still serves
+            return await DestinationLLMAgent().propose("Lakeport", ["food"], 3)
+
+    out = asyncio.run(main())
+    assert out["spots"] == warm["spots"] and "degraded" not in out
+    assert provider.started == 1
+
+
+class CountingOrchestrator:
+    """Wraps an orchestrator and counts how often it runs."""
+
+    def __init__(self, inner: Any) -> None:
+        self.inner = inner
+        self.name = inner.name
+        self.runs = 0
+
+    async def run(self, request: TripRequest) -> Any:
+        self.runs += 1
+        return await self.inner.run(request)
+
+
+def test_short_caller_does_not_degrade_a_shared_run(provider: SlowProvider, settings: Any) -> None:
+    settings(PLAN_CACHE_ENABLED=True, PLAN_DEADLINE_S=30.0)
+    orch = get_orchestrator("react")
+
+    async def main() -> List[Any]:
+        with deadline_scope(30.0):
+            full = asyncio.ensure_future(cached_plan(_request(), orch))
+            await asyncio.sleep(0.01)
+            short = asyncio.ensure_future(cached_plan(_request(), orch, wait_s=0.1))
+            return list(await asyncio.gather(short, full))
+
+    (short, short_status), (full, full_status) = asyncio.run(main())
+    assert short_status == "fallback" and json.loads(short.body)["metadata"]["degraded"]["reason"] == "deadline"
+    assert full_status == "miss" and "degraded" not in json.loads(full.body)["metadata"]
+    assert provider.started == 1 and provider.cancelled == 0
+
+
+def test_short_leader_degrades_inside_its_own_single_run(provider: SlowProvider, settings: Any) -> None:
+    settings(PLAN_CACHE_ENABLED=True, PLAN_DEADLINE_S=30.0)
+    orch = CountingOrchestrator(get_orchestrator("react"))
+
+    async def main() -> List[Any]:
+        with deadline_scope(30.0):
+            short = asyncio.ensure_future(cached_plan(_request(), orch, wait_s=0.1))
+            await asyncio.sleep(0.01)
+            full = asyncio.ensure_future(cached_plan(_request(), orch))
+            return list(await asyncio.gather(short, full))
+
+    (short, short_status), (full, full_status) = asyncio.run(main())
+    assert short_status == "miss" and json.loads(short.body)["metadata"]["degraded"]["reason"] == "deadline"
+    # the full caller did not join the short run, so it was not cut short
+    assert full_status == "miss" and "degraded" not in json.loads(full.body)["metadata"]
+    # one orchestrator run per caller; the provider fetch itself is still shared and not cancelled
+    assert orch.runs == 2 and provider.started == 1 and provider.cancelled == 0
+
+
+def test_admission_queue_wait_is_bounded_by_the_deadline(settings: Any) -> None:
+    settings(ADMISSION_ENABLED=True, ADMISSION_MAX_INFLIGHT=1, ADMISSION_QUEUE_TIMEOUT_S=10.0)
+    admission = plan_admission()
+    assert admission is not None
+
+    async def main() -> float:
+        release = await admission.hold()
+        t0 = time.monotonic()
+        try:
+            with deadline_scope(0.1):
+                with pytest.raises(Overloaded) as exc:
+                    await admission.acquire()
+            assert exc.value.status == 503 and exc.value.reason == "deadline" and exc.value.retry_after >= 1
+            with deadline_scope(0.0):
+                with pytest.raises(Overloaded):
+                    await admission.acquire()  # already out of time: refused without queueing
+        finally:
+            release()
+        return time.monotonic() - t0
+
+    assert asyncio.run(main()) < 1.0
+    assert admission.inflight == 0 and admission.queued == 0
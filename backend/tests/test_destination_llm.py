@@ -0,0 +1,44 @@
+from __future__ import annotations
+import asyncio
+from typing import Any, Dict, List, Sequence, Tuple
+
+import pytest
+
+from agents.destination_llm import DestinationLLMAgent
+from utils.curation import spots_for_days
+
+
+def _spots(n: int, prefix: str = "Spot") -> List[Dict[str, Any]]:
+    return [{"title": f"{prefix} {i}", "category": "sight", "best_time": "morning"} for i in range(n)]
+
+
+@pytest.fixture
+def llm_calls(settings: Any, monkeypatch: Any) -> List[int]:
+    """A configured provider whose curation answers `days` worth of spots at once."""
+    settings(PROVIDER="openai", OPENAI_API_KEY="sk-test")
+    calls: List[int] = []
+
+    async def curate(self: Any, destination: str, interests: Sequence[str] | None, days: int) -> Tuple[Any, Any]:
+        calls.append(days)
+        return _spots(spots_for_days(days), "LLM spot"), {"status": "miss"}
+
+    monkeypatch.setattr(DestinationLLMAgent, "_curate", curate)
+    return calls
+
+
+def test_short_trip_served_by_catalogue(llm_calls: List[int]) -> None:
+    out = asyncio.run(DestinationLLMAgent().propose("Paris", ["art"], 3))
+    assert out["source"] == "catalogue" and llm_calls == []
+
+
+def test_long_trip_tops_up_the_catalogue(llm_calls: List[int]) -> None:
+    out = asyncio.run(DestinationLLMAgent().propose("Paris", ["art"], 30))
+    titles = [s["title"] for s in out["spots"]]
+    assert llm_calls == [30] and out["source"] == "catalogue+llm"
+    assert len(titles) == spots_for_days(30)
+    assert not titles[0].startswith("LLM spot")  # catalogue spots keep the lead
+
+
+def test_long_trip_without_provider_keeps_the_catalogue() -> None:
+    out = asyncio.run(DestinationLLMAgent().propose("Paris", ["art"], 30))
+    assert out["source"] == "catalogue" and 0 < len(out["spots"]) < spots_for_days(30)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+import asyncio
+import dataclasses
+from typing import Any, Callable, Dict
+
+import pytest
+
+from orchestrators import get_orchestrator, stages
+from orchestrators.graph import GraphOrchestrator, Node, default_nodes, topo_order
+from utils.types import TripRequest
+
+REQUEST = TripRequest(origin="Chicago", destination="Rome", start_date="2026-05-01", days=3,
+                      profile={"people": 2, "budget_total": 1500, "interests": ["history"]})
+
+
+def _node(name: str, inputs: tuple[str, ...], outputs: tuple[str, ...]) -> Node:
+    return Node(name, inputs, outputs, fn=lambda **kw: {k: None for k in outputs})
+
+
+def test_topo_order_follows_declared_keys() -> None:
+    nodes = [_node("c", ("b",), ("c",)), _node("a", ("request",), ("a",)), _node("b", ("a",), ("b",))]
+    assert [n.name for n in topo_order(nodes)] == ["a", "b", "c"]
+    assert [n.name for n in topo_order(default_nodes())] == ["curate", "draft", "review", "estimate"]
+
+
+@pytest.mark.parametrize("nodes, message", [
+    ([_node("a", ("request",), ("x",)), _node("b", ("request",), ("x",))], "produced by both"),
+    ([_node("a", ("missing",), ("x",))], "unknown state key"),
+    ([_node("a", ("y",), ("x",)), _node("b", ("x",), ("y",))], "cycle"),
+])
+def test_topo_order_rejects_broken_graphs(nodes: Any, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        topo_order(nodes)
+
+
+def _slow(fn: Callable[..., Dict[str, Any]]) -> Callable[..., Any]:
+    async def run(**kwargs: Any) -> Dict[str, Any]:
+        await asyncio.sleep(0.1)
+        return fn(**kwargs)
+    return run
+
+
+def test_critic_and_budget_run_concurrently() -> None:
+    nodes = [dataclasses.replace(n, fn=_slow(n.fn)) if n.name in ("review", "estimate") else n
+             for n in default_nodes()]
+    plan = asyncio.run(GraphOrchestrator(nodes=nodes).run(REQUEST))
+    t = plan.metadata["graph_timings"]
+    assert t["review"]["start_ms"] < t["estimate"]["end_ms"] and t["estimate"]["start_ms"] < t["review"]["end_ms"]
+    assert t["draft"]["end_ms"] <= min(t["review"]["start_ms"], t["estimate"]["start_ms"])
+
+
+def test_graph_plans_like_the_react_loop() -> None:
+    graph = asyncio.run(get_orchestrator("graph").run(REQUEST))
+    react = asyncio.run(get_orchestrator("react").run(REQUEST))
+    assert [d.activities for d in graph.days] == [d.activities for d in react.days]
+    assert graph.total_estimated_cost == react.total_estimated_cost
+    assert graph.metadata["critic"] == react.metadata["critic"]
+
+
+def test_stream_events_follow_completion() -> None:
+    async def main() -> list[str]:
+        return [ev.event async for ev in get_orchestrator("graph").stream(REQUEST)]
+
+    events = asyncio.run(main())
+    assert events[:4] == ["spots", "day", "day", "day"] and events[-1] == "plan"
+    assert sorted(events[4:6]) == ["budget", "critic"]
+
+
+def test_failing_node_stops_the_plan(monkeypatch: Any) -> None:
+    def estimate(**kwargs: Any) -> None:
+        raise RuntimeError("no prices")
+
+    monkeypatch.setattr(stages, "estimate", estimate)
+    with pytest.raises(RuntimeError, match="no prices"):
+        asyncio.run(GraphOrchestrator().run(REQUEST))
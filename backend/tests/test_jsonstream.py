@@ -0,0 +1,38 @@
+from __future__ import annotations
+import json
+from typing import Any, Dict, List
+
+from utils.jsonstream import JsonArrayStream, parse_json_objects
+
+SPOTS = [
+    {"title": "Musée d'Orsay", "reason_short": "Impressionists {and} more [sic]"},
+    {"title": "Say \"cheese\" bar", "tags": ["food", {"nested": True}]},
+    {"title": "Canal walk"},
+]
+TEXT = "Sure! Here are [3] picks:\n```json\n" + json.dumps(SPOTS, ensure_ascii=False) + "\n```\nEnjoy [your trip]."
+
+
+def _feed_by(size: int, text: str = TEXT) -> List[List[Dict[str, Any]]]:
+    parser = JsonArrayStream()
+    return [parser.feed(text[i:i + size]) for i in range(0, len(text), size)]
+
+
+def test_objects_arrive_as_soon_as_they_close_whatever_the_chunking() -> None:
+    for size in (1, 2, 7, 64, len(TEXT)):
+        batches = _feed_by(size)
+        assert [o for batch in batches for o in batch] == SPOTS, size
+    one_char = _feed_by(1)
+    first = next(i for i, batch in enumerate(one_char) if batch)
+    assert one_char[first] == [SPOTS[0]] and TEXT[first] == "}"  # emitted on its closing brace
+
+
+def test_prose_brackets_and_bad_elements_are_skipped() -> None:
+    text = 'See [note] then [{"title": "A"}, {"title": broken}, "x", {"title": "B"}] and [{"title": "C"}]'
+    assert parse_json_objects([text]) == [{"title": "A"}, {"title": "B"}]  # only the first array
+
+
+def test_stops_after_the_array_closes() -> None:
+    parser = JsonArrayStream()
+    assert parser.feed('[{"a": 1}]') == [{"a": 1}] and parser.done
+    assert parser.feed('[{"b": 2}]') == []
+    assert parse_json_objects(["no array here", "[]"]) == []
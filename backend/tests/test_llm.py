@@ -0,0 +1,83 @@
+from __future__ import annotations
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Dict, List
+
+import pytest
+
+from utils import llm
+from utils.cache import cached_ranked_spots, get_spot_cache, spot_cache_key
+from utils.router import ROUTER
+
+
+@pytest.fixture(autouse=True)
+def one_provider(settings: Any) -> None:
+    settings(PROVIDER="openai", OPENAI_API_KEY="sk-test", LLM_MICROBATCH=False)
+    ROUTER.reset()
+
+
+def _spot(title: str) -> Dict[str, Any]:
+    return {"title": title, "category": "sight"}
+
+
+def test_stream_that_dies_half_way_is_not_cached(monkeypatch: Any) -> None:
+    async def broken(*args: Any, **kwargs: Any) -> AsyncIterator[Dict[str, Any]]:
+        yield _spot("Harbour walk")
+        yield _spot("Old market")
+        raise ConnectionError("stream reset")
+
+    monkeypatch.setattr(llm, "stream_ranked_spots", broken)
+    spots, info = asyncio.run(cached_ranked_spots("Lakeport", ["food"], 3))
+    assert spots == [] and info["status"] == "miss"
+    assert len(get_spot_cache()) == 0
+
+
+def test_complete_stream_is_cached(monkeypatch: Any) -> None:
+    async def whole(*args: Any, **kwargs: Any) -> AsyncIterator[Dict[str, Any]]:
+        for title in ("Harbour walk", "Old market"):
+            yield _spot(title)
+
+    monkeypatch.setattr(llm, "stream_ranked_spots", whole)
+    spots, _ = asyncio.run(cached_ranked_spots("Lakeport", ["food"], 3))
+    assert [s["title"] for s in spots] == ["Harbour walk", "Old market"]
+    _, info = asyncio.run(cached_ranked_spots("Lakeport", ["food"], 3))
+    assert info["status"] == "hit"
+
+
+def test_spot_cache_io_runs_off_the_event_loop(monkeypatch: Any) -> None:
+    async def whole(*args: Any, **kwargs: Any) -> AsyncIterator[Dict[str, Any]]:
+        yield _spot("Harbour walk")
+
+    monkeypatch.setattr(llm, "stream_ranked_spots", whole)
+    cache = get_spot_cache()
+    threads: Dict[str, int] = {}
+    for name in ("get", "put"):
+        def record(*args: Any, _name: str = name, _real: Any = getattr(cache, name)) -> Any:
+            threads[_name] = threading.get_ident()
+            return _real(*args)
+        monkeypatch.setattr(cache, name, record)
+
+    asyncio.run(cached_ranked_spots("Lakeport", ["food"], 3))
+    assert set(threads) == {"get", "put"} and threading.get_ident() not in threads.values()
+
+
+def test_failover_answer_is_cached_under_the_provider_that_gave_it(settings: Any, monkeypatch: Any) -> None:
+    s = settings(LLM_HEDGE=True, OLLAMA_HOST="http://127.0.0.1:11434")
+    calls: List[str] = []
+
+    async def primary_down(*args: Any, backend: Any, **kwargs: Any) -> AsyncIterator[Dict[str, Any]]:
+        calls.append(backend[0])
+        if backend[0] == "openai":
+            raise ConnectionError("primary down")
+        yield _spot("Harbour walk")
+
+    monkeypatch.setattr(llm, "stream_ranked_spots", primary_down)
+    spots, _ = asyncio.run(cached_ranked_spots("Lakeport", ["food"], 3))
+    assert [sp["title"] for sp in spots] == ["Harbour walk"] and calls == ["openai", "ollama"]
+
+    def key(provider: str, model: str) -> str:
+        return spot_cache_key("Lakeport", ["food"], 3, None, provider, model, s.LLM_TEMPERATURE, 12)
+
+    cache = get_spot_cache()
+    assert cache.get(key("openai", s.OPENAI_MODEL)) is None
+    assert cache.get(key("ollama", s.OLLAMA_MODEL)) == spots
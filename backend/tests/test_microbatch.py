@@ -0,0 +1,87 @@
+from __future__ import annotations
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List
+
+import pytest
+
+from utils import llm
+from utils.microbatch import CurationBatcher
+from utils.router import ROUTER
+
+
+def _spots(place: str, n: int = 3) -> List[Dict[str, Any]]:
+    return [{"title": f"{place} spot {i}", "category": "sight", "best_time": "morning"} for i in range(n)]
+
+
+class FakeProvider:
+    """Answers batched prompts with a JSON object (leaving out `missing`) and single prompts by streaming."""
+
+    def __init__(self, missing: str) -> None:
+        self.missing = missing
+        self.batch_calls: List[str] = []
+        self.single_calls: List[str] = []
+
+    async def call(self, system: str, user: str, **kwargs: Any) -> str:
+        self.batch_calls.append(user)
+        places = [p for p in ("Lakeport", "Nordby", "Eastwick") if p in user and p != self.missing]
+        return json.dumps({p.upper(): _spots(p) for p in places})  # labels match case-insensitively
+
+    async def stream(self, destination: str, *args: Any, **kwargs: Any) -> AsyncIterator[Dict[str, Any]]:
+        self.single_calls.append(destination)
+        for spot in _spots(destination, 2):
+            yield spot
+
+
+@pytest.fixture
+def provider(settings: Any, monkeypatch: Any) -> FakeProvider:
+    settings(PROVIDER="openai", OPENAI_API_KEY="sk-test", LLM_MICROBATCH=True, LLM_MICROBATCH_MAX=4,
+             LLM_MICROBATCH_WINDOW_MS=20.0)
+    ROUTER.reset()
+    fake = FakeProvider(missing="Eastwick")
+    monkeypatch.setattr(llm, "_call_llm", fake.call)
+    monkeypatch.setattr(llm, "stream_ranked_spots", fake.stream)
+    return fake
+
+
+def test_concurrent_requests_share_one_call_and_missing_entries_fall_back(provider: FakeProvider) -> None:
+    async def main() -> List[Any]:
+        batcher = CurationBatcher()
+        places = ("Lakeport", "Nordby", "Eastwick")
+        return list(await asyncio.gather(*(batcher.submit(d, ["food"], 3) for d in places)))
+
+    (lake, lake_by), (nord, nord_by), (east, east_by) = asyncio.run(main())
+    assert len(provider.batch_calls) == 1 and provider.single_calls == ["Eastwick"]
+    assert [s["title"] for s in lake] == [f"Lakeport spot {i}" for i in range(3)]
+    assert [s["title"] for s in nord] == [f"Nordby spot {i}" for i in range(3)]
+    assert [s["title"] for s in east] == ["Eastwick spot 0", "Eastwick spot 1"]
+    assert lake_by is not None and lake_by[0] == nord_by[0] == east_by[0] == "openai"
+
+
+def test_lone_request_makes_a_single_call(provider: FakeProvider) -> None:
+    spots, by = asyncio.run(CurationBatcher().submit("Lakeport", ["food"], 3))
+    assert provider.batch_calls == [] and provider.single_calls == ["Lakeport"]
+    assert len(spots) == 2 and by is not None
+
+
+def test_full_batch_flushes_without_waiting_for_the_window(provider: FakeProvider, settings: Any) -> None:
+    settings(LLM_MICROBATCH_MAX=2, LLM_MICROBATCH_WINDOW_MS=10_000.0)
+
+    async def main() -> List[Any]:
+        batcher = CurationBatcher()
+        work = asyncio.gather(*(batcher.submit(d, None, 3) for d in ("Lakeport", "Nordby")))
+        return list(await asyncio.wait_for(work, 2.0))
+
+    answers = asyncio.run(main())
+    assert len(provider.batch_calls) == 1 and all(spots for spots, _ in answers)
+
+
+def test_repeated_destination_starts_a_new_batch(provider: FakeProvider) -> None:
+    async def main() -> List[Any]:
+        batcher = CurationBatcher()
+        return list(await asyncio.gather(*(batcher.submit(d, ["food"], 3) for d in ("Lakeport", " lakeport "))))
+
+    answers = asyncio.run(main())
+    # one label per destination in a prompt: each lands alone in its batch and goes out as a single call
+    assert provider.batch_calls == [] and provider.single_calls == ["Lakeport", "lakeport"]
+    assert all(spots for spots, _ in answers)
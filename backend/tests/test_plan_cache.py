@@ -0,0 +1,105 @@
+from __future__ import annotations
+import asyncio
+import time
+from typing import Any, List, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from utils.config import get_settings
+from utils.plan_cache import (
+    CachedPlan, PlanCache, cached_plan, etag_for, etag_matches, etag_variant, get_plan_cache, plan_cache_key,
+)
+from utils.types import Plan, TripRequest
+
+REQUEST = TripRequest(origin="Chicago", destination="Paris", start_date="2026-05-01", days=2,
+                      profile={"people": 2, "interests": ["art", "cafes"]})
+
+
+def test_key_ignores_secrets_and_serving_settings(settings: Any) -> None:
+    key = plan_cache_key(REQUEST, "react", get_settings())
+    for changes in ({"PLAN_STORE_API_TOKEN": "t0ken"}, {"PLAN_STORE_API": True, "PLAN_STORE_DIR": "/elsewhere"},
+                    {"ADMISSION_MAX_INFLIGHT": 1}, {"PLAN_CACHE_TTL_S": 5.0}, {"RESPONSE_COMPRESSION": False}):
+        assert plan_cache_key(REQUEST, "react", settings(**changes)) == key, changes
+
+
+def test_key_follows_settings_that_shape_the_plan(settings: Any) -> None:
+    key = plan_cache_key(REQUEST, "react", get_settings())
+    assert plan_cache_key(REQUEST, "graph", get_settings()) != key
+    assert plan_cache_key(REQUEST, "react", settings(BUDGET_MODE="cheapest")) != key
+    same = TripRequest(origin=" chicago", destination="PARIS ", start_date="2026-05-01", days=2,
+                       profile={"people": 2, "interests": ["Cafes", "art"]})
+    assert plan_cache_key(same, "react", settings(BUDGET_MODE="best")) == key
+
+
+def _entry(size: int, created: Optional[float] = None) -> CachedPlan:
+    body = b"x" * (size - 256)  # CachedPlan.size counts 256 bytes of bookkeeping per entry
+    return CachedPlan(body, etag_for(body), time.time() if created is None else created)
+
+
+def test_cache_evicts_least_recently_used_within_its_byte_budget() -> None:
+    cache = PlanCache(max_bytes=8 * 1000, ttl_s=60.0)
+    for key in "abcdefgh":
+        assert cache.put(key, _entry(1000))
+    assert cache.get("a") is not None  # a is now the most recently used
+    assert cache.put("i", _entry(1000)) and cache.put("j", _entry(1000))
+    assert cache.get("b") is None and cache.get("c") is None and cache.get("a") is not None
+    snap = cache.snapshot()
+    assert snap["evictions"] == 2 and snap["entries"] == 8 and snap["bytes"] == 8000 == cache.max_bytes
+
+
+def test_cache_refuses_oversize_bodies_and_expires_old_ones() -> None:
+    cache = PlanCache(max_bytes=8 * 1000, ttl_s=60.0)
+    assert not cache.put("big", _entry(1001)) and cache.snapshot()["oversize"] == 1
+    cache.put("old", _entry(500, created=time.time() - 61.0))
+    assert cache.get("old") is None and cache.snapshot()["expired"] == 1 and cache.bytes == 0
+
+
+def test_etag_matching() -> None:
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag) and etag_matches('W/"abc"', etag) and etag_matches("*", etag)
+    assert etag_matches('"zzz", "abc"', etag)
+    assert not etag_matches('"abc-gzip"', etag) and not etag_matches(None, etag)
+    assert etag_variant(etag, "gzip") == '"abc-gzip"'
+
+
+@pytest.fixture
+def plan_cache(settings: Any) -> PlanCache:
+    settings(PLAN_CACHE_ENABLED=True)
+    cache = get_plan_cache()
+    assert cache is not None
+    cache.clear()
+    return cache
+
+
+def test_repeat_request_is_served_from_the_cache_and_revalidates(plan_cache: PlanCache) -> None:
+    client = TestClient(app, headers={"Accept-Encoding": "identity"})
+    body = {**REQUEST.model_dump(), "destination": " ROME "}
+    first = client.post("/plan", json=body)
+    assert first.status_code == 200 and first.headers["X-Plan-Cache"] == "miss"
+    again = client.post("/plan", json={**body, "destination": "rome"})  # same canonical request
+    assert again.headers["X-Plan-Cache"] == "hit" and again.content == first.content
+    assert again.headers["ETag"] == first.headers["ETag"] == etag_for(first.content)
+    fresh = client.post("/plan", json=body, headers={"If-None-Match": first.headers["ETag"]})
+    assert fresh.status_code == 304 and fresh.content == b"" and fresh.headers["ETag"] == first.headers["ETag"]
+    assert client.post("/plan", json=body, headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_identical_concurrent_requests_share_one_run(plan_cache: PlanCache) -> None:
+    runs: List[str] = []
+
+    class Slow:
+        name = "react"
+
+        async def run(self, request: TripRequest) -> Plan:
+            runs.append(request.destination)
+            await asyncio.sleep(0.05)
+            return Plan(destination=request.destination, total_estimated_cost=0.0, days=[])
+
+    async def main() -> List[Any]:
+        return list(await asyncio.gather(*(cached_plan(REQUEST, Slow()) for _ in range(3))))
+
+    results = asyncio.run(main())
+    assert runs == ["Paris"] and sorted(status for _, status in results) == ["coalesced", "coalesced", "miss"]
+    assert len({entry.body for entry, _ in results}) == 1
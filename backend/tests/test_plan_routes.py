@@ -0,0 +1,72 @@
+from __future__ import annotations
+import asyncio
+import json
+from typing import Any, Dict, List
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from orchestrators import get_orchestrator, stages
+from utils.admission import plan_admission
+from utils.types import Plan, TripRequest
+
+REQUEST = {"origin": "Chicago", "destination": "Paris", "start_date": "2026-05-01", "days": 2,
+           "profile": {"people": 2, "interests": ["art"]}}
+
+
+def _events(text: str) -> List[Dict[str, Any]]:
+    out = []
+    for block in text.strip().split("\n\n"):
+        name, data = block.split("\n", 1)
+        out.append({"event": name.removeprefix("event: "), **json.loads(data.removeprefix("data: "))})
+    return out
+
+
+def test_plan_body_leaves_out_llm_spots() -> None:
+    res = TestClient(app).post("/plan", json=REQUEST)
+    assert res.status_code == 200
+    metadata = res.json()["metadata"]
+    assert metadata["spot_source"] == "catalogue" and "llm_spots" not in metadata
+
+
+def test_stream_sends_spots_once() -> None:
+    res = TestClient(app).post("/plan/stream", json=REQUEST)
+    events = {ev["event"]: ev for ev in _events(res.text)}
+    assert events["spots"]["data"]["count"] == len(events["spots"]["data"]["spots"]) > 0
+    assert "llm_spots" not in events["plan"]["data"]["metadata"]
+
+
+def test_run_returns_the_streamed_plan_without_a_round_trip(monkeypatch: Any) -> None:
+    def no_revalidation(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError("the finished Plan was dumped and validated again")
+
+    monkeypatch.setattr(Plan, "model_validate", no_revalidation)
+    for name in ("react", "graph"):
+        plan = asyncio.run(get_orchestrator(name).run(TripRequest(**REQUEST)))
+        assert isinstance(plan, Plan) and len(plan.days) == 2 and plan.metadata["llm_spots"]
+
+
+def test_stream_plan_event_carries_the_plan_body() -> None:
+    res = TestClient(app).post("/plan/stream", json=REQUEST)
+    plan = [ev for ev in _events(res.text) if ev["event"] == "plan"][0]
+    assert plan["trace"] == [] and set(plan["data"]) == set(Plan.model_fields)
+    assert len(plan["data"]["days"]) == 2
+
+
+def test_stream_sends_one_event_per_stage_in_order() -> None:
+    res = TestClient(app).post("/plan/stream", json=REQUEST)
+    assert res.status_code == 200 and res.headers["content-type"].startswith("text/event-stream")
+    assert [ev["event"] for ev in _events(res.text)] == ["spots", "day", "day", "critic", "budget", "plan"]
+
+
+def test_stream_failure_ends_with_an_error_event(monkeypatch: Any) -> None:
+    def review(*args: Any) -> None:
+        raise RuntimeError("critic unavailable")
+
+    monkeypatch.setattr(stages, "review", review)
+    res = TestClient(app).post("/plan/stream", json=REQUEST)
+    events = _events(res.text)
+    assert res.status_code == 200 and [ev["event"] for ev in events] == ["spots", "day", "day", "error"]
+    assert events[-1]["data"] == {"detail": "critic unavailable"}
+    admission = plan_admission()
+    assert admission is not None and admission.inflight == 0  # the slot went back with the error
@@ -0,0 +1,83 @@
+from __future__ import annotations
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from utils import plan_store
+from utils.plan_store import close_plan_store, get_plan_store, record_plan
+from utils.types import Plan, TripRequest
+
+
+@pytest.fixture
+def store(settings: Any, tmp_path: Any) -> Any:
+    settings(PLAN_STORE_ENABLED=True, PLAN_STORE_DIR=str(tmp_path / "plans"), PLAN_STORE_FLUSH_MS=1.0)
+    yield
+    close_plan_store()
+
+
+def _plan() -> Plan:
+    return Plan(destination="Lakeport", total_estimated_cost=0.0, days=[])
+
+
+def _request() -> TripRequest:
+    return TripRequest(origin="Chicago", destination="Lakeport", start_date="2026-05-01", days=1)
+
+
+def test_record_plan_never_opens_the_store_itself(store: None) -> None:
+    assert record_plan(_request(), _plan()) is False  # not open yet: dropped, opened off the caller
+    plan_store._OPENER["thread"].join(5.0)
+    assert record_plan(_request(), _plan()) is True
+
+
+def test_read_api_is_off_by_default(store: None) -> None:
+    get_plan_store()
+    assert TestClient(app).get("/plans").status_code == 404
+
+
+def test_read_api_token(store: None, settings: Any) -> None:
+    settings(PLAN_STORE_API=True, PLAN_STORE_API_TOKEN="s3cret")
+    get_plan_store()
+    client = TestClient(app)
+    assert client.get("/plans").status_code == 401
+    assert client.get("/plans", headers={"Authorization": "Bearer nope"}).status_code == 401
+    ok = client.get("/plans", headers={"Authorization": "Bearer s3cret"})
+    assert ok.status_code == 200 and ok.json() == []
+
+
+
+class RotatingReader:
+    """A segment reader during whose time-range read the writer appends a newer plan and rotates."""
+
+    def __init__(self, store: plan_store.PlanStore, db: Any, row: Any) -> None:
+        self.store, self.db, self.row = store, db, row
+
+    def execute(self, sql: str, *args: Any) -> Any:
+        cur = self.db.execute(sql, *args)
+        if "MIN(ts)" in sql and self.row is not None:
+            rng = cur.fetchone()
+            self.store.append_many([self.row])
+            with self.store._lock:
+                self.store._rotate()
+            self.row = None
+            return self.db.execute("SELECT ?, ?", rng)
+        return cur
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def test_range_of_a_segment_rotated_during_a_query_is_not_kept(tmp_path: Any) -> None:
+    store = plan_store.PlanStore(str(tmp_path / "plans"), segment_bytes=1 << 20)
+    try:
+        store.append_many([plan_store.PendingPlan(_request(), _plan(), ts=100.0).row()])
+        late = plan_store.PendingPlan(_request(), _plan(), ts=200.0).row()
+        reader = store._reader
+        store._reader = lambda seg: RotatingReader(store, reader(seg), late)  # type: ignore[method-assign]
+        assert store.query(since=150.0) == []  # the late plan landed after this query read the range
+        store._reader = reader  # type: ignore[method-assign]
+        assert [p.ts for p in store.query(since=150.0)] == [200.0]
+        assert store.snapshot()["active"] == 2
+    finally:
+        store.close()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, AsyncIterator, List
+
+import pytest
+
+from evaluations.cassette import Cassette, CassetteMiss
+from evaluations.harness import recording_header, run_suite
+from evaluations.scenarios import generate, parse_scenarios
+from utils import llm
+from utils.router import ROUTER
+
+HEADER = {"provider": "openai", "model": "gpt-4o-mini", "temperature": 0.35}
+SUITE = [
+    {"id": "a", "request": {"origin": "Chicago", "destination": "Lakeport", "start_date": "2026-05-01", "days": 2}},
+    {"id": "b", "request": {"origin": "Berlin", "destination": "Nordby", "start_date": "2026-06-01", "days": 3,
+                            "profile": {"people": 2, "budget_total": 900.0, "interests": ["food"]}}},
+]
+
+
+async def _deltas(text: str, size: int = 5) -> AsyncIterator[str]:
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+
+def test_recorded_answers_replay_without_calling_the_provider(tmp_path: Path) -> None:
+    calls: List[str] = []
+
+    async def provider() -> str:
+        calls.append("called")
+        return "answer"
+
+    async def main() -> None:
+        rec = Cassette(tmp_path / "c.jsonl", mode="record", header=HEADER)
+        assert await rec.call("openai", "gpt-4o-mini", 0.35, "sys", "user", provider) == "answer"
+        assert await rec.call("openai", "gpt-4o-mini", 0.35, "sys", "user", provider) == "answer"
+        assert calls == ["called"] and rec.stats == {"hits": 1, "misses": 0, "recorded": 1}
+        rec.save()
+
+        play = Cassette(tmp_path / "c.jsonl")
+        assert play.header["model"] == "gpt-4o-mini" and len(play) == 1
+        assert await play.call("openai", "gpt-4o-mini", 0.35, "sys", "user", provider) == "answer"
+        with pytest.raises(CassetteMiss):
+            await play.call("openai", "gpt-4o-mini", 0.35, "sys", "other prompt", provider)
+        assert calls == ["called"] and play.stats["misses"] == 1
+
+    asyncio.run(main())
+
+
+def test_a_stream_closed_early_replays_up_to_the_same_point(tmp_path: Path) -> None:
+    async def read(gen: Any, n: int) -> str:
+        out = []
+        async for delta in gen:
+            out.append(delta)
+            if len(out) == n:
+                break
+        await gen.aclose()
+        return "".join(out)
+
+    async def main() -> None:
+        rec = Cassette(tmp_path / "c.jsonl", mode="record", header=HEADER)
+        seen = await read(rec.stream("openai", "m", 0.3, "sys", "user", _deltas("[1, 2, 3, 4, 5, 6]")), 2)
+        assert seen == "[1, 2, 3, " and rec.new[0]["complete"] is False
+        rec.save()
+        play = Cassette(tmp_path / "c.jsonl")
+        assert await read(play.stream("openai", "m", 0.3, "sys", "user", _deltas("unused")), 100) == seen
+
+    asyncio.run(main())
+
+
+def test_unsupported_cassette_versions_and_modes_are_refused(tmp_path: Path) -> None:
+    path = tmp_path / "old.jsonl"
+    path.write_text(json.dumps({"cassette": 99}) + "\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="version"):
+        Cassette(path)
+    with pytest.raises(ValueError, match="mode"):
+        Cassette(path, mode="live")
+
+
+def test_generated_suites_are_reproducible() -> None:
+    a, b = generate(20, seed=3), generate(20, seed=3)
+    assert [s.to_dict() for s in a] == [s.to_dict() for s in b] != [s.to_dict() for s in generate(20, seed=4)]
+    lines = [json.dumps(s.to_dict()) for s in a]
+    assert [s.to_dict() for s in parse_scenarios(lines)] == [s.to_dict() for s in a]
+    with pytest.raises(ValueError, match="unique"):
+        parse_scenarios(lines[:1] * 2)
+
+
+def test_suite_recorded_once_replays_offline_with_the_same_results(
+    tmp_path: Path, settings: Any, monkeypatch: Any
+) -> None:
+    def spots(user: str) -> str:
+        place = "Lakeport" if "Lakeport" in user else "Nordby"
+        return json.dumps([{"title": f"{place} stop {i}", "category": "sight", "neighborhood": "Centre",
+                            "best_time": "morning", "duration_hours": 2, "est_price": 10} for i in range(12)])
+
+    async def stream(system: str, user: str, *args: Any) -> AsyncIterator[str]:
+        async for delta in _deltas(spots(user), 40):
+            yield delta
+
+    async def call(system: str, user: str, *args: Any) -> str:
+        return spots(user)
+
+    settings(PROVIDER="openai", OPENAI_API_KEY="sk-test")
+    ROUTER.reset()
+    monkeypatch.setattr(llm, "_openai_chat_stream", stream)
+    monkeypatch.setattr(llm, "_openai_chat", call)
+    scenarios = parse_scenarios(json.dumps(s) for s in SUITE)
+    path = tmp_path / "suite.jsonl"
+
+    recorded = run_suite(scenarios, Cassette(path, "record", header=recording_header(False)), "record",
+                         progress=False)
+
+    async def offline(*args: Any) -> Any:
+        raise AssertionError("replay must not reach the provider")
+        yield ""  # pragma: no cover
+
+    monkeypatch.setattr(llm, "_openai_chat_stream", offline)
+    monkeypatch.setattr(llm, "_openai_chat", offline)
+    ROUTER.reset()
+    replayed = run_suite(scenarios, Cassette(path), "replay", progress=False)
+
+    assert [r["error"] for r in recorded + replayed] == [None] * 4
+    assert sum(r["cassette"]["recorded"] for r in recorded) > 0 and recorded[0]["spot_source"] is not None
+    assert all(r["cassette"]["misses"] == 0 and r["cassette"]["hits"] > 0 for r in replayed)
+    assert [(r["spot_source"], r["rubrics"]) for r in replayed] == [(r["spot_source"], r["rubrics"]) for r in recorded]
@@ -0,0 +1,56 @@
+from __future__ import annotations
+import asyncio
+import time
+from typing import Any, Tuple
+
+from utils import router as router_mod
+from utils.admission import AdmissionController
+from utils.config import get_settings
+from utils.router import ProviderRouter
+
+BACKEND = ("openai", {"model": "test"})
+
+
+def _open_breaker(router: ProviderRouter) -> None:
+    """Trip the breaker, then let its cooldown pass so the next call is the half-open probe."""
+    s = get_settings()
+    for _ in range(max(s.LLM_BREAKER_FAILURES, 1)):
+        router.record(BACKEND, False, 0.1, s)
+    router.stats(BACKEND).open_until = time.monotonic() - 1.0
+    assert router.stats(BACKEND).state(time.monotonic()) == "half_open"
+
+
+async def _ok(backend: Any, hedge: bool) -> Tuple[Any, bool]:
+    return ["spot"], True
+
+
+def test_shed_half_open_probe_frees_the_probe(monkeypatch: Any) -> None:
+    router = ProviderRouter()
+    _open_breaker(router)
+    full = AdmissionController("provider:openai", 1, 0, {})
+    full.inflight = 1  # saturated, no queue: the next acquire is refused
+    monkeypatch.setattr(router_mod, "provider_admission", lambda provider: full)
+
+    result, winner = asyncio.run(router.hedged([BACKEND], _ok, get_settings()))
+    assert (result, winner) == (None, None)
+    assert not router.stats(BACKEND).probing
+
+    # admission frees up: the next probe goes through and closes the breaker
+    monkeypatch.setattr(router_mod, "provider_admission", lambda provider: None)
+    result, winner = asyncio.run(router.hedged([BACKEND], _ok, get_settings()))
+    assert winner == BACKEND and result == ["spot"]
+    assert router.stats(BACKEND).state(time.monotonic()) == "closed"
+
+
+def test_admission_wait_is_not_provider_latency(monkeypatch: Any) -> None:
+    router = ProviderRouter()
+    slots = AdmissionController("provider:openai", 1, 4, {"interactive": 5.0})
+    monkeypatch.setattr(router_mod, "provider_admission", lambda provider: slots)
+
+    async def main() -> None:
+        await slots.acquire()
+        asyncio.get_running_loop().call_later(0.2, slots.release)  # queued for 0.2s first
+        await router._timed(BACKEND, _ok, False, get_settings())
+
+    asyncio.run(main())
+    assert list(router.stats(BACKEND).latencies) < [0.1]
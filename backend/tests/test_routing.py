@@ -0,0 +1,88 @@
+from __future__ import annotations
+import random
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from agents.routing import DETOUR, Router, distance_matrix, route_schedule, travel_minutes
+from agents.scheduler import DaySchedule, Schedule
+from tools.gazetteer import fold_name, get_gazetteer, haversine_km
+from utils.spots import SpotTable
+
+NORTH_TO_SOUTH = ["Montmartre", "10th arrondissement", "Beaubourg", "Île de la Cité", "Latin Quarter"]
+
+
+def _points(n: int, seed: int = 3) -> List[Tuple[float, float]]:
+    rnd = random.Random(seed)
+    return [(48.83 + rnd.random() * 0.06, 2.28 + rnd.random() * 0.12) for _ in range(n)]
+
+
+def test_names_fold_and_neighborhoods_resolve_near_their_destination() -> None:
+    gaz = get_gazetteer()
+    assert fold_name("Saint-Germain-des-Prés") == "saint germain des pres"
+    paris = gaz.resolve_destination("paris, France")
+    assert paris is not None and paris.name == "Paris"
+    nyc, london = gaz.resolve_destination("NYC"), gaz.resolve_destination("London")
+    assert nyc is not None and london is not None and gaz.resolve_destination("Atlantis") is None
+    in_nyc, in_london = gaz.resolve_neighborhood(nyc, "chinatown"), gaz.resolve_neighborhood(london, "Chinatown")
+    assert in_nyc is not None and in_nyc.country == "United States"
+    assert in_london is not None and in_london.country == "United Kingdom"
+    assert gaz.resolve_neighborhood(london, "Montmartre") is None
+
+
+def test_near_returns_places_inside_the_radius_nearest_first() -> None:
+    gaz = get_gazetteer()
+    hits = gaz.near(48.8867, 2.3431, 3.0, kind="neighborhood")
+    assert hits[0].name == "Montmartre"
+    dist = [haversine_km(48.8867, 2.3431, p.lat, p.lon) for p in hits]
+    assert dist == sorted(dist) and dist[-1] <= 3.0
+    assert all(p.kind == "neighborhood" for p in hits)
+
+
+def test_matrices_agree_across_backends() -> None:
+    np = pytest.importorskip("numpy")
+    points = _points(12)
+    fast, slow = distance_matrix(points), distance_matrix(points, use_numpy=False)
+    assert np.allclose(fast, np.asarray(slow))
+    assert fast[0][1] == pytest.approx(haversine_km(*points[0], *points[1]))
+    minutes = travel_minutes(np.asarray([[0.0, 1.0], [10.0, 0.0]]), 4.5, 1.5, 20.0, 8.0)
+    assert minutes[0][1] == pytest.approx(DETOUR / 4.5 * 60)  # short leg: walk
+    assert minutes[1][0] == pytest.approx(10 * DETOUR / 20.0 * 60 + 8.0)  # long leg: transit + overhead
+    assert np.allclose(travel_minutes([[0.0, 1.0], [10.0, 0.0]], 4.5, 1.5, 20.0, 8.0), minutes)
+
+
+@pytest.mark.parametrize("n", [6, 24])
+def test_python_and_numpy_routes_are_the_same(n: int) -> None:
+    pytest.importorskip("numpy")
+    fast, slow = Router(_points(n + 1), use_numpy=True), Router(_points(n + 1), use_numpy=False)
+    nodes = list(range(n))
+    assert fast.route(nodes) == slow.route(nodes)
+    assert fast.route(nodes, start=n) == slow.route(nodes, start=n)
+    routed = slow.route(nodes)
+    assert sorted(routed) == nodes and slow.length(routed) <= slow.length(nodes)
+
+
+def test_points_on_a_line_are_visited_end_to_end() -> None:
+    line = [(48.60 + 0.05 * i, 2.35) for i in range(8)]  # every leg by transit: time follows distance
+    order = Router(line, use_numpy=False).route([3, 7, 0, 5, 1, 6, 2, 4])
+    assert order in (list(range(8)), list(range(7, -1, -1)))
+    assert Router(line, use_numpy=False).route([6, 2, 4], start=7) == [6, 4, 2]
+
+
+def test_schedule_is_routed_within_its_slots() -> None:
+    spots: List[Dict[str, Any]] = [{"title": f"Stop {i}", "neighborhood": nbh}
+                                   for i, nbh in enumerate(["Latin Quarter", "Montmartre", "Nowhere",
+                                                            "Île de la Cité", "10th arrondissement", "Beaubourg"])]
+    spots.append({"title": "Dinner", "neighborhood": "Le Marais"})
+    table = SpotTable.from_dicts(spots)
+    day = DaySchedule(day=0, items=[(0, row) for row in range(6)] + [(2, 6)])
+    sched = Schedule(days=[day], unscheduled=[], table=table)
+
+    summary = route_schedule(sched, "Paris")
+
+    assert summary is not None and summary.located == 6 and summary.stops == 7
+    assert summary.km < summary.km_before
+    morning = [table.text(table.neighborhood[row]) for slot, row in day.items if slot == 0]
+    assert morning[:-1] in (NORTH_TO_SOUTH, NORTH_TO_SOUTH[::-1]) and morning[-1] == "Nowhere"
+    assert day.items[-1] == (2, 6)
+    assert route_schedule(sched, "Atlantis") is None
@@ -0,0 +1,41 @@
+from __future__ import annotations
+import random
+
+from agents.scheduler import schedule_spots
+
+
+def _spot(title: str, area: str, hours: float = 3.0) -> dict:
+    return {"title": title, "neighborhood": area, "duration_hours": hours}
+
+
+def test_better_ranked_spot_in_another_neighborhood_is_not_dropped() -> None:
+    spots = [_spot("A1", "A"), _spot("B1", "B")] + [_spot(f"A{i}", "A") for i in range(2, 6)]
+
+    sched = schedule_spots(spots, days=2, daily_hours=8.0)
+
+    placed = {sched.table.strings[sched.table.title[row]] for d in sched.days for row in d.ordered()}
+    assert placed == {"A1", "B1", "A2", "A3"}
+    assert sched.unscheduled == [4, 5]
+
+
+def test_same_neighborhood_spots_share_a_day() -> None:
+    spots = [_spot("A1", "A", 2.0), _spot("B1", "B", 2.0), _spot("A2", "A", 2.0), _spot("B2", "B", 2.0)]
+
+    sched = schedule_spots(spots, days=2, daily_hours=8.0)
+
+    assert sorted(sorted(d.ordered()) for d in sched.days) == [[0, 2], [1, 3]]
+
+
+def test_unscheduled_spots_are_always_the_worst_ranked() -> None:
+    rnd = random.Random(7)
+    for _ in range(200):
+        n = rnd.randint(1, 20)
+        hours = rnd.choice([1.0, 1.5, 2.5, 3.0])
+        spots = [_spot(f"s{i}", rnd.choice("ABCD"), hours) for i in range(n)]
+
+        sched = schedule_spots(spots, days=rnd.randint(1, 4), daily_hours=8.0)
+
+        # equal durations: a spot is only left out once no day has room, so the rows left
+        # out are a suffix of the ranking and never make way for a worse spot
+        assert sched.unscheduled == list(range(n - len(sched.unscheduled), n))
+        assert sched.scheduled + len(sched.unscheduled) == n
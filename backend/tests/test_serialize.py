@@ -0,0 +1,63 @@
+from __future__ import annotations
+import gzip
+import json
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from utils.serialize import compress, negotiate_encoding, parse_fields, project, project_json
+from utils.types import Plan
+
+REQUEST = {"origin": "Chicago", "destination": "Paris", "start_date": "2026-05-01", "days": 2,
+           "profile": {"people": 2, "interests": ["art"]}}
+DOC = {"destination": "Paris", "days": [{"day": 1, "activities": ["a"], "notes": "n"}, {"day": 2, "activities": []}],
+       "metadata": {"spot_source": "catalogue", "critic": {"issues": 0}}}
+
+
+def test_parse_fields_keeps_order_and_rejects_unknown_names() -> None:
+    assert parse_fields(" days.activities, destination,days.activities ", Plan.model_fields) == (
+        "days.activities", "destination")
+    assert parse_fields(None, Plan.model_fields) == ()
+    with pytest.raises(ValueError, match="unknown field.*nope"):
+        parse_fields("days,nope.x", Plan.model_fields)
+
+
+def test_projection_reaches_into_objects_and_lists() -> None:
+    assert project(DOC, ("days.activities", "metadata.spot_source")) == {
+        "days": [{"activities": ["a"]}, {"activities": []}], "metadata": {"spot_source": "catalogue"}}
+    assert project(DOC, ("metadata", "metadata.critic")) == {"metadata": DOC["metadata"]}  # whole value wins
+    assert project_json(json.dumps(DOC).encode(), ()) == json.dumps(DOC).encode()
+
+
+def test_encoding_follows_accept_encoding_and_size(settings: Any) -> None:
+    settings(RESPONSE_COMPRESS_MIN_BYTES=100)
+    assert negotiate_encoding("gzip", 99) is None
+    assert negotiate_encoding("gzip;q=0.5, identity", 100) == "gzip"
+    assert negotiate_encoding("gzip;q=0", 100) is None and negotiate_encoding(None, 10_000) is None
+    settings(RESPONSE_COMPRESSION=False)
+    assert negotiate_encoding("gzip", 10_000) is None
+    assert gzip.decompress(compress(b"x" * 200, "gzip")) == b"x" * 200
+
+
+def test_plan_body_is_gzipped_with_its_own_etag(settings: Any) -> None:
+    settings(PLAN_CACHE_ENABLED=True)  # both requests get the same plan
+    client = TestClient(app)
+    plain = client.post("/plan", json=REQUEST, headers={"Accept-Encoding": "identity"})
+    packed = client.post("/plan", json=REQUEST, headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in plain.headers and packed.headers["Content-Encoding"] == "gzip"
+    assert packed.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+    assert packed.headers["Vary"] == "Accept-Encoding" and packed.json() == plain.json()
+
+
+def test_fields_projects_the_plan_body() -> None:
+    res = TestClient(app).post("/plan?fields=destination,days.day", json=REQUEST)
+    assert res.status_code == 200
+    assert res.json() == {"destination": "Paris", "days": [{"day": 1}, {"day": 2}]}
+    assert "Content-Encoding" not in res.headers  # too small to be worth compressing
+
+
+def test_unknown_field_is_a_400() -> None:
+    res = TestClient(app).post("/plan?fields=days,secret", json=REQUEST)
+    assert res.status_code == 400 and "secret" in res.json()["detail"]
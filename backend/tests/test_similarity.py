@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from agents.critic import CriticAgent
+from utils.similarity import near_duplicate_groups, normalize_title, same_place, shingles
+
+
+def test_multilingual_titles_collapse() -> None:
+    assert normalize_title("Musée du Louvre (1st arr.)") == normalize_title("Louvre Museum")
+    assert normalize_title("La Tour Eiffel") == normalize_title("Eiffel Tower")
+    assert near_duplicate_groups(["Tour Eiffel", "Harbour cruise", "Eiffel Tower"]) == [[0, 2]]
+
+
+def test_english_tours_are_not_towers() -> None:
+    assert normalize_title("City walking tour") == "city tour walking"
+    assert normalize_title("Tour of the Old Town") == "old tour town"
+    assert near_duplicate_groups(["Harbour boat tour", "Harbour tower"]) == []
+    assert near_duplicate_groups(["Old town walking tour", "Old town clock tower"]) == []
+
+
+def test_french_tower_needs_an_article_or_a_landmark() -> None:
+    assert normalize_title("Tour the Louvre") == normalize_title("Louvre tour")
+    assert normalize_title("Tour guide meetup") == "guide meetup tour"
+    assert normalize_title("Le Tour de Paris") == "paris tour"
+    assert normalize_title("Tour Montparnasse") == "montparnasse tower"
+    assert normalize_title("Tour Saint-Jacques") == normalize_title("Saint-Jacques Tower")
+    assert near_duplicate_groups(["Tour the Louvre", "Louvre tower"]) == []
+
+
+def test_a_more_specific_place_is_not_a_duplicate() -> None:
+    assert near_duplicate_groups(["Central Park", "Central Park Zoo"]) == []
+    assert near_duplicate_groups(["Eiffel Tower", "Eiffel Tower summit"]) == []
+    assert near_duplicate_groups(["Central Park", "Central Parks"]) == [[0, 1]]
+    # adding a category word still names the same place
+    a, b = normalize_title("Montmartre"), normalize_title("Place Montmartre")
+    assert same_place(a, b, shingles(a), shingles(b))
+
+
+def test_critic_lists_each_repeat_day_once() -> None:
+    days = [["Louvre Museum", "Seine cruise"], ["Musée du Louvre", "Louvre museum"], ["The Louvre Museum"]]
+    report = CriticAgent().evaluate(days)
+    repeats = [i for i in report.issues if i.kind in ("duplicate", "near_duplicate")]
+    assert len(repeats) == 1
+    assert repeats[0].message.endswith("on day 2, day 3")
@@ -0,0 +1,42 @@
+from __future__ import annotations
+from typing import Any, Dict, List
+
+from utils.spots import NONE, Spot, SpotTable
+
+SPOTS: List[Dict[str, Any]] = [
+    {"title": "The Louvre", "neighborhood": "1st arrondissement", "category": "Museum", "best_time": "morning",
+     "duration_hours": "2.5", "est_price": 22, "reason_short": "Big collection"},
+    {"title": "Canal walk", "neighborhood": "10th  Arrondissement", "category": "stroll", "best_time": "Night"},
+    {"title": "Louvre", "neighborhood": "1st arrondissement", "duration_hours": "soon", "est_price": True},
+]
+
+
+def test_rows_round_trip_to_the_wire_format() -> None:
+    table = SpotTable.from_dicts(SPOTS)
+    assert len(table) == 3 and list(table) == [Spot.from_dict(s) for s in SPOTS]
+    first = table.to_dicts()[0]
+    assert first["category"] == "museum" and first["duration_hours"] == 2.5 and first["est_price"] == 22.0
+    assert table[2].duration_hours is None and table[2].est_price is None and table[2].category == "other"
+
+
+def test_strings_are_interned_and_unknown_categories_get_codes() -> None:
+    table = SpotTable.from_dicts(SPOTS)
+    assert table.neighborhood[0] == table.neighborhood[2] and table.best_time[2] == NONE
+    assert table.category_of(1) == "stroll" and table.category[1] == len(table.categories) - 1
+    assert list(table.slot) == [0, 2, -1]
+    assert table.text(table.area[1]) == "10th arrondissement"
+
+
+def test_find_matches_normalized_titles_first_in_rank_order() -> None:
+    table = SpotTable.from_dicts(SPOTS)
+    assert table.find("louvre") == 0 and table.find("THE LOUVRE!") == 0
+    assert table.find("Canal Walk") == 1 and table.find("Eiffel Tower") is None
+
+
+def test_activity_lines_match_the_row_view() -> None:
+    table = SpotTable.from_dicts(SPOTS)
+    line = table.activity(0)
+    assert line == table[0].activity() and line.startswith("The Louvre (1st arrondissement)")
+    assert line.endswith("— morning • 2.5h")
+    assert table.activity(0, "afternoon") == table[0].activity("afternoon")
+    assert table.activity(2) == "Louvre (1st arrondissement)"
@@ -0,0 +1,58 @@
+from __future__ import annotations
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import warmup
+from app.main import app
+from utils import llm
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+
+def _fresh(code: str) -> str:
+    """Output of `code` run in a new interpreter (nothing imported yet)."""
+    env = {"PATH": "", "PYTHONPATH": str(BACKEND), "PROVIDER": "none"}
+    return subprocess.run([sys.executable, "-c", code], cwd=BACKEND, env=env, capture_output=True, text=True,
+                          check=True, timeout=60).stdout.strip()
+
+
+@pytest.mark.parametrize("module", ["cli", "app.main"])
+def test_entry_points_import_without_httpx(module: str) -> None:
+    assert _fresh(f"import sys, {module}; print('httpx' in sys.modules)") == "False"
+
+
+def test_cli_help_does_not_load_the_orchestrators() -> None:
+    code = ("import contextlib, io, sys, cli\n"
+            "sys.argv = ['cli.py', '--help']\n"
+            "with contextlib.redirect_stdout(io.StringIO()), contextlib.suppress(SystemExit):\n"
+            "    cli.typer.run(cli.main)\n"
+            "print('orchestrators' in sys.modules, 'httpx' in sys.modules)")
+    assert _fresh(code) == "False False"
+
+
+def test_prewarm_runs_each_step_offline_without_a_provider_client() -> None:
+    steps = asyncio.run(warmup.prewarm())
+    assert set(steps) == {"provider", "caches", "models"}
+    assert llm._HTTP["client"] is None
+
+
+def test_failed_step_is_reported_and_prewarm_can_be_turned_off(settings: Any, monkeypatch: Any) -> None:
+    async def broken() -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setitem(warmup._STEPS, "caches", broken)
+    steps = asyncio.run(warmup.prewarm())
+    assert steps["errors"] == {"caches": "OSError: disk full"} and "models" in steps
+    settings(PREWARM=False)
+    assert asyncio.run(warmup.prewarm()) == {}
+
+
+def test_lifespan_keeps_the_prewarm_timings() -> None:
+    with TestClient(app):
+        assert set(app.state.prewarm) == {"provider", "caches", "models"}
@@ -0,0 +1,78 @@
+from __future__ import annotations
+import asyncio
+from typing import Dict, List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from utils.metrics import Registry
+from utils.trace import DecisionTrace, annotate, span
+
+REQUEST = {"origin": "Chicago", "destination": "Rome", "start_date": "2026-05-01", "days": 2}
+
+
+def test_spans_nest_and_lines_keep_their_span() -> None:
+    trace = DecisionTrace("plan")
+    trace.log("[Plan] start")
+    with trace.span("agent.planner", days=2) as planner:
+        trace.log("[Planner] drafting")
+        with span("llm.openai") as call:  # module-level span joins the active trace
+            annotate(tokens=12)
+            call.add("chunks", 2)
+            call.add("chunks", 1)
+    with pytest.raises(RuntimeError):
+        with trace.span("agent.critic"):
+            raise RuntimeError("boom")
+    trace.finish(outcome="ok")
+
+    spans = {s["name"]: s for s in trace.spans()}
+    assert spans["agent.planner"]["parent"] == spans["plan"]["id"]
+    assert spans["llm.openai"]["parent"] == planner.span_id
+    assert spans["llm.openai"]["attrs"] == {"tokens": 12, "chunks": 3}
+    assert spans["agent.critic"]["attrs"]["error"] == "RuntimeError"
+    assert all(s["duration_ms"] is not None for s in spans.values())
+    assert trace.dump() == ["[Plan] start", "[Planner] drafting"]
+    assert [e["span"] for e in trace.events()] == [spans["plan"]["id"], planner.span_id]
+
+
+def test_concurrent_tasks_report_to_their_own_span() -> None:
+    trace = DecisionTrace("plan")
+
+    async def agent(name: str) -> None:
+        with trace.span(name):
+            await asyncio.sleep(0.01)
+            trace.log(f"[{name}] done")
+
+    async def main() -> None:
+        await asyncio.gather(agent("a"), agent("b"))
+
+    asyncio.run(main())
+    ids: Dict[str, int] = {s["name"]: s["id"] for s in trace.spans()}
+    assert {e["message"]: e["span"] for e in trace.events()} == {"[a] done": ids["a"], "[b] done": ids["b"]}
+
+
+def test_registry_renders_prometheus_text() -> None:
+    reg = Registry()
+    calls = reg.counter("calls_total", "Calls.", ("outcome",))
+    calls.inc(outcome="ok")
+    calls.inc(2, outcome="ok")
+    hist = reg.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    hist.observe(0.05)
+    hist.observe(0.5)
+    lines: List[str] = reg.render().splitlines()
+    assert 'calls_total{outcome="ok"} 3' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 1' in lines and 'latency_seconds_bucket{le="+Inf"} 2' in lines
+    assert "latency_seconds_count 2" in lines
+    with pytest.raises(ValueError):
+        reg.gauge("calls_total", "Same name, other type.")
+
+
+def test_plan_metadata_and_metrics_endpoint() -> None:
+    client = TestClient(app)
+    plan = client.post("/plan", json=REQUEST).json()
+    names = {s["name"] for s in plan["metadata"]["trace_detail"]["spans"]}
+    assert {"plan", "agent.planner", "agent.critic", "agent.budget"} <= names
+    res = client.get("/metrics")
+    assert res.status_code == 200 and res.headers["content-type"].startswith("text/plain")
+    assert 'voyagecraft_plan_duration_seconds_count{orchestrator="react",outcome="ok"}' in res.text
@@ -0,0 +1,333 @@
+"""
+Offline destination catalogue.
+
+A compact, memory-mapped binary of curated spots (same schema ranked_spots_via_llm
+produces) with inverted indexes on destination, category, interest tag and best_time.
+The JSON source lives in tools/data/catalogue.json; the binary is (re)built from it
+on first use or with `python -m tools.catalogue build`.
+
+Each destination lists 12-13 spots. With CURATION_SPOTS_PER_DAY=4 that covers trips of
+up to 3 days; when a provider is configured, longer trips go to the provider so it can
+top the list up (agents.destination_llm), and only without one are they planned from
+the catalogue alone.
+
+File layout (little-endian):
+    b"VCAT" | u32 version | 4 x (u32 offset, u32 size) | u32 header_len | header JSON | pad
+    records      N x <IIIHBBfff  (title, neighborhood, reason string ids; destination,
+                                  category, best_time ids; duration, price, score)
+    str_offsets  (S + 1) x u32 into the string blob
+    strings      utf-8 blob
+    postings     u32 record ids, one run per index term (in rank order)
+"""
+from __future__ import annotations
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from utils.config import get_settings
+from utils.cache import normalize_destination, normalize_interests
+
+SOURCE_PATH = Path(__file__).resolve().parent / "data" / "catalogue.json"
+MAGIC = b"VCAT"
+VERSION = 1
+_PREFIX = struct.Struct("<4sI8II")  # magic, version, 4 x (offset, size), header length
+_REC = struct.Struct("<IIIHBBfff")
+_NONE = 0xFFFFFFFF
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _u32(buf: Any) -> Sequence[int]:
+    """View a little-endian u32 buffer as ints without copying (copy + swap on big-endian hosts)."""
+    if sys.byteorder == "little":
+        return memoryview(buf).cast("I")
+    arr = array("I", bytes(buf))
+    arr.byteswap()
+    return arr
+
+# -------------------- Build --------------------
+
+def build(src: Path = SOURCE_PATH, out: Optional[Path] = None) -> Path:
+    """Compile the JSON catalogue into the binary format and return its path."""
+    out = Path(out or get_settings().CATALOGUE_PATH)
+    data = json.loads(Path(src).read_text(encoding="utf-8"))
+
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def sid(s: Optional[str]) -> int:
+        if not s:
+            return _NONE
+        if s not in string_ids:
+            string_ids[s] = len(strings)
+            strings.append(s)
+        return string_ids[s]
+
+    categories: List[str] = []
+    best_times: List[str] = []
+    destinations: List[str] = []
+    aliases: Dict[str, int] = {}
+    index: Dict[str, Dict[str, List[int]]] = {"destination": {}, "category": {}, "tag": {}, "best_time": {}}
+    records = bytearray()
+    n = 0
+
+    def enum(values: List[str], v: str) -> int:
+        if v not in values:
+            values.append(v)
+        return values.index(v)
+
+    for dest in data["destinations"]:
+        d_id = len(destinations)
+        destinations.append(dest["name"])
+        for name in [dest["name"], *dest.get("aliases", [])]:
+            aliases[normalize_destination(name)] = d_id
+        spots = dest["spots"]
+        for rank, spot in enumerate(spots):
+            category = (spot.get("category") or "other").strip().lower()
+            best_time = (spot.get("best_time") or "flexible").strip().lower()
+            price = spot.get("est_price")
+            records += _REC.pack(
+                sid(spot["title"]),
+                sid(spot.get("neighborhood")),
+                sid(spot.get("reason_short")),
+                d_id,
+                enum(categories, category),
+                enum(best_times, best_time),
+                float(spot.get("duration_hours") or 1.5),
+                float("nan") if price is None else float(price),
+                1.0 - rank / max(len(spots), 1),  # source order is the editorial ranking
+            )
+            index["destination"].setdefault(str(d_id), []).append(n)
+            index["category"].setdefault(category, []).append(n)
+            index["best_time"].setdefault(best_time, []).append(n)
+            for tag in normalize_interests(spot.get("tags")):
+                index["tag"].setdefault(tag, []).append(n)
+            n += 1
+
+    postings = array("I")
+    terms: Dict[str, Dict[str, Tuple[int, int]]] = {}
+    for kind, by_term in index.items():
+        terms[kind] = {}
+        for term, ids in by_term.items():
+            terms[kind][term] = (len(postings), len(ids))
+            postings.extend(ids)
+
+    blob = bytearray()
+    offsets = array("I", [0])
+    for s in strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+    if sys.byteorder != "little":
+        postings.byteswap()
+        offsets.byteswap()
+
+    header = {
+        "count": n,
+        "destinations": destinations,
+        "aliases": aliases,
+        "categories": categories,
+        "best_times": best_times,
+        "synonyms": {k.casefold(): v.casefold() for k, v in data.get("interest_synonyms", {}).items()},
+        "index": terms,
+    }
+    head = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    sections: List[bytes] = [bytes(records), offsets.tobytes(), bytes(blob), postings.tobytes()]
+    layout: List[int] = []
+    pos = _align(_PREFIX.size + len(head))
+    for sec in sections:
+        layout += [pos, len(sec)]
+        pos = _align(pos + len(sec))
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    # a temp file of our own next to the target: processes rebuilding at once never share one
+    with tempfile.NamedTemporaryFile(dir=out.parent, prefix=out.name + ".", suffix=".tmp", delete=False) as f:
+        try:
+            f.write(_PREFIX.pack(MAGIC, VERSION, *layout, len(head)) + head)
+            for off, sec in zip(layout[::2], sections):
+                f.write(b"\0" * (off - f.tell()))
+                f.write(sec)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    try:
+        os.replace(f.name, out)
+    except OSError:
+        os.unlink(f.name)
+        raise
+    return out
+
+# -------------------- Query --------------------
+
+class Catalogue:
+    """Read-only view over a built catalogue file (memory-mapped; safe to share across threads)."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, *layout, head_len = _PREFIX.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a catalogue file")
+        if version != VERSION:
+            raise ValueError(f"{self.path}: unsupported catalogue version {version}")
+        h = json.loads(bytes(self._mm[_PREFIX.size:_PREFIX.size + head_len]).decode("utf-8"))
+        self.count: int = h["count"]
+        self.destinations: List[str] = h["destinations"]
+        self._aliases: Dict[str, int] = h["aliases"]
+        self._categories: List[str] = h["categories"]
+        self._best_times: List[str] = h["best_times"]
+        self._synonyms: Dict[str, str] = h["synonyms"]
+        self._terms: Dict[str, Dict[str, List[int]]] = h["index"]
+        rec, _, offs, offs_n, blob, blob_n, post, post_n = layout
+        self._rec = rec
+        self._view = memoryview(self._mm)  # zero-copy slices below are views into the mapping
+        self._offsets = _u32(self._view[offs:offs + offs_n])
+        self._blob = self._view[blob:blob + blob_n]
+        self._postings = _u32(self._view[post:post + post_n])
+        self._set = lru_cache(maxsize=None)(self._posting_set)
+
+    def resolve(self, destination: str) -> Optional[int]:
+        return self._aliases.get(normalize_destination(destination))
+
+    def __contains__(self, destination: str) -> bool:
+        return self.resolve(destination) is not None
+
+    def postings(self, kind: str, term: str) -> Sequence[int]:
+        """Record ids for one index term (destination ids are passed as strings)."""
+        span = self._terms.get(kind, {}).get(term)
+        if not span:
+            return ()
+        start, n = span
+        return self._postings[start:start + n]
+
+    def _posting_set(self, kind: str, term: str) -> FrozenSet[int]:
+        return frozenset(self.postings(kind, term))
+
+    def _str(self, i: int) -> Optional[str]:
+        if i == _NONE:
+            return None
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+
+    def spot(self, i: int) -> Dict[str, Any]:
+        title, nbh, reason, _dest, cat, bt, dur, price, _score = _REC.unpack_from(
+            self._mm, self._rec + i * _REC.size
+        )
+        return {
+            "title": self._str(title),
+            "neighborhood": self._str(nbh),
+            "category": self._categories[cat],
+            "best_time": self._best_times[bt],
+            "duration_hours": round(dur, 2),
+            "est_price": None if math.isnan(price) else round(price, 2),
+            "reason_short": self._str(reason),
+        }
+
+    def query(
+        self,
+        destination: str,
+        interests: Sequence[str] | None = None,
+        category: Optional[str] = None,
+        best_time: Optional[str] = None,
+        limit: int = 12,
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranked spots for a destination ([] if unknown). Spots matching more of the
+        interests come first; ties keep the editorial order. category/best_time filter.
+        """
+        d_id = self.resolve(destination)
+        if d_id is None:
+            return []
+        ids: Sequence[int] = self.postings("destination", str(d_id))
+        if category:
+            keep = self._set("category", category.strip().lower())
+            ids = [i for i in ids if i in keep]
+        if best_time:
+            keep = self._set("best_time", best_time.strip().lower())
+            ids = [i for i in ids if i in keep]
+        tags = {self._synonyms.get(t, t) for t in normalize_interests(interests)}
+        if tags:
+            tag_sets = [self._set("tag", t) for t in tags]
+            order = {i: n for n, i in enumerate(ids)}
+            ids = sorted(ids, key=lambda i: (-sum(i in s for s in tag_sets), order[i]))
+        return [self.spot(i) for i in list(ids)[:max(int(limit), 0)]]
+
+    def close(self) -> None:
+        self._set.cache_clear()
+        for view in (self._offsets, self._postings, self._blob, self._view):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mm.close()
+
+
+_STATE: Dict[str, Any] = {"catalogue": None, "key": None}
+_LOCK = threading.Lock()
+
+
+def get_catalogue() -> Optional[Catalogue]:
+    """
+    Process-wide Catalogue, rebuilt from the JSON source when the binary is missing or stale.
+    Returns None when disabled or when the catalogue cannot be loaded.
+    """
+    s = get_settings()
+    if not s.CATALOGUE_ENABLED:
+        return None
+    path = Path(s.CATALOGUE_PATH)
+    with _LOCK:
+        try:
+            if not path.exists() or path.stat().st_mtime < SOURCE_PATH.stat().st_mtime:
+                build(SOURCE_PATH, path)
+            key = (str(path), path.stat().st_mtime)
+            if _STATE["key"] != key:
+                previous, _STATE["catalogue"] = _STATE["catalogue"], Catalogue(path)
+                _STATE["key"] = key
+                if previous is not None:
+                    try:
+                        previous.close()
+                    except BufferError:
+                        pass  # a view is still held somewhere: the mapping goes with it
+        except (OSError, ValueError):
+            return None
+        catalogue: Catalogue = _STATE["catalogue"]
+        return catalogue
+
+
+if __name__ == "__main__":
+    import typer
+
+    cli = typer.Typer(help="Offline destination catalogue")
+
+    @cli.command("build")
+    def build_cmd(
+        src: Path = typer.Option(SOURCE_PATH, help="JSON source"),
+        out: Path = typer.Option(Path(get_settings().CATALOGUE_PATH), help="Binary output"),
+    ) -> None:
+        path = build(src, out)
+        print(f"wrote {path} ({path.stat().st_size} bytes)")
+
+    @cli.command("query")
+    def query_cmd(
+        destination: str,
+        interests: str = typer.Option("", help="Comma-separated interests"),
+        category: Optional[str] = typer.Option(None),
+        best_time: Optional[str] = typer.Option(None),
+        limit: int = typer.Option(12),
+    ) -> None:
+        cat = get_catalogue()
+        if cat is None:
+            raise typer.Exit(code=1)
+        ints = [s.strip() for s in interests.split(",") if s.strip()]
+        print(json.dumps(cat.query(destination, ints, category, best_time, limit), indent=2, ensure_ascii=False))
+
+    cli()
@@ -0,0 +1,170 @@
+"""
+Offline gazetteer: destination and neighborhood names -> coordinates, no network.
+
+Places come from tools/data/gazetteer.json (cities and their neighborhoods, approximate
+WGS84 centroids). Names and aliases are folded (case, accents, punctuation) into one
+name index; coordinates go into a grid of GRID_DEG x GRID_DEG cells so `near()` only
+looks at the cells a radius can touch. Neighborhood names are not unique ("Chinatown",
+"Soho"), so a neighborhood is always resolved relative to its destination: the match
+nearest the destination's centre, within NEIGHBORHOOD_RADIUS_KM.
+
+    python -m tools.gazetteer resolve "Paris" "Le Marais"
+"""
+from __future__ import annotations
+import json
+import math
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SOURCE_PATH = Path(__file__).resolve().parent / "data" / "gazetteer.json"
+GRID_DEG = 0.25                 # spatial index cell size (~28 km of latitude)
+NEIGHBORHOOD_RADIUS_KM = 40.0   # a destination's neighborhoods lie within this of its centre
+EARTH_RADIUS_KM = 6371.0088
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    kind: str                   # "city" | "neighborhood"
+    lat: float
+    lon: float
+    country: str = ""
+
+    @property
+    def coords(self) -> Tuple[float, float]:
+        return self.lat, self.lon
+
+
+def fold_name(name: str) -> str:
+    """'Saint-Germain-des-Prés' -> 'saint germain des pres'; 'Barri Gòtic' -> 'barri gotic'."""
+    text = unicodedata.normalize("NFKD", str(name or "")).encode("ascii", "ignore").decode("ascii")
+    text = "".join(c if c.isalnum() else " " for c in text.casefold())
+    return " ".join(text.split())
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class Gazetteer:
+    def __init__(self, places: Iterable[Place], aliases: Optional[Dict[int, List[str]]] = None) -> None:
+        self.places: List[Place] = list(places)
+        self._names: Dict[str, List[int]] = {}
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        for i, place in enumerate(self.places):
+            for name in [place.name, *(aliases or {}).get(i, [])]:
+                ids = self._names.setdefault(fold_name(name), [])
+                if i not in ids:
+                    ids.append(i)
+            self._grid.setdefault(self._cell(place.lat, place.lon), []).append(i)
+
+    @classmethod
+    def load(cls, path: Path = SOURCE_PATH) -> "Gazetteer":
+        raw = json.loads(Path(path).read_text(encoding="utf-8"))
+        places: List[Place] = []
+        aliases: Dict[int, List[str]] = {}
+        for rec in raw.get("places", []):
+            places.append(Place(str(rec["name"]), str(rec.get("kind") or "city"), float(rec["lat"]),
+                                float(rec["lon"]), str(rec.get("country") or "")))
+            if rec.get("aliases"):
+                aliases[len(places) - 1] = [str(a) for a in rec["aliases"]]
+        return cls(places, aliases)
+
+    def __len__(self) -> int:
+        return len(self.places)
+
+    @staticmethod
+    def _cell(lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / GRID_DEG), math.floor(lon / GRID_DEG)
+
+    # ---------- lookups ----------
+
+    def lookup(self, name: str, kind: Optional[str] = None) -> List[Place]:
+        """Every place called `name` (or an alias of it), optionally of one kind."""
+        return [self.places[i] for i in self._names.get(fold_name(name), [])
+                if kind is None or self.places[i].kind == kind]
+
+    def near(self, lat: float, lon: float, radius_km: float, kind: Optional[str] = None) -> List[Place]:
+        """Places within `radius_km` of (lat, lon), nearest first."""
+        dlat = radius_km / 111.0
+        dlon = radius_km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+        (r0, c0), (r1, c1) = self._cell(lat - dlat, lon - dlon), self._cell(lat + dlat, lon + dlon)
+        hits: List[Tuple[float, Place]] = []
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                for i in self._grid.get((r, c), []):
+                    place = self.places[i]
+                    if kind is not None and place.kind != kind:
+                        continue
+                    d = haversine_km(lat, lon, place.lat, place.lon)
+                    if d <= radius_km:
+                        hits.append((d, place))
+        return [p for _, p in sorted(hits, key=lambda h: h[0])]
+
+    def resolve_destination(self, destination: str) -> Optional[Place]:
+        """'Paris', 'paris, France', 'NYC' -> the city; None when unknown."""
+        text = str(destination or "")
+        for candidate in (text, text.split(",")[0]):
+            hits = self.lookup(candidate, kind="city")
+            if hits:
+                return hits[0]
+        return None
+
+    def resolve_neighborhood(
+        self, destination: Place, name: str, radius_km: float = NEIGHBORHOOD_RADIUS_KM
+    ) -> Optional[Place]:
+        """The place called `name` nearest to `destination`, if within `radius_km`."""
+        best: Optional[Tuple[float, Place]] = None
+        for place in self.lookup(name):
+            d = haversine_km(destination.lat, destination.lon, place.lat, place.lon)
+            if d <= radius_km and (best is None or d < best[0]):
+                best = (d, place)
+        return best[1] if best else None
+
+    def locate(self, destination: Place, neighborhoods: Iterable[Optional[str]]) -> List[Optional[Tuple[float, float]]]:
+        """Coordinates per neighborhood name (None when missing or unknown), memoized per name."""
+        seen: Dict[str, Optional[Tuple[float, float]]] = {}
+        out: List[Optional[Tuple[float, float]]] = []
+        for name in neighborhoods:
+            key = fold_name(name or "")
+            if key not in seen:
+                place = self.resolve_neighborhood(destination, key) if key else None
+                seen[key] = place.coords if place else None
+            out.append(seen[key])
+        return out
+
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    """Process-wide Gazetteer, loaded on first use."""
+    return Gazetteer.load()
+
+
+if __name__ == "__main__":
+    import typer
+
+    cli = typer.Typer(help="Offline gazetteer")
+
+    @cli.command("resolve")
+    def resolve_cmd(destination: str, neighborhoods: List[str] = typer.Argument(None)) -> None:
+        gaz = get_gazetteer()
+        city = gaz.resolve_destination(destination)
+        if city is None:
+            print(f"unknown destination: {destination}")
+            raise typer.Exit(code=1)
+        print(f"{city.name}, {city.country}: {city.lat:.4f}, {city.lon:.4f}")
+        for name, coords in zip(neighborhoods or [], gaz.locate(city, neighborhoods or [])):
+            print(f"  {name}: " + (f"{coords[0]:.4f}, {coords[1]:.4f}" if coords else "not found"))
+
+    @cli.command("near")
+    def near_cmd(lat: float, lon: float, radius_km: float = typer.Option(5.0)) -> None:
+        gaz = get_gazetteer()
+        for place in gaz.near(lat, lon, radius_km):
+            print(f"{haversine_km(lat, lon, place.lat, place.lon):6.2f} km  {place.kind:<12} {place.name}")
+
+    cli()
@@ -0,0 +1,196 @@
+"""
+Admission control and backpressure for plan requests and provider calls.
+
+Each worker process admits at most ADMISSION_MAX_INFLIGHT plans (and at most
+ADMISSION_PROVIDER_MAX_INFLIGHT calls per LLM provider) at a time. Everything else
+waits in a bounded, priority-ordered queue ("interactive" ahead of "batch") for up
+to its class deadline (a plan also no longer than its request's deadline, see
+utils/deadline.py). A full queue is refused right away (429) and a missed deadline
+gives up (503); both carry a Retry-After estimated from recent hold times, so a spike
+degrades into fast refusals instead of timeouts across the board.
+"""
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from .config import get_settings
+from .deadline import remaining
+from .metrics import ADMISSION_INFLIGHT, ADMISSION_QUEUED, ADMISSION_REJECTED, ADMISSION_WAIT_SECONDS
+
+PRIORITIES: Dict[str, int] = {"interactive": 0, "batch": 1}
+
+# priority of the plan running in this context; provider calls inherit it
+_PRIORITY: ContextVar[str] = ContextVar("voyagecraft_priority", default="interactive")
+
+
+class Overloaded(Exception):
+    """Admission refused; maps to an HTTP `status` with a Retry-After header."""
+
+    def __init__(self, scope: str, reason: str, status: int, retry_after: int) -> None:
+        super().__init__(f"{scope} saturated ({reason}); retry in {retry_after}s")
+        self.scope = scope
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+
+def current_priority() -> str:
+    return _PRIORITY.get()
+
+
+def set_priority(priority: str) -> None:
+    """Tag the running context (e.g. a streaming response) so its provider calls queue at this priority."""
+    _PRIORITY.set(priority)
+
+
+def check_priority(priority: Optional[str]) -> str:
+    p = (priority or "interactive").strip().lower()
+    if p not in PRIORITIES:
+        raise ValueError(f"unknown priority '{priority}' (choose from: {', '.join(PRIORITIES)})")
+    return p
+
+
+class AdmissionController:
+    """
+    Counting semaphore with a bounded priority wait queue. Slots are handed directly
+    to the next waiter on release, so a queued request cannot be overtaken by a new one.
+    With `use_deadline`, a wait also ends at the request's deadline. Single event loop; not thread-safe.
+    """
+
+    def __init__(
+        self, scope: str, max_inflight: int, max_queue: int, timeouts: Dict[str, float], use_deadline: bool = False
+    ) -> None:
+        self.scope = scope
+        self.max_inflight = max(int(max_inflight), 1)
+        self.max_queue = max(int(max_queue), 0)
+        self.timeouts = timeouts
+        self.use_deadline = use_deadline
+        self.inflight = 0
+        self.queued = 0
+        self._waiters: List[Tuple[int, int, "asyncio.Future[None]", str]] = []
+        self._seq = itertools.count()
+        self._hold_s = 1.0  # EWMA of how long a slot is held, for Retry-After
+
+    def retry_after(self) -> int:
+        backlog = (self.queued + 1) / self.max_inflight
+        return max(1, min(60, math.ceil(self._hold_s * backlog)))
+
+    def _reject(self, priority: str, reason: str, status: int) -> Overloaded:
+        ADMISSION_REJECTED.inc(scope=self.scope, priority=priority, reason=reason)
+        return Overloaded(self.scope, reason, status, self.retry_after())
+
+    async def acquire(self, priority: str = "interactive") -> None:
+        if self.inflight < self.max_inflight and not self.queued:
+            self.inflight += 1
+            ADMISSION_INFLIGHT.set(self.inflight, scope=self.scope)
+            return
+        if self.queued >= self.max_queue:
+            raise self._reject(priority, "queue_full", 429)
+        timeout = self.timeouts.get(priority, 10.0)
+        left = remaining() if self.use_deadline else None
+        if left is not None and left < timeout:
+            if left <= 0:
+                raise self._reject(priority, "deadline", 503)
+            timeout = left
+        fut: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (PRIORITIES[priority], next(self._seq), fut, priority))
+        self.queued += 1
+        ADMISSION_QUEUED.inc(scope=self.scope, priority=priority)
+        t0 = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if fut.done() and not fut.cancelled():
+                self.release()  # granted just as we gave up: pass the slot on
+            else:
+                fut.cancel()  # release() skips it
+                self.queued -= 1
+                ADMISSION_QUEUED.dec(scope=self.scope, priority=priority)
+            if isinstance(e, asyncio.TimeoutError):
+                reason = "queue_timeout" if timeout == self.timeouts.get(priority, 10.0) else "deadline"
+                raise self._reject(priority, reason, 503) from None
+            raise
+        finally:
+            ADMISSION_WAIT_SECONDS.observe(time.monotonic() - t0, scope=self.scope, priority=priority)
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut, priority = heapq.heappop(self._waiters)
+            if fut.done():
+                continue
+            self.queued -= 1
+            ADMISSION_QUEUED.dec(scope=self.scope, priority=priority)
+            fut.set_result(None)  # the slot moves to the waiter; inflight unchanged
+            return
+        self.inflight -= 1
+        ADMISSION_INFLIGHT.set(self.inflight, scope=self.scope)
+
+    async def hold(self, priority: str = "interactive") -> Callable[[], None]:
+        """Acquire now (raising Overloaded) and return an idempotent release for the caller to run later."""
+        await self.acquire(priority)
+        t0 = time.monotonic()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self._hold_s = 0.8 * self._hold_s + 0.2 * (time.monotonic() - t0)
+                self.release()
+
+        return release
+
+    @asynccontextmanager
+    async def slot(self, priority: str = "interactive") -> AsyncIterator[None]:
+        release = await self.hold(priority)
+        token = _PRIORITY.set(priority)
+        try:
+            yield
+        finally:
+            _PRIORITY.reset(token)
+            release()
+
+
+_CONTROLLERS: Dict[str, Tuple[Tuple[float, ...], AdmissionController]] = {}
+
+
+def _controller(scope: str, max_inflight: int, use_deadline: bool = False) -> Optional[AdmissionController]:
+    """Process-wide controller per scope (rebuilt when its settings change; None when disabled)."""
+    s = get_settings()
+    if not s.ADMISSION_ENABLED:
+        return None
+    timeouts = {"interactive": s.ADMISSION_QUEUE_TIMEOUT_S, "batch": s.ADMISSION_BATCH_TIMEOUT_S}
+    config = (max_inflight, s.ADMISSION_MAX_QUEUE, *timeouts.values())
+    cur = _CONTROLLERS.get(scope)
+    if cur is None or cur[0] != config:
+        if cur is not None and (cur[1].inflight or cur[1].queued):
+            return cur[1]  # keep the live one until it drains
+        controller = AdmissionController(scope, max_inflight, s.ADMISSION_MAX_QUEUE, timeouts, use_deadline)
+        cur = _CONTROLLERS[scope] = (config, controller)
+    return cur[1]
+
+
+def plan_admission() -> Optional[AdmissionController]:
+    return _controller("plan", get_settings().ADMISSION_MAX_INFLIGHT, use_deadline=True)
+
+
+def provider_admission(provider: str) -> Optional[AdmissionController]:
+    # no deadline here: within() already bounds provider calls, and a shared fetch must not
+    # be shed at the deadline of whichever request happened to start it
+    return _controller(f"provider:{provider}", get_settings().ADMISSION_PROVIDER_MAX_INFLIGHT)
+
+
+@asynccontextmanager
+async def admitted(controller: Optional[AdmissionController], priority: Optional[str] = None) -> AsyncIterator[None]:
+    """`controller.slot(priority)`, or a no-op when admission control is off."""
+    if controller is None:
+        yield
+        return
+    async with controller.slot(priority or current_priority()):
+        yield
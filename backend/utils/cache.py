@@ -0,0 +1,271 @@
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import get_settings, choose_llm
+from .deadline import within
+from .llm import ranked_spots_via_llm
+from .metrics import CACHE_REQUESTS
+from .microbatch import batched_ranked_spots
+from .trace import span
+
+# -------------------- Key normalization --------------------
+
+def normalize_destination(destination: str) -> str:
+    return " ".join((destination or "").split()).casefold()
+
+
+def normalize_interests(interests: Sequence[str] | None) -> List[str]:
+    return sorted({" ".join(i.split()).casefold() for i in (interests or []) if i and i.strip()})
+
+
+def spot_cache_key(
+    destination: str,
+    interests: Sequence[str] | None,
+    days: int | None,
+    month: str | None,
+    provider: str,
+    model: str,
+    temperature: float,
+    max_items: int,
+    focus: str | None = None,
+) -> str:
+    """
+    Stable key for a curation call. Destination/interests are normalized so that
+    'Paris, [Art, cafes]' and ' paris, [cafes, art]' share one entry.
+    """
+    parts = {
+        "d": normalize_destination(destination),
+        "i": normalize_interests(interests),
+        "n": None if days is None else int(days),
+        "m": (month or "").strip().casefold() or None,
+        "p": provider,
+        "model": model,
+        "t": round(float(temperature), 3),
+        "k": int(max_items),
+    }
+    if focus:  # shard of a long trip (unfocused keys stay as they were)
+        parts["f"] = " ".join(focus.split()).casefold()
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+# -------------------- Disk cache (SQLite, TTL + LRU) --------------------
+
+class SpotCache:
+    """
+    Small SQLite-backed key/value cache with TTL expiry and LRU eviction.
+    Values are JSON lists of spot dicts. Safe to share across threads.
+    """
+
+    def __init__(self, path: str, ttl_s: float, max_entries: int) -> None:
+        self.path = path
+        self.ttl_s = float(ttl_s)
+        self.max_entries = max(int(max_entries), 1)
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "coalesced": 0}
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS spots ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS spots_accessed ON spots(accessed)")
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT value, created FROM spots WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            value, created = row
+            if now - created > self.ttl_s:
+                self._db.execute("DELETE FROM spots WHERE key = ?", (key,))
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._db.execute("UPDATE spots SET accessed = ? WHERE key = ?", (now, key))
+            self.stats["hits"] += 1
+        spots: List[Dict[str, Any]] = json.loads(value)
+        return spots
+
+    def put(self, key: str, value: List[Dict[str, Any]]) -> None:
+        now = time.time()
+        blob = json.dumps(value, separators=(",", ":"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO spots(key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, blob, now, now),
+            )
+            (count,) = self._db.execute("SELECT COUNT(*) FROM spots").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM spots WHERE key IN (SELECT key FROM spots ORDER BY accessed ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.stats["evictions"] += overflow
+
+    def count(self, stat: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[stat] = self.stats.get(stat, 0) + n
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM spots").fetchone()
+        return int(count)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+# -------------------- Single-flight --------------------
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+    The first caller starts fn() as a task; later callers await the same task.
+    Callers are shielded from each other: cancelling one waiter does not cancel the shared work
+    while others still wait for it. When the last waiter is cancelled (client gone, deadline
+    passed) nobody needs the result any more, so the work itself is cancelled.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, "asyncio.Task[Any]"] = {}
+        self._waiters: Dict["asyncio.Task[Any]", int] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Return (result, shared) where shared=True means another caller did the work."""
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(partial(self._forget, key))
+        return await self._wait(task), shared
+
+    def join(self, key: str) -> Optional[Awaitable[Any]]:
+        """Wait for the call already running for `key`; None if there is none (never starts one)."""
+        task = self._calls.get(key)
+        return None if task is None else self._wait(task)
+
+    async def _wait(self, task: "asyncio.Task[Any]") -> Any:
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters.get(task) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            left = self._waiters.get(task, 1) - 1
+            if left:
+                self._waiters[task] = left
+            else:
+                self._waiters.pop(task, None)
+
+    def _forget(self, key: str, task: "asyncio.Task[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+# -------------------- Cached curation --------------------
+
+_STATE: Dict[str, Any] = {"cache": None, "config": None}
+_FLIGHT = SingleFlight()
+_STATE_LOCK = threading.Lock()
+
+
+def get_spot_cache() -> Optional[SpotCache]:
+    """Process-wide SpotCache built from Settings (rebuilt if cache settings change)."""
+    s = get_settings()
+    if not s.SPOT_CACHE_ENABLED:
+        return None
+    config = (s.SPOT_CACHE_PATH, s.SPOT_CACHE_TTL_S, s.SPOT_CACHE_MAX_ENTRIES)
+    with _STATE_LOCK:
+        if _STATE["cache"] is None or _STATE["config"] != config:
+            if _STATE["cache"] is not None:
+                _STATE["cache"].close()
+            _STATE["cache"] = SpotCache(*config)
+            _STATE["config"] = config
+        cache: SpotCache = _STATE["cache"]
+        return cache
+
+
+async def cached_ranked_spots(
+    destination: str,
+    interests: Sequence[str] | None,
+    days: int | None,
+    month: str | None = None,
+    max_items: int = 12,
+    focus: str | None = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Cache + single-flight front for utils.llm.ranked_spots_via_llm.
+    Returns (spots, cache_info) where cache_info["status"] is 'hit' | 'miss' | 'coalesced' | 'bypass'
+    and the remaining keys are the process-wide counters.
+    Empty results (provider off / parse failure) are never cached, and an answer is cached
+    under the provider that gave it (a hedge or failover may not be the configured one).
+    SQLite reads and writes run on a worker thread, off the event loop. A cache miss waits
+    for the provider at most until the request's deadline (raises DeadlineExceeded).
+    """
+    with span("cache.spots") as sp:
+        spots, info = await _lookup(destination, interests, days, month, max_items, focus)
+        sp.set(status=info["status"], spots=len(spots))
+    CACHE_REQUESTS.inc(cache="spots", status=info["status"])
+    return spots, info
+
+
+async def _lookup(
+    destination: str,
+    interests: Sequence[str] | None,
+    days: int | None,
+    month: str | None,
+    max_items: int,
+    focus: str | None = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    s = get_settings()
+    picked = choose_llm(s)
+    cache = get_spot_cache()
+    if not picked or cache is None:
+        spots = await within(ranked_spots_via_llm(destination=destination, interests=interests, days=days,
+                                                  month=month, max_items=max_items, focus=focus))
+        return spots, {"status": "bypass"}
+
+    provider, cfg = picked
+    key = spot_cache_key(destination, interests, days, month, provider, cfg["model"],
+                         s.LLM_TEMPERATURE, max_items, focus)
+    hit = await asyncio.to_thread(cache.get, key)
+    if hit is not None:
+        return hit, {"status": "hit", **cache.snapshot()}
+
+    async def fetch() -> List[Dict[str, Any]]:
+        # concurrent misses for other destinations may share this provider call (utils/microbatch.py)
+        spots, answered = await batched_ranked_spots(destination=destination, interests=interests, days=days,
+                                                     month=month, max_items=max_items, focus=focus)
+        if spots and answered is not None:
+            put = key if answered[0] == provider else spot_cache_key(
+                destination, interests, days, month, answered[0], answered[1]["model"],
+                s.LLM_TEMPERATURE, max_items, focus,
+            )
+            await asyncio.to_thread(cache.put, put, spots)
+        return spots
+
+    # only the provider fetch is bounded by the request's deadline (raises DeadlineExceeded)
+    spots, shared = await within(_FLIGHT.do(key, fetch))
+    if shared:
+        cache.count("coalesced")
+    return list(spots), {"status": "coalesced" if shared else "miss", **cache.snapshot()}
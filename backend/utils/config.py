@@ -1,14 +1,9 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, fields, replace
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List
 import os
 
-try:
-    from dotenv import dotenv_values  # type: ignore
-except Exception:
-    dotenv_values = None  # type: ignore
-
 # project paths
 ROOT = Path(__file__).resolve().parent.parent  # backend/
 ENV_PATH = ROOT / ".env"
@@ -18,31 +13,173 @@ class Settings:
     PROVIDER: str = "auto"             # "openai" | "ollama" | "auto"
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_MODEL: str = "gpt-4o-mini"
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"  # any OpenAI-compatible endpoint (proxy, local stand-in)
     OLLAMA_HOST: Optional[str] = None
     OLLAMA_MODEL: str = "llama3.1"
     LLM_TEMPERATURE: float = 0.35
+    LLM_STREAM: bool = True             # token-level streaming + incremental JSON parsing
+    LLM_HEDGE: bool = True              # race a second configured provider when the first runs late
+    LLM_HEDGE_PERCENTILE: float = 95.0  # hedge deadline = this latency percentile of the first provider
+    LLM_HEDGE_DELAY_S: float = 3.0      # deadline until a provider has enough latency samples
+    LLM_HEDGE_MIN_DELAY_S: float = 0.25
+    LLM_BREAKER_FAILURES: int = 3       # consecutive failures that open a provider's circuit
+    LLM_BREAKER_COOLDOWN_S: float = 30.0
+    LLM_MICROBATCH: bool = True         # share one provider call between concurrent curation requests
+    LLM_MICROBATCH_WINDOW_MS: float = 5.0
+    LLM_MICROBATCH_MAX: int = 4         # destinations per batched prompt (bounded by completion size)
+    SPOT_CACHE_ENABLED: bool = True
+    SPOT_CACHE_PATH: str = str(ROOT / ".cache" / "spots.sqlite3")
+    SPOT_CACHE_TTL_S: float = 7 * 24 * 3600.0   # curated spots change slowly
+    SPOT_CACHE_MAX_ENTRIES: int = 5000
+    PLAN_CACHE_ENABLED: bool = True     # whole-plan responses for POST /plan (in memory, ETag)
+    PLAN_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    PLAN_CACHE_TTL_S: float = 3600.0
+    PLAN_STORE_ENABLED: bool = True     # append finished plans + traces to a segmented log (background writer)
+    PLAN_STORE_DIR: str = str(ROOT / ".cache" / "plans")
+    PLAN_STORE_SEGMENT_BYTES: int = 64 * 1024 * 1024  # rotate to a new segment past this size
+    PLAN_STORE_QUEUE_MAX: int = 1000    # queued plans before new ones are dropped (never blocks a request)
+    PLAN_STORE_BATCH: int = 64          # plans per write transaction
+    PLAN_STORE_FLUSH_MS: float = 200.0  # longest a queued plan waits for its batch to fill
+    PLAN_STORE_API: bool = False        # serve GET /plans* (stored requests are user data: off by default)
+    PLAN_STORE_API_TOKEN: Optional[str] = None  # when set, the read API requires "Authorization: Bearer <token>"
+    HTTP_TIMEOUT_S: float = 60.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE: int = 20
+    HTTP_KEEPALIVE_EXPIRY_S: float = 30.0
+    HTTP2: bool = False                 # needs the optional 'h2' package
+    RESPONSE_COMPRESSION: bool = True   # gzip/br plan bodies for clients that accept it
+    RESPONSE_COMPRESS_MIN_BYTES: int = 1024
+    PREWARM: bool = True                # build provider client, caches and validators in the app lifespan
+    CURATION_SUPERSET_ITEMS: int = 30   # day-independent ranked spots fetched per destination + interests
+    CURATION_SPOTS_PER_DAY: int = 4     # prefix of the superset handed to the Planner per trip day
+    CURATION_MAX_SPOTS: int = 120       # spots handed to the Planner at most (30 days x 4)
+    CURATION_SHARD_ITEMS: int = 15      # spots per focused shard call when a trip needs more than the superset
+    CURATION_MAX_SHARDS: int = 8
+    CURATION_SHARD_CONCURRENCY: int = 8  # shard calls in flight per curation
+    CATALOGUE_ENABLED: bool = True      # serve known destinations offline before asking the LLM
+    CATALOGUE_PATH: str = str(ROOT / ".cache" / "catalogue.bin")
+    CATALOGUE_MIN_SPOTS: int = 6        # fewer matches than this counts as a miss
+    PLANNER_DAILY_HOURS: float = 8.0    # scheduler capacity per day (visits only)
+    BUDGET_DAILY_BASE: float = 100.0    # USD per person per day before entry prices (stay, meals, transit)
+    BUDGET_MODE: str = "best"           # fit to budget_total: "best" (most value) | "cheapest"
+    ROUTING_ENABLED: bool = True        # order each day's stops by travel time (offline gazetteer)
+    ROUTING_WALK_KMH: float = 4.5
+    ROUTING_WALK_MAX_KM: float = 1.5    # street distance walked; longer legs take transit
+    ROUTING_TRANSIT_KMH: float = 20.0
+    ROUTING_TRANSIT_OVERHEAD_MIN: float = 8.0  # per transit leg: walk to the stop, wait, transfer
+    ORCHESTRATOR: str = "react"         # default strategy: "react" | "graph"
+    PLAN_DEADLINE_S: float = 30.0       # end-to-end budget of /plan and /plan/stream (0 = none)
+    PLAN_DEADLINE_RESERVE_S: float = 0.5  # kept for Planner/Critic/Budget when LLM curation is abandoned
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_INFLIGHT: int = 32    # plans running per worker process
+    ADMISSION_PROVIDER_MAX_INFLIGHT: int = 16  # LLM calls in flight per provider per worker
+    ADMISSION_MAX_QUEUE: int = 64       # waiters per scope before 429
+    ADMISSION_QUEUE_TIMEOUT_S: float = 10.0    # interactive wait before 503
+    ADMISSION_BATCH_TIMEOUT_S: float = 120.0   # batch items may wait longer
+    BATCH_CONCURRENCY: int = 8          # plans in flight per batch (CLI / /plan/batch)
+    BATCH_MAX_ITEMS: int = 1000         # per /plan/batch request
+
+_ENV_KEYS = [f.name for f in fields(Settings)]
 
 _CACHE: Dict[str, Any] = {"mtime": None, "settings": None}
 
+def _dotenv() -> Any:
+    # python-dotenv is optional and only needed when a .env file is present
+    try:
+        from dotenv import dotenv_values
+    except Exception:
+        return None
+    return dotenv_values
+
 def _load_env_map() -> Dict[str, str]:
     # Prefer .env (if exists), else fall back to process env
     env_map: Dict[str, str] = {}
-    if ENV_PATH.exists() and dotenv_values:
-        env_map = {k: v for k, v in dotenv_values(str(ENV_PATH)).items() if v is not None}  # type: ignore
+    dotenv_values = _dotenv() if ENV_PATH.exists() else None
+    if dotenv_values:
+        env_map = {k: v for k, v in dotenv_values(str(ENV_PATH)).items() if v is not None}
     else:
-        for k in ["PROVIDER", "OPENAI_API_KEY", "OPENAI_MODEL", "OLLAMA_HOST", "OLLAMA_MODEL", "LLM_TEMPERATURE"]:
+        for k in _ENV_KEYS:
             if k in os.environ:
                 env_map[k] = os.environ[k]
     return env_map
 
+def _as_bool(v: str) -> bool:
+    return str(v).strip().lower() in {"1", "true", "yes", "on"}
+
 def _build_settings(env: Dict[str, str]) -> Settings:
     return Settings(
         PROVIDER=env.get("PROVIDER", "auto").lower(),
         OPENAI_API_KEY=env.get("OPENAI_API_KEY"),
         OPENAI_MODEL=env.get("OPENAI_MODEL", "gpt-4o-mini"),
+        OPENAI_BASE_URL=env.get("OPENAI_BASE_URL", Settings.OPENAI_BASE_URL),
         OLLAMA_HOST=env.get("OLLAMA_HOST"),
         OLLAMA_MODEL=env.get("OLLAMA_MODEL", "llama3.1"),
         LLM_TEMPERATURE=float(env.get("LLM_TEMPERATURE", "0.35")),
+        LLM_STREAM=_as_bool(env.get("LLM_STREAM", "true")),
+        LLM_HEDGE=_as_bool(env.get("LLM_HEDGE", "true")),
+        LLM_HEDGE_PERCENTILE=float(env.get("LLM_HEDGE_PERCENTILE", Settings.LLM_HEDGE_PERCENTILE)),
+        LLM_HEDGE_DELAY_S=float(env.get("LLM_HEDGE_DELAY_S", Settings.LLM_HEDGE_DELAY_S)),
+        LLM_HEDGE_MIN_DELAY_S=float(env.get("LLM_HEDGE_MIN_DELAY_S", Settings.LLM_HEDGE_MIN_DELAY_S)),
+        LLM_BREAKER_FAILURES=int(env.get("LLM_BREAKER_FAILURES", Settings.LLM_BREAKER_FAILURES)),
+        LLM_BREAKER_COOLDOWN_S=float(env.get("LLM_BREAKER_COOLDOWN_S", Settings.LLM_BREAKER_COOLDOWN_S)),
+        LLM_MICROBATCH=_as_bool(env.get("LLM_MICROBATCH", "true")),
+        LLM_MICROBATCH_WINDOW_MS=float(env.get("LLM_MICROBATCH_WINDOW_MS", Settings.LLM_MICROBATCH_WINDOW_MS)),
+        LLM_MICROBATCH_MAX=int(env.get("LLM_MICROBATCH_MAX", Settings.LLM_MICROBATCH_MAX)),
+        SPOT_CACHE_ENABLED=_as_bool(env.get("SPOT_CACHE_ENABLED", "true")),
+        SPOT_CACHE_PATH=env.get("SPOT_CACHE_PATH", Settings.SPOT_CACHE_PATH),
+        SPOT_CACHE_TTL_S=float(env.get("SPOT_CACHE_TTL_S", Settings.SPOT_CACHE_TTL_S)),
+        SPOT_CACHE_MAX_ENTRIES=int(env.get("SPOT_CACHE_MAX_ENTRIES", Settings.SPOT_CACHE_MAX_ENTRIES)),
+        PLAN_CACHE_ENABLED=_as_bool(env.get("PLAN_CACHE_ENABLED", "true")),
+        PLAN_CACHE_MAX_BYTES=int(env.get("PLAN_CACHE_MAX_BYTES", Settings.PLAN_CACHE_MAX_BYTES)),
+        PLAN_CACHE_TTL_S=float(env.get("PLAN_CACHE_TTL_S", Settings.PLAN_CACHE_TTL_S)),
+        PLAN_STORE_ENABLED=_as_bool(env.get("PLAN_STORE_ENABLED", "true")),
+        PLAN_STORE_DIR=env.get("PLAN_STORE_DIR", Settings.PLAN_STORE_DIR),
+        PLAN_STORE_SEGMENT_BYTES=int(env.get("PLAN_STORE_SEGMENT_BYTES", Settings.PLAN_STORE_SEGMENT_BYTES)),
+        PLAN_STORE_QUEUE_MAX=int(env.get("PLAN_STORE_QUEUE_MAX", Settings.PLAN_STORE_QUEUE_MAX)),
+        PLAN_STORE_BATCH=int(env.get("PLAN_STORE_BATCH", Settings.PLAN_STORE_BATCH)),
+        PLAN_STORE_FLUSH_MS=float(env.get("PLAN_STORE_FLUSH_MS", Settings.PLAN_STORE_FLUSH_MS)),
+        PLAN_STORE_API=_as_bool(env.get("PLAN_STORE_API", "false")),
+        PLAN_STORE_API_TOKEN=env.get("PLAN_STORE_API_TOKEN") or None,
+        HTTP_TIMEOUT_S=float(env.get("HTTP_TIMEOUT_S", Settings.HTTP_TIMEOUT_S)),
+        HTTP_MAX_CONNECTIONS=int(env.get("HTTP_MAX_CONNECTIONS", Settings.HTTP_MAX_CONNECTIONS)),
+        HTTP_MAX_KEEPALIVE=int(env.get("HTTP_MAX_KEEPALIVE", Settings.HTTP_MAX_KEEPALIVE)),
+        HTTP_KEEPALIVE_EXPIRY_S=float(env.get("HTTP_KEEPALIVE_EXPIRY_S", Settings.HTTP_KEEPALIVE_EXPIRY_S)),
+        HTTP2=_as_bool(env.get("HTTP2", "false")),
+        RESPONSE_COMPRESSION=_as_bool(env.get("RESPONSE_COMPRESSION", "true")),
+        RESPONSE_COMPRESS_MIN_BYTES=int(env.get("RESPONSE_COMPRESS_MIN_BYTES", Settings.RESPONSE_COMPRESS_MIN_BYTES)),
+        PREWARM=_as_bool(env.get("PREWARM", "true")),
+        CURATION_SUPERSET_ITEMS=int(env.get("CURATION_SUPERSET_ITEMS", Settings.CURATION_SUPERSET_ITEMS)),
+        CURATION_SPOTS_PER_DAY=int(env.get("CURATION_SPOTS_PER_DAY", Settings.CURATION_SPOTS_PER_DAY)),
+        CURATION_MAX_SPOTS=int(env.get("CURATION_MAX_SPOTS", Settings.CURATION_MAX_SPOTS)),
+        CURATION_SHARD_ITEMS=int(env.get("CURATION_SHARD_ITEMS", Settings.CURATION_SHARD_ITEMS)),
+        CURATION_MAX_SHARDS=int(env.get("CURATION_MAX_SHARDS", Settings.CURATION_MAX_SHARDS)),
+        CURATION_SHARD_CONCURRENCY=int(env.get("CURATION_SHARD_CONCURRENCY", Settings.CURATION_SHARD_CONCURRENCY)),
+        CATALOGUE_ENABLED=_as_bool(env.get("CATALOGUE_ENABLED", "true")),
+        CATALOGUE_PATH=env.get("CATALOGUE_PATH", Settings.CATALOGUE_PATH),
+        CATALOGUE_MIN_SPOTS=int(env.get("CATALOGUE_MIN_SPOTS", Settings.CATALOGUE_MIN_SPOTS)),
+        PLANNER_DAILY_HOURS=float(env.get("PLANNER_DAILY_HOURS", Settings.PLANNER_DAILY_HOURS)),
+        BUDGET_DAILY_BASE=float(env.get("BUDGET_DAILY_BASE", Settings.BUDGET_DAILY_BASE)),
+        BUDGET_MODE=env.get("BUDGET_MODE", Settings.BUDGET_MODE).lower(),
+        ROUTING_ENABLED=_as_bool(env.get("ROUTING_ENABLED", "true")),
+        ROUTING_WALK_KMH=float(env.get("ROUTING_WALK_KMH", Settings.ROUTING_WALK_KMH)),
+        ROUTING_WALK_MAX_KM=float(env.get("ROUTING_WALK_MAX_KM", Settings.ROUTING_WALK_MAX_KM)),
+        ROUTING_TRANSIT_KMH=float(env.get("ROUTING_TRANSIT_KMH", Settings.ROUTING_TRANSIT_KMH)),
+        ROUTING_TRANSIT_OVERHEAD_MIN=float(
+            env.get("ROUTING_TRANSIT_OVERHEAD_MIN", Settings.ROUTING_TRANSIT_OVERHEAD_MIN)
+        ),
+        ORCHESTRATOR=env.get("ORCHESTRATOR", Settings.ORCHESTRATOR).lower(),
+        PLAN_DEADLINE_S=float(env.get("PLAN_DEADLINE_S", Settings.PLAN_DEADLINE_S)),
+        PLAN_DEADLINE_RESERVE_S=float(env.get("PLAN_DEADLINE_RESERVE_S", Settings.PLAN_DEADLINE_RESERVE_S)),
+        ADMISSION_ENABLED=_as_bool(env.get("ADMISSION_ENABLED", "true")),
+        ADMISSION_MAX_INFLIGHT=int(env.get("ADMISSION_MAX_INFLIGHT", Settings.ADMISSION_MAX_INFLIGHT)),
+        ADMISSION_PROVIDER_MAX_INFLIGHT=int(
+            env.get("ADMISSION_PROVIDER_MAX_INFLIGHT", Settings.ADMISSION_PROVIDER_MAX_INFLIGHT)
+        ),
+        ADMISSION_MAX_QUEUE=int(env.get("ADMISSION_MAX_QUEUE", Settings.ADMISSION_MAX_QUEUE)),
+        ADMISSION_QUEUE_TIMEOUT_S=float(env.get("ADMISSION_QUEUE_TIMEOUT_S", Settings.ADMISSION_QUEUE_TIMEOUT_S)),
+        ADMISSION_BATCH_TIMEOUT_S=float(env.get("ADMISSION_BATCH_TIMEOUT_S", Settings.ADMISSION_BATCH_TIMEOUT_S)),
+        BATCH_CONCURRENCY=int(env.get("BATCH_CONCURRENCY", Settings.BATCH_CONCURRENCY)),
+        BATCH_MAX_ITEMS=int(env.get("BATCH_MAX_ITEMS", Settings.BATCH_MAX_ITEMS)),
     )
 
 def get_settings() -> Settings:
@@ -55,20 +192,47 @@ def get_settings() -> Settings:
         env_map = _load_env_map()
         _CACHE["settings"] = _build_settings(env_map)
         _CACHE["mtime"] = mtime
-    return _CACHE["settings"]
+    settings: Settings = _CACHE["settings"]
+    return settings
+
+def override_settings(base: Optional[Settings] = None, **changes: Any) -> Settings:
+    """
+    Install `base` (default: the current Settings) with `changes` applied, for scripts,
+    benchmarks and tests; returns the Settings it replaced, so `override_settings(previous)`
+    restores them. Lasts until backend/.env changes.
+    """
+    previous = get_settings()
+    _CACHE["settings"] = replace(base or previous, **changes)
+    return previous
 
 def choose_llm(s: Settings) -> Optional[Tuple[str, Dict[str, str]]]:
     """
-    Return ('openai', {'model':..., 'api_key':...}) or ('ollama', {'model':..., 'host':...}) or None.
+    Return ('openai', {'model':..., 'api_key':..., 'base_url':...}) or ('ollama', {'model':..., 'host':...}) or None.
     Honors s.PROVIDER = 'openai' | 'ollama' | 'auto'.
     """
     provider = (s.PROVIDER or "auto").lower()
     if provider == "openai" or (provider == "auto" and s.OPENAI_API_KEY):
         if not s.OPENAI_API_KEY:
             return None
-        return ("openai", {"model": s.OPENAI_MODEL, "api_key": s.OPENAI_API_KEY})
+        return ("openai", {"model": s.OPENAI_MODEL, "api_key": s.OPENAI_API_KEY, "base_url": s.OPENAI_BASE_URL})
     if provider == "ollama" or (provider == "auto" and s.OLLAMA_HOST):
         if not s.OLLAMA_HOST:
             return None
         return ("ollama", {"model": s.OLLAMA_MODEL, "host": s.OLLAMA_HOST})
     return None
+
+def llm_backends(s: Settings) -> List[Tuple[str, Dict[str, str]]]:
+    """
+    Every usable provider, preferred one (choose_llm) first. With LLM_HEDGE the
+    others are hedge/failover targets for the router in utils/router.py.
+    """
+    picked = choose_llm(s)
+    if not picked:
+        return []
+    out = [picked]
+    if s.LLM_HEDGE:
+        if picked[0] != "openai" and s.OPENAI_API_KEY:
+            out.append(("openai", {"model": s.OPENAI_MODEL, "api_key": s.OPENAI_API_KEY, "base_url": s.OPENAI_BASE_URL}))
+        if picked[0] != "ollama" and s.OLLAMA_HOST:
+            out.append(("ollama", {"model": s.OLLAMA_MODEL, "host": s.OLLAMA_HOST}))
+    return out
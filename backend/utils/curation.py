@@ -0,0 +1,207 @@
+"""
+Request canonicalization and superset reuse for destination curation.
+
+One day-independent, ranked superset of spots (CURATION_SUPERSET_ITEMS) is fetched
+per destination + canonical interest set; trip length and interest subsets are then
+derived locally: `spots_for_days` slices a prefix, and a request whose interests are a
+strict subset of an already cached set re-ranks that superset instead of calling the
+LLM again. So "Paris, [art, cafes], 3 days" and "paris, [cafes, Art], 4 days" share
+one provider call, and "Paris, [art]" reuses it too.
+
+Trips that need more spots than the superset holds (CURATION_SPOTS_PER_DAY per day)
+add focused shards: concurrent calls of CURATION_SHARD_ITEMS spots each, one per
+interest and then per spot category, that run alongside the superset call and are
+merged into it (deduplicated by canonical title). A 30-day trip thus costs about the
+wall-clock of a 3-day one, and every shard is cached on its own.
+"""
+from __future__ import annotations
+import asyncio
+import itertools
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from .cache import cached_ranked_spots, get_spot_cache, normalize_destination, normalize_interests, spot_cache_key
+from .config import choose_llm, get_settings
+from .metrics import CACHE_REQUESTS
+from .similarity import normalize_title
+
+MIN_SPOTS = 12  # never hand the Planner fewer candidates than the old fixed request size
+
+# interest (as users type it) -> spot categories that satisfy it
+_INTEREST_CATEGORIES: Dict[str, Set[str]] = {
+    "art": {"museum", "gallery"}, "museums": {"museum"}, "museum": {"museum"}, "galleries": {"gallery"},
+    "history": {"landmark", "museum"}, "architecture": {"landmark"}, "culture": {"museum", "landmark"},
+    "food": {"market", "cafe"}, "markets": {"market"}, "cafes": {"cafe"}, "cafe": {"cafe"}, "coffee": {"cafe"},
+    "nature": {"park", "viewpoint"}, "parks": {"park"}, "views": {"viewpoint"}, "outdoors": {"park", "viewpoint"},
+    "neighborhoods": {"neighborhood"}, "walking": {"neighborhood", "park"},
+    "shopping": {"market", "neighborhood"}, "nightlife": {"neighborhood"},
+}
+
+# spot category -> focus of a shard call for long trips, in the order shards are added
+_CATEGORY_FOCUS: Dict[str, str] = {
+    "museum": "museums and collections", "landmark": "landmarks, architecture and historic sites",
+    "neighborhood": "neighborhoods and streets to wander", "market": "markets and food halls",
+    "park": "parks and gardens", "gallery": "galleries and art spaces",
+    "cafe": "cafes, bakeries and casual food", "viewpoint": "viewpoints and scenic spots",
+}
+_EXTRA_FOCUS = ["lesser-known local favourites", "evening and nightlife", "day trips within easy reach"]
+
+
+def canonical_interests(interests: Sequence[str] | None) -> Tuple[str, ...]:
+    return tuple(normalize_interests(interests))
+
+
+def spots_for_days(days: int) -> int:
+    """How many ranked spots a trip of `days` gets (superset prefix, plus shards past its size)."""
+    s = get_settings()
+    return min(max(MIN_SPOTS, int(days) * s.CURATION_SPOTS_PER_DAY), s.CURATION_MAX_SPOTS)
+
+
+def _matches(spot: Dict[str, Any], interest: str) -> bool:
+    if spot.get("category") in _INTEREST_CATEGORIES.get(interest, ()):
+        return True
+    stem = interest[:-1] if interest.endswith("s") and len(interest) > 3 else interest
+    text = " ".join(str(spot.get(k) or "") for k in ("title", "category", "reason_short")).casefold()
+    return stem in text
+
+
+def rank_for_interests(spots: Sequence[Dict[str, Any]], interests: Sequence[str]) -> List[Dict[str, Any]]:
+    """Spots matching more of `interests` first; ties keep the superset's (LLM) order."""
+    if not interests:
+        return list(spots)
+    scored = [(-sum(_matches(sp, i) for i in interests), n, sp) for n, sp in enumerate(spots)]
+    return [sp for _, _, sp in sorted(scored, key=lambda t: (t[0], t[1]))]
+
+# -------------------- Superset index --------------------
+
+class SupersetIndex:
+    """
+    Which interest sets have a cached superset per destination (in-process; the spots
+    themselves live in the SpotCache). Bounded to `max_destinations`, LRU.
+    """
+
+    def __init__(self, max_destinations: int) -> None:
+        self.max_destinations = max(int(max_destinations), 1)
+        self._sets: "OrderedDict[str, Set[FrozenSet[str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, destination: str, interests: Tuple[str, ...]) -> None:
+        with self._lock:
+            self._sets.setdefault(destination, set()).add(frozenset(interests))
+            self._sets.move_to_end(destination)
+            while len(self._sets) > self.max_destinations:
+                self._sets.popitem(last=False)
+
+    def discard(self, destination: str, interests: FrozenSet[str]) -> None:
+        with self._lock:
+            self._sets.get(destination, set()).discard(interests)
+
+    def covering(self, destination: str, interests: Tuple[str, ...]) -> List[FrozenSet[str]]:
+        """Cached interest sets that strictly contain `interests`, most focused first ([] if it has its own)."""
+        want = frozenset(interests)
+        with self._lock:
+            sets = self._sets.get(destination, set())
+            found = [] if want in sets else [t for t in sets if want < t]
+        return sorted(found, key=lambda t: (len(t), sorted(t)))
+
+
+_INDEX: Dict[str, Optional[SupersetIndex]] = {"index": None}
+
+
+def _index() -> SupersetIndex:
+    index = _INDEX["index"]
+    if index is None:
+        index = _INDEX["index"] = SupersetIndex(get_settings().SPOT_CACHE_MAX_ENTRIES)
+    return index
+
+
+async def _from_covering(destination: str, interests: Tuple[str, ...]) -> Optional[Tuple[List[Dict[str, Any]], str]]:
+    """A cached superset for a wider interest set, re-ranked for `interests` (None if there is none)."""
+    s = get_settings()
+    picked = choose_llm(s)
+    cache = get_spot_cache()
+    if not interests or not picked or cache is None:
+        return None
+    dest = normalize_destination(destination)
+    for wider in _index().covering(dest, interests):
+        key = spot_cache_key(dest, sorted(wider), None, None, picked[0], picked[1]["model"],
+                             s.LLM_TEMPERATURE, s.CURATION_SUPERSET_ITEMS)
+        spots = await asyncio.to_thread(cache.get, key)
+        if spots is None:  # expired / evicted since it was indexed
+            _index().discard(dest, wider)
+            continue
+        return rank_for_interests(spots, interests), ", ".join(sorted(wider))
+    return None
+
+
+async def curated_superset(
+    destination: str, interests: Sequence[str] | None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Ranked, day-independent superset for destination + interests, and cache info
+    (status 'hit' | 'miss' | 'coalesced' | 'bypass' as in cached_ranked_spots, or
+    'derived' when re-ranked from a cached superset of a wider interest set).
+    """
+    canon = canonical_interests(interests)
+    derived = await _from_covering(destination, canon)
+    if derived is not None:
+        spots, wider = derived
+        CACHE_REQUESTS.inc(cache="superset", status="derived")
+        return spots, {"status": "derived", "from_interests": wider}
+    spots, info = await cached_ranked_spots(
+        destination=destination, interests=canon, days=None, max_items=get_settings().CURATION_SUPERSET_ITEMS
+    )
+    if spots and info["status"] != "bypass":
+        _index().add(normalize_destination(destination), canon)
+    return spots, info
+
+# -------------------- Shards for long trips --------------------
+
+def shard_focuses(interests: Sequence[str] | None, n: int) -> List[str]:
+    """Focus of each shard call needed to reach `n` spots ([] when the superset is enough)."""
+    s = get_settings()
+    missing = n - s.CURATION_SUPERSET_ITEMS
+    if missing <= 0 or s.CURATION_SHARD_ITEMS <= 0:
+        return []
+    # ask for a quarter more than missing: shards overlap each other and the superset
+    count = min(math.ceil(missing * 1.25 / s.CURATION_SHARD_ITEMS), s.CURATION_MAX_SHARDS)
+    canon = canonical_interests(interests)
+    wanted = [c for i in canon for c in sorted(_INTEREST_CATEGORIES.get(i, ()))]
+    focuses = list(canon) + [_CATEGORY_FOCUS[c] for c in wanted] + list(_CATEGORY_FOCUS.values()) + _EXTRA_FOCUS
+    return list(dict.fromkeys(focuses))[:count]
+
+
+async def curated_shards(
+    destination: str, interests: Sequence[str] | None, focuses: Sequence[str]
+) -> List[List[Dict[str, Any]]]:
+    """Spots per focus, fetched concurrently (CURATION_SHARD_CONCURRENCY); a failed shard is []."""
+    if not focuses:
+        return []
+    s = get_settings()
+    canon = canonical_interests(interests)
+    gate = asyncio.Semaphore(max(s.CURATION_SHARD_CONCURRENCY, 1))
+
+    async def shard(focus: str) -> List[Dict[str, Any]]:
+        async with gate:
+            spots, _ = await cached_ranked_spots(
+                destination=destination, interests=canon, days=None, max_items=s.CURATION_SHARD_ITEMS, focus=focus
+            )
+        return spots
+
+    results = await asyncio.gather(*(shard(f) for f in focuses), return_exceptions=True)
+    return [r if isinstance(r, list) else [] for r in results]
+
+
+def merge_ranked(head: Sequence[Dict[str, Any]], shards: Sequence[Sequence[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """`head` in order, then the shards round-robin (rank 1 of each, rank 2 of each, ...), first title wins."""
+    out: List[Dict[str, Any]] = []
+    seen: Set[str] = set()
+    tail = [sp for rank in itertools.zip_longest(*shards) for sp in rank if sp is not None]
+    for sp in itertools.chain(head, tail):
+        key = normalize_title(str(sp.get("title") or "")) or str(sp.get("title") or "").casefold()
+        if key and key not in seen:
+            seen.add(key)
+            out.append(sp)
+    return out
@@ -0,0 +1,95 @@
+"""
+Per-request deadlines.
+
+A route opens a deadline scope when the request arrives (PLAN_DEADLINE_S, or less if
+the client sends X-Deadline-Ms). The deadline lives in a ContextVar, so it follows the
+plan into every task the orchestrator starts: stages, graph nodes, curation shards,
+hedged provider calls. Nested scopes only ever tighten it.
+
+Only provider fetches are awaited through `within()`; local lookups (catalogue, spot
+cache) always run. When the deadline passes, the awaited fetch is cancelled: in-flight
+provider requests are closed and the router counts them as cancelled, not as provider
+failures, so a deadline never trips a circuit breaker. The caller then degrades
+(DestinationLLMAgent.propose keeps what it has and the Planner falls back to generic
+activities).
+
+Work shared between requests (utils.cache.SingleFlight) runs under the deadline of the
+request that started it; each caller bounds only its own wait. A plan run is only shared
+under the server's deadline: a caller with a shorter one of its own (X-Deadline-Ms)
+never starts a shared run (utils.plan_cache.cached_plan).
+"""
+from __future__ import annotations
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+from .config import get_settings
+
+T = TypeVar("T")
+
+# absolute time.monotonic() deadline of the plan running in this context
+_DEADLINE: ContextVar[Optional[float]] = ContextVar("voyagecraft_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline ran out before the awaited work finished."""
+
+
+def remaining() -> Optional[float]:
+    """Seconds left (<= 0 once passed), or None when no deadline is set."""
+    deadline = _DEADLINE.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired(reserve: float = 0.0) -> bool:
+    left = remaining()
+    return left is not None and left <= reserve
+
+
+def planning_reserve(budget: Optional[float]) -> float:
+    """Seconds of `budget` kept for the Planner/Critic/Budget: PLAN_DEADLINE_RESERVE_S, at most half of it."""
+    reserve = get_settings().PLAN_DEADLINE_RESERVE_S
+    return reserve if budget is None else max(0.0, min(reserve, budget / 2.0))
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    Bound the current context to `seconds` from now (None: leave it as is). A deadline
+    already set further up is kept if it is sooner. Yields the seconds in force.
+    """
+    current = _DEADLINE.get()
+    if seconds is not None:
+        at = time.monotonic() + seconds
+        current = at if current is None else min(current, at)
+    token = _DEADLINE.set(current)
+    try:
+        yield remaining()
+    finally:
+        _DEADLINE.reset(token)
+
+
+async def within(aw: Awaitable[T], reserve: float = 0.0, limit: Optional[float] = None) -> T:
+    """
+    Await `aw` until `reserve` seconds before the deadline, cancelling it and raising
+    DeadlineExceeded if it is not done by then. `limit` (seconds from now) bounds this
+    wait too without becoming the deadline of `aw`. Without either, just await it.
+    """
+    left = remaining()
+    if limit is not None:
+        left = limit if left is None else min(left, limit)
+    if left is None:
+        return await aw
+    if left - reserve <= 0:
+        if asyncio.iscoroutine(aw):
+            aw.close()  # never started
+        raise DeadlineExceeded("deadline passed before the work started")
+    t0 = time.monotonic()
+    try:
+        return await asyncio.wait_for(aw, left - reserve)
+    except asyncio.TimeoutError:
+        if time.monotonic() < t0 + left - reserve - 1e-3:
+            raise  # a timeout of the work itself, not ours
+        raise DeadlineExceeded(f"deadline passed after {left - reserve:.3f}s") from None
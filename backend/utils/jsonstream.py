@@ -0,0 +1,106 @@
+from __future__ import annotations
+import json
+from typing import Any, Dict, Iterable, List
+
+_WS = " \t\r\n"
+
+
+class JsonArrayStream:
+    """
+    Incremental, single-pass parser for a JSON array of objects embedded in free text.
+
+    Feed it text chunks as they arrive (e.g. LLM token deltas); each call returns the
+    objects whose closing brace arrived in that chunk. Leading/trailing prose and
+    markdown fences are skipped: the parser locks onto the first '[' that opens an
+    array of objects ('[' followed by '{' or ']') and ignores anything else.
+    Malformed elements are dropped without aborting the rest of the array.
+    """
+
+    def __init__(self) -> None:
+        self._phase = "seek"       # seek -> open (just saw '[') -> array -> done
+        self._depth = 0            # nesting depth inside the current element
+        self._in_str = False
+        self._esc = False
+        self._elem: List[str] = []  # chunks of the element being collected
+        self._elem_start = -1       # start index of the element within the current chunk
+
+    @property
+    def done(self) -> bool:
+        return self._phase == "done"
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        if not chunk or self._phase == "done":
+            return out
+        self._elem_start = 0 if self._depth else -1
+        i, n = 0, len(chunk)
+        while i < n:
+            c = chunk[i]
+            if self._phase == "seek":
+                j = chunk.find("[", i)
+                if j < 0:
+                    break
+                self._phase, i = "open", j + 1
+                continue
+            if self._phase == "open":
+                if c in _WS:
+                    pass
+                elif c == "{":
+                    self._phase = "array"
+                    continue  # re-handle '{' as the start of an element
+                elif c == "]":
+                    self._phase = "done"
+                    break
+                else:
+                    self._phase = "seek"  # '[' was prose (e.g. "[note]"), keep looking
+                    continue
+            elif self._depth == 0:
+                # between elements of the array
+                if c == "{":
+                    self._depth, self._elem_start = 1, i
+                    self._in_str = self._esc = False
+                elif c == "]":
+                    self._phase = "done"
+                    break
+            elif self._in_str:
+                if self._esc:
+                    self._esc = False
+                elif c == "\\":
+                    self._esc = True
+                elif c == '"':
+                    self._in_str = False
+            elif c == '"':
+                self._in_str = True
+            elif c in "{[":
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._elem.append(chunk[self._elem_start:i + 1])
+                    obj = self._decode("".join(self._elem))
+                    self._elem.clear()
+                    if obj is not None:
+                        out.append(obj)
+            i += 1
+        if self._depth and self._elem_start >= 0:
+            self._elem.append(chunk[self._elem_start:])
+        return out
+
+    @staticmethod
+    def _decode(text: str) -> Dict[str, Any] | None:
+        try:
+            obj = json.loads(text)
+        except ValueError:
+            return None
+        return obj if isinstance(obj, dict) else None
+
+
+def parse_json_objects(chunks: Iterable[str]) -> List[Dict[str, Any]]:
+    """Parse a complete (possibly chunked) text and return every object of its first array."""
+    parser = JsonArrayStream()
+    out: List[Dict[str, Any]] = []
+    for chunk in chunks:
+        out.extend(parser.feed(chunk))
+        if parser.done:
+            break
+    return out
@@ -1,58 +1,254 @@
 from __future__ import annotations
-from .config import get_settings, choose_llm
+from .config import get_settings, choose_llm, llm_backends
 import json
-import re
-from typing import Any, Dict, List, Sequence
-import httpx
+import time
+from contextlib import aclosing
+from functools import partial
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Dict, List, Optional, Sequence, Tuple
+from .jsonstream import JsonArrayStream, parse_json_objects
+from .metrics import LLM_TOKENS
+from .router import ROUTER, Backend
+from .spots import activity_string
+from .trace import annotate, current_span, span
+
+if TYPE_CHECKING:  # httpx is imported on first use, so runs without a provider never load it
+    import httpx
+
+# -------------------- Pooled HTTP client --------------------
+
+_HTTP: Dict[str, Optional[httpx.AsyncClient]] = {"client": None}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    import httpx
+
+    s = get_settings()
+    limits = httpx.Limits(
+        max_connections=s.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=s.HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=s.HTTP_KEEPALIVE_EXPIRY_S,
+    )
+    return httpx.AsyncClient(
+        limits=limits,
+        timeout=httpx.Timeout(s.HTTP_TIMEOUT_S, connect=min(10.0, s.HTTP_TIMEOUT_S)),
+        http2=s.HTTP2 and _http2_available(),  # HTTP/2 needs the optional 'h2' package
+    )
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """Create the shared, pooled AsyncClient (called from the FastAPI lifespan)."""
+    return get_http_client()
+
+
+async def close_http_client() -> None:
+    client, _HTTP["client"] = _HTTP["client"], None
+    if client is not None:
+        await client.aclose()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient, creating it lazily for callers outside the app
+    lifespan (CLI, scripts). Connections are kept alive and reused across calls.
+    """
+    client = _HTTP["client"]
+    if client is None or client.is_closed:
+        client = _HTTP["client"] = _build_http_client()
+    return client
 
 # -------------------- Provider calls --------------------
 
-def _openai_chat(system: str, user: str, model: str, api_key: str, temperature: float = 0.3) -> str:
-    url = "https://api.openai.com/v1/chat/completions"
+def _record_usage(provider: str, prompt: Any, completion: Any) -> None:
+    """Token counts reported by the provider -> current trace span + /metrics."""
+    for direction, n in (("prompt", prompt), ("completion", completion)):
+        if isinstance(n, int) and n >= 0:
+            annotate(**{f"{direction}_tokens": n})
+            LLM_TOKENS.inc(n, provider=provider, direction=direction)
+
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+
+async def _openai_chat(
+    system: str, user: str, model: str, api_key: str, temperature: float = 0.3, base_url: str = OPENAI_BASE_URL
+) -> str:
+    url = f"{base_url.rstrip('/')}/chat/completions"
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
     payload = {
         "model": model,
         "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
         "temperature": temperature,
     }
-    r = httpx.post(url, headers=headers, json=payload, timeout=60)
+    r = await get_http_client().post(url, headers=headers, json=payload)
     r.raise_for_status()
     data = r.json()
-    return data["choices"][0]["message"]["content"]  # type: ignore[index]
+    usage = data.get("usage") or {}
+    _record_usage("openai", usage.get("prompt_tokens"), usage.get("completion_tokens"))
+    content: str = data["choices"][0]["message"]["content"]
+    return content
 
 
-def _ollama_chat(system: str, user: str, model: str, host: str, temperature: float = 0.3) -> str:
+async def _ollama_chat(system: str, user: str, model: str, host: str, temperature: float = 0.3) -> str:
     # Ollama HTTP API
     url = f"{host.rstrip('/')}/api/chat"
     payload = {
         "model": model,
         "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
         "options": {"temperature": temperature},
+        "stream": False,
     }
-    r = httpx.post(url, json=payload, timeout=60)
+    r = await get_http_client().post(url, json=payload)
     r.raise_for_status()
     data = r.json()
+    if isinstance(data, dict):
+        _record_usage("ollama", data.get("prompt_eval_count"), data.get("eval_count"))
     if isinstance(data, dict) and "message" in data and "content" in data["message"]:
-        return data["message"]["content"]
-    return data.get("content", "")
+        content: str = data["message"]["content"]
+    else:
+        content = data.get("content", "")
+    return content
+
+async def _openai_chat_stream(
+    system: str, user: str, model: str, api_key: str, temperature: float = 0.3, base_url: str = OPENAI_BASE_URL
+) -> AsyncGenerator[str, None]:
+    """Yield content deltas from an OpenAI `stream: true` completion (SSE lines)."""
+    url = f"{base_url.rstrip('/')}/chat/completions"
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    payload = {
+        "model": model,
+        "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
+        "temperature": temperature,
+        "stream": True,
+        "stream_options": {"include_usage": True},  # final chunk carries token usage
+    }
+    async with get_http_client().stream("POST", url, headers=headers, json=payload) as r:
+        r.raise_for_status()
+        async for line in r.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            try:
+                chunk = json.loads(data)
+            except ValueError:
+                continue
+            if isinstance(chunk, dict) and chunk.get("usage"):
+                _record_usage("openai", chunk["usage"].get("prompt_tokens"), chunk["usage"].get("completion_tokens"))
+            try:
+                delta = chunk["choices"][0].get("delta", {}).get("content")
+            except (TypeError, KeyError, IndexError):
+                continue
+            if delta:
+                yield delta
+
+
+async def _ollama_chat_stream(
+    system: str, user: str, model: str, host: str, temperature: float = 0.3
+) -> AsyncGenerator[str, None]:
+    """Yield content deltas from Ollama's streaming /api/chat (one JSON object per line)."""
+    url = f"{host.rstrip('/')}/api/chat"
+    payload = {
+        "model": model,
+        "messages": [{"role": "system", "content": system}, {"role": "user", "content": user}],
+        "options": {"temperature": temperature},
+        "stream": True,
+    }
+    async with get_http_client().stream("POST", url, json=payload) as r:
+        r.raise_for_status()
+        async for line in r.aiter_lines():
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError:
+                continue
+            delta = (data.get("message") or {}).get("content")
+            if delta:
+                yield delta
+            if data.get("done"):
+                _record_usage("ollama", data.get("prompt_eval_count"), data.get("eval_count"))
+                break
+
+# -------------------- Cassettes --------------------
+
+# evaluations/cassette.py: records provider answers, or replays them offline, per process
+_CASSETTE: Dict[str, Any] = {"cassette": None}
+
+
+def set_cassette(cassette: Any) -> Any:
+    """
+    Route every provider call through `cassette` (None to stop); returns the previous one.
+    The cassette gets (provider, model, temperature, system, user) plus the real call,
+    which it may skip (replay) or run and keep (record).
+    """
+    previous, _CASSETTE["cassette"] = _CASSETTE["cassette"], cassette
+    return previous
 
 # -------------------- Public helpers --------------------
 
-def _call_llm(system: str, user: str, temperature: float | None = None) -> str:
+async def _call_llm(
+    system: str, user: str, temperature: float | None = None, backend: Optional[Backend] = None
+) -> str:
     s = get_settings()
-    picked = choose_llm(s)
+    picked = backend or choose_llm(s)
     if not picked:
         return ""
     kind, cfg = picked
     temp = s.LLM_TEMPERATURE if temperature is None else temperature
     if kind == "openai":
-        return _openai_chat(system, user, cfg["model"], cfg["api_key"], temp)
-    if kind == "ollama":
-        return _ollama_chat(system, user, cfg["model"], cfg["host"], temp)
-    return ""
+        base_url = cfg.get("base_url") or OPENAI_BASE_URL
+        call = partial(_openai_chat, system, user, cfg["model"], cfg["api_key"], temp, base_url)
+    elif kind == "ollama":
+        call = partial(_ollama_chat, system, user, cfg["model"], cfg["host"], temp)
+    else:
+        return ""
+    cassette = _CASSETTE["cassette"]
+    if cassette is not None:
+        replayed: str = await cassette.call(kind, cfg["model"], temp, system, user, call)
+        return replayed
+    return await call()
 
 
-def _extract_json_list(text: str) -> list:
+async def _stream_llm(
+    system: str, user: str, temperature: float | None = None, backend: Optional[Backend] = None
+) -> AsyncGenerator[str, None]:
+    """Streaming counterpart of _call_llm: yields text deltas (nothing if no provider)."""
+    s = get_settings()
+    picked = backend or choose_llm(s)
+    if not picked:
+        return
+    kind, cfg = picked
+    temp = s.LLM_TEMPERATURE if temperature is None else temperature
+    if kind == "openai":
+        base_url = cfg.get("base_url") or OPENAI_BASE_URL
+        gen = _openai_chat_stream(system, user, cfg["model"], cfg["api_key"], temp, base_url)
+    elif kind == "ollama":
+        gen = _ollama_chat_stream(system, user, cfg["model"], cfg["host"], temp)
+    else:
+        return
+    if _CASSETTE["cassette"] is not None:
+        gen = _CASSETTE["cassette"].stream(kind, cfg["model"], temp, system, user, gen)
+    t0 = time.perf_counter()
+    sp = current_span()
+    async with aclosing(gen):
+        async for delta in gen:
+            if sp is not None:
+                if "first_token_ms" not in sp.attrs:
+                    sp.set(first_token_ms=round((time.perf_counter() - t0) * 1000.0, 2))
+                sp.add("chunks", 1)
+            yield delta
+
+
+def _extract_json_list(text: str) -> List[Any]:
     """Extract a JSON array from free text robustly."""
     if not text:
         return []
@@ -63,91 +259,306 @@ def _extract_json_list(text: str) -> list:
             return parsed
     except Exception:
         pass
-    # try array substring
-    m = re.search(r"\[[\s\S]*\]", text)
-    if m:
-        try:
-            parsed = json.loads(m.group(0))
-            if isinstance(parsed, list):
-                return parsed
-        except Exception:
-            return []
-    return []
+    # single pass over the text: objects of the first array, prose/fences ignored
+    return parse_json_objects([text])
+
+
+_CURATOR_SYSTEM = (
+    "You are a senior travel curator for a world-class guide. "
+    "Only output valid JSON. Do not include explanations, disclaimers, or markdown."
+)
+
+_CURATION_TASK = (
+    "TASK:\n"
+    "- Propose top places/experiences that a discerning visitor should not miss.\n"
+    "- Prefer high-signal items (landmarks, major museums, iconic viewpoints, notable neighborhoods/markets, "
+    "  standout food/cafe areas); avoid generic tourist traps unless truly iconic.\n"
+    "- Align to the given interests.\n"
+    "- Distribute across different neighborhoods when possible and vary time-of-day (morning/afternoon/evening).\n"
+    "- Keep each title short and specific. If unsure on a field, omit it.\n\n"
+)
 
+_SPOT_SCHEMA = (
+    "  {\n"
+    '    "title": "string",\n'
+    '    "neighborhood": "string (optional)",\n'
+    '    "category": "museum | landmark | neighborhood | market | cafe | park | gallery | viewpoint | other",\n'
+    '    "best_time": "morning | afternoon | evening | night | flexible (optional)",\n'
+    '    "duration_hours":  number (e.g., 1.5),\n'
+    '    "est_price": number (USD, 0 if free, omit if unknown),\n'
+    '    "reason_short": "1 sentence focusing on why this is exceptional"\n'
+    "  }\n"
+)
 
-def ranked_spots_via_llm(
+
+def _trip_length(days: int | None) -> str:
+    if days is None:  # day-independent superset: order matters, callers slice a prefix per trip length
+        return "Trip length: any (rank by priority so that every prefix of the list is a good shorter trip)\n"
+    return f"Trip length (days): {days}\n"
+
+
+def _focus(focus: str | None) -> str:
+    if not focus:
+        return ""
+    # one shard of a long trip: other shards cover the rest, so stay on this theme
+    return f"Focus: {focus} (only places of this kind; other requests cover the rest of the destination)\n"
+
+
+def _spots_prompt(
     destination: str,
     interests: Sequence[str] | None,
-    days: int,
-    month: str | None = None,
-    max_items: int = 12,
-) -> List[Dict[str, Any]]:
-    """
-    Ask the LLM for the BEST places/experiences in a destination, aligned to interests and ready to schedule.
-    Returns a list of JSON objects with rich metadata (title, neighborhood, category, best_time, duration, price, reason).
-    If no LLM is configured or parsing fails, returns [].
-    """
+    days: int | None,
+    month: str | None,
+    max_items: int,
+    focus: str | None = None,
+) -> Tuple[str, str]:
     ints = ", ".join(interests or [])
-    system = (
-        "You are a senior travel curator for a world-class guide. "
-        "Only output valid JSON. Do not include explanations, disclaimers, or markdown."
-    )
     user = (
         f"Destination: {destination}\n"
-        f"Trip length (days): {days}\n"
+        f"{_trip_length(days)}"
         f"Interests: {ints if ints else 'none'}\n"
+        f"{_focus(focus)}"
         f"Month: {month or 'auto'}\n\n"
-        "TASK:\n"
-        "- Propose top places/experiences that a discerning visitor should not miss.\n"
-        "- Prefer high-signal items (landmarks, major museums, iconic viewpoints, notable neighborhoods/markets, "
-        "  standout food/cafe areas); avoid generic tourist traps unless truly iconic.\n"
-        "- Align to the given interests.\n"
-        "- Distribute across different neighborhoods when possible and vary time-of-day (morning/afternoon/evening).\n"
-        "- Keep each title short and specific. If unsure on a field, omit it.\n\n"
+        f"{_CURATION_TASK}"
         "OUTPUT STRICTLY AS JSON ARRAY of objects with this schema (no prose):\n"
         "[\n"
-        "  {\n"
-        '    "title": "string",\n'
-        '    "neighborhood": "string (optional)",\n'
-        '    "category": "museum | landmark | neighborhood | market | cafe | park | gallery | viewpoint | other",\n'
-        '    "best_time": "morning | afternoon | evening | night | flexible (optional)",\n'
-        '    "duration_hours":  number (e.g., 1.5),\n'
-        '    "est_price": number (USD, 0 if free, omit if unknown),\n'
-        '    "reason_short": "1 sentence focusing on why this is exceptional"\n'
-        "  }\n"
+        f"{_SPOT_SCHEMA}"
         "]\n"
         f"Return at most {max_items} items."
     )
+    return _CURATOR_SYSTEM, user
+
 
+def _multi_spots_prompt(
+    entries: Sequence[Tuple[str, Sequence[str] | None]],
+    days: int | None,
+    month: str | None,
+    max_items: int,
+    focus: str | None = None,
+) -> Tuple[str, str]:
+    """One prompt for several (destination label, interests) pairs; the answer is keyed by label."""
+    lines = "".join(
+        f'- "{label}" (interests: {", ".join(interests or []) or "none"})\n' for label, interests in entries
+    )
+    user = (
+        "Destinations (curate each one independently, with its own interests):\n"
+        f"{lines}"
+        f"{_trip_length(days)}"
+        f"{_focus(focus)}"
+        f"Month: {month or 'auto'}\n\n"
+        f"{_CURATION_TASK}"
+        "OUTPUT STRICTLY AS ONE JSON OBJECT whose keys are the destination labels above (verbatim) "
+        "and whose values are JSON arrays of objects with this schema (no prose):\n"
+        '{"<destination label>": [\n'
+        f"{_SPOT_SCHEMA}"
+        "]}\n"
+        f"Return at most {max_items} items per destination."
+    )
+    return _CURATOR_SYSTEM, user
+
+
+def _extract_json_object(text: str) -> Dict[str, Any] | None:
+    """The first JSON object in free text (fences/prose around it ignored), or None."""
+    if not text:
+        return None
+    for candidate in (text, text[text.find("{"):text.rfind("}") + 1]):
+        try:
+            parsed = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+    return None
+
+
+def _normalize_spot(it: Any) -> Dict[str, Any] | None:
+    """Coerce one raw LLM item into our spot schema (None if unusable)."""
+    if not isinstance(it, dict):
+        return None
+    title = str(it.get("title", "")).strip()
+    if not title:
+        return None
     try:
-        raw = _call_llm(system, user)
-    except Exception:
-        return []
+        duration = float(it.get("duration_hours") or 1.5)
+        price = float(it["est_price"]) if it.get("est_price") is not None else None
+    except (TypeError, ValueError):
+        return None
+    return {
+        "title": title,
+        "neighborhood": (it.get("neighborhood") or "").strip() or None,
+        "category": (it.get("category") or "other").strip(),
+        "best_time": (it.get("best_time") or "flexible").strip(),
+        "duration_hours": duration,
+        "est_price": price,
+        "reason_short": (it.get("reason_short") or "").strip() or None,
+    }
+
+
+async def _raw_spot_items(system: str, user: str, backend: Optional[Backend] = None) -> AsyncGenerator[Any, None]:
+    """Raw array items from the provider: streamed and parsed incrementally when LLM_STREAM is on."""
+    if not get_settings().LLM_STREAM:
+        for it in _extract_json_list(await _call_llm(system, user, backend=backend)):
+            yield it
+        return
+    parser = JsonArrayStream()
+    async with aclosing(_stream_llm(system, user, backend=backend)) as deltas:
+        async for delta in deltas:
+            for it in parser.feed(delta):
+                yield it
+            if parser.done:
+                return
+
 
-    items = _extract_json_list(raw)
-    out: List[Dict[str, Any]] = []
+async def stream_ranked_spots(
+    destination: str,
+    interests: Sequence[str] | None,
+    days: int | None,
+    month: str | None = None,
+    max_items: int = 12,
+    backend: Optional[Backend] = None,
+    focus: str | None = None,
+) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    Yield curated spots one by one as soon as each object is complete in the provider stream.
+    The provider request is closed as soon as `max_items` valid, distinct spots are in hand.
+    `backend` pins a provider (default: choose_llm); `focus` narrows the request to one theme.
+    """
+    system, user = _spots_prompt(destination, interests, days, month, max_items, focus)
     seen = set()
-    for it in items:
-        if not isinstance(it, dict):
-            continue
-        title = str(it.get("title", "")).strip()
-        if not title or title.lower() in seen:
-            continue
-        seen.add(title.lower())
-        out.append(
-            {
-                "title": title,
-                "neighborhood": (it.get("neighborhood") or "").strip() or None,
-                "category": (it.get("category") or "other").strip(),
-                "best_time": (it.get("best_time") or "flexible").strip(),
-                "duration_hours": float(it.get("duration_hours", 1.5)),
-                "est_price": (float(it["est_price"]) if "est_price" in it else None),
-                "reason_short": (it.get("reason_short") or "").strip() or None,
-            }
-        )
-        if len(out) >= max_items:
-            break
-    return out
+    async with aclosing(_raw_spot_items(system, user, backend)) as items:
+        async for it in items:
+            spot = _normalize_spot(it)
+            if spot is None or spot["title"].lower() in seen:
+                continue
+            seen.add(spot["title"].lower())
+            yield spot
+            if len(seen) >= max_items:
+                return
+
+
+async def ranked_spots_via_llm(
+    destination: str,
+    interests: Sequence[str] | None,
+    days: int | None,
+    month: str | None = None,
+    max_items: int = 12,
+    focus: str | None = None,
+) -> List[Dict[str, Any]]:
+    """
+    Ask the LLM for the BEST places/experiences in a destination, aligned to interests and ready to schedule.
+    Returns a list of JSON objects with rich metadata (title, neighborhood, category, best_time, duration, price, reason).
+    If no LLM is configured, parsing fails or the stream breaks off, returns [].
+
+    With several providers configured the call goes through the router: a late or
+    failing provider is hedged with the next one and the first valid list wins.
+    `focus` (e.g. "parks and gardens") asks for one theme only; long trips are curated
+    as several focused shards (see utils/curation.py).
+    """
+    spots, _ = await answered_ranked_spots(destination, interests, days, month, max_items, focus)
+    return spots
+
+
+async def answered_ranked_spots(
+    destination: str,
+    interests: Sequence[str] | None,
+    days: int | None,
+    month: str | None = None,
+    max_items: int = 12,
+    focus: str | None = None,
+) -> Tuple[List[Dict[str, Any]], Optional[Backend]]:
+    """ranked_spots_via_llm and the backend whose answer it is (None when none answered)."""
+    s = get_settings()
+    backends = llm_backends(s)
+    if not backends:
+        return [], None
+
+    async def attempt(backend: Backend, hedge: bool) -> Tuple[List[Dict[str, Any]], bool]:
+        provider, cfg = backend
+        out: List[Dict[str, Any]] = []
+        with span(f"llm.{provider}", model=cfg.get("model"), stream=s.LLM_STREAM) as sp:
+            if hedge:
+                sp.set(hedge=True)
+            if focus:
+                sp.set(focus=focus)
+            try:
+                async with aclosing(
+                    stream_ranked_spots(destination, interests, days, month, max_items, backend=backend, focus=focus)
+                ) as spots:
+                    async for spot in spots:
+                        out.append(spot)
+            except Exception as e:
+                # a stream that dies half-way is a failed call: its partial list is dropped, never cached
+                sp.set(error=type(e).__name__, partial=len(out))
+                return [], False
+            finally:
+                sp.set(spots=len(out))
+                if "completion_tokens" not in sp.attrs and sp.attrs.get("chunks"):
+                    # stream closed early (max_items reached): no usage chunk, deltas ~ tokens
+                    sp.set(completion_tokens_est=sp.attrs["chunks"])
+        return out, bool(out)
+
+    spots, winner = await ROUTER.hedged(backends, attempt, s)
+    if winner is not None and len(backends) > 1:
+        annotate(llm_winner=winner[0])
+    return list(spots or []), winner
+
+
+async def ranked_spots_batch_via_llm(
+    entries: Sequence[Tuple[str, Sequence[str] | None]],
+    days: int | None,
+    month: str | None = None,
+    max_items: int = 12,
+    focus: str | None = None,
+) -> Tuple[List[Optional[List[Dict[str, Any]]]], Optional[Backend]]:
+    """
+    Curate several (destination, interests) pairs with ONE provider call that returns a
+    JSON object keyed by destination label. One result per entry, in order: its spots,
+    or None when the answer had nothing usable for it (callers fall back to single calls);
+    and the backend that answered. Labels must be distinct after case/whitespace folding.
+    """
+    s = get_settings()
+    backends = llm_backends(s)
+    if not backends or not entries:
+        return [None] * len(entries), None
+    system, user = _multi_spots_prompt(entries, days, month, max_items, focus)
+
+    def fold(label: Any) -> str:
+        return " ".join(str(label).split()).casefold()
+
+    def split(obj: Dict[str, Any]) -> List[Optional[List[Dict[str, Any]]]]:
+        by_label = {fold(k): v for k, v in obj.items()}
+        out: List[Optional[List[Dict[str, Any]]]] = []
+        for label, _ in entries:
+            items = by_label.get(fold(label))
+            spots: List[Dict[str, Any]] = []
+            seen = set()
+            for it in items if isinstance(items, list) else []:
+                spot = _normalize_spot(it)
+                if spot is None or spot["title"].lower() in seen:
+                    continue
+                seen.add(spot["title"].lower())
+                spots.append(spot)
+                if len(spots) >= max_items:
+                    break
+            out.append(spots or None)
+        return out
+
+    async def attempt(backend: Backend, hedge: bool) -> Tuple[List[Optional[List[Dict[str, Any]]]], bool]:
+        provider, cfg = backend
+        with span(f"llm.{provider}", model=cfg.get("model"), stream=False, batch=len(entries)) as sp:
+            if hedge:
+                sp.set(hedge=True)
+            try:
+                obj = _extract_json_object(await _call_llm(system, user, backend=backend))
+            except Exception as e:
+                sp.set(error=type(e).__name__)
+                return [None] * len(entries), False
+            results = split(obj) if obj is not None else [None] * len(entries)
+            sp.set(spots=sum(len(r or []) for r in results), parsed=sum(r is not None for r in results))
+        return results, any(r is not None for r in results)
+
+    results, winner = await ROUTER.hedged(backends, attempt, s)
+    return list(results or [None] * len(entries)), winner
 
 
 def flatten_spots_to_activity_strings(spots: Sequence[Dict[str, Any]]) -> List[str]:
@@ -157,22 +568,7 @@ def flatten_spots_to_activity_strings(spots: Sequence[Dict[str, Any]]) -> List[s
     """
     acts: List[str] = []
     for s in spots:
-        title = s.get("title") or ""
-        nbh = s.get("neighborhood")
-        bt = s.get("best_time")
-        dur = s.get("duration_hours")
-        bits = [title]
-        suffix: List[str] = []
-        if nbh:
-            bits.append(f"({nbh})")
-        if bt and isinstance(bt, str):
-            suffix.append(bt)
-        if isinstance(dur, (int, float)):
-            hrs = round(float(dur), 1)
-            suffix.append(f"{hrs}h")
-        if suffix:
-            bits.append(" — " + " • ".join(suffix))
-        sstr = " ".join(bits).strip()
+        sstr = activity_string(s.get("title") or "", s.get("neighborhood"), s.get("best_time"), s.get("duration_hours"))
         if sstr:
             acts.append(sstr)
     # Dedupe while preserving order
@@ -0,0 +1,241 @@
+"""
+Process-wide metrics in the Prometheus text exposition format (served by GET /metrics).
+
+Deliberately tiny (counters, gauges and fixed-bucket histograms with labels) so the backend
+does not need prometheus_client. Trace spans feed the latency histograms as they close.
+"""
+from __future__ import annotations
+import bisect
+import math
+import threading
+from typing import Any, Dict, List, Sequence, Tuple, Type, TypeVar
+
+# seconds: sub-ms cache hits up to slow LLM completions
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+LabelKey = Tuple[str, ...]
+M = TypeVar("M", bound="_Metric")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelKey:
+        unknown = set(labels) - set(self.labelnames)
+        if unknown:
+            raise ValueError(f"{self.name}: unknown label(s) {', '.join(sorted(unknown))}")
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, /, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {_fmt(v)}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, /, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, /, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, /, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {_fmt(v)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, List[float]] = {}  # per-bucket counts..., sum, count
+
+    def observe(self, value: float, /, **labels: object) -> None:
+        key = self._key(labels)
+        n = len(self.buckets)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (n + 2)
+            i = bisect.bisect_left(self.buckets, value)
+            if i < n:
+                series[i] += 1
+            series[n] += value
+            series[n + 1] += 1
+
+    def count(self, **labels: object) -> int:
+        series = self._series.get(self._key(labels))
+        return int(series[-1]) if series else 0
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        n = len(self.buckets)
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0.0
+                for bound, c in zip(self.buckets, series[:n]):
+                    cumulative += c
+                    le = _labels(self.labelnames, key, f'le="{_fmt(bound)}"')
+                    lines.append(f"{self.name}_bucket{le} {_fmt(cumulative)}")
+                le = _labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {_fmt(series[n + 1])}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(series[n])}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_fmt(series[n + 1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls: Type[M], name: str, help: str, labelnames: Sequence[str], **kw: Any) -> M:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                created = cls(name, help, labelnames, **kw)
+                self._metrics[name] = created
+                return created
+            if not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(line for m in metrics for line in m.render()) + "\n"
+
+
+REGISTRY = Registry()
+
+SPAN_SECONDS = REGISTRY.histogram(
+    "voyagecraft_span_duration_seconds", "Duration of trace spans (agents, provider calls, caches).", ("span",)
+)
+PLAN_SECONDS = REGISTRY.histogram(
+    "voyagecraft_plan_duration_seconds", "End-to-end plan latency per orchestrator.", ("orchestrator", "outcome")
+)
+LLM_TOKENS = REGISTRY.counter(
+    "voyagecraft_llm_tokens_total", "LLM tokens by provider and direction (prompt|completion).",
+    ("provider", "direction"),
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "voyagecraft_cache_requests_total", "Cache lookups by cache and status (hit|miss|coalesced|batch|bypass).",
+    ("cache", "status"),
+)
+LLM_CALLS = REGISTRY.counter(
+    "voyagecraft_llm_calls_total",
+    "Provider calls by outcome (ok|error|cancelled|shed) and whether they were hedges.", ("provider", "outcome", "hedge"),
+)
+LLM_BREAKER = REGISTRY.counter(
+    "voyagecraft_llm_breaker_transitions_total", "Circuit breaker state changes per provider:model (open|closed).",
+    ("backend", "state"),
+)
+LLM_MICROBATCH = REGISTRY.counter(
+    "voyagecraft_llm_microbatch_requests_total",
+    "Curation requests by how they reached the provider (single|batched|fallback).", ("path",),
+)
+PLAN_STORE_RECORDS = REGISTRY.counter(
+    "voyagecraft_plan_store_records_total", "Plans handed to the plan store by outcome (written|dropped|error).",
+    ("status",),
+)
+PLAN_DEGRADED = REGISTRY.counter(
+    "voyagecraft_plan_degraded_total", "Plans returned without LLM curation because the deadline ran out.",
+    ("stage",),
+)
+PLAN_CANCELLED = REGISTRY.counter(
+    "voyagecraft_plan_cancelled_total", "Plans abandoned because the client disconnected.", ("route",)
+)
+ADMISSION_INFLIGHT = REGISTRY.gauge(
+    "voyagecraft_admission_inflight", "Admitted work in flight per scope (plan | provider:<name>).", ("scope",)
+)
+ADMISSION_QUEUED = REGISTRY.gauge(
+    "voyagecraft_admission_queue_depth", "Requests waiting for admission per scope and priority.", ("scope", "priority")
+)
+ADMISSION_REJECTED = REGISTRY.counter(
+    "voyagecraft_admission_rejected_total",
+    "Requests shed by admission control (reason: queue_full|queue_timeout|deadline).",
+    ("scope", "priority", "reason"),
+)
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "voyagecraft_admission_wait_seconds", "Time spent queued before admission.", ("scope", "priority")
+)
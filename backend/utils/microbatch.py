@@ -0,0 +1,150 @@
+"""
+Micro-batching of destination curation calls.
+
+Curation requests that arrive within LLM_MICROBATCH_WINDOW_MS of each other (and share
+trip length, month, size and shard focus) are collected, up to LLM_MICROBATCH_MAX, and sent as ONE
+provider call asking for a JSON object keyed by destination. The answer is split back
+to each waiting caller; entries the answer misses (or a batch that fails to parse) fall
+back to the usual single-destination call. A lone request in its window goes straight
+to the single call, so interactive latency only grows by the window.
+
+A caller that goes away (client disconnected, deadline passed) is dropped from its
+batch; once every caller of a batch is gone, its provider call is cancelled.
+"""
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .config import get_settings
+from .llm import answered_ranked_spots, ranked_spots_batch_via_llm
+from .metrics import LLM_MICROBATCH
+from .router import Backend
+
+Spots = List[Dict[str, Any]]
+Answer = Tuple[Spots, Optional[Backend]]  # spots and the backend that answered (None: nobody did)
+Group = Tuple[Optional[int], Optional[str], int, Optional[str]]  # (days, month, max_items, focus)
+
+
+@dataclass
+class _Entry:
+    destination: str
+    interests: Tuple[str, ...]
+    future: "asyncio.Future[Answer]"
+
+
+@dataclass
+class _Batch:
+    entries: List[_Entry] = field(default_factory=list)
+    labels: Set[str] = field(default_factory=set)  # folded destinations already in this batch
+    task: Optional["asyncio.Task[None]"] = None     # the provider call, once flushed
+
+
+def _fold(destination: str) -> str:
+    return " ".join(destination.split()).casefold()
+
+
+class CurationBatcher:
+    """Collects curation requests per group and flushes them on size or after the window."""
+
+    def __init__(self) -> None:
+        self._open: Dict[Group, _Batch] = {}
+        self._running: Set["asyncio.Task[None]"] = set()
+
+    async def submit(
+        self,
+        destination: str,
+        interests: Sequence[str] | None,
+        days: int | None,
+        month: str | None = None,
+        max_items: int = 12,
+        focus: str | None = None,
+    ) -> Answer:
+        s = get_settings()
+        if not s.LLM_MICROBATCH or s.LLM_MICROBATCH_MAX <= 1:
+            return await answered_ranked_spots(destination, interests, days, month, max_items, focus)
+        loop = asyncio.get_running_loop()
+        group: Group = (days, month, int(max_items), focus or None)
+        batch = self._open.get(group)
+        if batch is not None and _fold(destination) in batch.labels:
+            self._flush(group, batch)  # one label per destination in a prompt: start a fresh batch
+            batch = None
+        if batch is None:
+            batch = self._open[group] = _Batch()
+            loop.call_later(s.LLM_MICROBATCH_WINDOW_MS / 1000.0, self._flush, group, batch)
+        entry = _Entry(destination.strip(), tuple(interests or ()), loop.create_future())
+        batch.entries.append(entry)
+        batch.labels.add(_fold(destination))
+        if len(batch.entries) >= s.LLM_MICROBATCH_MAX:
+            self._flush(group, batch)
+        # shielded: a caller that goes away must not cancel the provider call others still wait for
+        try:
+            return await asyncio.shield(entry.future)
+        except asyncio.CancelledError:
+            entry.future.cancel()
+            if batch.task is not None and all(e.future.done() for e in batch.entries):
+                batch.task.cancel()
+            raise
+
+    def _flush(self, group: Group, batch: _Batch) -> None:
+        if self._open.get(group) is not batch:
+            return  # already flushed (size limit reached before the timer fired)
+        del self._open[group]
+        task = batch.task = asyncio.ensure_future(self._run(group, batch.entries))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, group: Group, entries: List[_Entry]) -> None:
+        days, month, max_items, focus = group
+        entries = [e for e in entries if not e.future.done()]  # callers gone before the flush
+        if not entries:
+            return
+        try:
+            if len(entries) == 1:
+                LLM_MICROBATCH.inc(path="single")
+                e = entries[0]
+                _resolve(e, await answered_ranked_spots(e.destination, e.interests, days, month, max_items, focus))
+                return
+            results, winner = await ranked_spots_batch_via_llm(
+                [(e.destination, e.interests) for e in entries], days, month, max_items, focus
+            )
+            missing = [e for e, r in zip(entries, results) if r is None]
+            for e, r in zip(entries, results):
+                if r is not None:
+                    _resolve(e, (r, winner))
+            LLM_MICROBATCH.inc(len(entries) - len(missing), path="batched")
+            if missing:
+                LLM_MICROBATCH.inc(len(missing), path="fallback")
+                answers = await asyncio.gather(
+                    *(answered_ranked_spots(e.destination, e.interests, days, month, max_items, focus) for e in missing)
+                )
+                for e, answer in zip(missing, answers):
+                    _resolve(e, answer)
+        except Exception as exc:
+            for e in entries:
+                if not e.future.done():
+                    e.future.set_exception(exc)
+        finally:
+            for e in entries:  # cancelled (loop shutdown): never leave a caller waiting
+                if not e.future.done():
+                    e.future.cancel()
+
+
+def _resolve(entry: _Entry, answer: Answer) -> None:
+    if not entry.future.done():
+        entry.future.set_result(answer)
+
+
+_BATCHER = CurationBatcher()
+
+
+async def batched_ranked_spots(
+    destination: str,
+    interests: Sequence[str] | None,
+    days: int | None,
+    month: str | None = None,
+    max_items: int = 12,
+    focus: str | None = None,
+) -> Answer:
+    """Drop-in for utils.llm.answered_ranked_spots that shares provider calls across concurrent requests."""
+    return await _BATCHER.submit(destination, interests, days, month, max_items, focus)
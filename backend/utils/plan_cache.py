@@ -0,0 +1,232 @@
+"""
+Whole-plan response cache for POST /plan.
+
+Plans are keyed by a canonical hash of the normalized TripRequest, the orchestrator,
+the configured provider/model and a fingerprint of the remaining settings, and kept
+as the serialized JSON body plus a content ETag. Memory is bounded in bytes
+(PLAN_CACHE_MAX_BYTES, LRU order; bodies above 1/8 of the budget are not kept).
+Concurrent identical requests share one orchestrator run.
+"""
+from __future__ import annotations
+import dataclasses
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from .admission import admitted, plan_admission
+from .cache import SingleFlight, normalize_destination, normalize_interests
+from .config import Settings, choose_llm, get_settings, llm_backends
+from .deadline import DeadlineExceeded, deadline_scope, planning_reserve, remaining, within
+from .metrics import CACHE_REQUESTS
+from .plan_store import record_plan
+from .serialize import dump_plan
+from .types import TripRequest
+
+_ENTRY_OVERHEAD = 256  # bytes per entry beyond the body (key, etag, bookkeeping)
+_SECRET_SETTINGS = {"OPENAI_API_KEY", "PLAN_STORE_API_TOKEN"}
+# settings that never shape a plan's body (where it is stored, cached, served from, or how requests queue)
+_SERVING_SETTINGS = ("PLAN_STORE_", "PLAN_CACHE_", "HTTP", "RESPONSE_COMPRESS", "PREWARM", "ADMISSION_", "BATCH_")
+
+
+def _settings_fingerprint(s: Settings) -> Dict[str, Any]:
+    return {
+        k: v for k, v in dataclasses.asdict(s).items()
+        if k not in _SECRET_SETTINGS and not k.startswith(_SERVING_SETTINGS)
+    }
+
+
+def plan_cache_key(request: TripRequest, orchestrator: str, s: Settings) -> str:
+    """
+    Stable key for a plan. Text fields are whitespace/case-normalized and interests
+    sorted, so 'Paris, [Art, cafes]' and ' paris, [cafes, art]' share one entry.
+    """
+    picked = choose_llm(s)
+    parts = {
+        "o": normalize_destination(request.origin),
+        "d": normalize_destination(request.destination),
+        "s": request.start_date.strip(),
+        "n": int(request.days),
+        "pp": int(request.profile.people),
+        "b": None if request.profile.budget_total is None else round(float(request.profile.budget_total), 2),
+        "i": normalize_interests(request.profile.interests),
+        "orch": orchestrator,
+        "p": picked[0] if picked else None,
+        "model": picked[1].get("model") if picked else None,
+        "cfg": _settings_fingerprint(s),
+    }
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_variant(etag: str, coding: str) -> str:
+    """Distinct strong ETag for a content-coded representation ('"abc"' -> '"abc-gzip"')."""
+    return etag[:-1] + f'-{coding}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """RFC 9110 weak comparison against an If-None-Match header ('*' or a list of tags)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == bare:
+            return True
+    return False
+
+
+@dataclass(frozen=True)
+class CachedPlan:
+    body: bytes          # serialized Plan JSON, served as-is
+    etag: str
+    created: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + _ENTRY_OVERHEAD
+
+
+# -------------------- In-memory cache (TTL + byte-bounded LRU) --------------------
+
+class PlanCache:
+    """LRU over serialized plans, bounded by total bytes rather than entry count. Thread-safe."""
+
+    def __init__(self, max_bytes: int, ttl_s: float) -> None:
+        self.max_bytes = max(int(max_bytes), 1)
+        self.max_entry_bytes = max(self.max_bytes // 8, 1)
+        self.ttl_s = float(ttl_s)
+        self.bytes = 0
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "oversize": 0}
+        self._entries: "OrderedDict[str, CachedPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedPlan]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if now - entry.created > self.ttl_s:
+                self._remove(key)
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(self, key: str, entry: CachedPlan) -> bool:
+        """Store an entry, evicting least-recently-used ones until the byte budget holds."""
+        if entry.size > self.max_entry_bytes:
+            with self._lock:
+                self.stats["oversize"] += 1
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.bytes += entry.size
+            while self.bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+        return True
+
+    def _remove(self, key: str) -> None:
+        self.bytes -= self._entries.pop(key).size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "bytes": self.bytes}
+
+# -------------------- Cached planning --------------------
+
+_STATE: Dict[str, Any] = {"cache": None, "config": None}
+_FLIGHT = SingleFlight()
+_STATE_LOCK = threading.Lock()
+
+
+def get_plan_cache() -> Optional[PlanCache]:
+    """Process-wide PlanCache built from Settings (rebuilt if cache settings change)."""
+    s = get_settings()
+    if not s.PLAN_CACHE_ENABLED:
+        return None
+    config = (s.PLAN_CACHE_MAX_BYTES, s.PLAN_CACHE_TTL_S)
+    with _STATE_LOCK:
+        if _STATE["cache"] is None or _STATE["config"] != config:
+            _STATE["cache"] = PlanCache(*config)
+            _STATE["config"] = config
+        cache: PlanCache = _STATE["cache"]
+        return cache
+
+
+async def cached_plan(
+    request: TripRequest, orchestrator: Any, priority: str = "interactive", wait_s: Optional[float] = None
+) -> Tuple[CachedPlan, str]:
+    """
+    Serialized plan for `request` and its cache status: 'hit' | 'miss' | 'coalesced' | 'bypass' | 'fallback'.
+    Only a real orchestrator run takes an admission slot (may raise Overloaded); hits never queue.
+    Plans that fell back to generic activities while a provider is configured
+    (provider down, parse failure, deadline ran out) are served but not cached. Every orchestrator run is
+    queued to the plan store (utils/plan_store.py).
+
+    `wait_s` is this caller's own deadline (X-Deadline-Ms). Such a caller never leads a run
+    shared with others, so it cannot cut their plans short: it waits for an identical run
+    already in flight if that finishes in time, and otherwise runs (and degrades) its own,
+    once. Having waited in vain, it plans without LLM curation ('fallback').
+    """
+    s = get_settings()
+    cache = get_plan_cache()
+    key = plan_cache_key(request, orchestrator.name, s) if cache is not None else ""
+    left = remaining()
+    if wait_s is not None and left is not None and wait_s >= left:
+        wait_s = None  # no shorter than the deadline the run has anyway
+
+    async def build(curate: bool = True) -> CachedPlan:
+        async with admitted(plan_admission(), priority):  # queues no longer than the deadline
+            with deadline_scope(None if curate else 0.0):
+                plan = await orchestrator.run(request)
+        body = dump_plan(plan)
+        record_plan(request, body, orchestrator.name, source="plan")
+        entry = CachedPlan(body=body, etag=etag_for(body), created=time.time())
+        fallback = not plan.metadata.get("spot_source") and llm_backends(s)
+        if cache is not None and not fallback and "degraded" not in plan.metadata:
+            cache.put(key, entry)
+        return entry
+
+    hit = cache.get(key) if cache is not None else None
+    if hit is not None:
+        entry, status = hit, "hit"
+    elif cache is None or wait_s is not None:
+        with deadline_scope(wait_s):  # not shared: the caller's deadline is the run's
+            flight = _FLIGHT.join(key) if cache is not None else None
+            if flight is None:
+                entry, status = await build(), "bypass" if cache is None else "miss"
+            else:
+                try:
+                    entry, status = await within(flight, planning_reserve(wait_s)), "coalesced"
+                except DeadlineExceeded:
+                    entry, status = await build(curate=False), "fallback"
+    else:
+        entry, shared = await _FLIGHT.do(key, build)
+        status = "coalesced" if shared else "miss"
+    CACHE_REQUESTS.inc(cache="plan", status=status)
+    return entry, status
@@ -0,0 +1,496 @@
+"""
+Append-only store of finished plans (with their decision trace), written off the hot path.
+
+Request handlers only enqueue (`record_plan`, never blocks; a full queue drops the record
+and counts it). The store is opened up front (app lifespan, CLI); record_plan never opens
+it on the request path. The read API (app/routes/store.py) is off unless PLAN_STORE_API. One background thread drains the queue and appends in batches, one
+transaction per batch. The log is a directory of numbered segments,
+
+    PLAN_STORE_DIR/seg-000001.sqlite3, seg-000002.sqlite3, ...
+
+each an SQLite database in WAL mode holding one `plans` table with B-tree indexes on
+destination, trip start date, request hash and record time. The newest segment takes
+appends until it grows past PLAN_STORE_SEGMENT_BYTES, then a new one is started; older
+segments are never written again (drop whole files to expire history). Plan bodies are
+stored compressed (zstd when the optional zstandard package is installed, else zlib),
+request JSON as-is.
+
+Queries walk segments newest first and use each segment's indexes, so a lookup by
+destination, start date or request hash never scans a segment; record-time bounds also
+skip whole segments by their time range.
+
+    python -m utils.plan_store query --destination Paris --limit 5
+    python -m utils.plan_store get 3-17
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+from .cache import normalize_destination, normalize_interests
+from .config import Settings, get_settings
+from .metrics import PLAN_STORE_RECORDS
+from .types import Plan, TripRequest
+
+try:
+    import zstandard
+except Exception:
+    zstandard = None  # type: ignore[assignment, unused-ignore]
+
+_SEGMENT = re.compile(r"^seg-(\d{6})\.sqlite3$")
+_STOP = object()
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS plans ("
+    " id INTEGER PRIMARY KEY, ts REAL NOT NULL, request_hash TEXT NOT NULL, destination TEXT NOT NULL,"
+    " start_date TEXT NOT NULL, days INTEGER NOT NULL, orchestrator TEXT, source TEXT,"
+    " codec TEXT NOT NULL, request TEXT NOT NULL, plan BLOB NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS plans_destination ON plans(destination, ts)",
+    "CREATE INDEX IF NOT EXISTS plans_start_date ON plans(start_date, ts)",
+    "CREATE INDEX IF NOT EXISTS plans_request_hash ON plans(request_hash, ts)",
+    "CREATE INDEX IF NOT EXISTS plans_ts ON plans(ts)",
+)
+_SUMMARY = "id, ts, request_hash, destination, start_date, days, orchestrator, source"
+
+
+def request_hash(request: TripRequest) -> str:
+    """Hash of the normalized request alone (no settings), shared by replays of the same trip."""
+    parts = {
+        "o": normalize_destination(request.origin),
+        "d": normalize_destination(request.destination),
+        "s": request.start_date.strip(),
+        "n": int(request.days),
+        "pp": int(request.profile.people),
+        "b": None if request.profile.budget_total is None else round(float(request.profile.budget_total), 2),
+        "i": normalize_interests(request.profile.interests),
+    }
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+# -------------------- Codecs --------------------
+
+def _compress(data: bytes) -> Tuple[str, bytes]:
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=3).compress(data)
+    return "zlib", zlib.compress(data, 6)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("segment was written with zstd; install the 'zstandard' package to read it")
+        plain: bytes = zstandard.ZstdDecompressor().decompress(data)
+        return plain
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"unknown codec '{codec}'")
+
+# -------------------- Records --------------------
+
+@dataclass
+class PendingPlan:
+    """What a handler hands over; encoding and compression happen on the writer thread."""
+    request: TripRequest
+    plan: Union[Plan, bytes, Dict[str, Any]]
+    orchestrator: Optional[str] = None
+    source: Optional[str] = None
+    ts: float = field(default_factory=time.time)
+
+    def row(self) -> Tuple[Any, ...]:
+        if isinstance(self.plan, bytes):
+            body = self.plan
+        elif isinstance(self.plan, BaseModel):
+            body = type(self.plan).__pydantic_serializer__.to_json(self.plan)
+        else:
+            body = json.dumps(self.plan, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        codec, blob = _compress(body)
+        req = self.request
+        return (self.ts, request_hash(req), normalize_destination(req.destination), req.start_date.strip(),
+                int(req.days), self.orchestrator, self.source, codec, req.model_dump_json(), blob)
+
+
+@dataclass
+class StoredPlan:
+    id: str                             # "<segment>-<row id>"
+    ts: float
+    request_hash: str
+    destination: str                    # normalized
+    start_date: str
+    days: int
+    orchestrator: Optional[str]
+    source: Optional[str]
+    request: Optional[Dict[str, Any]] = None
+    plan: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if v is not None or k not in ("request", "plan")}
+
+# -------------------- Store --------------------
+
+class PlanStore:
+    """
+    Segmented append-only plan log. `append_many` is called from the writer thread only;
+    queries open their own read connections and are safe from any thread.
+    """
+
+    def __init__(self, path: str, segment_bytes: int) -> None:
+        self.dir = Path(path)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = max(int(segment_bytes), 64 * 1024)
+        self._lock = threading.Lock()       # writer connection and the active segment number
+        self._ranges_lock = threading.Lock()
+        self._ranges: Dict[int, Tuple[float, float]] = {}  # segment -> (min ts, max ts), closed segments
+        segments = self.segments()
+        self._active = segments[-1] if segments else 1
+        self._db = self._open_writer(self._active)
+
+    def _file(self, seg: int) -> Path:
+        return self.dir / f"seg-{seg:06d}.sqlite3"
+
+    def segments(self) -> List[int]:
+        return sorted(int(m.group(1)) for m in map(_SEGMENT.match, os.listdir(self.dir)) if m)
+
+    def _open_writer(self, seg: int) -> sqlite3.Connection:
+        db = sqlite3.connect(self._file(seg), check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        for stmt in _SCHEMA:
+            db.execute(stmt)
+        return db
+
+    # ---------- writes ----------
+
+    def append_many(self, rows: List[Tuple[Any, ...]]) -> None:
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT INTO plans(ts, request_hash, destination, start_date, days, orchestrator, source,"
+                    " codec, request, plan) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            (pages,) = self._db.execute("PRAGMA page_count").fetchone()
+            (page_size,) = self._db.execute("PRAGMA page_size").fetchone()
+            if pages * page_size >= self.segment_bytes:
+                self._rotate()
+
+    def _rotate(self) -> None:
+        self._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._db.close()
+        self._active += 1
+        self._db = self._open_writer(self._active)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # ---------- reads ----------
+
+    def _reader(self, seg: int) -> sqlite3.Connection:
+        return sqlite3.connect(f"file:{self._file(seg)}?mode=ro", uri=True)
+
+    def _active_segment(self) -> int:
+        with self._lock:
+            return self._active
+
+    def _time_range(self, seg: int, db: sqlite3.Connection, active: int) -> Tuple[float, float]:
+        """(min ts, max ts) of a segment; `active` is the writer's segment when the query started."""
+        with self._ranges_lock:
+            rng = self._ranges.get(seg)
+        if rng is not None:
+            return rng
+        lo, hi = db.execute("SELECT MIN(ts), MAX(ts) FROM plans").fetchone()  # both from the ts index
+        rng = (lo if lo is not None else 0.0, hi if hi is not None else 0.0)
+        if seg < active:
+            # closed before the query started, so it never changes; a segment rotated out since
+            # may have taken rows after this read and is left for the next query
+            with self._ranges_lock:
+                self._ranges[seg] = rng
+        return rng
+
+    def query(
+        self,
+        destination: Optional[str] = None,
+        start_date: Optional[str] = None,
+        request_hash: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: int = 20,
+        with_plan: bool = False,
+    ) -> List[StoredPlan]:
+        """Newest records first matching every given key (destination is normalized like the cache keys)."""
+        where: List[str] = []
+        args: List[Any] = []
+        for column, value in (("destination", normalize_destination(destination) if destination else None),
+                              ("start_date", start_date), ("request_hash", request_hash)):
+            if value:
+                where.append(f"{column} = ?")
+                args.append(value)
+        if since is not None:
+            where.append("ts >= ?")
+            args.append(since)
+        if until is not None:
+            where.append("ts < ?")
+            args.append(until)
+        cols = _SUMMARY + (", codec, request, plan" if with_plan else "")
+        sql = (f"SELECT {cols} FROM plans" + (" WHERE " + " AND ".join(where) if where else "")
+               + " ORDER BY ts DESC LIMIT ?")
+        out: List[StoredPlan] = []
+        active = self._active_segment()
+        for seg in reversed(self.segments()):
+            if len(out) >= limit:
+                break
+            db = self._reader(seg)
+            try:
+                lo, hi = self._time_range(seg, db, active)
+                if (since is not None and hi < since) or (until is not None and lo >= until):
+                    continue
+                for row in db.execute(sql, (*args, limit - len(out))):
+                    out.append(self._record(seg, row, with_plan))
+            except sqlite3.OperationalError:
+                continue  # a segment created but not yet initialized by the writer
+            finally:
+                db.close()
+        return out
+
+    def get(self, record_id: str) -> Optional[StoredPlan]:
+        """One record, with its request and plan, by "<segment>-<row id>"."""
+        try:
+            seg, rowid = (int(x) for x in record_id.split("-", 1))
+        except ValueError:
+            return None
+        if not self._file(seg).exists():
+            return None
+        db = self._reader(seg)
+        try:
+            row = db.execute(f"SELECT {_SUMMARY}, codec, request, plan FROM plans WHERE id = ?", (rowid,)).fetchone()
+        finally:
+            db.close()
+        return self._record(seg, row, True) if row else None
+
+    def destinations(self, limit: int = 20) -> List[Tuple[str, int]]:
+        """Most planned destinations across all segments (index-only counts)."""
+        counts: Dict[str, int] = {}
+        for seg in self.segments():
+            db = self._reader(seg)
+            try:
+                for dest, n in db.execute("SELECT destination, COUNT(*) FROM plans GROUP BY destination"):
+                    counts[dest] = counts.get(dest, 0) + n
+            except sqlite3.OperationalError:
+                continue
+            finally:
+                db.close()
+        return sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]
+
+    def snapshot(self) -> Dict[str, Any]:
+        segs = self.segments()
+        return {
+            "segments": len(segs),
+            "active": self._active_segment(),
+            "bytes": sum(self._file(s).stat().st_size for s in segs if self._file(s).exists()),
+        }
+
+    @staticmethod
+    def _record(seg: int, row: Tuple[Any, ...], with_plan: bool) -> StoredPlan:
+        rec = StoredPlan(f"{seg}-{row[0]}", *row[1:8])
+        if with_plan:
+            codec, request, blob = row[8:11]
+            rec.request = json.loads(request)
+            rec.plan = json.loads(_decompress(codec, blob))
+        return rec
+
+# -------------------- Background writer --------------------
+
+class PlanStoreWriter:
+    """Daemon thread that batches queued PendingPlans into PlanStore.append_many."""
+
+    def __init__(self, store: PlanStore, max_queue: int, batch: int, flush_ms: float) -> None:
+        self.store = store
+        self.batch = max(int(batch), 1)
+        self.flush_s = max(float(flush_ms), 1.0) / 1000.0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(int(max_queue), 1))
+        self._thread = threading.Thread(target=self._loop, name="plan-store-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: PendingPlan) -> bool:
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            PLAN_STORE_RECORDS.inc(status="dropped")
+            return False
+
+    def _loop(self) -> None:
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            items: List[PendingPlan] = []
+            deadline = time.monotonic() + self.flush_s
+            while True:
+                if item is _STOP:
+                    stop = True
+                    break
+                items.append(item)
+                if len(items) >= self.batch:
+                    break
+                try:
+                    # drain what is already queued; wait briefly only to fill a small batch
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+                except queue.Empty:
+                    break
+            if items:
+                self._write(items)
+
+    def _write(self, items: List[PendingPlan]) -> None:
+        rows = []
+        for it in items:
+            try:
+                rows.append(it.row())
+            except Exception:
+                PLAN_STORE_RECORDS.inc(status="error")
+        try:
+            if rows:
+                self.store.append_many(rows)
+                PLAN_STORE_RECORDS.inc(len(rows), status="written")
+        except Exception:
+            PLAN_STORE_RECORDS.inc(len(rows), status="error")
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush what is queued and stop the thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+
+_STATE: Dict[str, Any] = {"store": None, "writer": None, "config": None}
+_STATE_LOCK = threading.Lock()
+_OPENER: Dict[str, Optional[threading.Thread]] = {"thread": None}
+_OPENER_LOCK = threading.Lock()  # never held while opening, unlike _STATE_LOCK
+
+
+def _config(s: Settings) -> Tuple[Any, ...]:
+    return (s.PLAN_STORE_DIR, s.PLAN_STORE_SEGMENT_BYTES, s.PLAN_STORE_QUEUE_MAX, s.PLAN_STORE_BATCH,
+            s.PLAN_STORE_FLUSH_MS)
+
+
+def get_plan_store() -> Optional[PlanStore]:
+    """
+    Process-wide PlanStore (its writer thread starts with it); None when disabled.
+    Opening (or reopening after a settings change) touches the disk and joins the old
+    writer: call it at startup or from a thread, not on the event loop.
+    """
+    s = get_settings()
+    if not s.PLAN_STORE_ENABLED:
+        return None
+    config = _config(s)
+    with _STATE_LOCK:
+        if _STATE["store"] is None or _STATE["config"] != config:
+            _close_locked()
+            try:
+                store = PlanStore(s.PLAN_STORE_DIR, s.PLAN_STORE_SEGMENT_BYTES)
+            except (OSError, sqlite3.Error):
+                return None
+            _STATE.update(store=store, config=config,
+                          writer=PlanStoreWriter(store, *config[2:]))
+        opened: PlanStore = _STATE["store"]
+        return opened
+
+
+def record_plan(
+    request: TripRequest,
+    plan: Union[Plan, bytes, Dict[str, Any]],
+    orchestrator: Optional[str] = None,
+    source: Optional[str] = None,
+) -> bool:
+    """
+    Queue a finished plan for the store. Never blocks; False when disabled or the queue is full.
+    A store that is not open yet (or whose settings changed) is opened on a background
+    thread, and the plans finished meanwhile are dropped and counted.
+    """
+    s = get_settings()
+    if not s.PLAN_STORE_ENABLED:
+        return False
+    writer: Optional[PlanStoreWriter] = _STATE["writer"]
+    if writer is None or _STATE["config"] != _config(s):
+        _open_in_background()
+        PLAN_STORE_RECORDS.inc(status="dropped")
+        return False
+    return writer.submit(PendingPlan(request, plan, orchestrator, source))
+
+
+def _open_in_background() -> None:
+    with _OPENER_LOCK:
+        opener = _OPENER["thread"]
+        if opener is None or not opener.is_alive():
+            opener = _OPENER["thread"] = threading.Thread(target=get_plan_store, name="plan-store-open", daemon=True)
+            opener.start()
+
+
+def _close_locked() -> None:
+    if _STATE["writer"] is not None:
+        _STATE["writer"].close()
+    if _STATE["store"] is not None:
+        _STATE["store"].close()
+    _STATE.update(store=None, writer=None, config=None)
+
+
+def close_plan_store() -> None:
+    """Flush queued plans and close the store (app shutdown, end of a CLI run)."""
+    with _STATE_LOCK:
+        _close_locked()
+
+
+if __name__ == "__main__":
+    import typer
+
+    cli = typer.Typer(help="Append-only plan store")
+
+    def _open() -> PlanStore:
+        s = get_settings()
+        if not Path(s.PLAN_STORE_DIR).exists():
+            print(f"no plan store at {s.PLAN_STORE_DIR}")
+            raise typer.Exit(code=1)
+        return PlanStore(s.PLAN_STORE_DIR, s.PLAN_STORE_SEGMENT_BYTES)
+
+    @cli.command("query")
+    def query_cmd(
+        destination: Optional[str] = typer.Option(None),
+        start_date: Optional[str] = typer.Option(None, help="Trip start date (YYYY-MM-DD)"),
+        request_hash: Optional[str] = typer.Option(None),
+        limit: int = typer.Option(20),
+        plans: bool = typer.Option(False, "--plans", help="Include request and plan bodies"),
+    ) -> None:
+        for rec in _open().query(destination, start_date, request_hash, limit=limit, with_plan=plans):
+            print(json.dumps(rec.to_dict(), ensure_ascii=False))
+
+    @cli.command("get")
+    def get_cmd(record_id: str) -> None:
+        rec = _open().get(record_id)
+        if rec is None:
+            raise typer.Exit(code=1)
+        print(json.dumps(rec.to_dict(), indent=2, ensure_ascii=False))
+
+    @cli.command("top")
+    def top_cmd(limit: int = typer.Option(20)) -> None:
+        for dest, n in _open().destinations(limit):
+            print(f"{n:>8}  {dest}")
+
+    @cli.command("stats")
+    def stats_cmd() -> None:
+        print(json.dumps(_open().snapshot(), indent=2))
+
+    cli()
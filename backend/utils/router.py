@@ -0,0 +1,209 @@
+"""
+Latency-aware routing, hedging and circuit breaking across the configured LLM providers.
+
+The router keeps a rolling window of latencies and outcomes per backend
+(provider:model). `hedged()` starts the healthiest backend first and gives it a
+deadline equal to its own latency percentile (LLM_HEDGE_PERCENTILE); if no valid
+answer has arrived by then, or the call fails early, the next backend is started.
+The first valid answer wins and the other call is cancelled. A backend that fails
+LLM_BREAKER_FAILURES times in a row is skipped for LLM_BREAKER_COOLDOWN_S (circuit
+open), then let through for a single probe (half-open) that closes or re-opens it.
+"""
+from __future__ import annotations
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .admission import Overloaded, admitted, provider_admission
+from .config import Settings
+from .metrics import LLM_BREAKER, LLM_CALLS
+
+Backend = Tuple[str, Dict[str, str]]
+# attempt(backend, hedge) -> (result, valid)
+Attempt = Callable[[Backend, bool], Awaitable[Tuple[Any, bool]]]
+
+WINDOW = 50          # calls remembered per backend
+MIN_SAMPLES = 5      # latencies needed before percentiles replace LLM_HEDGE_DELAY_S
+
+
+def backend_key(backend: Backend) -> str:
+    return f"{backend[0]}:{backend[1].get('model')}"
+
+
+@dataclass
+class BackendStats:
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=WINDOW))  # seconds, valid answers
+    outcomes: Deque[bool] = field(default_factory=lambda: deque(maxlen=WINDOW))
+    consecutive_failures: int = 0
+    open_until: float = 0.0     # monotonic; 0 = closed, past = half-open
+    probing: bool = False       # half-open trial call in flight
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.latencies) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100.0 * len(ordered)) - 1))]
+
+    @property
+    def error_rate(self) -> float:
+        return 1.0 - sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    def state(self, now: float) -> str:
+        if not self.open_until:
+            return "closed"
+        return "open" if now < self.open_until else "half_open"
+
+
+class ProviderRouter:
+    def __init__(self) -> None:
+        self._stats: Dict[str, BackendStats] = {}
+
+    def stats(self, backend: Backend) -> BackendStats:
+        key = backend_key(backend)
+        if key not in self._stats:
+            self._stats[key] = BackendStats()
+        return self._stats[key]
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+    # ---------- routing ----------
+
+    def order(self, backends: Sequence[Backend], s: Settings) -> List[Backend]:
+        """
+        Backends with an open circuit last. With PROVIDER=auto, measured backends then
+        compete on median latency inflated by their error rate; an explicit PROVIDER
+        keeps its place while its circuit is closed.
+        """
+        now = time.monotonic()
+
+        def rank(item: Tuple[int, Backend]) -> Tuple[bool, float, int]:
+            i, b = item
+            st = self.stats(b)
+            tripped = st.state(now) == "open"
+            if s.PROVIDER != "auto":
+                return tripped, float(i), i
+            p50 = st.percentile(50.0)
+            est = p50 * (1.0 + st.error_rate) if p50 is not None else (0.0 if i == 0 else math.inf)
+            return tripped, est, i
+
+        return [b for _, b in sorted(enumerate(backends), key=rank)]
+
+    def allow(self, backend: Backend) -> bool:
+        """Closed: yes. Open: no. Half-open: only the first caller (the probe)."""
+        st = self.stats(backend)
+        state = st.state(time.monotonic())
+        if state == "closed":
+            return True
+        if state == "half_open" and not st.probing:
+            st.probing = True
+            return True
+        return False
+
+    def hedge_delay(self, backend: Backend, s: Settings) -> float:
+        p = self.stats(backend).percentile(s.LLM_HEDGE_PERCENTILE)
+        return max(p if p is not None else s.LLM_HEDGE_DELAY_S, s.LLM_HEDGE_MIN_DELAY_S)
+
+    # ---------- outcomes ----------
+
+    def record(self, backend: Backend, ok: bool, seconds: float, s: Settings) -> None:
+        st = self.stats(backend)
+        st.outcomes.append(ok)
+        was_open = bool(st.open_until)
+        st.probing = False
+        if ok:
+            st.latencies.append(seconds)
+            st.consecutive_failures = 0
+            if was_open:
+                st.open_until = 0.0
+                LLM_BREAKER.inc(backend=backend_key(backend), state="closed")
+            return
+        st.consecutive_failures += 1
+        if was_open or st.consecutive_failures >= max(s.LLM_BREAKER_FAILURES, 1):
+            st.open_until = time.monotonic() + s.LLM_BREAKER_COOLDOWN_S
+            LLM_BREAKER.inc(backend=backend_key(backend), state="open")
+
+    def release(self, backend: Backend) -> None:
+        """A call was cancelled (lost the race): no verdict, but free the half-open probe slot."""
+        self.stats(backend).probing = False
+
+    async def _timed(self, backend: Backend, attempt: Attempt, hedge: bool, s: Settings) -> Tuple[Any, bool]:
+        labels = {"provider": backend[0], "hedge": "true" if hedge else "false"}
+        t0 = 0.0
+        try:
+            async with admitted(provider_admission(backend[0])):
+                t0 = time.monotonic()  # latency from admission on: queue wait is not the provider's
+                result, ok = await attempt(backend, hedge)
+        except Overloaded:
+            # saturated locally, not the provider's fault: no breaker verdict (frees a half-open probe), fail over
+            self.release(backend)
+            LLM_CALLS.inc(outcome="shed", **labels)
+            return None, False
+        except asyncio.CancelledError:
+            self.release(backend)
+            LLM_CALLS.inc(outcome="cancelled", **labels)
+            raise
+        except Exception:
+            result, ok = None, False
+        self.record(backend, ok, time.monotonic() - t0, s)
+        LLM_CALLS.inc(outcome="ok" if ok else "error", **labels)
+        return result, ok
+
+    # ---------- hedging ----------
+
+    async def hedged(
+        self, backends: Sequence[Backend], attempt: Attempt, s: Settings
+    ) -> Tuple[Any, Optional[Backend]]:
+        """
+        Run `attempt` on the best backend, hedging / failing over to the next ones.
+        Returns (result, winning backend), or (None, None) when nothing valid arrives:
+        a failed call's result (e.g. a stream that died half-way) is never returned,
+        so callers cannot cache a partial answer as if it were complete.
+        """
+        queue = self.order(backends, s)
+        tasks: Dict["asyncio.Task[Tuple[Any, bool]]", Backend] = {}
+        launched = 0
+
+        def launch() -> Optional[Backend]:
+            nonlocal launched
+            while queue:
+                b = queue.pop(0)
+                if self.allow(b):
+                    tasks[asyncio.ensure_future(self._timed(b, attempt, launched > 0, s))] = b
+                    launched += 1
+                    return b
+            return None
+
+        current = launch()
+        if current is None:
+            return None, None
+        deadline: Optional[float] = self.hedge_delay(current, s)
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(
+                    list(tasks), timeout=deadline if queue else None, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:  # deadline passed: hedge with the next backend
+                    current = launch()
+                    deadline = self.hedge_delay(current, s) if current is not None else None
+                    continue
+                for t in done:
+                    b = tasks.pop(t)
+                    result, ok = t.result()
+                    if ok:
+                        return result, b
+                if queue:  # failed early: fail over without waiting for the deadline
+                    current = launch()
+                    deadline = self.hedge_delay(current, s) if current is not None else None
+        finally:
+            for t in tasks:
+                t.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        return None, None
+
+
+ROUTER = ProviderRouter()
@@ -0,0 +1,155 @@
+"""
+Response encoding for plans: JSON bytes, field projection and content negotiation.
+
+Models go straight to bytes through their pydantic-core serializer; plain dicts (SSE
+and NDJSON records, projected plans) through orjson when installed, else compact
+stdlib json. `?fields=days,total_estimated_cost` keeps only the listed fields (dotted
+paths reach into objects and apply to every element of a list, e.g.
+`metadata.spot_source` or `days.activities`). HTTP plan bodies leave out
+`metadata.llm_spots` (see PLAN_BODY_EXCLUDE). Bodies of at least
+RESPONSE_COMPRESS_MIN_BYTES are compressed with brotli (when installed) or gzip,
+whichever the client prefers in Accept-Encoding.
+"""
+from __future__ import annotations
+import gzip
+import json
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from .config import get_settings
+
+try:
+    import orjson
+except Exception:
+    orjson = None  # type: ignore[assignment, unused-ignore]
+
+try:
+    import brotli
+except Exception:
+    brotli = None  # type: ignore[assignment, unused-ignore]
+
+Fields = Tuple[str, ...]
+
+# -------------------- JSON --------------------
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON; unknown types are stringified rather than failing the response."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def dump_model(model: BaseModel, exclude: Optional[Dict[str, Any]] = None) -> bytes:
+    """model.model_dump_json() without the str round trip."""
+    return type(model).__pydantic_serializer__.to_json(model, exclude=exclude)
+
+
+# Plan.metadata["llm_spots"] repeats the spots `days` already lists as activities (one full
+# object per scheduled spot). It stays on the Plan for in-process callers (Critic/Budget inputs,
+# evaluation rubrics); HTTP plan bodies drop it, and /plan/stream sends it once, as its
+# "spots" event.
+PLAN_BODY_EXCLUDE: Dict[str, Any] = {"metadata": {"llm_spots": True}}
+
+
+def dump_plan(plan: BaseModel) -> bytes:
+    """A Plan as its HTTP body: JSON bytes without metadata.llm_spots."""
+    return dump_model(plan, exclude=PLAN_BODY_EXCLUDE)
+
+
+# -------------------- Field projection --------------------
+
+def parse_fields(spec: Optional[str], allowed: Collection[str]) -> Fields:
+    """'a,b.c' -> ('a', 'b.c'); () for no projection. Raises ValueError on unknown top-level names."""
+    fields = tuple(dict.fromkeys(f.strip() for f in (spec or "").split(",") if f.strip()))
+    unknown = sorted({f.split(".", 1)[0] for f in fields} - set(allowed))
+    if unknown:
+        raise ValueError(f"unknown field(s): {', '.join(unknown)} (choose from: {', '.join(allowed)})")
+    return fields
+
+
+def _tree(fields: Fields) -> Dict[str, Any]:
+    # {"days": {"activities": {}}, "total_estimated_cost": {}}; {} keeps the whole value
+    root: Dict[str, Any] = {}
+    for path in sorted(fields, key=lambda f: f.count(".")):
+        node = root
+        *parents, leaf = path.split(".")
+        for part in parents:
+            if part in node and not node[part]:
+                break  # a shorter path already keeps this whole value
+            node = node.setdefault(part, {})
+        else:
+            node[leaf] = {}
+    return root
+
+
+def _apply(value: Any, tree: Dict[str, Any]) -> Any:
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [_apply(v, tree) for v in value]
+    if isinstance(value, dict):
+        return {k: _apply(v, tree[k]) for k, v in value.items() if k in tree}
+    return value
+
+
+def project(doc: Dict[str, Any], fields: Fields) -> Dict[str, Any]:
+    if not fields:
+        return doc
+    out: Dict[str, Any] = _apply(doc, _tree(fields))
+    return out
+
+
+def project_json(body: bytes, fields: Fields) -> bytes:
+    """Projection of a serialized JSON object (the body itself when `fields` is empty)."""
+    return dumps(project(loads(body), fields)) if fields else body
+
+# -------------------- Content negotiation --------------------
+
+def _accepted(accept_encoding: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, val = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(val)
+                except ValueError:
+                    q = 0.0
+        if token.strip():
+            out[token.strip().lower()] = q
+    return out
+
+
+def available_encodings() -> List[str]:
+    """Content-codings this process can produce, preferred first."""
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: Optional[str], size: int) -> Optional[str]:
+    """Coding to use for a body of `size` bytes, or None to send it as-is."""
+    s = get_settings()
+    if not accept_encoding or not s.RESPONSE_COMPRESSION or size < s.RESPONSE_COMPRESS_MIN_BYTES:
+        return None
+    accepted = _accepted(accept_encoding)
+    best, best_q = None, 0.0
+    for enc in available_encodings():
+        q = accepted.get(enc, accepted.get("*", 0.0))
+        if q > best_q:  # ties keep the earlier (better) coding
+            best, best_q = enc, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        packed: bytes = brotli.compress(body, quality=5)
+        return packed
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    raise ValueError(f"unsupported content-coding '{encoding}'")
@@ -0,0 +1,186 @@
+"""
+Near-duplicate detection for short titles (activity names) in near-linear time.
+
+Titles are normalized (accents, case, parenthetical/neighborhood suffixes, stopwords,
+multilingual synonyms), shingled into word + character n-grams, signed with MinHash
+and bucketed with LSH banding. Only pairs that share a bucket are verified with
+exact Jaccard similarity, so cost grows with the number of titles, not its square.
+A title that only adds a specific word to another ("Central Park Zoo" after "Central
+Park") names a different place, however similar the shingles.
+"""
+from __future__ import annotations
+import hashlib
+import re
+import struct
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+_U32X16 = struct.Struct("<16I")
+_STOPWORDS = frozenset(
+    "a an and the of at in on to de du des la le les el los las di del della da do dos das "
+    "von der und et y e d l s".split()  # incl. elisions: d'Orsay, l'Arc
+)
+# same concept in different languages / phrasings collapses to one token
+_SYNONYMS = {
+    "musee": "museum", "museo": "museum", "museu": "museum", "museum": "museum", "museums": "museum",
+    "galerie": "gallery", "galleria": "gallery", "galeria": "gallery",
+    "cathedrale": "cathedral", "cattedrale": "cathedral", "catedral": "cathedral", "duomo": "cathedral",
+    "eglise": "church", "chiesa": "church", "iglesia": "church", "basilique": "basilica",
+    "jardin": "garden", "giardino": "garden", "jardim": "garden", "gardens": "garden",
+    "parc": "park", "parco": "park", "parque": "park",
+    "marche": "market", "mercato": "market", "mercado": "market", "markets": "market",
+    "torre": "tower", "pont": "bridge", "ponte": "bridge", "puente": "bridge",
+    "place": "square", "piazza": "square", "plaza": "square", "praca": "square",
+    "palais": "palace", "palazzo": "palace", "palacio": "palace",
+}
+# category words: adding one does not make a different place ("Louvre" / "Louvre Museum")
+_GENERIC = frozenset(_SYNONYMS.values())
+# French "tour" is a tower after "la" ("La Tour Eiffel") or in a landmark's name; anywhere
+# else it is the English word ("Tour the Louvre", "Tour guide meetup", "City walking tour")
+_FRENCH_TOWER = re.compile(r"^(?:la tour|tour(?= (?:eiffel|montparnasse|saint[ -]jacques|pey[ -]berland)\b)) ")
+_SUFFIX = re.compile(r"\s+[—–-]\s+.*$")      # "Louvre — morning • 2h"
+_PARENS = re.compile(r"\([^)]*\)|\[[^\]]*\]")  # "(1st arr.)", "[note]"
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_title(text: str) -> str:
+    """Canonical token string: 'Musée du Louvre (1st arr.)' -> 'louvre museum'."""
+    s = _SUFFIX.sub("", text or "")
+    s = _PARENS.sub(" ", s)
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii").lower().strip()
+    s = _FRENCH_TOWER.sub("tower ", s)
+    tokens = {_SYNONYMS.get(t, t) for t in _NON_WORD.split(s) if t and t not in _STOPWORDS}
+    return " ".join(sorted(tokens))
+
+
+def shingles(canonical: str, k: int = 3) -> FrozenSet[str]:
+    """Word tokens plus character k-grams of each token (robust to small spelling drift)."""
+    out: Set[str] = set()
+    for tok in canonical.split():
+        out.add(tok)
+        padded = f"^{tok}$"
+        for i in range(max(len(padded) - k + 1, 1)):
+            out.add(padded[i:i + k])
+    return frozenset(out)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _narrower(a: Set[str], b: Set[str]) -> bool:
+    """b is a's words plus a specific one: a place within or next to a ('central park zoo')."""
+    return a < b and not (b - a) <= _GENERIC
+
+
+def same_place(a: str, b: str, sa: FrozenSet[str], sb: FrozenSet[str], threshold: float = 0.6) -> bool:
+    """Whether canonical titles `a` and `b` (shingled: `sa`, `sb`) name the same place."""
+    if jaccard(sa, sb) < threshold:
+        return False
+    wa, wb = set(a.split()), set(b.split())
+    return not _narrower(wa, wb) and not _narrower(wb, wa)
+
+
+class MinHashLSH:
+    """
+    MinHash signatures (num_perm = bands * rows) with LSH banding.
+    Pairs with Jaccard similarity around (1/bands) ** (1/rows) or above are likely to collide.
+
+    Each shingle's num_perm hash values come from keyed blake2b digests (16 x u32 per
+    digest, computed in C) and are cached, since titles share most of their n-grams;
+    a signature is then an element-wise min over cached rows.
+    """
+
+    _MAX_CACHED = 200_000
+
+    def __init__(self, bands: int = 8, rows: int = 4, seed: int = 1) -> None:
+        self.bands, self.rows = bands, rows
+        self.num_perm = bands * rows
+        self._keys = [f"{seed}:{i}".encode() for i in range(-(-self.num_perm // 16))]
+        self._rows: Dict[str, Tuple[int, ...]] = {}
+
+    def _row(self, shingle: str) -> Tuple[int, ...]:
+        row = self._rows.get(shingle)
+        if row is None:
+            if len(self._rows) >= self._MAX_CACHED:
+                self._rows.clear()
+            data = shingle.encode("utf-8")
+            values: Tuple[int, ...] = ()
+            for key in self._keys:
+                values += _U32X16.unpack(hashlib.blake2b(data, digest_size=64, key=key).digest())
+            row = self._rows[shingle] = values[:self.num_perm]
+        return row
+
+    def signature(self, items: Iterable[str]) -> Tuple[int, ...]:
+        rows = [self._row(s) for s in items] or [self._row("")]
+        return tuple(map(min, zip(*rows)))
+
+    def candidate_pairs(self, signatures: Sequence[Tuple[int, ...]]) -> Set[Tuple[int, int]]:
+        """Index pairs (i < j) that share at least one LSH band bucket."""
+        pairs: Set[Tuple[int, int]] = set()
+        r = self.rows
+        for band in range(self.bands):
+            buckets: Dict[Tuple[int, ...], List[int]] = {}
+            lo = band * r
+            for i, sig in enumerate(signatures):
+                buckets.setdefault(sig[lo:lo + r], []).append(i)
+            for members in buckets.values():
+                if len(members) > 1:
+                    for x in range(len(members)):
+                        for y in range(x + 1, len(members)):
+                            pairs.add((members[x], members[y]))
+        return pairs
+
+
+def near_duplicate_groups(
+    titles: Sequence[str],
+    threshold: float = 0.6,
+    lsh: Optional[MinHashLSH] = None,
+    canonical: Optional[Sequence[Optional[str]]] = None,
+) -> List[List[int]]:
+    """
+    Group indexes of `titles` whose normalized shingle sets have Jaccard >= threshold
+    (and neither only adds a specific word to the other, see same_place). Identical canonical titles are grouped directly; the rest go through MinHash/LSH.
+    `canonical` may carry already-normalized titles (None = normalize that one here).
+    Returns groups of size >= 2, each sorted, ordered by first index.
+    """
+    lsh = lsh or MinHashLSH()
+    canon = [c if c is not None else normalize_title(t)
+             for t, c in zip(titles, canonical or [None] * len(titles))]
+
+    parent = list(range(len(titles)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    # exact canonical matches: one representative per distinct title goes to LSH
+    first: Dict[str, int] = {}
+    reps: List[int] = []
+    for i, c in enumerate(canon):
+        if c in first:
+            union(first[c], i)
+        else:
+            first[c] = i
+            reps.append(i)
+
+    sets = {i: shingles(canon[i]) for i in reps}
+    sigs = [lsh.signature(sets[i]) for i in reps]
+    for x, y in lsh.candidate_pairs(sigs):
+        i, j = reps[x], reps[y]
+        if same_place(canon[i], canon[j], sets[i], sets[j], threshold):
+            union(i, j)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(titles)):
+        groups.setdefault(find(i), []).append(i)
+    return [g for _, g in sorted(groups.items()) if len(g) > 1]
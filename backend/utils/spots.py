@@ -0,0 +1,198 @@
+"""
+Compact spot representation shared by the agents.
+
+Curation (LLM, spot cache, catalogue) produces spots as dicts in the
+ranked_spots_via_llm schema; those stay the wire format (Plan.metadata["llm_spots"],
+the "spots" stream event). Inside one plan the agents work on a SpotTable built once
+from that list: one row per spot in curated (rank) order, stored by column. Strings
+(titles, neighborhoods, reasons, best_time) are interned in one pool and referenced
+by id, categories are small codes into a category vocabulary, durations and prices
+are float arrays (NaN = not given). Titles are normalized once (utils.similarity), so
+the Critic and Budget match rows by id instead of re-parsing activity strings; those
+strings are rendered only when a DayPlan is built.
+
+`Spot` is the row view (a frozen, slotted dataclass) for code that wants attributes.
+"""
+from __future__ import annotations
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+from .similarity import normalize_title
+
+NONE = -1                       # missing string id
+# known categories get stable codes; anything else the LLM says is appended per table
+CATEGORIES = (
+    "other", "museum", "gallery", "landmark", "church", "park", "garden", "viewpoint", "market",
+    "food", "cafe", "nightlife", "shopping", "tour", "walk", "neighborhood",
+)
+SLOT_OF_BEST_TIME = {"morning": 0, "afternoon": 1, "evening": 2, "night": 2}
+
+
+def activity_string(
+    title: str, neighborhood: Optional[str] = None, best_time: Optional[str] = None, duration: Any = None
+) -> str:
+    """'Musée d'Orsay (Left Bank) — morning • 2.0h' (the Plan schema's activity line)."""
+    bits = [title]
+    suffix: List[str] = []
+    if neighborhood:
+        bits.append(f"({neighborhood})")
+    if best_time and isinstance(best_time, str):
+        suffix.append(best_time)
+    if isinstance(duration, (int, float)) and not (isinstance(duration, float) and math.isnan(duration)):
+        suffix.append(f"{round(float(duration), 1)}h")
+    if suffix:
+        bits.append(" — " + " • ".join(suffix))
+    return " ".join(bits).strip()
+
+
+@dataclass(frozen=True, slots=True)
+class Spot:
+    title: str
+    neighborhood: Optional[str] = None
+    category: str = "other"
+    best_time: Optional[str] = None
+    duration_hours: Optional[float] = None
+    est_price: Optional[float] = None
+    reason_short: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, d: Mapping[str, Any]) -> "Spot":
+        return cls(
+            title=str(d.get("title") or ""),
+            neighborhood=str(d["neighborhood"]) if d.get("neighborhood") else None,
+            category=str(d.get("category") or "other").strip().lower(),
+            best_time=str(d["best_time"]) if d.get("best_time") else None,
+            duration_hours=_number(d.get("duration_hours")),
+            est_price=_number(d.get("est_price")),
+            reason_short=str(d["reason_short"]) if d.get("reason_short") else None,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "title": self.title,
+            "neighborhood": self.neighborhood,
+            "category": self.category,
+            "best_time": self.best_time,
+            "duration_hours": self.duration_hours,
+            "est_price": self.est_price,
+            "reason_short": self.reason_short,
+        }
+
+    def activity(self, slot: Optional[str] = None) -> str:
+        """Activity line, labelled with `slot` (the slot it was given) instead of best_time."""
+        return activity_string(self.title, self.neighborhood, slot or self.best_time, self.duration_hours)
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return None if value is None or isinstance(value, bool) else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SpotTable:
+    """Column store of spots in rank order; row i is the i-th curated spot."""
+
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self.categories: List[str] = list(CATEGORIES)
+        self._codes: Dict[str, int] = {c: i for i, c in enumerate(CATEGORIES)}
+        self.title = array("i")             # string id
+        self.key = array("i")               # string id of the normalized title (utils.similarity)
+        self.neighborhood = array("i")      # string id or NONE
+        self.area = array("i")              # string id of the folded neighborhood (grouping) or NONE
+        self.best_time = array("i")         # string id or NONE
+        self.slot = array("b")              # preferred slot index from best_time, -1 = flexible
+        self.category = array("B")          # code into self.categories
+        self.duration = array("d")          # hours as given, NaN when missing
+        self.price = array("d")             # per person as given, NaN when missing
+        self.reason = array("i")            # string id or NONE
+        self._by_key: Dict[int, int] = {}   # normalized title id -> first row
+
+    @classmethod
+    def from_dicts(cls, spots: Sequence[Mapping[str, Any]]) -> "SpotTable":
+        table = cls()
+        for s in spots:
+            table.append(s)
+        return table
+
+    def intern(self, text: Optional[str]) -> int:
+        if text is None:
+            return NONE
+        i = self._ids.get(text)
+        if i is None:
+            i = self._ids[text] = len(self.strings)
+            self.strings.append(text)
+        return i
+
+    def append(self, spot: Mapping[str, Any]) -> int:
+        row = len(self.title)
+        title = str(spot.get("title") or "")
+        nbh = str(spot["neighborhood"]) if spot.get("neighborhood") else None
+        best = str(spot["best_time"]) if spot.get("best_time") else None
+        category = str(spot.get("category") or "other").strip().lower()
+        code = self._codes.get(category)
+        if code is None:
+            code = len(self.categories) if len(self.categories) < 256 else 0
+            if code:
+                self._codes[category] = code
+                self.categories.append(category)
+        self.title.append(self.intern(title))
+        self.key.append(self.intern(normalize_title(title) or title.casefold()))
+        self.neighborhood.append(self.intern(nbh))
+        self.area.append(self.intern(" ".join(nbh.split()).casefold()) if nbh else NONE)
+        self.best_time.append(self.intern(best))
+        self.slot.append(SLOT_OF_BEST_TIME.get((best or "").strip().lower(), -1))
+        self.category.append(code)
+        duration, price = _number(spot.get("duration_hours")), _number(spot.get("est_price"))
+        self.duration.append(math.nan if duration is None else duration)
+        self.price.append(math.nan if price is None else price)
+        self.reason.append(self.intern(str(spot["reason_short"]) if spot.get("reason_short") else None))
+        self._by_key.setdefault(self.key[row], row)
+        return row
+
+    def __len__(self) -> int:
+        return len(self.title)
+
+    def __iter__(self) -> Iterator[Spot]:
+        return (self[i] for i in range(len(self)))
+
+    def __getitem__(self, row: int) -> Spot:
+        return Spot(
+            title=self.strings[self.title[row]],
+            neighborhood=self.text(self.neighborhood[row]),
+            category=self.categories[self.category[row]],
+            best_time=self.text(self.best_time[row]),
+            duration_hours=None if math.isnan(self.duration[row]) else self.duration[row],
+            est_price=None if math.isnan(self.price[row]) else self.price[row],
+            reason_short=self.text(self.reason[row]),
+        )
+
+    def text(self, sid: int) -> Optional[str]:
+        return None if sid == NONE else self.strings[sid]
+
+    # ---------- lookups ----------
+
+    def find(self, title: str) -> Optional[int]:
+        """Row of the spot whose normalized title matches `title`'s (first in rank order)."""
+        sid = self._ids.get(normalize_title(title) or title.casefold())
+        return None if sid is None else self._by_key.get(sid)
+
+    def category_of(self, row: int) -> str:
+        return self.categories[self.category[row]]
+
+    def activity(self, row: int, slot: Optional[str] = None) -> str:
+        """Activity line for a row, labelled with `slot` (the slot it was given) instead of best_time."""
+        dur = self.duration[row]
+        return activity_string(
+            self.strings[self.title[row]],
+            self.text(self.neighborhood[row]),
+            slot or self.text(self.best_time[row]),
+            None if math.isnan(dur) else dur,
+        )
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [spot.to_dict() for spot in self]
@@ -1,23 +1,170 @@
 from __future__ import annotations
-from typing import List
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .metrics import SPAN_SECONDS
+
+
+@dataclass
+class Span:
+    """A timed section of work. Times are seconds since the trace started (monotonic clock)."""
+    name: str
+    span_id: int
+    parent_id: Optional[int]
+    start: float
+    end: Optional[float] = None
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def add(self, key: str, n: float) -> None:
+        """Accumulate a numeric attribute (e.g. tokens over several chunks)."""
+        self.attrs[key] = self.attrs.get(key, 0) + n
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end is None else (self.end - self.start) * 1000.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "start_ms": round(self.start * 1000.0, 3),
+            "duration_ms": None if self.end is None else round(self.duration_ms or 0.0, 3),
+            "attrs": dict(self.attrs),
+        }
+
+
+@dataclass
+class TraceEvent:
+    t: float                    # seconds since the trace started
+    message: str
+    span_id: Optional[int]
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"t_ms": round(self.t * 1000.0, 3), "span": self.span_id, "message": self.message}
+        if self.attrs:
+            out["attrs"] = dict(self.attrs)
+        return out
+
+
+# (trace, span) that code running in this context reports to; each asyncio task gets its own copy
+_CURRENT: ContextVar[Optional[Tuple["DecisionTrace", Span]]] = ContextVar("voyagecraft_span", default=None)
+
 
 class DecisionTrace:
     """
-    Minimal append-only trace used by agents and orchestrators to log decisions.
-    Keep it lightweight and serializable to JSON for API responses.
+    Append-only trace used by agents and orchestrators to log decisions.
+
+    Log lines stay one-liners ("[Planner] ...") and `dump()` still renders them as the
+    plain strings that go into Plan.trace. Each line is also kept as a structured event
+    with a monotonic timestamp and the span it was logged in; spans nest (plan -> agent
+    -> provider call) and carry attributes such as token counts and cache status.
+    Closed spans feed the latency histograms behind /metrics.
     """
-    def __init__(self) -> None:
-        self._events: List[str] = []
+    def __init__(self, name: str = "trace") -> None:
+        self._events: List[TraceEvent] = []
+        self._spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._t0 = time.perf_counter()
+        self.root = self._open(name, None, {})
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._t0
 
-    def log(self, message: str) -> None:
+    def _open(self, name: str, parent: Optional[int], attrs: Dict[str, Any]) -> Span:
+        sp = Span(name=name, span_id=next(self._ids), parent_id=parent, start=self._now(), attrs=dict(attrs))
+        self._spans.append(sp)
+        return sp
+
+    def _close(self, sp: Span) -> None:
+        if sp.end is None:
+            sp.end = self._now()
+            SPAN_SECONDS.observe(sp.end - sp.start, span=sp.name)
+
+    def current(self) -> Span:
+        """Innermost open span of this trace in the running context (the root otherwise)."""
+        cur = _CURRENT.get()
+        return cur[1] if cur is not None and cur[0] is self else self.root
+
+    def log(self, message: str, **attrs: Any) -> None:
         # Keep one-liners; agents can include their name like: "[Planner] ..."
-        self._events.append(message)
+        self._events.append(TraceEvent(self._now(), message, self.current().span_id, attrs))
 
     def extend(self, messages: List[str]) -> None:
-        self._events.extend(messages)
+        for m in messages:
+            self.log(m)
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Span]:
+        """
+        Time a block as a child of the current span. Do not `yield` to a consumer
+        inside the block (generators): the span is bound to the running context.
+        """
+        sp = self._open(name, self.current().span_id, attrs)
+        token = _CURRENT.set((self, sp))
+        try:
+            yield sp
+        except BaseException as e:
+            sp.attrs.setdefault("error", type(e).__name__)
+            raise
+        finally:
+            _CURRENT.reset(token)
+            self._close(sp)
+
+    def finish(self, **attrs: Any) -> Span:
+        """Close the root span (idempotent) and return it."""
+        self.root.set(**attrs)
+        self._close(self.root)
+        return self.root
 
     def dump(self) -> List[str]:
-        return list(self._events)  # return a copy to avoid external mutation
+        return [e.message for e in self._events]  # return a copy to avoid external mutation
+
+    def events(self) -> List[Dict[str, Any]]:
+        return [e.to_dict() for e in self._events]
+
+    def spans(self) -> List[Dict[str, Any]]:
+        return [s.to_dict() for s in self._spans]
 
     def __len__(self) -> int:
         return len(self._events)
+
+
+def current_span() -> Optional[Span]:
+    cur = _CURRENT.get()
+    return cur[1] if cur is not None else None
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    """
+    Child span of whatever trace is active in this context; outside any trace the
+    block is still timed into the metrics, just not recorded anywhere else.
+    """
+    cur = _CURRENT.get()
+    if cur is not None:
+        with cur[0].span(name, **attrs) as sp:
+            yield sp
+        return
+    t0 = time.perf_counter()
+    sp = Span(name=name, span_id=0, parent_id=None, start=0.0, attrs=dict(attrs))
+    try:
+        yield sp
+    finally:
+        sp.end = time.perf_counter() - t0
+        SPAN_SECONDS.observe(sp.end, span=name)
+
+
+def annotate(**attrs: Any) -> None:
+    """Set attributes on the current span (no-op outside a trace)."""
+    sp = current_span()
+    if sp is not None:
+        sp.set(**attrs)
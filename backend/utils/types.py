@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from pydantic import BaseModel, Field
 
 class UserProfile(BaseModel):
@@ -26,3 +26,10 @@ class Plan(BaseModel):
     days: List[DayPlan]
     trace: List[str] = Field(default_factory=list)
     metadata: Dict[str, Any] = Field(default_factory=dict)
+
+class PlanEvent(BaseModel):
+    """Progress event emitted by orchestrators while a plan is being built (see /plan/stream)."""
+    event: Literal["spots", "day", "critic", "budget", "plan", "error"]
+    data: Dict[str, Any] = Field(default_factory=dict)
+    trace: List[str] = Field(default_factory=list)  # lines that also end up in Plan.trace
+    plan: Optional[Plan] = Field(default=None, exclude=True)  # the "plan" event's Plan, serialized at the edge
@@ -1,4 +1,4 @@
-import type { TripRequest, Plan } from "@/types";
+import type { TripRequest, Plan, PlanEvent, PlanEventType } from "@/types";
 
 const API_BASE =
   process.env.NEXT_PUBLIC_API_BASE?.replace(/\/+$/, "") || "http://127.0.0.1:8000";
@@ -39,3 +39,55 @@ export async function createPlan(req: TripRequest): Promise<Plan> {
   const data = (await res.json()) as Plan;
   return data;
 }
+
+/**
+ * Call FastAPI POST /plan/stream and invoke `onEvent` as each stage completes.
+ * Resolves with the final Plan (the "plan" event).
+ */
+export async function streamPlan(
+  req: TripRequest,
+  onEvent: (ev: PlanEvent) => void,
+): Promise<Plan> {
+  const res = await fetch(`${API_BASE}/plan/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
+    body: JSON.stringify(req),
+    cache: "no-store",
+  });
+  if (!res.ok || !res.body) {
+    throw new ApiError(`/plan/stream request failed`, res.status);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  let plan: Plan | null = null;
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let sep: number;
+    while ((sep = buffer.indexOf("\n\n")) !== -1) {
+      const frame = buffer.slice(0, sep);
+      buffer = buffer.slice(sep + 2);
+      let event: PlanEventType | null = null;
+      let data = "";
+      for (const line of frame.split("\n")) {
+        if (line.startsWith("event: ")) event = line.slice(7) as PlanEventType;
+        else if (line.startsWith("data: ")) data += line.slice(6);
+      }
+      if (!event) continue;
+      const payload = JSON.parse(data) as Omit<PlanEvent, "event">;
+      const ev: PlanEvent = { event, ...payload };
+      onEvent(ev);
+      if (event === "error") {
+        throw new ApiError(`/plan/stream failed`, 500, ev.data);
+      }
+      if (event === "plan") plan = ev.data as unknown as Plan;
+    }
+  }
+
+  if (!plan) throw new ApiError(`/plan/stream ended without a plan`, 502);
+  return plan;
+}
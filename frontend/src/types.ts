@@ -43,3 +43,12 @@ export const defaultRequest: TripRequest = {
   days: 3,
   profile: defaultProfile,
 };
+
+// Progress events from POST /plan/stream (Server-Sent Events)
+export type PlanEventType = "spots" | "day" | "critic" | "budget" | "plan" | "error";
+
+export interface PlanEvent {
+  event: PlanEventType;
+  data: Record<string, unknown>;
+  trace: string[];                // same lines that end up in Plan.trace
+}